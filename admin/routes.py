@@ -3,11 +3,10 @@ Admin routes - Flask route handlers for admin interface
 """
 from flask import Flask, render_template, request, redirect, url_for, session, jsonify, send_from_directory, send_file, Response, abort
 from werkzeug.datastructures import ImmutableMultiDict
+from werkzeug.exceptions import HTTPException
 from functools import wraps
 import os
 import logging
-import threading
-import subprocess
 import sys
 import time
 import secrets
@@ -15,16 +14,20 @@ from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
 from urllib.parse import urlparse, unquote
-import requests
 
 from .services import (
     validate_zip_code, validate_article_id, safe_path, get_db, get_db_legacy,
     hash_password, verify_password, get_articles, get_rejected_articles,
     toggle_article, get_sources, get_stats, get_settings, trash_article, restore_article,
-    toggle_top_story, toggle_top_article, toggle_alert, toggle_good_fit, train_relevance
+    toggle_top_story, toggle_top_article, toggle_alert, toggle_good_fit, train_relevance,
+    get_job_queue, submit_regeneration, REGENERATION_JOB_TYPES, send_static,
+    send_cached_page
 )
 from database import ArticleDatabase
-from jinja2 import Environment, FileSystemLoader
+from utils.job_queue import JOB_STATUSES
+from utils.templates import get_template
+from utils.image_proxy import ImageFetchError, get_image_proxy_cache
+from utils.feed_proxy import FeedFetchError, get_feed_cache
 from pathlib import Path
 from config import DATABASE_CONFIG, NEWS_SOURCES, WEBSITE_CONFIG, VERSION, CATEGORY_COLORS
 
@@ -34,12 +37,8 @@ load_dotenv()
 def render_dynamic_index(articles, active_category='local', zip_code='02720'):
     """Render the index template dynamically with articles and active category"""
     try:
-        # Setup Jinja2 environment
-        template_dir = Path(__file__).parent.parent / "website_generator" / "templates"
-        jinja_env = Environment(loader=FileSystemLoader(str(template_dir)))
-
-        # Get the index template
-        template = jinja_env.get_template('index.html.j2')
+        # Get the index template (compiled once per process, see utils/templates.py)
+        template = get_template('index.html.j2')
 
         # Generate navigation tabs with correct active state
         nav_tabs = generate_nav_tabs(active_category)
@@ -394,15 +393,9 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
-# Global flag to prevent concurrent regenerations
-_regenerating = False
-_regeneration_lock = threading.Lock()
+# Last on-load regeneration trigger (duplicate jobs are coalesced by the job queue)
 _last_regeneration_start = None
 
-# Static regeneration tracking
-_static_regenerating = {}  # zip_code -> bool
-_static_regeneration_lock = threading.Lock()
-
 # Security constants
 ZIP_CODE_LENGTH = 5
 MAX_ARTICLE_ID = 2**31 - 1
@@ -489,7 +482,7 @@ def serve_zip_page(zip_code):
         logger.error(f"[DEBUG] Error checking show_images: {e}")
 
     # No need to check exists again since get_zip_dir() already validated
-    return send_file(index_path)
+    return send_static(index_path)
 
 def serve_zip_category_page(zip_code, category_slug):
     """Unified function to serve zip-specific category page from clean zip structure"""
@@ -508,7 +501,7 @@ def serve_zip_category_page(zip_code, category_slug):
     category_path = os.path.join(full_zip_dir, 'category', f'{category_slug}.html')
 
     if os.path.exists(category_path):
-        return send_file(category_path)
+        return send_static(category_path)
     else:
         return "Category page not found", 404
 
@@ -554,6 +547,10 @@ if not flask_secret_key:
     logger.warning("FLASK_SECRET_KEY not set in environment. Using generated key (sessions will be invalidated on restart).")
 app.secret_key = flask_secret_key
 
+# Views that set their own Cache-Control: dynamic pages served by send_cached_page (browsers must be
+# able to revalidate them, so no no-store) and the image proxy (one year, immutable)
+SELF_CACHED_ENDPOINTS = {'index', 'category_page', 'zip_page', 'zip_category_page', 'cached_image'}
+
 # Security: Configure secure session cookies
 @app.after_request
 def after_request(response):
@@ -568,7 +565,9 @@ def after_request(response):
 
     # Only set content-type for admin pages and non-image responses
     content_type = response.headers.get('Content-Type', '').lower()
-    if not content_type.startswith('image/') and not request.path.startswith('/cached-images/'):
+    if (not content_type.startswith(('image/', 'text/css', 'text/javascript', 'application/javascript',
+                                     'application/rss+xml', 'application/atom+xml', 'application/xml', 'text/xml'))
+            and not request.path.startswith('/cached-images/')):
         # Force UTF-8 encoding for admin pages and other text content
         response.headers['Content-Type'] = 'text/html; charset=utf-8'
 
@@ -581,6 +580,9 @@ def after_request(response):
         response.headers.add('Expires', '0')
         response.headers.add('Last-Modified', datetime.now().strftime('%a, %d %b %Y %H:%M:%S GMT'))
         response.headers.add('ETag', '')
+    # Views that set their own validators (ETag/Last-Modified) keep their Cache-Control
+    elif request.endpoint in SELF_CACHED_ENDPOINTS:
+        pass
     # Add appropriate caching for website content
     else:
         path = request.path.lower()
@@ -716,93 +718,26 @@ def _should_regenerate():
         return False
 
 def _trigger_regeneration():
-    """Trigger website regeneration in background"""
-    global _regenerating, _last_regeneration_start
-
-    with _regeneration_lock:
-        if _regenerating:
-            return  # Already regenerating
-
-        _regenerating = True
-        _last_regeneration_start = datetime.now()
-
-        def regenerate():
-            global _regenerating
-            try:
-                logger.info("=" * 60)
-                logger.info("Website is out of date - triggering QUICK regeneration in background")
-                logger.info("Page served immediately - regeneration happening asynchronously")
-                logger.info("=" * 60)
-
-                # Run quick_regenerate.py
-                result = subprocess.run([
-                    sys.executable, 'scripts/deployment/quick_regenerate.py'
-                ], capture_output=True, text=True, timeout=300)
-
-                if result.returncode == 0:
-                    logger.info("Background regeneration completed successfully")
-                else:
-                    logger.error(f"Background regeneration failed: {result.stderr}")
-
-            except subprocess.TimeoutExpired:
-                logger.error("Background regeneration timed out")
-            except Exception as e:
-                logger.error(f"Error during background regeneration: {e}")
-            finally:
-                _regenerating = False
+    """Queue a quick website regeneration (coalesces with one that is already waiting)"""
+    global _last_regeneration_start
 
-        # Start regeneration in background thread
-        thread = threading.Thread(target=regenerate, daemon=True)
-        thread.start()
+    _last_regeneration_start = datetime.now()
+    try:
+        job, created = submit_regeneration('regenerate')
+        if created:
+            logger.info(f"Website is out of date - queued quick regeneration as job {job['id']}")
+    except Exception as e:
+        logger.error(f"Error queueing background regeneration: {e}")
 
 
 def _trigger_static_regeneration(zip_code):
-    """Trigger static file regeneration for a specific zip code in background"""
-    global _static_regenerating
-
-    with _static_regeneration_lock:
-        if _static_regenerating.get(zip_code, False):
-            return  # Already regenerating for this zip
-
-        _static_regenerating[zip_code] = True
-
-        def regenerate_static():
-            global _static_regenerating
-            try:
-                logger.info(f"Starting background static regeneration for zip {zip_code}")
-
-                # Run the regeneration command
-                result = subprocess.run([
-                    sys.executable, 'main.py', '--once', '--zip', zip_code
-                ], capture_output=True, text=True, timeout=300)
-
-                if result.returncode == 0:
-                    logger.info(f"Background static regeneration completed for zip {zip_code}")
-
-                    # Update last regeneration time
-                    try:
-                        with get_db() as conn:
-                            cursor = conn.cursor()
-                            cursor.execute('''
-                                INSERT OR REPLACE INTO admin_settings (key, value)
-                                VALUES (?, ?)
-                            ''', (f'last_static_regen_{zip_code}', datetime.now().isoformat()))
-                            conn.commit()
-                    except Exception as e:
-                        logger.warning(f"Could not update last regeneration time for {zip_code}: {e}")
-                else:
-                    logger.error(f"Background static regeneration failed for zip {zip_code}: {result.stderr}")
-
-            except subprocess.TimeoutExpired:
-                logger.error(f"Background static regeneration timed out for zip {zip_code}")
-            except Exception as e:
-                logger.error(f"Error during background static regeneration for {zip_code}: {e}")
-            finally:
-                _static_regenerating[zip_code] = False
-
-        # Start regeneration in background thread
-        thread = threading.Thread(target=regenerate_static, daemon=True)
-        thread.start()
+    """Queue static file regeneration for a specific zip code"""
+    try:
+        job, created = submit_regeneration('static_regenerate', zip_code)
+        if created:
+            logger.info(f"Queued static regeneration for zip {zip_code} as job {job['id']}")
+    except Exception as e:
+        logger.error(f"Error queueing static regeneration for {zip_code}: {e}")
 
 
 # Trusted domains for image caching
@@ -851,65 +786,26 @@ def cached_image(url):
             logger.warning(f"Blocked image request from untrusted domain: {domain}")
             return Response("Forbidden: Untrusted domain", status=403, mimetype='text/plain')
 
-        # Fetch image with timeout and proper headers
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Referer': 'https://fallriver.live/',
-            'Sec-Fetch-Dest': 'image',
-            'Sec-Fetch-Mode': 'no-cors',
-            'Sec-Fetch-Site': 'cross-site'
-        }
-
+        # Served from the disk cache; only misses and stale entries go upstream
         try:
-            response = requests.get(
-                full_url,
-                headers=headers,
-                stream=True,
-                timeout=15,
-                allow_redirects=True
-            )
-        except requests.exceptions.Timeout:
-            logger.warning(f"Timeout fetching image: {full_url}")
-            return Response("Gateway Timeout", status=504, mimetype='text/plain')
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"Request error fetching image {full_url}: {e}")
-            return Response("Bad Gateway", status=502, mimetype='text/plain')
-
-        if response.status_code != 200:
-            logger.warning(f"Failed to fetch image {full_url}: HTTP {response.status_code}")
-            return Response(f"Not Found: HTTP {response.status_code}", status=404, mimetype='text/plain')
-
-        # Validate content type
-        content_type = response.headers.get('content-type', '').lower()
-        if not content_type.startswith('image/'):
-            logger.warning(f"URL does not return image content: {full_url} (content-type: {content_type})")
-            return Response(f"Not an image: {content_type}", status=404, mimetype='text/plain')
+            entry = get_image_proxy_cache().get(full_url)
+        except ImageFetchError as e:
+            return Response(e.message, status=e.status, mimetype='text/plain')
 
         # Aggressive caching headers for performance
-        cache_headers = {
+        response = send_file(entry['path'], mimetype=entry['content_type'], etag=entry['sha256'],
+                             conditional=True)
+        response.headers.update({
             'Cache-Control': 'public, max-age=31536000, immutable',  # 1 year cache
-            'Content-Type': content_type,
             'Access-Control-Allow-Origin': '*',
             'Access-Control-Allow-Methods': 'GET',
             'X-Content-Type-Options': 'nosniff',
             'X-Frame-Options': 'DENY',
             'X-XSS-Protection': '1; mode=block'
-        }
-
-        # Add content length if available
-        if 'content-length' in response.headers:
-            cache_headers['Content-Length'] = response.headers['content-length']
+        })
 
         logger.debug(f"Serving cached image: {domain}/{decoded_url[:50]}...")
-
-        # Stream the response
-        return Response(
-            response.iter_content(chunk_size=8192),
-            headers=cache_headers
-        )
+        return response
 
     except Exception as e:
         logger.error(f"Unexpected error in cached_image: {e}")
@@ -923,6 +819,17 @@ def session_check():
     return jsonify({'logged_in': session.get('logged_in', False)})
 
 
+_article_db = None
+
+
+def get_article_db():
+    """ArticleDatabase shared by the dynamic page routes (its schema setup runs once per process)"""
+    global _article_db
+    if _article_db is None:
+        _article_db = ArticleDatabase()
+    return _article_db
+
+
 # Website routes (serve static files)
 @app.route('/')
 def index():
@@ -933,18 +840,13 @@ def index():
         logger.info(f"Redirecting to zip code: {zip_code}")
         return redirect(f'/{zip_code}')
 
-    # Get recent articles for the homepage (all categories)
-    db = ArticleDatabase()
-    articles = db.get_recent_articles(hours=48, limit=50, zip_code='02720')
+    def render():
+        # Get recent articles for the homepage (all categories)
+        articles = get_article_db().get_recent_articles(hours=48, limit=50, zip_code='02720')
+        # Render dynamic page with all articles and 'local' as active category
+        return render_dynamic_index(articles, active_category='local', zip_code='02720')
 
-    # Render dynamic page with all articles and 'local' as active category
-    html_content = render_dynamic_index(articles, active_category='local', zip_code='02720')
-
-    if isinstance(html_content, tuple):  # Error case
-        return html_content
-
-    from flask import Response
-    return Response(html_content, mimetype='text/html')
+    return send_cached_page('02720', None, render)
 
 
 @app.route('/category/<path:category_slug>')
@@ -977,18 +879,13 @@ def category_page(category_slug):
     # Get the database category name
     db_category = category_map.get(category_slug, category_slug)
 
-    # Get filtered articles from database
-    db = ArticleDatabase()
-    articles = db.get_articles_by_category(db_category, limit=50, zip_code='02720')
+    def render():
+        # Get filtered articles from database
+        articles = get_article_db().get_articles_by_category(db_category, limit=50, zip_code='02720')
+        # Render dynamic page with filtered articles
+        return render_dynamic_index(articles, active_category=category_slug, zip_code='02720')
 
-    # Render dynamic page with filtered articles
-    html_content = render_dynamic_index(articles, active_category=category_slug, zip_code='02720')
-
-    if isinstance(html_content, tuple):  # Error case
-        return html_content
-
-    from flask import Response
-    return Response(html_content, mimetype='text/html')
+    return send_cached_page('02720', category_slug, render)
 
 
 @app.route('/admin/main', strict_slashes=False)
@@ -1187,34 +1084,33 @@ def zip_page(zip_code):
                 _trigger_static_regeneration(zip_code)
 
             logger.info(f"Serving static file for zip {zip_code}")
-            return send_file(str(static_file_path), mimetype='text/html')
+            return send_static(static_file_path, mimetype='text/html; charset=utf-8')
         except Exception as e:
             logger.warning(f"Could not serve static file for zip {zip_code}: {e}")
 
     # Fallback to dynamic content generation
-    logger.info(f"Generating dynamic content for zip {zip_code}")
-    db = ArticleDatabase()
-    articles = db.get_recent_articles(hours=48, limit=50, zip_code=zip_code)
+    def render():
+        logger.info(f"Generating dynamic content for zip {zip_code}")
+        articles = get_article_db().get_recent_articles(hours=48, limit=50, zip_code=zip_code)
+        # Render dynamic page with all articles and 'local' as active category
+        return render_dynamic_index(articles, active_category='local', zip_code=zip_code)
 
-    # Render dynamic page with all articles and 'local' as active category
-    html_content = render_dynamic_index(articles, active_category='local', zip_code=zip_code)
-
-    if isinstance(html_content, tuple):  # Error case
-        return html_content
-
-    from flask import Response
-    return Response(html_content, mimetype='text/html')
+    return send_cached_page(zip_code, None, render)
 
 
 @app.route('/zips/<path:filename>')
 def serve_zip_static(filename):
     """Serve static files from zip directories"""
     try:
-        file_path = Path(__file__).parent.parent / "build" / "zips" / filename
-        if file_path.exists():
-            return send_file(str(file_path))
+        file_path = safe_path((Path(__file__).parent.parent / "build" / "zips").resolve(), filename)
+        if file_path.is_file():
+            return send_static(file_path)
         else:
             abort(404)
+    except ValueError:
+        abort(404)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error serving static file {filename}: {e}")
         abort(500)
@@ -1247,18 +1143,13 @@ def zip_category_page(zip_code, category_slug):
     # Get the database category name
     db_category = category_map.get(category_slug, category_slug)
 
-    # Get filtered articles from database
-    db = ArticleDatabase()
-    articles = db.get_articles_by_category(db_category, limit=50, zip_code=zip_code)
-
-    # Render dynamic page with filtered articles
-    html_content = render_dynamic_index(articles, active_category=category_slug, zip_code=zip_code)
+    def render():
+        # Get filtered articles from database
+        articles = get_article_db().get_articles_by_category(db_category, limit=50, zip_code=zip_code)
+        # Render dynamic page with filtered articles
+        return render_dynamic_index(articles, active_category=category_slug, zip_code=zip_code)
 
-    if isinstance(html_content, tuple):  # Error case
-        return html_content
-
-    from flask import Response
-    return Response(html_content, mimetype='text/html')
+    return send_cached_page(zip_code, category_slug, render)
 
 
 @app.route('/css/<path:filename>')
@@ -1270,9 +1161,9 @@ def serve_css(filename):
     full_zip_dir = os.path.join(project_root, zip_dir)
     logger.debug(f"Serving CSS from {full_zip_dir}")
     safe_filename = safe_path(Path(os.path.join(full_zip_dir, 'css')), filename)
-    if not safe_filename.exists():
+    if not safe_filename.is_file():
         return "File not found", 404
-    return send_from_directory(str(safe_filename.parent), safe_filename.name)
+    return send_static(safe_filename)
 
 
 @app.route('/js/<path:filename>')
@@ -1284,9 +1175,9 @@ def serve_js(filename):
     full_zip_dir = os.path.join(project_root, zip_dir)
     logger.debug(f"Serving JS from {full_zip_dir}")
     safe_filename = safe_path(Path(os.path.join(full_zip_dir, 'js')), filename)
-    if not safe_filename.exists():
+    if not safe_filename.is_file():
         return "File not found", 404
-    return send_from_directory(str(safe_filename.parent), safe_filename.name)
+    return send_static(safe_filename)
 
 
 @app.route('/images/<path:filename>')
@@ -1298,9 +1189,13 @@ def serve_images(filename):
     full_zip_dir = os.path.join(project_root, zip_dir)
     logger.debug(f"Serving images from {full_zip_dir}")
     safe_filename = safe_path(Path(os.path.join(full_zip_dir, 'images')), filename)
-    if not safe_filename.exists():
-        return "File not found", 404
-    return send_from_directory(str(safe_filename.parent), safe_filename.name)
+    if not safe_filename.is_file():
+        # Thumbnails are shared by all zips and live in the top-level build images directory
+        shared_images = Path(project_root) / WEBSITE_CONFIG.get("output_dir", "build") / 'images'
+        safe_filename = safe_path(shared_images, filename)
+        if not safe_filename.is_file():
+            return "File not found", 404
+    return send_static(safe_filename)
 
 
 @app.route('/api/proxy-rss')
@@ -1311,15 +1206,19 @@ def proxy_rss():
         return jsonify({'error': 'No URL provided'}), 400
 
     try:
-        import requests
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
+        # Served from the feed cache; upstream is only hit on a miss or stale refresh
+        feed = get_feed_cache().get(url)
 
         # Return the RSS content with appropriate headers
-        return response.content, 200, {
-            'Content-Type': response.headers.get('content-type', 'application/xml'),
+        return feed.body, 200, {
+            'Content-Type': feed.content_type,
             'Cache-Control': 'public, max-age=300'  # Cache for 5 minutes
         }
+    except FeedFetchError as e:
+        if e.status == 400:
+            return jsonify({'error': e.message}), 400
+        logger.error(f"RSS proxy error: {e}")
+        return jsonify({'error': 'Failed to fetch RSS feed'}), 500
     except Exception as e:
         logger.error(f"RSS proxy error: {e}")
         return jsonify({'error': 'Failed to fetch RSS feed'}), 500
@@ -2408,123 +2307,44 @@ def regenerate_settings():
     return jsonify({'success': True, 'message': 'Settings regenerated'})
 
 
-@login_required
+def _submit_job(job_type, zip_code, message):
+    """Queue a background job (or join the identical one already waiting) and describe it"""
+    if zip_code and not validate_zip_code(zip_code):
+        return jsonify({'success': False, 'error': 'Invalid zip code'}), 400
+
+    if job_type in REGENERATION_JOB_TYPES:
+        job, created = submit_regeneration(job_type, zip_code or None)
+    else:
+        job, created = get_job_queue().submit(job_type, zip_code=zip_code or None)
+    return jsonify({
+        'success': True,
+        'message': message if created else f"{message} (already queued as job {job['id']})",
+        'job_id': job['id'],
+        'status': job['status'],
+        'coalesced': not created
+    }), 202
+
+
 @app.route('/admin/api/regenerate', methods=['POST', 'OPTIONS'])
+@login_required
 def regenerate_website():
     """Trigger website regeneration using existing data"""
     try:
-        import subprocess
-        import threading
-
-        zip_code = request.args.get('zip_code')
-
-        def run_regeneration():
-            try:
-                # Run quick_regenerate.py script from project root
-                import os
-                script_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts', 'deployment', 'quick_regenerate.py')
-                cmd = [sys.executable, script_path]
-                if zip_code:
-                    cmd.extend(['--zip', zip_code])
-
-                logger.info(f"[REGENERATION] Starting command: {' '.join(cmd)}")
-                logger.info(f"[REGENERATION] Script path exists: {os.path.exists(script_path)}")
-                logger.info(f"[REGENERATION] Working directory: {os.path.dirname(os.path.dirname(os.path.abspath(__file__)))}")
-
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=300, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-                logger.info(f"[REGENERATION] Process completed with return code: {result.returncode}")
-                if result.returncode == 0:
-                    logger.info("[REGENERATION] SUCCESS: Website regeneration completed")
-                    logger.info(f"[REGENERATION] Output: {result.stdout[:500]}...")  # First 500 chars
-                else:
-                    logger.error(f"[REGENERATION] FAILED: Return code {result.returncode}")
-                    logger.error(f"[REGENERATION] Stdout: {result.stdout}")
-                    logger.error(f"[REGENERATION] Stderr: {result.stderr}")
-
-            except subprocess.TimeoutExpired:
-                logger.error("[REGENERATION] TIMEOUT: Regeneration timed out after 5 minutes")
-            except Exception as e:
-                logger.error(f"[REGENERATION] ERROR: {e}")
-                import traceback
-                logger.error(f"[REGENERATION] Traceback: {traceback.format_exc()}")
-
-        # Run regeneration in background thread
-        logger.info("Starting background regeneration thread")
-        thread = threading.Thread(target=run_regeneration, daemon=True)
-        thread.start()
-        logger.info("Background regeneration thread started")
-
-        return jsonify({
-            'success': True,
-            'message': 'Website regeneration started in background',
-            'note': 'Check server logs for completion status'
-        })
+        return _submit_job('regenerate', request.args.get('zip_code'),
+                           'Website regeneration queued')
 
     except Exception as e:
         logger.error(f"Error starting regeneration: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@login_required
 @app.route('/admin/api/regenerate-all', methods=['POST', 'OPTIONS'])
+@login_required
 def regenerate_all():
     """Trigger full regeneration with fresh data"""
     try:
-        import subprocess
-        import threading
-
-        zip_code = request.args.get('zip_code')
-
-        def run_full_regeneration():
-            try:
-                # First run aggregation to get fresh data
-                from aggregator import NewsAggregator
-                aggregator = NewsAggregator()
-                if zip_code:
-                    # For zip-specific, aggregate with force_refresh for that zip
-                    aggregator.aggregate(force_refresh=True, zip_code=zip_code)
-                else:
-                    # For full regeneration, aggregate everything with force refresh
-                    aggregator.aggregate(force_refresh=True)
-                logger.info("Aggregation completed, starting website regeneration")
-
-                # Then run website regeneration
-                import os
-                script_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts', 'deployment', 'quick_regenerate.py')
-                cmd = [sys.executable, script_path]
-                if zip_code:
-                    cmd.extend(['--zip', zip_code])
-
-                logger.info(f"Running full regeneration command: {' '.join(cmd)}")
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=600, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-                if result.returncode == 0:
-                    logger.info("Full regeneration completed successfully")
-                    logger.info(f"Output: {result.stdout}")
-                else:
-                    logger.error(f"Full regeneration failed with return code {result.returncode}")
-                    logger.error(f"Stdout: {result.stdout}")
-                    logger.error(f"Stderr: {result.stderr}")
-
-            except subprocess.TimeoutExpired:
-                logger.error("Full regeneration timed out after 10 minutes")
-            except Exception as e:
-                logger.error(f"Full regeneration error: {e}")
-                import traceback
-                logger.error(f"Traceback: {traceback.format_exc()}")
-
-        # Run full regeneration in background thread
-        logger.info("Starting background full regeneration thread")
-        thread = threading.Thread(target=run_full_regeneration, daemon=True)
-        thread.start()
-        logger.info("Background full regeneration thread started")
-
-        return jsonify({
-            'success': True,
-            'message': 'Full regeneration started in background',
-            'note': 'This may take several minutes. Check server logs for completion.'
-        })
+        return _submit_job('regenerate_all', request.args.get('zip_code'),
+                           'Full regeneration queued')
 
     except Exception as e:
         logger.error(f"Error starting full regeneration: {e}")
@@ -2618,57 +2438,80 @@ def save_weather_api_key():
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
-@login_required
 @app.route('/admin/api/regeneration-status', methods=['GET', 'OPTIONS'])
+@login_required
 def get_regeneration_status():
-    """Check the status of ongoing regeneration processes"""
+    """Check the status of ongoing regeneration jobs"""
     try:
-        # Check if any regeneration processes are currently running
-        # This is a simple implementation - in a real system you'd track PIDs or use a job queue
-
-        # For now, we'll check the last regeneration time and assume processes are done
-        # if they've been running for more than a reasonable time
-        with get_db() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT value FROM admin_settings WHERE key = ?', ('last_regeneration_time',))
-            last_regeneration_row = cursor.fetchone()
-
-            if last_regeneration_row and last_regeneration_row[0]:
-                try:
-                    import time
-                    last_time = float(last_regeneration_row[0])
-                    current_time = time.time()
-                    time_since = current_time - last_time
-
-                    # If it's been more than 5 minutes since last regeneration started,
-                    # assume any process has completed
-                    if time_since > 300:  # 5 minutes
-                        return jsonify({
-                            'status': 'idle',
-                            'last_regeneration': last_time,
-                            'message': 'No active regeneration processes'
-                        })
-                    else:
-                        return jsonify({
-                            'status': 'busy',
-                            'last_regeneration': last_time,
-                            'time_running': int(time_since),
-                            'message': f'Regeneration in progress ({int(time_since)}s elapsed)'
-                        })
-
-                except (ValueError, TypeError):
-                    pass
-
+        queue = get_job_queue()
+        active = [job for status in ('running', 'queued') for job_type in REGENERATION_JOB_TYPES
+                  for job in queue.list_jobs(status=status, job_type=job_type, limit=10)]
+        if active:
+            job = active[0]
             return jsonify({
-                'status': 'unknown',
-                'message': 'Unable to determine regeneration status'
+                'status': 'busy',
+                'job_id': job['id'],
+                'time_running': int(job['duration'] or 0),
+                'message': job['message'] or f"Regeneration {job['status']}"
             })
 
+        return jsonify({'status': 'idle', 'message': 'No active regeneration jobs'})
+
     except Exception as e:
         logger.error(f"Error checking regeneration status: {e}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
+@app.route('/admin/api/jobs', methods=['GET', 'OPTIONS'])
+@login_required
+def list_jobs():
+    """Recent background jobs with progress and timings"""
+    try:
+        status = request.args.get('status')
+        if status and status not in JOB_STATUSES:
+            return jsonify({'success': False, 'error': 'Invalid status'}), 400
+        zip_code = request.args.get('zip_code')
+        if zip_code and not validate_zip_code(zip_code):
+            return jsonify({'success': False, 'error': 'Invalid zip code'}), 400
+        try:
+            limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+        except ValueError:
+            limit = 50
+
+        jobs = get_job_queue().list_jobs(status=status, job_type=request.args.get('type'),
+                                         zip_code=zip_code, limit=limit)
+        return jsonify({'success': True, 'jobs': jobs})
+
+    except Exception as e:
+        logger.error(f"Error listing jobs: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/admin/api/jobs/<int:job_id>', methods=['GET', 'OPTIONS'])
+@login_required
+def get_job(job_id):
+    """One background job"""
+    job = get_job_queue().get_job(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': job})
+
+
+@app.route('/admin/api/jobs/<int:job_id>/cancel', methods=['POST', 'OPTIONS'])
+@login_required
+def cancel_job(job_id):
+    """Cancel a queued job, or ask a running one to stop"""
+    try:
+        job = get_job_queue().cancel(job_id)
+        if job is None:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        return jsonify({'success': True, 'job': job})
+
+    except Exception as e:
+        logger.error(f"Error cancelling job {job_id}: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @login_required
 @app.route('/admin/api/get-article', methods=['GET', 'OPTIONS'])
 def get_article():
@@ -2696,6 +2539,29 @@ def get_article():
         return jsonify({'error': 'Database error'}), 500
 
 
+@app.route('/admin/api/related-articles', methods=['GET', 'OPTIONS'])
+@login_required
+def get_related_articles():
+    """Get the precomputed related articles for an article (stored during website generation)"""
+    article_id = request.args.get('id', type=int)
+    k = min(request.args.get('k', 5, type=int), 20)
+    zip_code = request.args.get('zip_code')
+    if not article_id:
+        return jsonify({'error': 'Article ID required'}), 400
+    if zip_code and not validate_zip_code(zip_code):
+        return jsonify({'error': 'Invalid zip code'}), 400
+
+    try:
+        from utils.related_index import load_related
+        with get_db() as conn:
+            cursor = conn.cursor()
+            related = load_related(cursor, article_id, k=k, zip_code=zip_code)
+        return jsonify({'success': True, 'article_id': article_id, 'related': related})
+    except Exception as e:
+        logger.error(f"Error getting related articles for {article_id}: {e}")
+        return jsonify({'error': 'Database error'}), 500
+
+
 @login_required
 @app.route('/admin/api/good-fit', methods=['POST', 'OPTIONS'])
 def good_fit():
@@ -3109,18 +2975,13 @@ def get_category_keywords_stats(zip_code):
 
 
 @app.route('/admin/api/retrain-categories', methods=['POST', 'OPTIONS'])
+@login_required
 def retrain_categories():
-    """Retrain category classification for all articles"""
-    data = request.get_json() if request.is_json else request.form
-    zip_code = data.get('zip_code')
-
-    if zip_code and not validate_zip_code(zip_code):
-        return jsonify({'success': False, 'error': 'Invalid zip code'}), 400
+    """Rebuild the learned category model and recategorize articles in the background"""
+    data = (request.get_json(silent=True) if request.is_json else request.form) or {}
 
     try:
-        # This would trigger the category classification retraining
-        # For now, just return success
-        return jsonify({'success': True, 'message': 'Category retraining completed'})
+        return _submit_job('retrain_categories', data.get('zip_code'), 'Category retraining queued')
 
     except Exception as e:
         logger.error(f"Error retraining categories: {e}")
@@ -3195,153 +3056,52 @@ def manage_category_keywords():
             return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@login_required
 @app.route('/admin/api/recategorize-all', methods=['POST', 'OPTIONS'])
+@login_required
 def recategorize_all():
-    """Recategorize all articles"""
+    """Recategorize all articles in the background"""
     try:
-        # This would trigger recategorization of all articles
-        return jsonify({'success': True, 'message': 'Recategorization completed'})
+        data = request.get_json(silent=True)
+        zip_code = data.get('zip_code') if data else None
+
+        # Runs as a job; poll /admin/api/jobs/<job_id> for progress and the result
+        return _submit_job('recategorize', zip_code, 'Recategorization queued')
 
     except Exception as e:
         logger.error(f"Error recategorizing: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@login_required
 @app.route('/admin/api/rerun-relevance-scoring', methods=['POST', 'OPTIONS'])
+@login_required
 def rerun_relevance_scoring():
-    """Rerun relevance scoring for all articles"""
+    """Rerun relevance scoring for all articles in the background"""
     try:
-        print(f"[DEBUG SERVER] rerun_relevance_scoring called")
-        from utils.relevance_calculator import calculate_relevance_score_with_tags
-        from utils.bayesian_learner import BayesianLearner
-        import sqlite3
-        from config import DATABASE_CONFIG
-
-        # Get zip_code from request
-        data = request.get_json()
-        print(f"[DEBUG SERVER] request data: {data}")
+        data = request.get_json(silent=True)
         zip_code = data.get('zip_code') if data else None
-        print(f"[DEBUG SERVER] zip_code: {zip_code}")
-
-        # Connect to database and get relevance threshold
-        conn = sqlite3.connect(DATABASE_CONFIG.get("path", "fallriver_news.db"))
-        cursor = conn.cursor()
 
-        # Get relevance threshold from admin_settings
-        cursor.execute('SELECT value FROM admin_settings WHERE key = ?', ('relevance_threshold',))
-        threshold_row = cursor.fetchone()
-        relevance_threshold = float(threshold_row[0]) if threshold_row else 10.0
-
-        # Clear existing auto-filtered status for re-evaluation
-        if zip_code:
-            cursor.execute('UPDATE article_management SET is_auto_filtered = 0, auto_reject_reason = NULL WHERE zip_code = ? AND is_auto_filtered = 1', (zip_code,))
-        else:
-            cursor.execute('UPDATE article_management SET is_auto_filtered = 0, auto_reject_reason = NULL WHERE is_auto_filtered = 1')
-
-        # Get all articles (including previously auto-filtered ones for re-evaluation)
-        if zip_code:
-            cursor.execute('SELECT id, title, content, source FROM articles WHERE zip_code = ?', (zip_code,))
-        else:
-            cursor.execute('SELECT id, title, content, source FROM articles')
-
-        articles = cursor.fetchall()
-        processed_count = 0
-        filtered_count = 0
-
-        logger.info(f"Starting relevance rerun for {len(articles)} articles with threshold {relevance_threshold}")
-
-        learner = BayesianLearner()
-
-        for article_row in articles:
-            article_id, title, content, source = article_row
-            article = {
-                'title': title,
-                'content': content or '',
-                'source': source
-            }
-
-            # Calculate relevance score
-            try:
-                relevance_score, tag_info = calculate_relevance_score_with_tags(article, zip_code=zip_code)
-            except Exception as e:
-                logger.warning(f"Error calculating relevance for article {article_id}: {e}")
-                continue
-
-            # Update relevance score in database
-            cursor.execute('UPDATE articles SET relevance_score = ? WHERE id = ?', (relevance_score, article_id))
-
-            # Check if it should be auto-filtered
-            should_filter = False
-            reason = ""
-
-            # Check relevance threshold (exclude obituaries)
-            article_category = (article.get('category', '') or '').lower()
-            is_obituary = 'obituar' in article_category
-
-            if relevance_score < relevance_threshold and not is_obituary:
-                should_filter = True
-                reason = f"Relevance score {relevance_score:.1f} below threshold {relevance_threshold}"
-                logger.info(f"Filtering article {article_id}: score {relevance_score:.1f} < {relevance_threshold}, category: {article_category}")
-
-            # Check Bayesian filtering
-            if not should_filter:
-                try:
-                    bayesian_should_filter, probability, reasons = learner.should_filter(article, threshold=0.7)
-                    if bayesian_should_filter:
-                        should_filter = True
-                        reason_str = "; ".join(reasons[:3]) if reasons else "High similarity to previously rejected articles"
-                        reason = f"Bayesian filter: {reason_str}"
-                except Exception as e:
-                    logger.warning(f"Error in Bayesian filtering for article {article_id}: {e}")
-
-            # Auto-filter if needed
-            if should_filter:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO article_management
-                    (article_id, enabled, is_auto_filtered, auto_reject_reason, zip_code)
-                    VALUES (?, 0, 1, ?, ?)
-                ''', (article_id, reason, zip_code or "02720"))
-                filtered_count += 1
-
-            processed_count += 1
-
-            if not should_filter:
-                logger.debug(f"Keeping article {article_id}: score {relevance_score:.1f}, category: {article.get('category', '')}")
-
-        conn.commit()
-        conn.close()
-
-        kept_count = processed_count - filtered_count
-
-        return jsonify({
-            'success': True,
-            'message': f'Processed {processed_count} articles, auto-filtered {filtered_count}',
-            'processed_count': processed_count,
-            'auto_rejected_count': filtered_count,
-            'kept_count': kept_count
-        })
+        # Batch engine runs as a job; poll /admin/api/jobs/<job_id> for progress and the result
+        return _submit_job('rescore', zip_code, 'Relevance rescoring queued')
 
     except Exception as e:
-        import traceback
-        error_details = f"{str(e)}\n\nTraceback:\n{traceback.format_exc()}"
-        print(f"[DEBUG SERVER] Exception in rerun_relevance_scoring: {error_details}")
         logger.error(f"Error in rerun relevance scoring: {e}")
-        return jsonify({'success': False, 'error': error_details}), 500
+        return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@login_required
 @app.route('/admin/api/add-relevance-item', methods=['POST', 'OPTIONS'])
+@login_required
 def add_relevance_item():
     """Add an item to a relevance category"""
     try:
         data = request.get_json()
         category = data.get('category')
         value = data.get('value')
+        zip_code = data.get('zip_code') or get_current_zip_from_request()
 
         if not category or not value:
             return jsonify({'success': False, 'error': 'Missing category or value'}), 400
+        if not validate_zip_code(zip_code):
+            return jsonify({'success': False, 'error': 'Invalid zip code'}), 400
 
         # Load current relevance config
         relevance_config = WEBSITE_CONFIG.get('relevance', {})
@@ -3357,24 +3117,35 @@ def add_relevance_item():
             # Save back to config (in memory for now)
             WEBSITE_CONFIG['relevance'] = relevance_config
 
-        return jsonify({'success': True})
+        # Persist and rescore only the articles containing the new term
+        from utils.relevance_index import apply_relevance_item_change
+        result = apply_relevance_item_change(category, value, zip_code=zip_code, added=True)
+
+        return jsonify({
+            'success': True,
+            'affected_count': result['affected_count'],
+            'changed_count': result['changed_count']
+        })
 
     except Exception as e:
         logger.error(f"Error adding relevance item: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@login_required
 @app.route('/admin/api/remove-relevance-item', methods=['POST', 'OPTIONS'])
+@login_required
 def remove_relevance_item():
     """Remove an item from a relevance category"""
     try:
         data = request.get_json()
         category = data.get('category')
         item = data.get('item')
+        zip_code = data.get('zip_code') or get_current_zip_from_request()
 
         if not category or not item:
             return jsonify({'success': False, 'error': 'Missing category or item'}), 400
+        if not validate_zip_code(zip_code):
+            return jsonify({'success': False, 'error': 'Invalid zip code'}), 400
 
         # Load current relevance config
         relevance_config = WEBSITE_CONFIG.get('relevance', {})
@@ -3386,7 +3157,15 @@ def remove_relevance_item():
             # Save back to config (in memory for now)
             WEBSITE_CONFIG['relevance'] = relevance_config
 
-        return jsonify({'success': True})
+        # Persist and rescore only the articles containing the removed term
+        from utils.relevance_index import apply_relevance_item_change
+        result = apply_relevance_item_change(category, item, zip_code=zip_code, added=False)
+
+        return jsonify({
+            'success': True,
+            'affected_count': result['affected_count'],
+            'changed_count': result['changed_count']
+        })
 
     except Exception as e:
         logger.error(f"Error removing relevance item: {e}")
@@ -5,6 +5,7 @@ import sqlite3
 import json
 import os
 import logging
+import threading
 from datetime import datetime
 from pathlib import Path
 from contextlib import contextmanager
@@ -12,6 +13,8 @@ from typing import List, Dict, Optional, Tuple
 
 from config import DATABASE_CONFIG, NEWS_SOURCES, WEBSITE_CONFIG
 from utils.bayesian_relevance import BayesianRelevanceLearner
+from utils.job_queue import JobQueue
+from utils.regeneration_worker import REGENERATION_DEBOUNCE, REGENERATION_MAX_DELAY, get_regenerator
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +69,68 @@ def safe_path(base_path: Path, user_path: str) -> Path:
         raise ValueError("Invalid path")
 
 
+def send_static(path, mimetype: Optional[str] = None):
+    """Send a generated site file with content negotiation and a strong ETag
+
+    Serves the precompressed .br/.gz sibling when the client accepts it (through send_file, so
+    the WSGI server can use sendfile) and answers a matching If-None-Match with 304.
+
+    Args:
+        path: File to serve (already validated by the caller)
+        mimetype: Content-Type override (guessed from the extension by default)
+    """
+    from flask import Response, request, send_file
+    from utils.static_files import etag_matches, guess_mimetype, select_representation, strong_etag
+
+    path = str(path)
+    file_path, encoding = select_representation(path, request.headers.get('Accept-Encoding'))
+    etag = strong_etag(path, encoding)
+    if etag_matches(request.headers.get('If-None-Match'), etag):
+        response = Response(status=304)
+    else:
+        response = send_file(file_path, mimetype=mimetype or guess_mimetype(path), etag=False, conditional=False)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.headers['ETag'] = etag
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+
+def send_cached_page(zip_code: str, category: Optional[str], render):
+    """Serve a dynamic page from the response cache with ETag/Last-Modified validators
+
+    A hit is a dict lookup; render() only runs when articles, display settings or templates
+    changed since the page was cached (or it expired). Matching If-None-Match or
+    If-Modified-Since headers get a 304.
+
+    Args:
+        zip_code: Zip the page is for
+        category: Category slug, or None for the zip's index
+        render: Returns the page HTML, or a (body, status) tuple on error
+    """
+    from flask import Response, request
+    from werkzeug.http import http_date, parse_date
+    from utils.response_cache import get_response_cache
+    from utils.static_files import etag_matches
+
+    cache = get_response_cache()
+    entry = cache.get_or_render(cache.key(zip_code, category), render)
+    if isinstance(entry, tuple):  # Error case
+        return entry
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        not_modified = etag_matches(if_none_match, entry.etag)
+    else:
+        since = parse_date(request.headers.get('If-Modified-Since'))
+        not_modified = since is not None and int(entry.last_modified) <= since.timestamp()
+    response = Response(status=304) if not_modified else Response(entry.body, mimetype='text/html')
+    response.headers['ETag'] = entry.etag
+    response.headers['Last-Modified'] = http_date(entry.last_modified)
+    response.headers['Cache-Control'] = 'no-cache'  # Always revalidate; data changes invalidate
+    return response
+
+
 @contextmanager
 def get_db():
     """Database connection context manager"""
@@ -207,7 +272,7 @@ def get_articles(zip_code=None, limit=50, offset=0, category=None, search=None):
             search_param = f'%{search}%'
             params.extend([search_param, search_param, search_param])
 
-        query += ' ORDER BY a.published DESC LIMIT ? OFFSET ?'
+        query += ' ORDER BY a.published_ts DESC, a.id DESC LIMIT ? OFFSET ?'
         params.extend([limit, offset])
 
         cursor.execute(query, params)
@@ -747,4 +812,78 @@ def train_relevance(article_id, zip_code, click_type):
 
     except Exception as e:
         logger.error(f"Error training relevance model: {e}")
-        return False, str(e)
\ No newline at end of file
+        return False, str(e)
+
+# Background jobs started from the admin UI (see utils/job_queue.py)
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+# Regeneration job types; triggers for these are debounced per zip
+REGENERATION_JOB_TYPES = ('regenerate', 'regenerate_all', 'static_regenerate')
+
+
+def run_regenerate_job(ctx):
+    """Quick regeneration from existing articles (in-process, see utils/regeneration_worker.py)"""
+    return get_regenerator().quick_regenerate(ctx.zip_code, report=ctx.message)
+
+
+def run_regenerate_all_job(ctx):
+    """Fetch fresh data from all sources, save it, then regenerate"""
+    return get_regenerator().aggregation_cycle(ctx.zip_code, force_refresh=True, report=ctx.message)
+
+
+def run_static_regenerate_job(ctx):
+    """Fetch and regenerate static files for one zip (main.py --once --zip)"""
+    return get_regenerator().aggregation_cycle(ctx.zip_code, report=ctx.message)
+
+
+def run_rescore_job(ctx):
+    """Batch relevance rescoring (see utils.batch_relevance.rescore_articles)"""
+    from utils.batch_relevance import rescore_articles
+    return rescore_articles(zip_code=ctx.zip_code, progress=ctx.progress)
+
+
+def run_recategorize_job(ctx):
+    """Recategorize articles with the current model (manually overridden categories are left alone)"""
+    from utils.job_runner import run_article_job
+    result = run_article_job('categorize', zip_code=ctx.zip_code, progress=ctx.progress)
+    result['changed_count'] = result['written'].get('category', 0)
+    return result
+
+
+def run_retrain_categories_job(ctx):
+    """Rebuild the learned category model, then recategorize articles"""
+    from utils.category_model import DEFAULT_ZIP, build_category_model
+    from utils.job_runner import run_article_job
+    ctx.message('Rebuilding learned category keywords')
+    learned = build_category_model(ctx.zip_code or DEFAULT_ZIP)
+    result = run_article_job('categorize', zip_code=ctx.zip_code, progress=ctx.progress)
+    result['learned_categories'] = len(learned)
+    result['changed_count'] = result['written'].get('category', 0)
+    return result
+
+
+def get_job_queue():
+    """Shared admin job queue with its handlers registered (workers start on first submit)"""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            queue = JobQueue()
+            queue.register('regenerate', run_regenerate_job)
+            queue.register('regenerate_all', run_regenerate_all_job)
+            queue.register('static_regenerate', run_static_regenerate_job)
+            queue.register('rescore', run_rescore_job)
+            queue.register('recategorize', run_recategorize_job)
+            queue.register('retrain_categories', run_retrain_categories_job)
+            _job_queue = queue
+        return _job_queue
+
+
+def submit_regeneration(job_type, zip_code=None):
+    """Queue a regeneration job, folding a burst of triggers for the same zip into one build
+
+    Returns:
+        (job, created) as JobQueue.submit
+    """
+    return get_job_queue().submit(job_type, zip_code=zip_code, delay=REGENERATION_DEBOUNCE,
+                                  max_delay=REGENERATION_MAX_DELAY)
@@ -815,12 +815,40 @@ function closeExplanation(explanationId) {
     }
 }
 
+// Poll a background job until it finishes; resolves with the final job record
+function pollJob(jobId, onProgress, intervalMs = 2000) {
+    return new Promise((resolve, reject) => {
+        const poll = () => {
+            fetch(`/admin/api/jobs/${jobId}`)
+            .then(response => response.json())
+            .then(data => {
+                if (!data.success) {
+                    reject(new Error(data.error || 'Job not found'));
+                    return;
+                }
+                const job = data.job;
+                if (['succeeded', 'failed', 'cancelled'].includes(job.status)) {
+                    resolve(job);
+                    return;
+                }
+                if (onProgress) onProgress(job);
+                setTimeout(poll, intervalMs);
+            })
+            .catch(reject);
+        };
+        poll();
+    });
+}
+
+function cancelJob(jobId) {
+    return fetch(`/admin/api/jobs/${jobId}/cancel`, {method: 'POST'})
+        .then(response => response.json());
+}
+
 function rerunRelevanceScoring() {
-    console.log('[DEBUG] rerunRelevanceScoring called');
     const btn = document.getElementById('rerunRelevanceBtn');
     const statusDiv = document.getElementById('rerunRelevanceStatus');
     const statusP = statusDiv.querySelector('p');
-    console.log('[DEBUG] btn found:', !!btn, 'statusDiv found:', !!statusDiv);
 
     btn.disabled = true;
     btn.innerHTML = '🔄 <span class="spinner"></span> Processing...';
@@ -828,7 +856,6 @@ function rerunRelevanceScoring() {
     statusP.textContent = 'Starting relevance recalculation...';
 
     const zipCode = getZipCodeFromUrl();
-    console.log('[DEBUG] Sending zip_code:', zipCode);
 
     fetch('/admin/api/rerun-relevance-scoring', {
         method: 'POST',
@@ -837,19 +864,37 @@ function rerunRelevanceScoring() {
     })
     .then(response => response.json())
     .then(data => {
-        if (data.success) {
-            const processed = data.processed_count || 0;
-            const duration = data.duration || 'unknown';
-            statusP.textContent = `✅ Completed! Processed ${processed} articles in ${duration} seconds.`;
+        if (!data.success) {
+            throw new Error(data.error || 'Unknown error');
+        }
+        statusP.textContent = data.message;
+        return pollJob(data.job_id, job => {
+            if (job.status === 'queued') {
+                statusP.textContent = '⏳ Waiting for a running rescoring job to finish...';
+            } else if (job.total) {
+                statusP.textContent = `🔄 Rescoring... ${job.processed}/${job.total} articles (${job.percent}%)`;
+            }
+        });
+    })
+    .then(job => {
+        if (job.status === 'succeeded') {
+            const result = job.result || {};
+            const processed = result.processed_count || 0;
+            const changed = result.changed_count || 0;
+            const duration = result.duration || job.duration || 'unknown';
+            statusP.textContent = `✅ Completed! Processed ${processed} articles (${changed} scores changed) in ${duration} seconds.`;
             showToast(`Relevance scoring completed! Processed ${processed} articles.`, 'success');
+        } else if (job.status === 'cancelled') {
+            statusP.textContent = '⏹️ Relevance scoring was cancelled';
+            showToast('Relevance scoring cancelled', 'error');
         } else {
-            statusP.textContent = '❌ Error: ' + (data.error || 'Unknown error');
+            statusP.textContent = '❌ Error: ' + (job.error || 'Unknown error');
             showToast('Failed to rerun relevance scoring', 'error');
         }
     })
     .catch(error => {
-        statusP.textContent = '❌ Network error occurred';
-        showToast('Network error during relevance scoring', 'error');
+        statusP.textContent = '❌ Error: ' + error.message;
+        showToast('Error during relevance scoring', 'error');
         console.error('Relevance scoring error:', error);
     })
     .finally(() => {
@@ -869,12 +914,13 @@ function addRelevanceItem(category, value) {
     fetch('/admin/api/add-relevance-item', {
         method: 'POST',
         headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({category: category, value: value.trim()})
+        body: JSON.stringify({category: category, value: value.trim(), zip_code: getZipCodeFromUrl()})
     })
     .then(response => response.json())
     .then(data => {
         if (data.success) {
-            location.reload(); // Refresh to show new item
+            showToast(`Added "${value.trim()}" - rescored ${data.affected_count || 0} articles, ${data.changed_count || 0} changed`, 'success');
+            setTimeout(() => location.reload(), 1500); // Refresh to show new item
         } else {
             showToast('Failed to add item: ' + (data.error || 'Unknown error'), 'error');
         }
@@ -893,12 +939,13 @@ function removeRelevanceItem(category, item) {
     fetch('/admin/api/remove-relevance-item', {
         method: 'POST',
         headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({category: category, item: item})
+        body: JSON.stringify({category: category, item: item, zip_code: getZipCodeFromUrl()})
     })
     .then(response => response.json())
     .then(data => {
         if (data.success) {
-            location.reload(); // Refresh to update list
+            showToast(`Removed "${item}" - rescored ${data.affected_count || 0} articles, ${data.changed_count || 0} changed`, 'success');
+            setTimeout(() => location.reload(), 1500); // Refresh to update list
         } else {
             showToast('Failed to remove item: ' + (data.error || 'Unknown error'), 'error');
         }
@@ -1222,7 +1269,7 @@ function regenerateWebsite(event) {
             showToast('✅ Quick regeneration started! Using existing articles from database.', 'success');
 
             // Poll for completion status
-            pollRegenerationStatus(btn, originalText, 'quick');
+            pollRegenerationStatus(btn, originalText, 'quick', data.job_id);
 
         } else {
             showToast('❌ Regeneration failed: ' + (data.error || 'Unknown error'), 'error');
@@ -1265,7 +1312,7 @@ function regenerateAll(event) {
             showToast('✅ Full regeneration started! Fetching fresh data from all sources...', 'success');
 
             // Poll for completion status
-            pollRegenerationStatus(btn, originalText, 'full');
+            pollRegenerationStatus(btn, originalText, 'full', data.job_id);
 
         } else {
             showToast('❌ Full regeneration failed: ' + (data.error || 'Unknown error'), 'error');
@@ -1384,84 +1431,41 @@ function saveImageSetting() {
     });
 }
 
-// Poll regeneration status and update UI accordingly
-function pollRegenerationStatus(btn, originalText, type) {
-    let pollCount = 0;
-    const maxPolls = type === 'quick' ? 60 : 120; // 1-2 minutes depending on type
-
-    const pollStatus = () => {
-        pollCount++;
+// Poll a regeneration job and update UI accordingly
+function pollRegenerationStatus(btn, originalText, type, jobId) {
+    const label = type === 'quick' ? 'Quick regeneration' : 'Full regeneration';
+    let lastMessage = null;
 
-        fetch('/admin/api/regeneration-status')
-        .then(response => response.json())
-        .then(status => {
-            console.log('Regeneration status:', status);
-
-            // Show progress updates at different stages
-            if (type === 'quick') {
-                if (pollCount === 3) showToast('🔄 Processing articles...', 'success');
-                if (pollCount === 10) showToast('📄 Generating pages...', 'success');
-                if (pollCount === 20) showToast('🎨 Applying styles...', 'success');
-            } else { // full regeneration
-                if (pollCount === 3) showToast('🔍 Scanning sources...', 'success');
-                if (pollCount === 10) showToast('📥 Fetching fresh articles...', 'success');
-                if (pollCount === 25) showToast('💾 Updating database...', 'success');
-                if (pollCount === 50) showToast('📄 Generating pages...', 'success');
-                if (pollCount === 80) showToast('🎨 Finalizing website...', 'success');
-            }
-
-            // If status is 'idle', regeneration is complete
-            if (status.status === 'idle' && pollCount > 2) {
-                const message = type === 'quick'
-                    ? '🎉 Quick regeneration completed! Website updated with latest content.'
-                    : '🎉 Full regeneration completed! Website rebuilt with fresh data.';
-                showToast(message, 'success');
-
-                // Reset button
-                btn.innerHTML = originalText;
-                btn.disabled = false;
-                btn.style.opacity = '1';
-                return; // Stop polling
-            }
-
-            // If status is 'busy', keep polling
-            if (status.status === 'busy' && pollCount < maxPolls) {
-                setTimeout(pollStatus, 2000); // Poll every 2 seconds
-            } else {
-                // Timeout or unknown status - assume complete
-                const message = type === 'quick'
-                    ? '🎉 Quick regeneration completed! Website updated.'
-                    : '🎉 Full regeneration completed! Website rebuilt.';
-                showToast(message, 'success');
-
-                // Reset button
-                btn.innerHTML = originalText;
-                btn.disabled = false;
-                btn.style.opacity = '1';
-            }
-        })
-        .catch(error => {
-            console.error('Status check error:', error);
-            // If we can't check status, assume completion after reasonable time
-            if (pollCount >= 10) {
-                const message = type === 'quick'
-                    ? '🎉 Quick regeneration completed! Website updated.'
-                    : '🎉 Full regeneration completed! Website rebuilt.';
-                showToast(message, 'success');
-
-                // Reset button
-                btn.innerHTML = originalText;
-                btn.disabled = false;
-                btn.style.opacity = '1';
-            } else {
-                // Keep trying
-                setTimeout(pollStatus, 2000);
-            }
-        });
+    const resetButton = () => {
+        btn.innerHTML = originalText;
+        btn.disabled = false;
+        btn.style.opacity = '1';
     };
 
-    // Start polling after initial delay
-    setTimeout(pollStatus, 2000);
+    pollJob(jobId, job => {
+        // Surface each new stage the job reports
+        if (job.message && job.message !== lastMessage) {
+            lastMessage = job.message;
+            showToast(`🔄 ${job.message}...`, 'success');
+        }
+    })
+    .then(job => {
+        if (job.status === 'succeeded') {
+            const message = type === 'quick'
+                ? '🎉 Quick regeneration completed! Website updated with latest content.'
+                : '🎉 Full regeneration completed! Website rebuilt with fresh data.';
+            showToast(message, 'success');
+        } else if (job.status === 'cancelled') {
+            showToast(`⏹️ ${label} was cancelled`, 'error');
+        } else {
+            showToast(`❌ ${label} failed: ` + (job.error || 'Unknown error'), 'error');
+        }
+    })
+    .catch(error => {
+        console.error('Status check error:', error);
+        showToast(`❌ Could not check ${label.toLowerCase()} status`, 'error');
+    })
+    .finally(resetButton);
 }
 
 // Missing article functions
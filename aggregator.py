@@ -19,6 +19,8 @@ from config import (
 import asyncio
 from database import ArticleDatabase
 from cache import get_cache
+from utils.timestamps import article_epoch, hours_since, parse_datetime, to_epoch
+from utils.filter_rules import FilterRules, detect_alert, source_key_for
 import hashlib
 import re
 import sqlite3
@@ -40,6 +42,7 @@ class NewsAggregator:
         self.database = ArticleDatabase()
         self.cache = get_cache()
         self._source_fetch_interval = self._load_source_fetch_interval()  # Load from admin settings
+        self._related_index = None  # (listing, RelatedArticlesIndex) for the last listing passed to _find_related_articles
         self._setup_ingestors()
     
     def _load_source_fetch_interval(self) -> int:
@@ -229,6 +232,8 @@ class NewsAggregator:
             List of articles
         """
         all_articles = []
+        if force_refresh:
+            self.cache.invalidate("rss")
         
         # Setup ingestors for these sources
         for source_key, source_config in sources.items():
@@ -289,6 +294,8 @@ class NewsAggregator:
     async def collect_all_articles_async(self, force_refresh: bool = False) -> List[Dict]:
         """Collect articles from all sources in parallel (async) with selective updates"""
         all_articles = []
+        if force_refresh:
+            self.cache.invalidate("rss")
         
         # Check which sources need updating
         sources_to_fetch = self._get_sources_to_fetch(force_refresh)
@@ -537,21 +544,15 @@ class NewsAggregator:
 
         # === RECENCY BONUS (0-5 points) ===
         # Recent articles get small bonus, but not for old news
-        published = article.get("published")
-        if published:
-            try:
-                pub_date = datetime.fromisoformat(published.replace('Z', '+00:00').split('+')[0])
-                hours_old = (datetime.now() - pub_date.replace(tzinfo=None)).total_seconds() / 3600
-
-                if hours_old <= 6:
-                    score += 5.0  # <6h: +5 points
-                elif hours_old <= 24:
-                    score += 3.0  # <24h: +3 points
-                elif hours_old <= 72:
-                    score += 1.0  # <72h: +1 point
-                # Older than 3 days: no recency bonus
-            except:
-                pass
+        hours_old = hours_since(article_epoch(article))
+        if hours_old is not None:
+            if hours_old <= 6:
+                score += 5.0  # <6h: +5 points
+            elif hours_old <= 24:
+                score += 3.0  # <24h: +3 points
+            elif hours_old <= 72:
+                score += 1.0  # <72h: +1 point
+            # Older than 3 days: no recency bonus
 
         # === JUNK CONTENT PENALTIES (-50 to 0 points) ===
         # Strong penalties for truly irrelevant or low-quality content
@@ -664,37 +665,11 @@ class NewsAggregator:
         import sqlite3
         from config import DATABASE_CONFIG
         
-        # Get source settings, AI filtering setting, and relevance threshold from database
-        source_settings = {}
-        ai_filtering_enabled = False
-        relevance_threshold = 10.0  # Default threshold
-        try:
-            conn = sqlite3.connect(DATABASE_CONFIG.get("path", "fallriver_news.db"))
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute('SELECT key, value FROM admin_settings WHERE key LIKE "source_%" OR key = "ai_filtering_enabled" OR key = "relevance_threshold"')
-            for row in cursor.fetchall():
-                key = row['key']
-                if key == 'ai_filtering_enabled':
-                    ai_filtering_enabled = row['value'] == '1'
-                elif key == 'relevance_threshold':
-                    try:
-                        relevance_threshold = float(row['value'])
-                    except:
-                        relevance_threshold = 10.0
-                else:
-                    parts = key.replace('source_', '').split('_', 1)
-                    if len(parts) == 2:
-                        source_key = parts[0]
-                        setting = parts[1]
-                        if source_key not in source_settings:
-                            source_settings[source_key] = {}
-                        source_settings[source_key][setting] = row['value'] == '1'
-            conn.close()
-        except:
-            pass
+        # Admin settings are read once per cycle; alert/source rules are precompiled
+        rules = FilterRules.load()
         
         relevant = []
+        candidates = []  # Passed the rule-based filters; AI and Bayesian checks follow
         keywords = AGGREGATION_CONFIG.get("keywords_filter", [])
         exclude_keywords = AGGREGATION_CONFIG.get("exclude_keywords", [])
         min_length = AGGREGATION_CONFIG.get("min_article_length", 100)
@@ -702,11 +677,7 @@ class NewsAggregator:
         for article in articles:
             # Check if source requires Fall River mention (do this early for logging)
             source = article.get("source", "").lower()
-            source_key = None
-            for key, config in NEWS_SOURCES.items():
-                if config["name"].lower() in source or key in source:
-                    source_key = key
-                    break
+            source_key = source_key_for(source)
             
             # Check minimum length (more lenient for Fall River Reporter)
             content = article.get("content", article.get("summary", ""))
@@ -717,17 +688,11 @@ class NewsAggregator:
                 continue
             
             # Check date
-            try:
-                pub_str = article.get("published", "")
-                if pub_str:
-                    pub_date = datetime.fromisoformat(pub_str.replace('Z', '+00:00').split('+')[0])
-                    days_old = (datetime.now() - pub_date.replace(tzinfo=None)).days
-                    if days_old > 45:
-                        if source_key == "fall_river_reporter":
-                            logger.info(f"Filtering out Fall River Reporter article '{article.get('title', '')[:50]}...' - too old: {days_old} days")
-                        continue
-            except:
-                pass
+            hours_old = hours_since(article_epoch(article))
+            if hours_old is not None and int(hours_old // 24) > 45:
+                if source_key == "fall_river_reporter":
+                    logger.info(f"Filtering out Fall River Reporter article '{article.get('title', '')[:50]}...' - too old: {int(hours_old // 24)} days")
+                continue
             
             # Check for relevant keywords
             content_lower = content.lower()
@@ -735,57 +700,8 @@ class NewsAggregator:
             combined_text = f"{title_lower} {content_lower}"
 
             # === ALERT DETECTION (moved before relevance calculation) ===
-            # ONLY flag TRUE emergency situations with official terminology
-            alert_keywords = {
-                'weather': [
-                    # Only official National Weather Service warnings/advisories
-                    'winter weather advisory', 'winter storm warning', 'winter storm watch',
-                    'blizzard warning', 'blizzard watch', 'ice storm warning', 'ice storm watch',
-                    'freezing rain warning', 'freezing rain advisory', 'heavy snow warning',
-                    'heavy snow advisory', 'wind warning', 'wind advisory', 'high wind warning',
-                    'severe thunderstorm warning', 'severe thunderstorm watch', 'tornado warning',
-                    'tornado watch', 'flood warning', 'flood watch', 'flash flood warning',
-                    'flash flood watch', 'coastal flood warning', 'coastal flood watch',
-                    'hazardous weather outlook', 'special weather statement', 'severe weather statement',
-                    # Emergency conditions (must include "emergency" or official terminology)
-                    'snow emergency declared', 'state of emergency due to weather',
-                    'emergency travel ban', 'weather emergency road closure',
-                    'dangerous driving conditions due to weather', 'whiteout emergency conditions',
-                    'life-threatening weather conditions', 'extreme cold warning', 'extreme heat warning'
-                ],
-                'parking': [
-                    # Only emergency parking situations with "emergency" or "snow emergency"
-                    'emergency parking ban', 'parking ban due to snow emergency',
-                    'parking ban due to weather emergency', 'emergency alternate side parking',
-                    'emergency street cleaning due to weather', 'emergency parking restriction due to snow'
-                ],
-                'trash': [
-                    # Only emergency trash collection situations
-                    'emergency trash collection delay', 'trash collection delayed due to snow emergency',
-                    'trash collection delayed due to weather emergency', 'emergency waste collection delay',
-                    'storm emergency trash collection', 'weather emergency collection delay due to storm'
-                ]
-            }
-
-            article['is_alert'] = False
-            article['alert_type'] = None
-            article['alert_priority'] = 'info'  # info, warning, critical
-
-            alert_content_lower = f"{article.get('title', '')} {article.get('content', '')} {article.get('summary', '')}".lower()
-
-            for alert_type, keywords in alert_keywords.items():
-                if any(keyword in alert_content_lower for keyword in keywords):
-                    article['is_alert'] = True
-                    article['alert_type'] = alert_type
-
-                    # Determine alert priority
-                    if any(word in alert_content_lower for word in ['emergency', 'evacuation', 'critical', 'severe']):
-                        article['alert_priority'] = 'critical'
-                    elif any(word in alert_content_lower for word in ['warning', 'advisory', 'caution', 'alert']):
-                        article['alert_priority'] = 'warning'
-                    else:
-                        article['alert_priority'] = 'info'
-                    break  # Only set one alert type
+            # ONLY flag TRUE emergency situations with official terminology (one compiled matcher pass)
+            article.update(detect_alert(article))
 
             # Calculate relevance score with tag tracking (Phase 5: city_state support)
             try:
@@ -828,8 +744,9 @@ class NewsAggregator:
                     # Save article first (insert if new, update relevance score if exists)
                     cursor.execute('''
                         INSERT OR REPLACE INTO articles
-                        (title, url, published, summary, content, source, source_type, ingested_at, relevance_score)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        (title, url, published, summary, content, source, source_type, ingested_at, relevance_score,
+                         published_ts, ingested_ts)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     ''', (
                         article.get("title", ""),
                         article.get("url", ""),
@@ -839,7 +756,9 @@ class NewsAggregator:
                         article.get("source", ""),
                         article.get("source_type", ""),
                         article.get("ingested_at", ""),
-                        relevance_score
+                        relevance_score,
+                        to_epoch(article.get("published")) or 0,
+                        to_epoch(article.get("ingested_at")) or 0
                     ))
 
                     # Get article ID (either new or existing)
@@ -893,8 +812,9 @@ class NewsAggregator:
                     # Save article first (insert if new, update relevance score if exists)
                     cursor.execute('''
                         INSERT OR REPLACE INTO articles
-                        (title, url, published, summary, content, source, source_type, ingested_at, relevance_score)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        (title, url, published, summary, content, source, source_type, ingested_at, relevance_score,
+                         published_ts, ingested_ts)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     ''', (
                         article.get("title", ""),
                         article.get("url", ""),
@@ -904,7 +824,9 @@ class NewsAggregator:
                         article.get("source", ""),
                         article.get("source_type", ""),
                         article.get("ingested_at", ""),
-                        relevance_score
+                        relevance_score,
+                        to_epoch(article.get("published")) or 0,
+                        to_epoch(article.get("ingested_at")) or 0
                     ))
 
                     # Get article ID (either new or existing)
@@ -943,8 +865,7 @@ class NewsAggregator:
             
             # Smart require_fall_river filtering: Use relevance score to determine true local relevance
             if source_key:
-                require_fr = source_settings.get(source_key, {}).get('require_fall_river', 
-                    NEWS_SOURCES.get(source_key, {}).get('require_fall_river', False))
+                require_fr = rules.require_fall_river(source_key)
                 
                 if require_fr:
                     # Log articles when require_fall_river is enabled for debugging
@@ -990,25 +911,31 @@ class NewsAggregator:
                 except Exception as e:
                     logger.warning(f"Error checking excluded towns: {e}")
             
-            # AI-based relevance check: Use AI to verify article is truly about Fall River
-            # Only run if enabled in admin settings
-            if ai_filtering_enabled:
-                try:
-                    from utils.ai_relevance_checker import AIRelevanceChecker
-                    ai_checker = AIRelevanceChecker()
-                    
-                    # Run AI check for all articles when enabled
-                    should_include, ai_reason = ai_checker.should_include(article, threshold=0.6)
-                    
-                    if not should_include:
-                        logger.info(f"🤖 AI FILTER: Filtering out article '{title_lower[:50]}...' - {ai_reason}")
-                        continue
-                    elif ai_checker.enabled:
-                        logger.debug(f"🤖 AI CHECK: Article '{title_lower[:50]}...' passed AI relevance check - {ai_reason}")
-                except Exception as e:
-                    logger.warning(f"Error in AI relevance checking: {e}")
-                    # Continue processing if AI check fails
-            
+            candidates.append(article)
+
+        # AI-based relevance check: Use AI to verify articles are truly about Fall River
+        # Only run if enabled in admin settings; one batched pass over the articles that survived the
+        # rule-based filters, with verdicts cached by content so only new articles cost a call
+        ai_decisions = [(True, '')] * len(candidates)
+        ai_checker = None
+        if rules.ai_filtering_enabled and candidates:
+            try:
+                from utils.ai_relevance_checker import get_ai_relevance_checker
+                ai_checker = get_ai_relevance_checker()
+                ai_decisions = ai_checker.should_include_batch(candidates, threshold=0.6)
+            except Exception as e:
+                logger.warning(f"Error in AI relevance checking: {e}")
+                # Continue processing if AI check fails
+
+        for article, (should_include, ai_reason) in zip(candidates, ai_decisions):
+            title_lower = article.get("title", "").lower()
+            relevance_score = article['_relevance_score']
+            if not should_include:
+                logger.info(f"🤖 AI FILTER: Filtering out article '{title_lower[:50]}...' - {ai_reason}")
+                continue
+            elif ai_checker is not None and ai_checker.enabled:
+                logger.debug(f"🤖 AI CHECK: Article '{title_lower[:50]}...' passed AI relevance check - {ai_reason}")
+
             # Bayesian filtering: Check if article should be rejected based on learned patterns
             try:
                 from utils.bayesian_learner import BayesianLearner
@@ -1029,8 +956,9 @@ class NewsAggregator:
                         # Save article first (insert if new, update relevance score if exists)
                         cursor.execute('''
                             INSERT OR REPLACE INTO articles
-                            (title, url, published, summary, content, source, source_type, ingested_at, relevance_score)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            (title, url, published, summary, content, source, source_type, ingested_at, relevance_score,
+                             published_ts, ingested_ts)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                         ''', (
                             article.get("title", ""),
                             article.get("url", ""),
@@ -1040,7 +968,9 @@ class NewsAggregator:
                             article.get("source", ""),
                             article.get("source_type", ""),
                             article.get("ingested_at", ""),
-                            relevance_score  # Include the calculated relevance score
+                            relevance_score,  # Include the calculated relevance score
+                            to_epoch(article.get("published")) or 0,
+                            to_epoch(article.get("ingested_at")) or 0
                         ))
                         
                         # Get article ID (either new or existing)
@@ -1114,6 +1044,14 @@ class NewsAggregator:
     def enrich_articles(self, articles: List[Dict]) -> List[Dict]:
         """Add metadata and formatting to articles"""
         enriched = []
+        category_updates = []  # (category, confidence, id) flushed in one transaction at the end
+        
+        # Rebuild learned category models once per cycle if category_training changed
+        try:
+            from utils.category_model import refresh_category_models
+            refresh_category_models(article.get("zip_code", "02720") for article in articles)
+        except Exception as e:
+            logger.warning(f"Error refreshing category models: {e}")
         
         for article in articles:
             # Check if category is manually overridden (don't recalculate)
@@ -1122,6 +1060,7 @@ class NewsAggregator:
             # Detect/assign category if not set or if override is not set
             if not article.get("category") or (not category_override and article.get("category_override") is None):
                 # Recalculate category using learned patterns (will use training data)
+                previous = (article.get("category"), article.get("category_confidence"))
                 detected_category, confidence = self._detect_category(article)
                 article["category"] = detected_category
                 article["category_confidence"] = confidence
@@ -1130,23 +1069,9 @@ class NewsAggregator:
                 if confidence < 0.6:
                     logger.info(f"⚠️  LOW CONFIDENCE: Article '{article.get('title', '')[:50]}...' categorized as '{detected_category}' with only {confidence:.1%} confidence")
 
-                # Update database if article has an ID
-                if article.get("id"):
-                    try:
-                        from config import DATABASE_CONFIG
-                        import sqlite3
-                        db_path = DATABASE_CONFIG.get("path", "fallriver_news.db")
-                        conn = sqlite3.connect(db_path)
-                        cursor = conn.cursor()
-                        cursor.execute('''
-                            UPDATE articles
-                            SET category = ?, category_confidence = ?
-                            WHERE id = ? AND (category_override = 0 OR category_override IS NULL)
-                        ''', (detected_category, confidence, article["id"]))
-                        conn.commit()
-                        conn.close()
-                    except Exception as e:
-                        logger.warning(f"Error updating category in database: {e}")
+                # Queue a database update if the article has an ID and its category actually changed
+                if article.get("id") and previous != (detected_category, confidence):
+                    category_updates.append((detected_category, confidence, article["id"]))
             
             # Detect neighborhoods
             article["neighborhoods"] = self._detect_neighborhoods(article)
@@ -1161,80 +1086,14 @@ class NewsAggregator:
             article["hashtags"] = self._generate_hashtags(article)
 
             # === ALERT DETECTION ===
-            # ONLY flag TRUE emergency situations with official terminology
-            alert_keywords = {
-                'weather': [
-                    # Only official National Weather Service warnings/advisories
-                    'winter weather advisory', 'winter storm warning', 'winter storm watch',
-                    'blizzard warning', 'blizzard watch', 'ice storm warning', 'ice storm watch',
-                    'freezing rain warning', 'freezing rain advisory', 'heavy snow warning',
-                    'heavy snow advisory', 'wind warning', 'wind advisory', 'high wind warning',
-                    'severe thunderstorm warning', 'severe thunderstorm watch', 'tornado warning',
-                    'tornado watch', 'flood warning', 'flood watch', 'flash flood warning',
-                    'flash flood watch', 'coastal flood warning', 'coastal flood watch',
-                    'hazardous weather outlook', 'special weather statement', 'severe weather statement',
-                    # Emergency conditions (must include "emergency" or official terminology)
-                    'snow emergency declared', 'state of emergency due to weather',
-                    'emergency travel ban', 'weather emergency road closure',
-                    'dangerous driving conditions due to weather', 'whiteout emergency conditions',
-                    'life-threatening weather conditions', 'extreme cold warning', 'extreme heat warning'
-                ],
-                'parking': [
-                    # Only emergency parking situations with "emergency" or "snow emergency"
-                    'emergency parking ban', 'parking ban due to snow emergency',
-                    'parking ban due to weather emergency', 'emergency alternate side parking',
-                    'emergency street cleaning due to weather', 'emergency parking restriction due to snow'
-                ],
-                'trash': [
-                    # Only emergency trash collection situations
-                    'emergency trash collection delay', 'trash collection delayed due to snow emergency',
-                    'trash collection delayed due to weather emergency', 'emergency waste collection delay',
-                    'storm emergency trash collection', 'weather emergency collection delay due to storm'
-                ]
-            }
+            # Articles that skipped filter_relevant_articles (e.g. reloaded from the database) get alert fields here
+            if 'is_alert' not in article:
+                article.update(detect_alert(article))
 
             # Add formatted date - use actual publication date, NOT today's date
-            pub_date = None
-            published_str = article.get("published")
-            
-            # Try to parse published date first
-            if published_str:
-                try:
-                    # Handle various ISO formats
-                    pub_str_clean = published_str.replace('Z', '+00:00').split('+')[0].split('.')[0]
-                    pub_date = datetime.fromisoformat(pub_str_clean)
-                except:
-                    try:
-                        # Try parsing just the date part
-                        pub_date = datetime.fromisoformat(published_str.split('T')[0])
-                    except:
-                        pass
-            
-            # If no published date, try date_sort (from database)
-            if not pub_date:
-                date_sort_str = article.get("date_sort")
-                if date_sort_str:
-                    try:
-                        date_sort_clean = date_sort_str.replace('Z', '+00:00').split('+')[0].split('.')[0]
-                        pub_date = datetime.fromisoformat(date_sort_clean)
-                    except:
-                        try:
-                            pub_date = datetime.fromisoformat(date_sort_str.split('T')[0])
-                        except:
-                            pass
-            
-            # If still no date, try created_at (ingestion date) as last resort
-            if not pub_date:
-                created_str = article.get("created_at")
-                if created_str:
-                    try:
-                        created_clean = created_str.replace('Z', '+00:00').split('+')[0].split('.')[0]
-                        pub_date = datetime.fromisoformat(created_clean)
-                    except:
-                        try:
-                            pub_date = datetime.fromisoformat(created_str.split('T')[0])
-                        except:
-                            pass
+            # Fall back to date_sort (from database), then created_at (ingestion date)
+            pub_date = (parse_datetime(article.get("published")) or parse_datetime(article.get("date_sort"))
+                        or parse_datetime(article.get("created_at")))
             
             # Format the date if we found one
             if pub_date:
@@ -1274,68 +1133,57 @@ class NewsAggregator:
             
             enriched.append(article)
         
+        self._flush_category_updates(category_updates)
+        
         # Sort by published date (newest first), fallback to date_sort
-        # Handle None values properly for sorting
-        enriched.sort(key=lambda x: x.get("published") or x.get("date_sort") or "1970-01-01T00:00:00", reverse=True)
+        enriched.sort(key=lambda x: article_epoch(x) or to_epoch(x.get("date_sort")) or 0, reverse=True)
         
         return enriched
     
+    def _flush_category_updates(self, category_updates: List[tuple]):
+        """Write recomputed categories in a single transaction (no-op when nothing changed)
+        
+        Args:
+            category_updates: List of (category, confidence, article_id)
+        """
+        if not category_updates:
+            return
+        try:
+            conn = sqlite3.connect(self.database.db_path)
+            try:
+                cursor = conn.cursor()
+                # The IS NOT guard skips rows whose stored values already match
+                cursor.executemany('''
+                    UPDATE articles
+                    SET category = ?, category_confidence = ?
+                    WHERE id = ? AND (category_override = 0 OR category_override IS NULL)
+                    AND (category IS NOT ? OR category_confidence IS NOT ?)
+                ''', [(category, confidence, article_id, category, confidence)
+                      for category, confidence, article_id in category_updates])
+                conn.commit()
+            finally:
+                conn.close()
+            logger.debug(f"Updated categories for {len(category_updates)} articles")
+        except Exception as e:
+            logger.warning(f"Error updating category in database: {e}")
+    
     def _find_related_articles(self, article: Dict, all_articles: List[Dict], limit: int = 5) -> List[Dict]:
-        """Find related articles based on keywords, topics, and categories"""
+        """Find related articles based on keywords, topics, and categories
+        
+        The TF-IDF index is built once per listing and reused for every article in it,
+        so a listing costs one index build instead of scoring every pair.
+        """
         if not all_articles:
             return []
         
-        article_title = article.get("title", "").lower()
-        article_content = article.get("content", article.get("summary", "")).lower()
-        article_category = article.get("category", "")
-        article_source = article.get("source", "")
-        
-        # Extract key terms from article (excluding common words)
-        common_words = {"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "by", "is", "are", "was", "were", "be", "been", "have", "has", "had", "do", "does", "did", "will", "would", "could", "should", "may", "might", "must", "can", "this", "that", "these", "those", "i", "you", "he", "she", "it", "we", "they", "what", "which", "who", "when", "where", "why", "how"}
-        
-        # Get meaningful words from title and content
-        title_words = set(word.strip('.,!?;:"()[]') for word in article_title.split() if len(word) > 3 and word.lower() not in common_words)
-        content_words = set(word.strip('.,!?;:"()[]') for word in article_content.split() if len(word) > 4 and word.lower() not in common_words)
-        key_terms = title_words | content_words
+        from utils.related_index import RelatedArticlesIndex
         
-        # Score each article for relatedness
-        related_scores = []
-        for other_article in all_articles:
-            # Skip the same article
-            if other_article.get("id") == article.get("id") or other_article.get("url") == article.get("url"):
-                continue
-            
-            score = 0.0
-            
-            # Category match (high weight)
-            if other_article.get("category") == article_category:
-                score += 10.0
-            
-            # Source match (medium weight)
-            if other_article.get("source") == article_source:
-                score += 5.0
-            
-            # Keyword matches
-            other_title = other_article.get("title", "").lower()
-            other_content = other_article.get("content", other_article.get("summary", "")).lower()
-            other_text = f"{other_title} {other_content}"
-            
-            # Count matching key terms
-            matches = sum(1 for term in key_terms if term in other_text)
-            score += matches * 2.0
-            
-            # Check for specific topic matches (crime, government, schools, etc.)
-            topic_keywords = ["police", "arrest", "city council", "mayor", "school", "student", "business", "restaurant", "event", "festival"]
-            for topic in topic_keywords:
-                if topic in article_content and topic in other_content:
-                    score += 3.0
-            
-            if score > 0:
-                related_scores.append((score, other_article))
+        if (self._related_index is None or self._related_index[0] is not all_articles
+                or len(self._related_index[1].articles) != len(all_articles)):
+            self._related_index = (all_articles, RelatedArticlesIndex(all_articles, k=max(limit, 5)))
+        index = self._related_index[1]
         
-        # Sort by score and return top matches
-        related_scores.sort(key=lambda x: x[0], reverse=True)
-        return [article for _, article in related_scores[:limit]]
+        return [related for related, _ in index.related_to(article, k=limit)]
     
     def _detect_neighborhoods(self, article: Dict) -> List[str]:
         """Detect neighborhoods mentioned in article"""
@@ -1365,8 +1213,7 @@ class NewsAggregator:
     def _detect_category(self, article: Dict) -> tuple[str, float]:
         """Detect article category based on content and source, with source override
         Also learns from manual recategorizations stored in category_training table"""
-        from config import NEWS_SOURCES, DATABASE_CONFIG
-        import sqlite3
+        from config import NEWS_SOURCES
         
         source = article.get("source", "").lower()
         source_display = article.get("source_display", "").lower()
@@ -1378,122 +1225,11 @@ class NewsAggregator:
         combined = f"{title} {content}"
         
         try:
-            db_path = DATABASE_CONFIG.get("path", "fallriver_news.db")
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            # Create category_training table if it doesn't exist
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS category_training (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    article_id INTEGER,
-                    title TEXT,
-                    content TEXT,
-                    summary TEXT,
-                    source TEXT,
-                    url TEXT,
-                    original_category TEXT,
-                    corrected_category TEXT,
-                    zip_code TEXT,
-                    trained_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (article_id) REFERENCES articles (id)
-                )
-            ''')
-            
-            # Get zip_code from article or use default
-            zip_code = article.get("zip_code", "02720")
-            
-            # Find similar training examples by extracting keywords and matching
-            # Look for training examples with similar keywords
-            cursor.execute('''
-                SELECT corrected_category, COUNT(*) as count
-                FROM category_training
-                WHERE zip_code = ? OR zip_code IS NULL
-                GROUP BY corrected_category
-            ''', (zip_code,))
-            
-            training_categories = {}
-            for row in cursor.fetchall():
-                cat, count = row
-                training_categories[cat] = count
-            
-            # Extract keywords from training examples for each category using TF-IDF
-            learned_keywords = {}
-            for category in training_categories.keys():
-                cursor.execute('''
-                    SELECT title, content, summary, source
-                    FROM category_training
-                    WHERE corrected_category = ? AND (zip_code = ? OR zip_code IS NULL)
-                    LIMIT 100  -- Increased for better TF-IDF
-                ''', (category, zip_code))
-
-                category_texts = []
-                for row in cursor.fetchall():
-                    title_text, content_text, summary_text, source_text = row
-                    combined_text = f"{title_text or ''} {content_text or ''} {summary_text or ''} {source_text or ''}".lower()
-                    category_texts.append(combined_text)
-
-                # Use TF-IDF vectorization for better keyword extraction
-                if category_texts and len(category_texts) >= 3:  # Need minimum examples
-                    try:
-                        from sklearn.feature_extraction.text import TfidfVectorizer
-                        import numpy as np
-
-                        # TF-IDF vectorization with proper preprocessing
-                        vectorizer = TfidfVectorizer(
-                            max_features=50,  # Top 50 terms per category
-                            stop_words='english',
-                            ngram_range=(1, 3),  # Unigrams, bigrams, trigrams
-                            min_df=2,  # Term must appear in at least 2 documents
-                            max_df=0.9  # Term can appear in at most 90% of documents
-                        )
-
-                        # Fit and transform
-                        tfidf_matrix = vectorizer.fit_transform(category_texts)
-                        feature_names = vectorizer.get_feature_names_out()
-
-                        # Get average TF-IDF scores across all documents
-                        avg_scores = np.mean(tfidf_matrix.toarray(), axis=0)
-
-                        # Get top keywords by TF-IDF score
-                        top_indices = np.argsort(avg_scores)[-20:][::-1]  # Top 20
-                        top_keywords = [feature_names[i] for i in top_indices if avg_scores[i] > 0.1]
-
-                        learned_keywords[category] = top_keywords[:15]  # Limit to 15 best
-
-                    except ImportError:
-                        # Fallback to simple frequency-based extraction if sklearn not available
-                        logger.warning("sklearn not available, using fallback keyword extraction")
-                        word_counts = {}
-                        for text in category_texts:
-                            words = [w for w in text.split() if len(w) > 3]  # Filter short words
-                            for word in words:
-                                word_counts[word] = word_counts.get(word, 0) + 1
-
-                        # Get words that appear in at least 40% of examples
-                        min_occurrences = max(2, len(category_texts) * 0.4)
-                        top_keywords = [word for word, count in word_counts.items()
-                                      if count >= min_occurrences][:20]
-                        learned_keywords[category] = top_keywords
-
-            conn.close()
-
-            # Check if current article matches learned patterns with confidence scoring
-            best_match = None
-            best_confidence = 0.0
-            best_matches = 0
-
-            for category, keywords in learned_keywords.items():
-                if not keywords:
-                    continue
+            from utils.category_model import get_category_model, match_learned_category
 
-                matches = sum(1 for kw in keywords if kw in combined)
-                if matches > 0:
-                    confidence = matches / len(keywords)  # Confidence = match ratio
-                    if confidence > best_confidence:
-                        best_confidence = confidence
-                        best_match = category
-                        best_matches = matches
+            # Learned keywords are precomputed per zip and kept in memory
+            learned_keywords = get_category_model(article.get("zip_code", "02720"))
+            best_match, best_confidence, best_matches = match_learned_category(combined, learned_keywords)
 
             # Use learned category if confidence > 60%
             if best_match and best_confidence > 0.6:
@@ -1954,8 +1690,9 @@ class NewsAggregator:
             # Save article first (insert if new, update relevance score if exists)
             cursor.execute('''
                 INSERT OR REPLACE INTO articles
-                (title, url, published, summary, content, source, source_type, ingested_at, relevance_score)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                (title, url, published, summary, content, source, source_type, ingested_at, relevance_score,
+                 published_ts, ingested_ts)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 article.get("title", ""),
                 article.get("url", ""),
@@ -1965,7 +1702,9 @@ class NewsAggregator:
                 article.get("source", ""),
                 article.get("source_type", ""),
                 article.get("ingested_at", ""),
-                relevance_score
+                relevance_score,
+                to_epoch(article.get("published")) or 0,
+                to_epoch(article.get("ingested_at")) or 0
             ))
 
             # Get article ID
@@ -1,194 +1,409 @@
 """
 Intelligent caching layer for news aggregation
-Uses in-memory cache with file-based persistence
-
-CACHING DISABLED: 2024-12-11
-All caching is disabled to ensure fresh data on every page load.
+Two tiers: a size-bounded in-memory LRU in front of a SQLite store (cache/cache.db).
+Entries are kept as JSON, so every hit returns a fresh copy callers can modify. Each cache type
+has a TTL and a stale window. Inside the stale window, get_or_fetch() returns the old value and
+refreshes it in the background, and get(allow_stale=True) can fall back to it when a fetch
+fails. Both tiers index entries by type, so invalidate(cache_type) only touches that type's
+entries. Set CACHE_DISABLED=true to bypass the cache.
 """
 import json
 import hashlib
 import os
+import sqlite3
+import threading
 import time
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
-from functools import lru_cache
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable, Set
 import logging
 from pathlib import Path
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# CACHING DISABLED - Always fetch fresh data
-CACHE_DISABLED = True
+# Escape hatch: always fetch fresh data
+CACHE_DISABLED = os.getenv("CACHE_DISABLED", "false").lower() == "true"
 
-# Cache directory (kept for compatibility but not used when disabled)
-CACHE_DIR = Path("cache")
-CACHE_DIR.mkdir(exist_ok=True)
+# Cache directory (disk tier lives in cache/cache.db)
+CACHE_DIR = Path(__file__).resolve().parent / "cache"
 
-# Cache TTLs (in seconds) - NOT USED when CACHE_DISABLED=True
+# Cache TTLs (in seconds): values are fresh for this long
 CACHE_TTLS = {
-    "rss": 0,  # DISABLED
-    "scraped": 0,  # DISABLED
-    "weather": 0,  # DISABLED
-    "articles": 0,  # DISABLED
-    "meetings": 0,  # DISABLED
+    "rss": 5 * 60,
+    "scraped": 30 * 60,
+    "weather": 10 * 60,
+    "articles": 5 * 60,
+    "meetings": 60 * 60,
+    "agendas": 6 * 60 * 60,
+    "zip": 24 * 60 * 60,
+}
+
+# Stale windows (in seconds): how long after the TTL a value may still be served while it is
+# refreshed, or when a refresh fails
+CACHE_STALE_TTLS = {
+    "rss": 60 * 60,
+    "scraped": 6 * 60 * 60,
+    "weather": 30 * 60,
+    "articles": 0,
+    "meetings": 24 * 60 * 60,
+    "agendas": 24 * 60 * 60,
+    "zip": 30 * 24 * 60 * 60,
 }
 
+DEFAULT_TTL = 10 * 60
+
+# Tier bounds (bytes of serialized data)
+MEMORY_MAX_BYTES = int(os.getenv("CACHE_MEMORY_MB", "32")) * 1024 * 1024
+DISK_MAX_BYTES = int(os.getenv("CACHE_DISK_MB", "256")) * 1024 * 1024
+
+
+def init_cache_table(cursor):
+    """Create the cache_entries table if it doesn't exist"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            cache_key TEXT PRIMARY KEY,
+            cache_type TEXT NOT NULL,
+            identifier TEXT NOT NULL,
+            data TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            cached_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            stale_until REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_cache_entries_type ON cache_entries(cache_type)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed ON cache_entries(accessed_at)')
+
+
+class CacheEntry:
+    """Serialized value plus its freshness window"""
+
+    __slots__ = ('cache_type', 'data', 'expires_at', 'stale_until')
+
+    def __init__(self, cache_type: str, data: str, expires_at: float, stale_until: float):
+        self.cache_type = cache_type
+        self.data = data
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+
 
 class CacheManager:
-    """Manages caching for RSS feeds, scraped content, and other data
-    
-    NOTE: Caching is currently DISABLED (CACHE_DISABLED=True)
-    All get() calls return None to force fresh data fetches.
-    """
-    
-    def __init__(self):
-        self.memory_cache = {}  # In-memory cache
-        self.cache_dir = CACHE_DIR
+    """Manages caching for RSS feeds, scraped content, weather and zip lookups"""
+
+    def __init__(self, cache_dir: Optional[Path] = None, memory_max_bytes: int = MEMORY_MAX_BYTES,
+                 disk_max_bytes: int = DISK_MAX_BYTES):
+        self.cache_dir = Path(cache_dir or CACHE_DIR)
+        self.db_path = self.cache_dir / "cache.db"
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.memory_cache: 'OrderedDict[str, CacheEntry]' = OrderedDict()  # In-memory LRU tier
+        self._memory_bytes = 0
+        self._types: Dict[str, Set[str]] = {}  # cache_type -> keys in the memory tier
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.RLock()
+        self._db_ready = False
+        self._refreshing: Set[str] = set()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "memory_evictions": 0, "disk_evictions": 0,
+                      "refreshes": 0}
         if CACHE_DISABLED:
             logger.info("[CACHE] ⚠️ Caching is DISABLED - all requests will fetch fresh data")
-    
+
     def _get_cache_key(self, cache_type: str, identifier: str) -> str:
         """Generate cache key"""
         key_string = f"{cache_type}:{identifier}"
         return hashlib.md5(key_string.encode()).hexdigest()
-    
-    def _get_cache_path(self, cache_key: str) -> Path:
-        """Get file path for cache entry"""
-        return self.cache_dir / f"{cache_key}.json"
-    
-    def get(self, cache_type: str, identifier: str) -> Optional[Any]:
-        """Get cached value if exists and not expired
-        
-        DISABLED: Always returns None to force fresh data
-        """
-        # CACHING DISABLED - always return None to force fresh fetch
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._db_ready:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        if not self._db_ready:
+            with conn:
+                init_cache_table(conn.cursor())
+            self._db_ready = True
+        return conn
+
+    # Memory tier
+
+    def _remember(self, key: str, entry: CacheEntry):
+        with self._lock:
+            self._forget(key)
+            self.memory_cache[key] = entry
+            self._types.setdefault(entry.cache_type, set()).add(key)
+            self._memory_bytes += len(entry.data)
+            while self._memory_bytes > self.memory_max_bytes and len(self.memory_cache) > 1:
+                oldest = next(iter(self.memory_cache))
+                self._forget(oldest)
+                self.stats["memory_evictions"] += 1
+
+    def _forget(self, key: str):
+        with self._lock:
+            entry = self.memory_cache.pop(key, None)
+            if entry is not None:
+                self._memory_bytes -= len(entry.data)
+                keys = self._types.get(entry.cache_type)
+                if keys is not None:
+                    keys.discard(key)
+
+    # Disk tier
+
+    def _load(self, key: str) -> Optional[CacheEntry]:
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute('SELECT cache_type, data, expires_at, stale_until FROM cache_entries '
+                                   'WHERE cache_key = ?', (key,)).fetchone()
+                if row is not None:
+                    with conn:
+                        conn.execute('UPDATE cache_entries SET accessed_at = ? WHERE cache_key = ?', (time.time(), key))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Error reading cache entry {key}: {e}")
+            return None
+        return CacheEntry(*row) if row else None
+
+    def _store(self, key: str, cache_type: str, identifier: str, entry: CacheEntry):
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                with self._lock:
+                    total = self._disk_total(conn)
+                    with conn:
+                        previous = conn.execute('SELECT size FROM cache_entries WHERE cache_key = ?', (key,)).fetchone()
+                        conn.execute('''
+                            INSERT OR REPLACE INTO cache_entries
+                                (cache_key, cache_type, identifier, data, size, cached_at, expires_at, stale_until, accessed_at)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ''', (key, cache_type, identifier, entry.data, len(entry.data), now, entry.expires_at,
+                              entry.stale_until, now))
+                    total += len(entry.data) - (previous[0] if previous else 0)
+                    self._disk_bytes = total
+                    if total > self.disk_max_bytes:
+                        self._evict_disk(conn, keep=key)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Error writing cache entry {cache_type}:{identifier}: {e}")
+
+    def _disk_total(self, conn, refresh: bool = False) -> int:
+        """Running total of bytes in the disk tier"""
+        if self._disk_bytes is None or refresh:
+            self._disk_bytes = conn.execute('SELECT COALESCE(SUM(size), 0) FROM cache_entries').fetchone()[0]
+        return self._disk_bytes
+
+    def _evict_disk(self, conn, keep: str):
+        """Drop expired entries, then least recently used ones, until the disk tier fits"""
+        with conn:
+            conn.execute('DELETE FROM cache_entries WHERE stale_until < ? AND cache_key != ?', (time.time(), keep))
+        total = self._disk_total(conn, refresh=True)
+        while total > self.disk_max_bytes:
+            rows = conn.execute('SELECT cache_key, size FROM cache_entries WHERE cache_key != ? '
+                                'ORDER BY accessed_at LIMIT 64', (keep,)).fetchall()
+            if not rows:
+                break
+            with conn:
+                for key, size in rows:
+                    conn.execute('DELETE FROM cache_entries WHERE cache_key = ?', (key,))
+                    self._forget(key)
+                    self.stats["disk_evictions"] += 1
+                    total -= size
+                    if total <= self.disk_max_bytes:
+                        break
+        self._disk_bytes = total
+
+    # Public API
+
+    def _lookup(self, cache_type: str, identifier: str, allow_stale: bool):
+        """(value, is_stale) or None"""
         if CACHE_DISABLED:
             logger.debug(f"[CACHE] DISABLED - forcing fresh fetch for {cache_type}:{identifier}")
             return None
-        
+
         cache_key = self._get_cache_key(cache_type, identifier)
-        
-        # Check memory cache first
-        if cache_key in self.memory_cache:
-            entry = self.memory_cache[cache_key]
-            if time.time() < entry.get("expires_at", 0):
-                logger.debug(f"Cache hit (memory): {cache_type}:{identifier}")
-                return entry.get("data")
-            else:
-                # Expired, remove from memory
-                del self.memory_cache[cache_key]
-        
-        # Check file cache
-        cache_path = self._get_cache_path(cache_key)
-        if cache_path.exists():
-            try:
-                with open(cache_path, 'r', encoding='utf-8') as f:
-                    entry = json.load(f)
-                
-                expires_at = entry.get("expires_at", 0)
-                if time.time() < expires_at:
-                    # Load into memory cache
-                    self.memory_cache[cache_key] = entry
-                    logger.debug(f"Cache hit (file): {cache_type}:{identifier}")
-                    return entry.get("data")
-                else:
-                    # Expired, delete file
-                    cache_path.unlink()
-                    logger.debug(f"Cache expired: {cache_type}:{identifier}")
-            except Exception as e:
-                logger.warning(f"Error reading cache file {cache_path}: {e}")
-        
+        entry = self.memory_cache.get(cache_key)
+        if entry is not None:
+            with self._lock:
+                if cache_key in self.memory_cache:
+                    self.memory_cache.move_to_end(cache_key)
+        else:
+            entry = self._load(cache_key)
+            if entry is not None:
+                self._remember(cache_key, entry)
+
+        now = time.time()
+        if entry is not None and now < entry.expires_at:
+            self.stats["hits"] += 1
+            logger.debug(f"Cache hit: {cache_type}:{identifier}")
+            return json.loads(entry.data), False
+        if entry is not None and allow_stale and now < entry.stale_until:
+            self.stats["stale_hits"] += 1
+            logger.debug(f"Cache hit (stale): {cache_type}:{identifier}")
+            return json.loads(entry.data), True
+
+        if entry is not None and now >= entry.stale_until:
+            self._forget(cache_key)
+        self.stats["misses"] += 1
         logger.debug(f"Cache miss: {cache_type}:{identifier}")
         return None
-    
+
+    def get(self, cache_type: str, identifier: str, allow_stale: bool = False) -> Optional[Any]:
+        """Get cached value if exists and not expired
+
+        Args:
+            cache_type: Cache type (see CACHE_TTLS)
+            identifier: Key within the type
+            allow_stale: Also return a value that is past its TTL but inside its stale window
+
+        Returns:
+            A copy of the cached value, or None
+        """
+        found = self._lookup(cache_type, identifier, allow_stale)
+        return found[0] if found else None
+
+    def get_or_fetch(self, cache_type: str, identifier: str, fetch: Callable[[], Any],
+                     ttl: Optional[int] = None) -> Optional[Any]:
+        """Cached value, using stale-while-revalidate inside the type's stale window
+
+        A fresh value is returned as is. A stale one is returned immediately while fetch() refreshes
+        it in the background (one refresh per key at a time). On a miss fetch() runs inline.
+        None results are not cached.
+
+        Args:
+            cache_type: Cache type (see CACHE_TTLS)
+            identifier: Key within the type
+            fetch: Produces the value (must be JSON-serializable)
+            ttl: TTL override in seconds
+        """
+        found = self._lookup(cache_type, identifier, allow_stale=True)
+        if found is not None:
+            value, stale = found
+            if stale:
+                self._refresh_in_background(cache_type, identifier, fetch, ttl)
+            return value
+
+        value = fetch()
+        if value is not None:
+            self.set(cache_type, identifier, value, ttl)
+        return value
+
+    def _refresh_in_background(self, cache_type: str, identifier: str, fetch: Callable[[], Any], ttl: Optional[int]):
+        cache_key = self._get_cache_key(cache_type, identifier)
+        with self._lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+
+        def refresh():
+            try:
+                value = fetch()
+                if value is not None:
+                    self.set(cache_type, identifier, value, ttl)
+                    self.stats["refreshes"] += 1
+            except Exception as e:
+                logger.warning(f"Background refresh of {cache_type}:{identifier} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(cache_key)
+
+        self._refresher.submit(refresh)
+
     def set(self, cache_type: str, identifier: str, data: Any, ttl: Optional[int] = None):
         """Set cached value
-        
-        DISABLED: Does nothing when caching is disabled
+
+        Args:
+            cache_type: Cache type (see CACHE_TTLS)
+            identifier: Key within the type
+            data: JSON-serializable value (datetimes are stored as strings)
+            ttl: TTL override in seconds (the stale window still follows the type)
         """
-        # CACHING DISABLED - don't store anything
         if CACHE_DISABLED:
             logger.debug(f"[CACHE] DISABLED - not caching {cache_type}:{identifier}")
             return
-        
+
         cache_key = self._get_cache_key(cache_type, identifier)
-        
+
         # Get TTL
         if ttl is None:
-            ttl = CACHE_TTLS.get(cache_type, 10 * 60)  # Default 10 minutes
-        
+            ttl = CACHE_TTLS.get(cache_type, DEFAULT_TTL)
         expires_at = time.time() + ttl
-        
-        entry = {
-            "cache_type": cache_type,
-            "identifier": identifier,
-            "data": data,
-            "expires_at": expires_at,
-            "cached_at": time.time()
-        }
-        
-        # Store in memory
-        self.memory_cache[cache_key] = entry
-        
-        # Store in file
-        cache_path = self._get_cache_path(cache_key)
-        try:
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(entry, f, default=str)
-        except Exception as e:
-            logger.warning(f"Error writing cache file {cache_path}: {e}")
-    
+        entry = CacheEntry(cache_type, json.dumps(data, default=str), expires_at,
+                           expires_at + CACHE_STALE_TTLS.get(cache_type, 0))
+
+        self._remember(cache_key, entry)
+        self._store(cache_key, cache_type, identifier, entry)
+
     def invalidate(self, cache_type: str, identifier: Optional[str] = None):
-        """Invalidate cache entries"""
+        """Invalidate cache entries (one identifier, or every entry of the type)"""
         if identifier:
             cache_key = self._get_cache_key(cache_type, identifier)
-            # Remove from memory
-            if cache_key in self.memory_cache:
-                del self.memory_cache[cache_key]
-            # Remove file
-            cache_path = self._get_cache_path(cache_key)
-            if cache_path.exists():
-                cache_path.unlink()
+            self._forget(cache_key)
+            where, params = 'cache_key = ?', (cache_key,)
             logger.info(f"Invalidated cache: {cache_type}:{identifier}")
         else:
-            # Invalidate all of this type
-            keys_to_remove = []
-            for key, entry in self.memory_cache.items():
-                if entry.get("cache_type") == cache_type:
-                    keys_to_remove.append(key)
-            
-            for key in keys_to_remove:
-                del self.memory_cache[key]
-            
-            # Remove files
-            for cache_file in self.cache_dir.glob("*.json"):
-                try:
-                    with open(cache_file, 'r', encoding='utf-8') as f:
-                        entry = json.load(f)
-                    if entry.get("cache_type") == cache_type:
-                        cache_file.unlink()
-                except:
-                    pass
-            
+            with self._lock:
+                for cache_key in list(self._types.get(cache_type, ())):
+                    self._forget(cache_key)
+            where, params = 'cache_type = ?', (cache_type,)
             logger.info(f"Invalidated all cache entries of type: {cache_type}")
-    
+
+        try:
+            conn = self._connect()
+            try:
+                with self._lock:
+                    with conn:
+                        conn.execute(f'DELETE FROM cache_entries WHERE {where}', params)
+                    self._disk_bytes = None  # Recounted on the next write
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Error invalidating cache {cache_type}: {e}")
+
     def clear_all(self):
         """Clear all cache"""
-        self.memory_cache.clear()
-        for cache_file in self.cache_dir.glob("*.json"):
+        with self._lock:
+            self.memory_cache.clear()
+            self._types.clear()
+            self._memory_bytes = 0
+            try:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.execute('DELETE FROM cache_entries')
+                    self._disk_bytes = 0
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Error clearing cache: {e}")
+        for cache_file in self.cache_dir.glob("*.json"):  # Files written by the old JSON store
             cache_file.unlink()
         logger.info("Cleared all cache")
-    
+
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
-        memory_entries = len(self.memory_cache)
-        file_entries = len(list(self.cache_dir.glob("*.json")))
-        
+        disk_entries = 0
+        try:
+            conn = self._connect()
+            try:
+                disk_entries = conn.execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+                disk_bytes = self._disk_total(conn, refresh=True)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Error reading cache stats: {e}")
+            disk_bytes = self._disk_bytes or 0
+
         return {
-            "memory_entries": memory_entries,
-            "file_entries": file_entries,
-            "cache_dir": str(self.cache_dir)
+            "memory_entries": len(self.memory_cache),
+            "memory_bytes": self._memory_bytes,
+            "file_entries": disk_entries,
+            "disk_bytes": disk_bytes,
+            "cache_dir": str(self.cache_dir),
+            **self.stats
         }
 
 
@@ -199,4 +414,3 @@ _cache_manager = CacheManager()
 def get_cache() -> CacheManager:
     """Get global cache manager instance"""
     return _cache_manager
-
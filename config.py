@@ -345,7 +345,19 @@ WEBSITE_CONFIG = {
     "domain": os.getenv("WEBSITE_DOMAIN", "fallrivernews.local"),
     "output_dir": "build",
     "auto_deploy": os.getenv("AUTO_DEPLOY", "false").lower() == "true",
-    "deploy_method": os.getenv("DEPLOY_METHOD", "github_pages")  # github_pages, netlify, vercel
+    "deploy_method": os.getenv("DEPLOY_METHOD", "github_pages"),  # github_pages, netlify, vercel
+    "template_cache_dir": os.getenv("TEMPLATE_CACHE_DIR", os.path.join("cache", "jinja")),  # Compiled template bytecode
+    "template_auto_reload": os.getenv("TEMPLATE_AUTO_RELOAD", os.getenv("FLASK_DEBUG", "0")).lower() in ("1", "true"),  # Dev mode: pick up template edits
+    "response_cache_max_age": int(os.getenv("RESPONSE_CACHE_MAX_AGE", "300")),  # Seconds a rendered dynamic page is reused (0 disables)
+    "response_cache_dir": os.getenv("RESPONSE_CACHE_DIR", ""),  # Optional disk copy of rendered pages, shared by server processes
+    "image_proxy_cache_dir": os.getenv("IMAGE_PROXY_CACHE_DIR", os.path.join("cache", "images")),  # /cached-images blobs
+    "image_proxy_cache_mb": int(os.getenv("IMAGE_PROXY_CACHE_MB", "512")),  # Disk budget; least recently used images are evicted
+    "image_proxy_max_age": int(os.getenv("IMAGE_PROXY_MAX_AGE", "86400")),  # Seconds before a cached image is revalidated upstream
+    "feed_proxy_ttl": int(os.getenv("FEED_PROXY_TTL", "300")),  # Seconds a proxied RSS feed is served without going upstream
+    "feed_proxy_stale_ttl": int(os.getenv("FEED_PROXY_STALE_TTL", "3600")),  # Further seconds it is served while refreshing
+    "feed_proxy_cache_mb": int(os.getenv("FEED_PROXY_CACHE_MB", "16")),  # Memory cap for proxied feeds
+    "thumbnail_cache_mb": int(os.getenv("THUMBNAIL_CACHE_MB", "500")),  # Disk budget; least recently used thumbnails are evicted
+    "thumbnail_workers": int(os.getenv("THUMBNAIL_WORKERS", "0"))  # Processes making thumbnails (0 = CPU count)
 }
 
 # Database Configuration
@@ -354,7 +366,8 @@ DEFAULT_DB_FILENAME = os.getenv("DATABASE_PATH", "fallriver_news.db")
 DATABASE_PATH = DEFAULT_DB_FILENAME if os.path.isabs(DEFAULT_DB_FILENAME) else os.path.join(BASE_DIR, DEFAULT_DB_FILENAME)
 DATABASE_CONFIG = {
     "type": "sqlite",
-    "path": DATABASE_PATH
+    "path": DATABASE_PATH,
+    "duplicate_history_days": int(os.getenv("DUPLICATE_HISTORY_DAYS", "7"))  # Near-duplicate check window
 }
 
 # Scanner Configuration (Broadcastify)
@@ -6,11 +6,45 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import logging
 from config import DATABASE_CONFIG, AGGREGATION_CONFIG
+from utils.timestamps import to_epoch
+from utils.quality_store import init_quality_table, quality_content_hash
+from utils.build_manifest import init_build_manifest_table
+from utils.data_version import init_data_version_table
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def backfill_epoch_columns(cursor, batch_size: int = 1000) -> int:
+    """Fill published_ts / ingested_ts for rows that don't have them yet
+    
+    Run once per database open (_init_database) so read paths never write. Writers set the
+    columns themselves; this covers rows from before the migration and rows whose string was
+    edited outside save_article (the triggers reset the epoch to NULL). Unparseable or missing
+    values are stored as 0 so they aren't retried.
+    
+    Returns:
+        Number of rows updated
+    """
+    updated = 0
+    while True:
+        cursor.execute('''
+            SELECT id, published, COALESCE(ingested_at, created_at) FROM articles
+            WHERE published_ts IS NULL OR ingested_ts IS NULL
+            LIMIT ?
+        ''', (batch_size,))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        cursor.executemany('UPDATE articles SET published_ts = ?, ingested_ts = ? WHERE id = ?',
+                           [(to_epoch(published) or 0, to_epoch(ingested) or 0, article_id)
+                            for article_id, published, ingested in rows])
+        updated += len(rows)
+    if updated:
+        logger.info(f"Backfilled epoch timestamps for {updated} articles")
+    return updated
+
+
 class ArticleDatabase:
     """Database for storing articles and tracking posted items"""
     
@@ -118,6 +152,53 @@ class ArticleDatabase:
         except:
             pass
         
+        # Normalized epoch timestamps (0 = missing/unparseable) for integer sorting and recency
+        try:
+            cursor.execute('ALTER TABLE articles ADD COLUMN published_ts INTEGER')
+        except:
+            pass  # Column already exists
+        try:
+            cursor.execute('ALTER TABLE articles ADD COLUMN ingested_ts INTEGER')
+        except:
+            pass  # Column already exists
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_published_ts ON articles(published_ts DESC)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_ingested_ts ON articles(ingested_ts DESC)')
+        # Editing the string column clears its epoch so the next backfill recomputes it
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_articles_published_ts
+            AFTER UPDATE OF published ON articles
+            WHEN NEW.published IS NOT OLD.published AND NEW.published_ts IS OLD.published_ts
+            BEGIN
+                UPDATE articles SET published_ts = NULL WHERE id = NEW.id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_articles_ingested_ts
+            AFTER UPDATE OF ingested_at ON articles
+            WHEN NEW.ingested_at IS NOT OLD.ingested_at AND NEW.ingested_ts IS OLD.ingested_ts
+            BEGIN
+                UPDATE articles SET ingested_ts = NULL WHERE id = NEW.id;
+            END
+        ''')
+        backfill_epoch_columns(cursor)
+        
+        # Content hash keying stored ContentQualityAnalyzer results (see utils/quality_store)
+        try:
+            cursor.execute('ALTER TABLE articles ADD COLUMN content_hash TEXT')
+        except:
+            pass  # Column already exists
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_content_hash ON articles(content_hash)')
+        # Editing the text clears the hash so recompute_quality() picks the article up again
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_articles_content_hash
+            AFTER UPDATE OF title, content, summary, image_url ON articles
+            WHEN NEW.content_hash IS NOT NULL AND NEW.content_hash IS OLD.content_hash
+            BEGIN
+                UPDATE articles SET content_hash = NULL WHERE id = NEW.id;
+            END
+        ''')
+        init_quality_table(cursor)
+        
         # Create index on zip_code for performance
         try:
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_zip_code ON articles(zip_code)')
@@ -349,14 +430,7 @@ class ArticleDatabase:
         ''')
         
         # Create website generation tracking table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS website_generation (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                last_article_id INTEGER,
-                last_generation_time TEXT,
-                pages_generated TEXT
-            )
-        ''')
+        init_build_manifest_table(cursor)
         
         # Create source fetch tracking table
         cursor.execute('''
@@ -576,6 +650,9 @@ class ArticleDatabase:
             VALUES ('zip_pin_editable', '0')
         ''')
         
+        # Data-version counter and triggers (invalidates cached dynamic pages)
+        init_data_version_table(cursor)
+        
         conn.commit()
         conn.close()
         logger.info(f"Database initialized at {self.db_path}")
@@ -591,6 +668,39 @@ class ArticleDatabase:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             new_ids = []
+            inserted_articles = []  # (id, title, content, source) for the relevance term index
+            inserted_signatures = []  # (id, title, content, summary) for the near-duplicate history index
+
+            # Persistent near-duplicate index (checks new articles against recent history)
+            history_check = False
+            try:
+                from utils.duplicate_history import (find_history_duplicate, init_signature_tables, prune_signatures,
+                                                     store_signatures)
+                init_signature_tables(cursor)
+                history_check = True
+            except ImportError:
+                pass  # Optional feature
+            except Exception as e:
+                logger.warning(f"Near-duplicate history index unavailable: {e}")
+
+            # Source performance tracking for dynamic credibility learning (set up before the save
+            # transaction opens; per-article updates then run on this cursor)
+            credibility_system = None
+            relevance_threshold = 11.0  # Default, can be overridden from admin_settings
+            try:
+                from utils.dynamic_source_credibility import DynamicSourceCredibility
+                credibility_system = DynamicSourceCredibility(self.db_path)
+                try:
+                    cursor.execute('SELECT value FROM admin_settings WHERE key = "relevance_threshold"')
+                    threshold_result = cursor.fetchone()
+                    if threshold_result and threshold_result[0]:
+                        relevance_threshold = float(threshold_result[0])
+                except:
+                    pass  # Use default
+            except ImportError:
+                pass  # Optional feature
+            except Exception as e:
+                logger.warning(f"Source performance tracking unavailable: {e}")
 
             # Apply semantic deduplication to the batch
             try:
@@ -768,6 +878,16 @@ class ArticleDatabase:
                             logger.info(f"Skipping rejected article by normalized URL: {title[:50]}")
                             continue
                     
+                    # Near-duplicate of a story saved in an earlier cycle (e.g. re-syndicated by another source)
+                    if history_check:
+                        try:
+                            history_dup = find_history_duplicate(cursor, article, zip_code=article.get("zip_code") or zip_code)
+                            if history_dup:
+                                logger.info(f"Skipping near-duplicate of article {history_dup[0]} ({history_dup[2]}): {title[:50]}")
+                                continue
+                        except Exception as e:
+                            logger.debug(f"Error checking near-duplicate history: {e}")
+                    
                     # Calculate relevance score if not already present (using optimized calculator)
                     relevance_score = article.get('relevance_score') or article.get('_relevance_score')
                     if relevance_score is None:
@@ -777,40 +897,25 @@ class ArticleDatabase:
                         relevance_score = calculate_relevance_score(article, zip_code=article_zip)
 
                     # Track source performance for dynamic credibility learning
-                    try:
-                        from utils.dynamic_source_credibility import DynamicSourceCredibility
-                        from utils.content_quality import ContentQualityAnalyzer
-
-                        credibility_system = DynamicSourceCredibility()
-                        quality_analyzer = ContentQualityAnalyzer()
-
-                        # Get quality score
-                        quality_analysis = quality_analyzer.calculate_quality_score(article)
-                        quality_score = quality_analysis['quality_score']
-
-                        # Determine if article will be enabled (rough approximation)
-                        # Check if article should be enabled based on relevance threshold
-                        relevance_threshold = 11.0  # Default, can be overridden from admin_settings
+                    if credibility_system is not None:
                         try:
-                            threshold_cursor = conn.cursor()
-                            threshold_cursor.execute('SELECT value FROM admin_settings WHERE key = "relevance_threshold"')
-                            threshold_result = threshold_cursor.fetchone()
-                            if threshold_result and threshold_result[0]:
-                                relevance_threshold = float(threshold_result[0])
-                        except:
-                            pass  # Use default
+                            from utils.quality_store import get_quality
 
-                        is_enabled = relevance_score >= relevance_threshold
+                            # Get quality score (analyzed once per content hash and stored in article_quality)
+                            quality_score = get_quality(article, cursor)['quality_score']
 
-                        # Update source performance
-                        credibility_system.update_source_performance(
-                            source, relevance_score, quality_score, is_enabled, zip_code
-                        )
+                            # Determine if article will be enabled (rough approximation)
+                            is_enabled = relevance_score >= relevance_threshold
 
-                    except ImportError:
-                        pass  # Optional feature
-                    except Exception as e:
-                        logger.debug(f"Error tracking source performance: {e}")
+                            # Update source performance in the save transaction
+                            credibility_system.update_source_performance(
+                                source, relevance_score, quality_score, is_enabled, zip_code, cursor=cursor
+                            )
+
+                        except ImportError:
+                            pass  # Optional feature
+                        except Exception as e:
+                            logger.debug(f"Error tracking source performance: {e}")
                     
                     # Calculate local focus score
                     local_focus_score = None
@@ -972,14 +1077,16 @@ class ArticleDatabase:
                             f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"H","location":"database.py:791","message":"Saving article to database","data":{"title":(title or '')[:50],"has_image_url":bool(article.get("image_url")),"image_url":(article.get("image_url") or '')[:80] if article.get("image_url") else None},"timestamp":int(time.time()*1000)})+'\n')
                     except: pass
                     # #endregion
+                    ingested_at = article.get("ingested_at", datetime.now().isoformat())
                     cursor.execute('''
                         INSERT INTO articles
                         (title, url, published, summary, content, source, source_type,
                          image_url, post_id, ingested_at, relevance_score, local_score, zip_code,
                          city_name, state_abbrev, city_state,
                          category, primary_category, secondary_category, category_confidence, category_override,
-                         is_alert, alert_type, alert_priority, alert_start_time, alert_end_time)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                         is_alert, alert_type, alert_priority, alert_start_time, alert_end_time,
+                         published_ts, ingested_ts, content_hash)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     ''', (
                         title,
                         url,
@@ -990,7 +1097,7 @@ class ArticleDatabase:
                         article.get("source_type", ""),
                         article.get("image_url"),
                         article.get("post_id"),
-                        article.get("ingested_at", datetime.now().isoformat()),
+                        ingested_at,
                         relevance_score,
                         local_focus_score,
                         article.get("zip_code") or zip_code,
@@ -1006,11 +1113,16 @@ class ArticleDatabase:
                         article.get("alert_type"),
                         article.get("alert_priority", "info"),
                         article.get("alert_start_time"),
-                        article.get("alert_end_time")
+                        article.get("alert_end_time"),
+                        to_epoch(published) or 0,
+                        to_epoch(ingested_at) or 0,
+                        quality_content_hash(article)
                     ))
                     
                     article_id = cursor.lastrowid
                     new_ids.append(article_id)
+                    inserted_articles.append((article_id, title, article.get("content", ""), source))
+                    inserted_signatures.append((article_id, title, article.get("content", ""), article.get("summary", "")))
                     
                     # Create article_management entry with zip_code
                     # If below threshold, mark as disabled (auto-filtered)
@@ -1051,6 +1163,22 @@ class ArticleDatabase:
                 except Exception as e:
                     logger.error(f"Error saving article: {e}")
             
+            # Keep the relevance keyword -> article index current for targeted rescoring
+            try:
+                from utils.relevance_index import index_articles
+                index_articles(cursor, inserted_articles)
+            except ImportError:
+                pass  # Optional feature
+            except Exception as e:
+                logger.warning(f"Error updating relevance term index: {e}")
+            
+            if history_check:
+                try:
+                    store_signatures(cursor, inserted_signatures)
+                    prune_signatures(cursor)
+                except Exception as e:
+                    logger.warning(f"Error updating near-duplicate signatures: {e}")
+            
             conn.commit()
             conn.close()
             return new_ids
@@ -1148,7 +1276,7 @@ class ArticleDatabase:
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
-        cutoff_time = (datetime.now() - timedelta(hours=hours)).isoformat()
+        cutoff_time = int((datetime.now() - timedelta(hours=hours)).timestamp())
         
         # Resolve zip_code to city_state if provided (Phase 2)
         if zip_code and not city_state:
@@ -1163,10 +1291,10 @@ class ArticleDatabase:
             # Filter by city_state (articles shared across zips in same city)
             cursor.execute('''
                 SELECT * FROM articles 
-                WHERE city_state = ? AND (published >= ? OR ingested_at >= ? OR published IS NULL)
+                WHERE city_state = ? AND (published_ts >= ? OR ingested_ts >= ? OR published IS NULL)
                 ORDER BY 
-                    CASE WHEN published IS NOT NULL AND published != '' THEN published ELSE '1970-01-01' END DESC,
-                    ingested_at DESC
+                    published_ts DESC,
+                    ingested_ts DESC
                 LIMIT ?
             ''', (city_state, cutoff_time, cutoff_time, limit))
         elif zip_code:
@@ -1174,10 +1302,10 @@ class ArticleDatabase:
             cursor.execute('''
                 SELECT * FROM articles 
                 WHERE (city_state = (SELECT city_state FROM city_zip_mapping WHERE zip_code = ?) OR zip_code = ?)
-                AND (published >= ? OR ingested_at >= ? OR published IS NULL)
+                AND (published_ts >= ? OR ingested_ts >= ? OR published IS NULL)
                 ORDER BY 
-                    CASE WHEN published IS NOT NULL AND published != '' THEN published ELSE '1970-01-01' END DESC,
-                    ingested_at DESC
+                    published_ts DESC,
+                    ingested_ts DESC
                 LIMIT ?
             ''', (zip_code, zip_code, cutoff_time, cutoff_time, limit))
         else:
@@ -1185,10 +1313,10 @@ class ArticleDatabase:
             # This ensures newest articles appear first regardless of when they were ingested
             cursor.execute('''
                 SELECT * FROM articles 
-                WHERE published >= ? OR ingested_at >= ? OR published IS NULL
+                WHERE published_ts >= ? OR ingested_ts >= ? OR published IS NULL
                 ORDER BY 
-                    CASE WHEN published IS NOT NULL AND published != '' THEN published ELSE '1970-01-01' END DESC,
-                    ingested_at DESC
+                    published_ts DESC,
+                    ingested_ts DESC
                 LIMIT ?
             ''', (cutoff_time, cutoff_time, limit))
         
@@ -1249,7 +1377,7 @@ class ArticleDatabase:
             WHERE a.published IS NOT NULL AND a.published != ''
             AND (am.is_auto_rejected IS NULL OR am.is_auto_rejected = 0)
             {city_filter}
-            ORDER BY a.published DESC
+            ORDER BY a.published_ts DESC
             LIMIT ?
         ''', filter_params + [limit])
         
@@ -1328,8 +1456,8 @@ class ArticleDatabase:
         base_query += '''
             ORDER BY
                 CASE
-                    WHEN published IS NOT NULL THEN published
-                    ELSE ingested_at
+                    WHEN published_ts > 0 THEN published_ts
+                    ELSE ingested_ts
                 END DESC,
                 created_at DESC
             LIMIT ?
@@ -1379,14 +1507,14 @@ class ArticleDatabase:
         cursor = conn.cursor()
         
         # Get articles from last 7 days that haven't been posted
-        cutoff_time = (datetime.now() - timedelta(days=7)).isoformat()
+        cutoff_time = int((datetime.now() - timedelta(days=7)).timestamp())
         
         cursor.execute('''
             SELECT a.* FROM articles a
             LEFT JOIN posted_articles pa ON a.id = pa.article_id AND pa.platform = ? AND pa.success = 1
-            WHERE (a.published >= ? OR a.ingested_at >= ?)
+            WHERE (a.published_ts >= ? OR a.ingested_ts >= ?)
             AND pa.id IS NULL
-            ORDER BY a.published DESC, a.ingested_at DESC
+            ORDER BY a.published_ts DESC, a.ingested_ts DESC
             LIMIT ?
         ''', (platform, cutoff_time, cutoff_time, limit))
         
@@ -9,6 +9,8 @@ and provides a final status report.
 
 import sqlite3
 from config import DATABASE_CONFIG
+from utils.duplicate_history import HISTORY_THRESHOLD, indexed_candidate_pairs, rebuild_signature_index
+from utils.semantic_deduplication import SemanticDeduplicator
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -70,6 +72,10 @@ def final_duplicate_check():
     url_dupes = cursor.fetchall()
     logger.info(f"URL duplicates: {len(url_dupes)}")
 
+    # Check near-duplicates (same story, reworded title) via the signature index
+    near_dupes = find_near_duplicates(cursor)
+    logger.info(f"Near-duplicate pairs: {len(near_dupes)}")
+
     conn.close()
 
     return {
@@ -77,9 +83,36 @@ def final_duplicate_check():
         'identical_content': len(remaining_identical),
         'identical_summaries': len(remaining_summaries),
         'exact_duplicates': len(exact_dupes),
-        'url_duplicates': len(url_dupes)
+        'url_duplicates': len(url_dupes),
+        'near_duplicates': len(near_dupes)
     }
 
+def find_near_duplicates(cursor):
+    """Near-duplicate pairs from the title signature index, verified with the ingest similarity check"""
+    candidate_pairs = indexed_candidate_pairs(cursor, kind='title')
+    if not candidate_pairs:
+        return []
+
+    deduplicator = SemanticDeduplicator()
+    features = {}
+    candidate_ids = sorted({article_id for pair in candidate_pairs for article_id in pair})
+    for i in range(0, len(candidate_ids), 500):
+        chunk = candidate_ids[i:i + 500]
+        cursor.execute(f'''
+            SELECT id, title, content, summary FROM articles WHERE id IN ({','.join('?' * len(chunk))})
+        ''', chunk)
+        for article_id, title, content, summary in cursor.fetchall():
+            features[article_id] = deduplicator.article_features({'title': title, 'content': content, 'summary': summary})
+
+    near_dupes = []
+    for id1, id2 in sorted(candidate_pairs):
+        if id1 not in features or id2 not in features:
+            continue
+        similarity = deduplicator.feature_similarity(features[id1], features[id2])[0]
+        if similarity >= HISTORY_THRESHOLD:
+            near_dupes.append((id1, id2, similarity))
+    return near_dupes
+
 def create_final_backup():
     """Create final backup after all cleanup"""
     import shutil
@@ -94,6 +127,9 @@ def main():
     logger.info("🎯 FINAL DATABASE DUPLICATE VERIFICATION")
     logger.info("=" * 60)
 
+    # Make sure every article has near-duplicate signatures
+    rebuild_signature_index()
+
     # Run final checks
     results = final_duplicate_check()
 
@@ -103,6 +139,7 @@ def main():
     logger.info(f"  Identical summary groups: {results['identical_summaries']}")
     logger.info(f"  Exact duplicates: {results['exact_duplicates']}")
     logger.info(f"  URL duplicates: {results['url_duplicates']}")
+    logger.info(f"  Near-duplicate pairs: {results['near_duplicates']}")
 
     # Create final backup
     backup_path = create_final_backup()
@@ -112,7 +149,8 @@ def main():
         results['identical_content'],
         results['identical_summaries'],
         results['exact_duplicates'],
-        results['url_duplicates']
+        results['url_duplicates'],
+        results['near_duplicates']
     ])
 
     logger.info("\nFINAL VERDICT:")
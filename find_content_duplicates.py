@@ -10,73 +10,77 @@ but might have slight variations in titles, dates, or other metadata.
 import sqlite3
 from config import DATABASE_CONFIG
 from difflib import SequenceMatcher
+from utils.duplicate_history import indexed_candidate_pairs, rebuild_signature_index, remove_signatures
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 def find_similar_content_by_source():
-    """Find articles with very similar content from the same source"""
+    """Find articles with very similar content from the same source
+
+    Candidate pairs come from the near-duplicate signature index (articles sharing a
+    content LSH bucket) instead of comparing every pair of articles per source.
+    """
     logger.info("Finding articles with similar content from same source...")
 
+    # Make sure every article has signatures before querying the index
+    rebuild_signature_index()
+
     conn = sqlite3.connect(DATABASE_CONFIG["path"])
     cursor = conn.cursor()
 
-    # Get all articles by source
-    cursor.execute('''
-        SELECT id, title, content, summary, url, published, source
-        FROM articles
-        WHERE content IS NOT NULL AND content != '' AND source IS NOT NULL
-        ORDER BY source, published DESC
-    ''')
-
-    articles = cursor.fetchall()
-    logger.info(f"Analyzing {len(articles)} articles with content")
-
-    # Group by source
-    by_source = {}
-    for article in articles:
-        source = article[6]
-        if source not in by_source:
-            by_source[source] = []
-        by_source[source].append(article)
+    candidate_pairs = indexed_candidate_pairs(cursor, kind='content')
+    logger.info(f"Verifying {len(candidate_pairs)} candidate pairs from the signature index")
+
+    # Load the articles that appear in any candidate pair
+    candidate_ids = sorted({article_id for pair in candidate_pairs for article_id in pair})
+    articles = {}
+    for i in range(0, len(candidate_ids), 500):
+        chunk = candidate_ids[i:i + 500]
+        cursor.execute(f'''
+            SELECT id, title, content, summary, url, published, source
+            FROM articles
+            WHERE id IN ({','.join('?' * len(chunk))})
+            AND content IS NOT NULL AND content != '' AND source IS NOT NULL
+        ''', chunk)
+        for row in cursor.fetchall():
+            articles[row[0]] = row
 
     potential_dupes = []
 
-    # For each source, compare content similarity
-    for source, source_articles in by_source.items():
-        if len(source_articles) < 2:
+    for pair in sorted(candidate_pairs):
+        art1, art2 = articles.get(pair[0]), articles.get(pair[1])
+        if not art1 or not art2:
             continue
+        id1, title1, content1, summary1, url1, pub1, src1 = art1
+        id2, title2, content2, summary2, url2, pub2, src2 = art2
 
-        logger.info(f"Checking {len(source_articles)} articles from {source}")
-
-        # Compare each pair of articles from same source
-        for i, art1 in enumerate(source_articles):
-            for j, art2 in enumerate(source_articles[i+1:], i+1):
-                id1, title1, content1, summary1, url1, pub1, src1 = art1
-                id2, title2, content2, summary2, url2, pub2, src2 = art2
+        # Only same-source pairs
+        if src1 != src2:
+            continue
 
-                # Skip if same URL (already caught)
-                if url1 and url2 and url1 == url2:
-                    continue
+        # Skip if same URL (already caught)
+        if url1 and url2 and url1 == url2:
+            continue
 
-                # Compare content similarity
-                content_sim = SequenceMatcher(None, (content1 or "").lower(), (content2 or "").lower()).ratio()
+        # Compare content similarity
+        content_sim = SequenceMatcher(None, (content1 or "").lower(), (content2 or "").lower()).ratio()
 
-                # Compare summary similarity
-                summary_sim = SequenceMatcher(None, (summary1 or "").lower(), (summary2 or "").lower()).ratio()
+        # Compare summary similarity
+        summary_sim = SequenceMatcher(None, (summary1 or "").lower(), (summary2 or "").lower()).ratio()
 
-                # High similarity in content or summary
-                if content_sim > 0.85 or (summary_sim > 0.9 and content_sim > 0.7):
-                    potential_dupes.append({
-                        'source': source,
-                        'similarity': max(content_sim, summary_sim),
-                        'id1': id1, 'id2': id2,
-                        'title1': title1[:60], 'title2': title2[:60],
-                        'url1': url1[:50] if url1 else None,
-                        'url2': url2[:50] if url2 else None,
-                        'date1': pub1, 'date2': pub2
-                    })
+        # High similarity in content or summary
+        if content_sim > 0.85 or (summary_sim > 0.9 and content_sim > 0.7):
+            potential_dupes.append({
+                'source': src1,
+                'similarity': max(content_sim, summary_sim),
+                'id1': id1, 'id2': id2,
+                'title1': (title1 or '')[:60], 'title2': (title2 or '')[:60],
+                'url1': url1[:50] if url1 else None,
+                'url2': url2[:50] if url2 else None,
+                'date1': pub1, 'date2': pub2
+            })
 
     logger.info(f"Found {len(potential_dupes)} potential content duplicates")
 
@@ -202,6 +206,8 @@ def remove_content_duplicates():
                 cursor.execute('DELETE FROM articles WHERE id = ?', (delete_id,))
                 removed += 1
 
+            remove_signatures(cursor, delete_ids)
+
     conn.commit()
     conn.close()
 
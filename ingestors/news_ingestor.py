@@ -228,6 +228,13 @@ class NewsIngestor:
         except Exception as e:
             logger.error(f"Error fetching RSS from {source_name}: {e}")
         
+        if not articles:
+            # Fall back to the last good fetch while it is inside the stale window
+            stale_data = cache.get("rss", rss_url, allow_stale=True)
+            if stale_data:
+                logger.info(f"Using stale cached RSS for {source_name}")
+                return stale_data
+        
         return articles
     
     def _fetch_from_web(self) -> List[Dict]:
@@ -4,7 +4,7 @@ Recalculate relevance scores for all existing articles to fix trending section
 """
 
 import sqlite3
-from utils.relevance_calculator_v2 import calculate_relevance_score
+from utils.job_runner import run_article_job
 from config import DATABASE_CONFIG
 import logging
 
@@ -17,59 +17,13 @@ def recalculate_all_relevance_scores():
     db_path = DATABASE_CONFIG.get("path", "fallriver_news.db")
 
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        # Get all articles
-        cursor.execute('''
-            SELECT id, title, content, summary, source, published, zip_code
-            FROM articles
-            WHERE zip_code = '02720'
-            ORDER BY id
-        ''')
-
-        articles = cursor.fetchall()
-        total_articles = len(articles)
-
-        logger.info(f"Recalculating relevance scores for {total_articles} articles...")
-
-        updated_count = 0
-        for i, (article_id, title, content, summary, source, published, zip_code) in enumerate(articles):
-            if i % 100 == 0:
-                logger.info(f"Processing {i}/{total_articles} articles...")
-
-            # Create article dict for relevance calculation
-            article_dict = {
-                'id': article_id,
-                'title': title or '',
-                'content': content or '',
-                'summary': summary or '',
-                'source': source or '',
-                'published': published or '',
-                'zip_code': zip_code or '02720'
-            }
-
-            try:
-                # Calculate new relevance score
-                new_score = calculate_relevance_score(article_dict, zip_code=zip_code)
-
-                # Update the database
-                cursor.execute('''
-                    UPDATE articles
-                    SET relevance_score = ?
-                    WHERE id = ?
-                ''', (new_score, article_id))
-
-                updated_count += 1
-
-            except Exception as e:
-                logger.warning(f"Error calculating score for article {article_id}: {e}")
-                continue
-
-        conn.commit()
-        conn.close()
+        # Score every article across all cores (workers read, this process writes)
+        result = run_article_job('relevance_v2', zip_code='02720', db_path=db_path,
+                                 progress=lambda done, total: logger.info(f"Processing {done}/{total} articles..."))
+        total_articles = result['total']
+        updated_count = result['written'].get('score', 0)
 
-        logger.info(f"Successfully updated relevance scores for {updated_count}/{total_articles} articles")
+        logger.info(f"Successfully updated relevance scores for {updated_count}/{total_articles} articles (unchanged scores skipped)")
 
         # Verify the update worked
         conn = sqlite3.connect(db_path)
@@ -56,6 +56,13 @@ class ArticleRecalculator:
 
             updated_count = 0
 
+            # Management flags (stellar etc.) for the whole batch in one query per zip
+            from utils.scoring_context import ScoringContext
+            contexts = {}
+            for article_row in articles:
+                contexts.setdefault(article_row['zip_code'], []).append(article_row['id'])
+            contexts = {zip_key: ScoringContext(zip_key, self.db_path).prefetch(ids) for zip_key, ids in contexts.items()}
+
             for article_row in articles:
                 article_id = article_row['id']
                 article_dict = dict(article_row)
@@ -64,7 +71,8 @@ class ArticleRecalculator:
                 try:
                     from utils.relevance_calculator import calculate_relevance_score
                     # Temporarily disable dynamic credibility to avoid database locks
-                    new_relevance = calculate_relevance_score(article_dict, zip_code=article_row['zip_code'])
+                    new_relevance = calculate_relevance_score(article_dict, zip_code=article_row['zip_code'],
+                                                              context=contexts[article_row['zip_code']])
                     # Note: Dynamic credibility learning is skipped during bulk recalculation
 
                     # Recalculate category using smart categorizer
@@ -0,0 +1,62 @@
+"""
+Benchmark AI relevance checking against the local stub server
+Compares one request per article (the old behavior) with batched, concurrent requests, then
+re-checks the same articles to show that cached verdicts cost no requests. The stub sleeps a
+fixed latency per request to stand in for a remote model.
+
+Usage: python scripts/debug/benchmark_ai_relevance.py [article_count] [latency_seconds]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from utils.ai_relevance_checker import AIRelevanceChecker, ChatCompletionsBackend
+from utils.ai_stub_server import StubServer
+
+PLACES = ["Fall River", "Somerset", "Boston", "Battleship Cove", "Worcester", "Swansea", "Kennedy Park"]
+TOPICS = ["council vote", "school budget", "road closure", "festival", "fire", "election"]
+
+
+def build_fixture(count: int):
+    return [{
+        'title': f"{PLACES[i % len(PLACES)]} {TOPICS[i % len(TOPICS)]} #{i}",
+        'content': f"Story {i} about the {TOPICS[i % len(TOPICS)]} in {PLACES[(i * 3) % len(PLACES)]}.",
+        'source': 'Benchmark',
+    } for i in range(count)]
+
+
+def run(server, db_path, articles, label, **kwargs):
+    backend = ChatCompletionsBackend(base_url=server.base_url, model='stub', api_key='benchmark')
+    checker = AIRelevanceChecker(backend=backend, db_path=db_path, **kwargs)
+    before = len(server.requests)
+    start = time.time()
+    verdicts = checker.check_batch(articles)
+    elapsed = time.time() - start
+    print(f"{label:<34} {elapsed:8.2f}s  {len(server.requests) - before:5d} requests")
+    return verdicts
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    articles = build_fixture(count)
+
+    with StubServer(latency=latency) as server:
+        with tempfile.TemporaryDirectory() as tmp:
+            print(f"{count} articles, {latency}s per request")
+            serial = run(server, os.path.join(tmp, 'serial.db'), articles, "One request per article",
+                         batch_size=1, max_concurrency=1)
+            batched_db = os.path.join(tmp, 'batched.db')
+            batched = run(server, batched_db, articles, "Batched (10/request, 4 in flight)")
+            cached = run(server, batched_db, articles, "Re-check (cached verdicts)")
+            new = build_fixture(count + 10)[count:]
+            run(server, batched_db, articles + new, "Re-check plus 10 new articles")
+
+    print(f"Verdicts identical: {serial == batched == cached}")
+
+
+if __name__ == "__main__":
+    main()
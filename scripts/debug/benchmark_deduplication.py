@@ -0,0 +1,78 @@
+"""
+Benchmark semantic deduplication: MinHash/LSH candidates vs the exhaustive pairwise scan
+Builds a labeled synthetic batch (stories plus reworded copies), runs both implementations
+at the thresholds used in save_articles (0.75) and trending (0.85), and checks that
+every duplicate decision is identical.
+
+Usage: python scripts/debug/benchmark_deduplication.py [article_count]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from utils.semantic_deduplication import SemanticDeduplicator
+
+VOCABULARY = (
+    "fall river police fire council mayor school budget harbor festival storm arrest street "
+    "park durfee highlands water bridge route crash election vote tax library church hospital "
+    "restaurant opening zoning housing teacher student football basketball weather snow rain "
+    "flood traffic highway court judge trial parade concert museum battleship cove somerset"
+).split()
+
+
+def build_fixture(count: int, duplicate_rate: float = 0.4, seed: int = 42):
+    """Synthetic labeled batch: each duplicate is a reworded copy of an earlier story"""
+    rng = random.Random(seed)
+    articles = []
+    for i in range(count):
+        if articles and rng.random() < duplicate_rate:
+            source = rng.choice(articles)
+            words = source['title'].split()
+            if rng.random() < 0.5:
+                words[rng.randrange(len(words))] = rng.choice(VOCABULARY)
+            if rng.random() < 0.3:
+                rng.shuffle(words)
+            content = source['content'] if rng.random() < 0.5 else ' '.join(rng.sample(VOCABULARY, 30))
+            articles.append({'id': i, 'title': ' '.join(words), 'content': content, 'label': source['label']})
+        else:
+            title = ' '.join(word.title() for word in rng.sample(VOCABULARY, 8))
+            articles.append({'id': i, 'title': title, 'content': ' '.join(rng.sample(VOCABULARY, 30)), 'label': i})
+    return articles
+
+
+def decisions(unique, duplicates):
+    return ([a['id'] for a in unique],
+            [(d['article']['id'], d['similar_to']['id'], d['similarity'], d['reason']) for d in duplicates])
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    articles = build_fixture(count)
+    deduplicator = SemanticDeduplicator()
+    all_equal = True
+
+    for threshold in (0.75, 0.85):
+        start = time.time()
+        exhaustive = deduplicator.deduplicate_batch_exhaustive(articles, threshold=threshold)
+        exhaustive_time = time.time() - start
+
+        start = time.time()
+        lsh = deduplicator.deduplicate_batch(articles, threshold=threshold)
+        lsh_time = time.time() - start
+
+        equal = decisions(*lsh) == decisions(*exhaustive)
+        all_equal = all_equal and equal
+        mislabeled = sum(1 for d in lsh[1] if d['article']['label'] != d['similar_to']['label'])
+        print(f"threshold={threshold}: {len(lsh[0])} unique, {len(lsh[1])} duplicates "
+              f"({mislabeled} across labels) | exhaustive {exhaustive_time:.2f}s, "
+              f"lsh {lsh_time:.2f}s ({exhaustive_time / max(lsh_time, 1e-9):.1f}x) | "
+              f"decisions {'identical' if equal else 'DIFFER'}")
+
+    sys.exit(0 if all_equal else 1)
+
+
+if __name__ == '__main__':
+    main()
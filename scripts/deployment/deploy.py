@@ -5,6 +5,7 @@ import os
 import shutil
 import logging
 from config import WEBSITE_CONFIG
+from utils.site_writer import get_site_writer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,6 +18,18 @@ class WebsiteDeployer:
         self.output_dir = WEBSITE_CONFIG.get("output_dir", "build")
         self.deploy_method = WEBSITE_CONFIG.get("deploy_method", "github_pages")
     
+    def changed_files(self):
+        """Generated files whose content changed since the last successful deploy
+
+        Images and thumbnails are not tracked, but only change alongside the pages that use
+        them, so an empty list means there is nothing to deploy.
+        """
+        return get_site_writer().changed_files(self.output_dir)
+
+    def mark_deployed(self, paths):
+        """Record the deployed content of paths so unchanged files are skipped next time"""
+        get_site_writer().mark_deployed(paths)
+
     def deploy_to_github_pages(self):
         """Deploy to GitHub Pages"""
         logger.info("Deploying to GitHub Pages...")
@@ -31,14 +44,20 @@ class WebsiteDeployer:
             logger.error(f"Website output directory {self.output_dir} not found")
             return False
         
+        changed = self.changed_files()
+        if not changed:
+            logger.info("No website files changed since the last deploy")
+            return True
+
         try:
-            # Add and commit changes
+            # Pages are only rewritten when their content changes, so git stages just the real changes
             import subprocess
             subprocess.run(["git", "add", self.output_dir], check=True)
             subprocess.run(["git", "commit", "-m", "Update website"], check=True)
             subprocess.run(["git", "push"], check=True)
+            self.mark_deployed(changed)
             
-            logger.info("Website deployed to GitHub Pages")
+            logger.info(f"Website deployed to GitHub Pages ({len(changed)} changed files)")
             logger.info("Note: Enable GitHub Pages in repository settings")
             return True
         
@@ -57,6 +76,11 @@ class WebsiteDeployer:
             logger.error(f"Website output directory {self.output_dir} not found")
             return False
         
+        changed = self.changed_files()
+        if not changed:
+            logger.info("No website files changed since the last deploy")
+            return True
+
         try:
             import subprocess
             # Netlify CLI deployment
@@ -67,7 +91,8 @@ class WebsiteDeployer:
             )
             
             if result.returncode == 0:
-                logger.info("Website deployed to Netlify")
+                self.mark_deployed(changed)
+                logger.info(f"Website deployed to Netlify ({len(changed)} changed files)")
                 return True
             else:
                 logger.error(f"Netlify deployment failed: {result.stderr}")
@@ -85,6 +110,11 @@ class WebsiteDeployer:
             logger.error(f"Website output directory {self.output_dir} not found")
             return False
         
+        changed = self.changed_files()
+        if not changed:
+            logger.info("No website files changed since the last deploy")
+            return True
+
         try:
             import subprocess
             # Change to output directory and deploy
@@ -95,7 +125,8 @@ class WebsiteDeployer:
             )
             
             if result.returncode == 0:
-                logger.info("Website deployed to Vercel")
+                self.mark_deployed(changed)
+                logger.info(f"Website deployed to Vercel ({len(changed)} changed files)")
                 return True
             else:
                 logger.error(f"Vercel deployment failed: {result.stderr}")
@@ -120,6 +151,12 @@ class WebsiteDeployer:
 
 
 if __name__ == "__main__":
+    import sys
     deployer = WebsiteDeployer()
-    deployer.deploy()
+    if "--list-changed" in sys.argv:
+        # Files the next deploy would push, one per line (relative to the output directory)
+        for path in deployer.changed_files():
+            print(os.path.relpath(path, deployer.output_dir))
+    else:
+        deployer.deploy()
 
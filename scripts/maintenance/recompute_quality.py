@@ -0,0 +1,20 @@
+"""Recompute stored content quality results after ContentQualityAnalyzer changes
+
+Only articles without a result for the current ANALYZER_VERSION are analyzed, so running
+this when the version hasn't changed is a no-op. Use --force to recompute everything.
+"""
+import argparse
+import logging
+from database import ArticleDatabase
+from utils.content_quality import ANALYZER_VERSION
+from utils.quality_store import recompute_quality
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument('--force', action='store_true', help='Recompute every article regardless of analyzer version')
+args = parser.parse_args()
+
+ArticleDatabase()  # Apply migrations (content_hash column, article_quality table)
+analyzed = recompute_quality(force=args.force)
+print(f"Analyzer v{ANALYZER_VERSION}: analyzed {analyzed} articles")
@@ -4,7 +4,7 @@ import logging
 import sqlite3
 from datetime import datetime
 from aggregator import NewsAggregator
-from database import ArticleDatabase
+from database import ArticleDatabase, backfill_epoch_columns
 from config import DATABASE_CONFIG, NEWS_SOURCES
 import feedparser
 
@@ -61,6 +61,7 @@ async def update_dates_from_feeds():
                 cursor.execute('UPDATE articles SET published = ? WHERE id = ?', (new_date, article_id))
                 updated += 1
                 logger.debug(f"Updated article {article_id}: {old_published} -> {new_date}")
+    backfill_epoch_columns(cursor)  # The published edits reset published_ts
     
     conn.commit()
     conn.close()
@@ -12,10 +12,10 @@ from http.server import HTTPServer, SimpleHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 import threading
 import logging
-import urllib.request
-import urllib.error
 
 from config import DATABASE_CONFIG
+from utils.feed_proxy import FeedFetchError, get_feed_cache
+from utils.static_files import etag_matches, guess_mimetype, select_representation, strong_etag
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -77,6 +77,47 @@ class RegeneratingHTTPRequestHandler(SimpleHTTPRequestHandler):
         return super().do_GET()
 
 
+    def send_head(self):
+        """Send headers for a site file, preferring a precompressed sibling the client accepts
+
+        Strong ETags (one per encoding) let repeat views be answered with 304. Directories and
+        missing files keep the default behaviour.
+        """
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            return super().send_head()
+
+        file_path, encoding = select_representation(path, self.headers.get('Accept-Encoding'))
+        etag = strong_etag(path, encoding)
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return None
+
+        try:
+            f = open(file_path, 'rb')
+        except OSError:
+            self.send_error(404, "File not found")
+            return None
+        stat = os.fstat(f.fileno())
+        self.send_response(200)
+        self.send_header('Content-Type', guess_mimetype(path))
+        self.send_header('Content-Length', str(stat.st_size))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('ETag', etag)
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Last-Modified', self.date_time_string(int(stat.st_mtime)))
+        self.end_headers()
+        return f
+
+    def copyfile(self, source, outputfile):
+        """Send file bodies with sendfile (socket.sendfile falls back to send where unsupported)"""
+        outputfile.flush()
+        self.connection.sendfile(source)
+
     def _handle_rss_proxy(self):
         """Proxy RSS feeds to avoid CORS issues"""
         try:
@@ -93,35 +134,25 @@ class RegeneratingHTTPRequestHandler(SimpleHTTPRequestHandler):
                 self.wfile.write(b'Missing url parameter')
                 return
             
-            # Fetch RSS feed
-            req = urllib.request.Request(rss_url)
-            req.add_header('User-Agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-            
+            # Served from the feed cache; upstream is only hit on a miss or stale refresh
             try:
-                with urllib.request.urlopen(req, timeout=10) as response:
-                    rss_data = response.read()
-                    
-                    # Send response
-                    self.send_response(200)
-                    self.send_header('Content-type', 'application/rss+xml; charset=utf-8')
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.send_header('Access-Control-Allow-Methods', 'GET')
-                    self.end_headers()
-                    self.wfile.write(rss_data)
-            except urllib.error.HTTPError as e:
-                logger.error(f"HTTP error fetching RSS: {e}")
-                self.send_response(e.code)
+                feed = get_feed_cache().get(rss_url)
+            except FeedFetchError as e:
+                self.send_response(e.status)
                 self.send_header('Content-type', 'text/plain')
                 self.send_header('Access-Control-Allow-Origin', '*')
                 self.end_headers()
-                self.wfile.write(f'Error fetching RSS: {e}'.encode())
-            except Exception as e:
-                logger.error(f"Error fetching RSS: {e}")
-                self.send_response(500)
-                self.send_header('Content-type', 'text/plain')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(f'Error: {str(e)}'.encode())
+                self.wfile.write(e.message.encode())
+                return
+
+            # Send response
+            self.send_response(200)
+            self.send_header('Content-type', 'application/rss+xml; charset=utf-8')
+            self.send_header('Content-Length', str(len(feed.body)))
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'GET')
+            self.end_headers()
+            self.wfile.write(feed.body)
                 
         except Exception as e:
             logger.error(f"Error in RSS proxy: {e}")
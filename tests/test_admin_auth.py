@@ -0,0 +1,42 @@
+"""Tests that admin API endpoints which start jobs or change scoring require a login"""
+import os
+import unittest
+from unittest.mock import patch
+
+os.environ.setdefault('ADMIN_USERNAME', 'test-admin')
+os.environ.setdefault('ADMIN_PASSWORD', 'test-password')
+
+from admin import routes
+
+
+class TestAdminAuth(unittest.TestCase):
+    """@app.route must wrap @login_required, or the route is registered without the check"""
+
+    ENDPOINTS = [
+        ('get', '/admin/api/jobs'),
+        ('get', '/admin/api/jobs/1'),
+        ('post', '/admin/api/jobs/1/cancel'),
+        ('post', '/admin/api/retrain-categories'),
+        ('post', '/admin/api/recategorize-all'),
+        ('post', '/admin/api/rerun-relevance-scoring'),
+        ('post', '/admin/api/add-relevance-item'),
+        ('post', '/admin/api/remove-relevance-item'),
+        ('post', '/admin/api/regenerate'),
+        ('post', '/admin/api/regenerate-all'),
+        ('get', '/admin/api/regeneration-status'),
+        ('get', '/admin/api/related-articles?article_id=1'),
+    ]
+
+    def test_endpoints_reject_anonymous_requests(self):
+        """Test that each endpoint answers 401 without a session and never reaches its handler"""
+        client = routes.app.test_client()
+        with patch.object(routes, '_submit_job', side_effect=AssertionError("job submitted")), \
+                patch.object(routes, 'get_job_queue', side_effect=AssertionError("job queue used")):
+            for method, url in self.ENDPOINTS:
+                with self.subTest(url=url):
+                    response = getattr(client, method)(url, json={})
+                    self.assertEqual(response.status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
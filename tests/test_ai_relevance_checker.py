@@ -0,0 +1,82 @@
+"""Tests for batched, cached AI relevance checking against the local stub server"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from utils import ai_relevance_checker
+from utils.ai_relevance_checker import AIRelevanceChecker, ChatCompletionsBackend, heuristic_verdict
+from utils.ai_stub_server import StubServer
+
+
+def make_articles(count):
+    """Alternate local and non-local stories with distinct text"""
+    articles = []
+    for i in range(count):
+        if i % 2:
+            articles.append({"title": f"Boston transit update {i}", "content": "Boston commuters face delays downtown.", "source": "Wire"})
+        else:
+            articles.append({"title": f"Fall River council meeting {i}", "content": "The Fall River city council met.", "source": "Herald News"})
+    return articles
+
+
+class TestAIRelevanceChecker(unittest.TestCase):
+    """Articles are batched per request and only uncached content is sent"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StubServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        """Set up a temporary verdict cache database"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        self.server.requests.clear()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.temp_db.name):
+            os.unlink(self.temp_db.name)
+
+    def _checker(self, **kwargs):
+        backend = ChatCompletionsBackend(base_url=self.server.base_url, model="stub", api_key="test")
+        return AIRelevanceChecker(backend=backend, db_path=self.temp_db.name, **kwargs)
+
+    def test_batches_match_heuristics(self):
+        """Test that verdicts come back aligned and several articles share a request"""
+        articles = make_articles(25)
+        verdicts = self._checker(batch_size=10, max_concurrency=2).check_batch(articles)
+        self.assertEqual(verdicts, [heuristic_verdict(article) for article in articles])
+        self.assertEqual(sorted(self.server.requests), [5, 10, 10])
+
+    def test_cached_verdicts_skip_requests(self):
+        """Test that a new checker on the same database sends only new or changed content"""
+        articles = make_articles(6)
+        self._checker().check_batch(articles + articles[:2])  # Duplicates are sent once
+        self.assertEqual(self.server.requests, [6])
+
+        changed = dict(articles[0], content="Fall River firefighters respond to a blaze.")
+        decisions = self._checker().should_include_batch(articles + [changed])
+        self.assertEqual(self.server.requests, [6, 1])
+        self.assertEqual([include for include, _ in decisions], [True, False, True, False, True, False, True])
+
+        with patch.object(ai_relevance_checker, 'PROMPT_VERSION', ai_relevance_checker.PROMPT_VERSION + 1):
+            self._checker().check_batch(articles)
+        self.assertEqual(self.server.requests, [6, 1, 6])
+
+    def test_failed_batch_falls_back_uncached(self):
+        """Test that a failed request uses heuristics and is retried next time"""
+        articles = make_articles(3)
+        backend = ChatCompletionsBackend(base_url="http://127.0.0.1:1/v1", model="stub", api_key="test")
+        checker = AIRelevanceChecker(backend=backend, db_path=self.temp_db.name)
+        self.assertEqual(checker.check_batch(articles), [heuristic_verdict(article) for article in articles])
+
+        self._checker().check_batch(articles)
+        self.assertEqual(self.server.requests, [3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Tests for the batch relevance rescoring engine"""
+import unittest
+from datetime import datetime, timedelta
+from utils.batch_relevance import BatchRelevanceScorer, build_term_matrix
+from utils.relevance_calculator import calculate_relevance_score_with_tags, get_default_relevance_config
+from utils.timestamps import article_epoch, parse_datetime, to_epoch
+
+
+class TestBatchRelevance(unittest.TestCase):
+    """Batch scores must match the per-article calculator"""
+
+    def setUp(self):
+        """Set up fixture articles covering every score component"""
+        now = datetime.now()
+        self.config = get_default_relevance_config()
+        self.config['high_relevance_points'] = 15.0
+        self.config['local_places_points'] = 3.0
+        self.articles = [
+            {
+                "title": "Fall River City Council approves budget",
+                "content": "The city council met at Government Center to discuss the city budget and zoning.",
+                "source": "Herald News",
+                "published": (now - timedelta(hours=2)).isoformat()
+            },
+            {
+                "title": "Durfee students hold fundraiser",
+                "content": "Students at BMC Durfee held a charity event in the Highlands.",
+                "source": "Fall River Reporter",
+                "published": (now - timedelta(hours=30)).isoformat()
+            },
+            {
+                "title": "You won't believe this one trick",
+                "content": "Click here to find out more.",
+                "source": "Unknown Blog",
+                "published": (now - timedelta(days=10)).isoformat()
+            },
+            {
+                "title": "Weather update",
+                "content": "",
+                "source": "WPRI 12",
+                "published": "not a date"
+            },
+            {
+                "title": "Stellar pick",
+                "summary": "A story about the mayor",
+                "source": "ABC6",
+                "is_stellar": 1
+            },
+            {
+                "title": "Nothing local here",
+                "content": "Generic national story.",
+                "source": "Wire"
+            }
+        ]
+
+    def test_scores_match_per_article_calculator(self):
+        """Test that batch scores equal calculate_relevance_score_with_tags"""
+        scorer = BatchRelevanceScorer(config=self.config, use_bayesian=False)
+        batch_scores = scorer.score(self.articles)
+
+        self.assertEqual(len(batch_scores), len(self.articles))
+        for article, batch_score in zip(self.articles, batch_scores):
+            expected, _ = calculate_relevance_score_with_tags(article, config=self.config)
+            self.assertAlmostEqual(batch_score, expected, places=6, msg=article["title"])
+
+    def test_term_matrix_substring_semantics(self):
+        """Test that the term matrix matches `term in text` including repeats and boundaries"""
+        texts = ["fall river fall river", "river", "", "the fall"]
+        terms = ["fall river", "river", "fall", "zzz"]
+        matrix = build_term_matrix(texts, terms).toarray()
+
+        for i, text in enumerate(texts):
+            for j, term in enumerate(terms):
+                self.assertEqual(bool(matrix[i, j]), term in text)
+
+    def test_empty_batch(self):
+        """Test that an empty batch returns no scores"""
+        scorer = BatchRelevanceScorer(config=self.config, use_bayesian=False)
+        self.assertEqual(len(scorer.score([])), 0)
+
+
+class TestTimestamps(unittest.TestCase):
+    """The shared parser keeps the scorers' wall-clock semantics"""
+
+    def test_parse_formats(self):
+        """Test ISO, 'Z'/offset, date-only and RFC 2822 inputs"""
+        expected = datetime(2024, 3, 5, 14, 30)
+        self.assertEqual(parse_datetime("2024-03-05T14:30:00Z"), expected)
+        self.assertEqual(parse_datetime("2024-03-05T14:30:00+02:00"), expected)
+        self.assertEqual(parse_datetime("Tue, 05 Mar 2024 14:30:00 -0500"), expected)
+        self.assertEqual(parse_datetime("2024-03-05"), datetime(2024, 3, 5))
+        self.assertIsNone(parse_datetime("not a date"))
+        self.assertIsNone(to_epoch(""))
+
+    def test_article_epoch_prefers_column(self):
+        """Test that the normalized column wins and 0 means unknown"""
+        self.assertEqual(article_epoch({"published": "2024-03-05", "published_ts": 1234}), 1234)
+        self.assertIsNone(article_epoch({"published": "2024-03-05", "published_ts": 0}))
+        self.assertEqual(article_epoch({"published": "2024-03-05"}), to_epoch(datetime(2024, 3, 5)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Tests for the dependency-tracked build manifest"""
+import os
+import tempfile
+import unittest
+from utils.build_manifest import BuildManifest, page_inputs
+from utils.site_writer import SiteWriter
+
+
+class TestBuildManifest(unittest.TestCase):
+    """Pages are only re-rendered when the inputs they were built from change"""
+
+    def setUp(self):
+        """Set up a temporary database and output directory"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        self.out_dir = tempfile.TemporaryDirectory()
+        self.renders = []
+        self.articles = [{'id': 1, 'title': 'Council meets', 'category': 'local-news'},
+                         {'id': 2, 'title': 'Durfee wins', 'category': 'sports'}]
+        self.settings = {'show_images': '1', 'last_regeneration_time': '2026-01-01T00:00:00'}
+        self.weather = {'location': 'Fall River, MA', 'current': {'temperature': 40, 'condition': 'Clear'}}
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.out_dir.cleanup()
+        if os.path.exists(self.temp_db.name):
+            os.unlink(self.temp_db.name)
+
+    def _run(self, articles, settings, weather):
+        """One generation pass over a page per category, returning the pages rendered"""
+        writer = SiteWriter(db_path=self.temp_db.name)
+        manifest = BuildManifest('02720', db_path=self.temp_db.name, writer=writer).load()
+        for category in ('local-news', 'sports'):
+            output_file = os.path.join(self.out_dir.name, f"{category}.html")
+            shown = [a for a in articles if a['category'] == category]
+
+            def render(category=category, output_file=output_file):
+                self.renders.append(category)
+                writer.write_text(output_file, category)
+
+            manifest.build(category, page_inputs(shown, settings, weather, 'templates'), output_file, render)
+        manifest.save(max(a['id'] for a in articles))
+        return manifest.rebuilt
+
+    def test_unchanged_inputs_skip_rendering(self):
+        """Test that a second run with the same inputs renders nothing"""
+        self.assertEqual(self._run(self.articles, self.settings, self.weather), ['local-news', 'sports'])
+        settings = dict(self.settings, last_regeneration_time='2026-01-01T01:00:00')
+        weather = dict(self.weather, fetched_at='later')
+        articles = [dict(a, _category='trending', source_initials='HN') for a in self.articles]
+        self.assertEqual(self._run(articles, settings, weather), [])
+        self.assertEqual(BuildManifest('02720', db_path=self.temp_db.name).load().last_article_id, 2)
+
+    def test_changed_inputs_rebuild_only_affected_pages(self):
+        """Test that new or edited articles rebuild their page and settings/weather rebuild all"""
+        self._run(self.articles, self.settings, self.weather)
+        articles = self.articles + [{'id': 3, 'title': 'Fair opens', 'category': 'local-news'}]
+        self.assertEqual(self._run(articles, self.settings, self.weather), ['local-news'])
+        articles[1] = dict(articles[1], title='Durfee wins title')
+        self.assertEqual(self._run(articles, self.settings, self.weather), ['sports'])
+        weather = {'location': 'Fall River, MA', 'current': {'temperature': 55, 'condition': 'Rain'}}
+        self.assertEqual(self._run(articles, self.settings, weather), ['local-news', 'sports'])
+
+        os.unlink(os.path.join(self.out_dir.name, 'sports.html'))
+        self.assertEqual(self._run(articles, self.settings, weather), ['sports'])
+
+
+if __name__ == "__main__":
+    unittest.main()
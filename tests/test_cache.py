@@ -0,0 +1,74 @@
+"""Tests for the tiered CacheManager"""
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from cache import CacheManager
+
+
+class TestCacheManager(unittest.TestCase):
+    """Values live in a bounded memory LRU backed by SQLite, with per-type TTLs"""
+
+    def setUp(self):
+        """Set up a cache in a temporary directory"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = CacheManager(cache_dir=Path(self.temp_dir.name), memory_max_bytes=200, disk_max_bytes=400)
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.temp_dir.cleanup()
+
+    def test_tiers_and_copies(self):
+        """Test memory hits, disk hits in a new process, and that callers get copies"""
+        articles = [{"title": "Council meets", "url": "https://www.heraldnews.com/a"}]
+        self.cache.set("rss", "https://www.heraldnews.com/rss", articles)
+        cached = self.cache.get("rss", "https://www.heraldnews.com/rss")
+        self.assertEqual(cached, articles)
+        cached[0]["title"] = "Changed"
+        self.assertEqual(self.cache.get("rss", "https://www.heraldnews.com/rss"), articles)
+
+        fresh = CacheManager(cache_dir=Path(self.temp_dir.name))  # As in a new process
+        self.assertEqual(fresh.get("rss", "https://www.heraldnews.com/rss"), articles)
+        self.assertIsNone(fresh.get("rss", "https://www.heraldnews.com/other"))
+        self.assertEqual((fresh.stats["hits"], fresh.stats["misses"]), (1, 1))
+
+    def test_eviction_and_type_invalidation(self):
+        """Test byte-bounded eviction in both tiers and per-type invalidation"""
+        for n in range(6):
+            self.cache.set("weather", f"station-{n}", "x" * 80)
+        stats = self.cache.get_stats()
+        self.assertLessEqual(stats["memory_bytes"], 200)
+        self.assertLessEqual(stats["disk_bytes"], 400)
+        self.assertGreater(stats["memory_evictions"], 0)
+        self.assertGreater(stats["disk_evictions"], 0)
+        self.assertIsNone(self.cache.get("weather", "station-0"))  # Least recently used
+        self.assertIsNotNone(self.cache.get("weather", "station-5"))
+
+        self.cache.set("zip", "02720", {"city": "Fall River"})
+        self.cache.invalidate("weather")
+        self.assertIsNone(self.cache.get("weather", "station-5"))
+        self.assertEqual(self.cache.get("zip", "02720"), {"city": "Fall River"})
+
+    def test_stale_while_revalidate(self):
+        """Test that a stale value is served while one background refresh replaces it"""
+        self.cache.set("weather", "02720", {"temperature": 50}, ttl=0)
+        self.assertIsNone(self.cache.get("weather", "02720"))
+        self.assertEqual(self.cache.get("weather", "02720", allow_stale=True), {"temperature": 50})
+
+        refreshed = threading.Event()
+
+        def fetch():
+            time.sleep(0.05)
+            refreshed.set()
+            return {"temperature": 55}
+
+        self.assertEqual(self.cache.get_or_fetch("weather", "02720", fetch), {"temperature": 50})
+        self.assertTrue(refreshed.wait(2))
+        self.cache._refresher.shutdown(wait=True)
+        self.assertEqual(self.cache.get("weather", "02720"), {"temperature": 55})
+        self.assertEqual(self.cache.stats["refreshes"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+"""Tests for the precomputed learned-category model"""
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from utils import category_model
+from utils.category_model import get_category_model, init_category_tables, match_learned_category, refresh_category_models
+
+
+class TestCategoryModel(unittest.TestCase):
+    """The model is rebuilt only when category_training changes"""
+
+    def setUp(self):
+        """Set up a temporary database with training examples"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        conn = sqlite3.connect(self.temp_db.name)
+        init_category_tables(conn.cursor())
+        conn.executemany('''
+            INSERT INTO category_training (title, content, corrected_category, zip_code) VALUES (?, ?, ?, ?)
+        ''', [(f"Hilltoppers basketball game {i}", "durfee basketball team wins game", "sports", "02720") for i in range(4)])
+        conn.commit()
+        conn.close()
+        category_model._model_cache.clear()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        category_model._model_cache.clear()
+        if os.path.exists(self.temp_db.name):
+            os.unlink(self.temp_db.name)
+
+    def test_model_built_once_and_matched(self):
+        """Test that the stored model is reused until training data changes"""
+        keywords = get_category_model("02720", db_path=self.temp_db.name)
+        self.assertIn("sports", keywords)
+
+        category, confidence, _ = match_learned_category("durfee basketball team wins game", keywords)
+        self.assertEqual(category, "sports")
+        self.assertGreater(confidence, 0.6)
+
+        # Unchanged training data - loaded from the stored model without rebuilding
+        category_model._model_cache.clear()
+        with patch.object(category_model, 'build_category_model') as build:
+            refresh_category_models(["02720"], db_path=self.temp_db.name)
+            build.assert_not_called()
+        self.assertEqual(get_category_model("02720"), keywords)
+
+    def test_training_change_triggers_rebuild(self):
+        """Test that a new training example rebuilds the zip's model"""
+        refresh_category_models(["02720"], db_path=self.temp_db.name)
+        conn = sqlite3.connect(self.temp_db.name)
+        conn.execute("INSERT INTO category_training (title, corrected_category, zip_code) VALUES ('x', 'news', '02720')")
+        conn.commit()
+        conn.close()
+
+        with patch.object(category_model, 'build_category_model') as build:
+            refresh_category_models(["02720"], db_path=self.temp_db.name)
+            build.assert_called_once_with("02720", db_path=self.temp_db.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""Tests for the cached RSS proxy"""
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from utils.feed_proxy import FeedCache, FeedFetchError
+
+FEED_URL = 'https://www.heraldnews.com/news/rss'
+
+
+class FakeResponse:
+    """Minimal streamed requests.Response"""
+
+    def __init__(self, status_code=200, body=b'<rss></rss>', delay=0):
+        self.status_code = status_code
+        self.body = body
+        self.headers = {'content-type': 'application/rss+xml', 'etag': '"feed-v1"'}
+        self.delay = delay
+
+    def __enter__(self):
+        time.sleep(self.delay)
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def iter_content(self, chunk_size=8192):
+        yield self.body
+
+
+class TestFeedCache(unittest.TestCase):
+    """Feeds are fetched once, served from memory and refreshed in the background"""
+
+    def setUp(self):
+        """Set up a small feed cache"""
+        self.cache = FeedCache(ttl=60, stale_ttl=600, max_bytes=1000)
+
+    def test_concurrent_requests_fetch_once(self):
+        """Test that many simultaneous visitors cause one upstream fetch, then hits are local"""
+        results = []
+        with patch('utils.feed_proxy.requests.get', return_value=FakeResponse(delay=0.2)) as get:
+            threads = [threading.Thread(target=lambda: results.append(self.cache.get(FEED_URL))) for _ in range(20)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.cache.get(FEED_URL)
+            self.assertEqual(get.call_count, 1)
+        self.assertEqual(len(results), 20)
+        self.assertTrue(all(feed.body == b'<rss></rss>' for feed in results))
+
+    def test_stale_while_revalidate(self):
+        """Test that a stale feed is served at once and revalidated with its ETag"""
+        with patch('utils.feed_proxy.requests.get', return_value=FakeResponse()):
+            feed = self.cache.get(FEED_URL)
+        feed.fetched_at -= 120  # Past the TTL
+
+        with patch('utils.feed_proxy.requests.get', return_value=FakeResponse(status_code=304, delay=0.1)) as get:
+            self.assertIs(self.cache.get(FEED_URL), feed)
+            self.cache._refresher.shutdown(wait=True)
+            self.assertEqual(get.call_args.kwargs['headers']['If-None-Match'], '"feed-v1"')
+        self.assertLess(feed.age(), 60)
+
+    def test_byte_cap_and_errors(self):
+        """Test least recently used eviction over the byte cap and error statuses"""
+        with patch('utils.feed_proxy.requests.get', return_value=FakeResponse(body=b'x' * 400)):
+            for n in range(3):
+                self.cache.get(f'{FEED_URL}?page={n}')
+        self.assertEqual(self.cache.get_stats()['feeds'], 2)
+
+        with self.assertRaises(FeedFetchError) as error:
+            self.cache.get('file:///etc/passwd')
+        self.assertEqual(error.exception.status, 400)
+        with patch('utils.feed_proxy.requests.get', return_value=FakeResponse(status_code=404)):
+            with self.assertRaises(FeedFetchError) as error:
+                self.cache.get(f'{FEED_URL}?missing=1')
+        self.assertEqual(error.exception.status, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+"""Tests for the compiled alert/source filtering rules"""
+import unittest
+from config import NEWS_SOURCES
+from utils.filter_rules import ALERT_KEYWORDS, detect_alert, match_alert_type, source_key_for
+
+
+def reference_alert_type(text):
+    """The original per-article scan over every phrase list"""
+    for alert_type, keywords in ALERT_KEYWORDS.items():
+        if any(keyword in text for keyword in keywords):
+            return alert_type
+    return None
+
+
+class TestFilterRules(unittest.TestCase):
+    """Compiled matchers must agree with the original substring scans"""
+
+    def test_alert_type_matches_reference(self):
+        """Test overlapping phrases, type order and non-alerts"""
+        texts = [
+            "city declares emergency parking ban ahead of winter storm warning",
+            "emergency parking ban in effect tonight",
+            "storm emergency trash collection moved to friday",
+            "flash flood warning issued for bristol county",
+            "council discusses parking downtown",
+            "",
+        ]
+        for text in texts:
+            self.assertEqual(match_alert_type(text), reference_alert_type(text), text)
+
+    def test_detect_alert_priority(self):
+        """Test alert fields and priority words"""
+        alert = detect_alert({"title": "Wind Advisory for Fall River", "content": "Gusts up to 50 mph."})
+        self.assertEqual(alert, {'is_alert': True, 'alert_type': 'weather', 'alert_priority': 'warning'})
+        self.assertFalse(detect_alert({"title": "Library book sale"})['is_alert'])
+
+    def test_source_key_lookup(self):
+        """Test that source names resolve to the same key as the NEWS_SOURCES scan"""
+        for key, config in NEWS_SOURCES.items():
+            self.assertIsNotNone(source_key_for(config["name"].lower()))
+        self.assertIsNone(source_key_for("some unrelated blog"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+"""Tests for the thumbnail pipeline and its indexed cache"""
+import io
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from utils.image_cache import ImageCache
+from utils.image_processor import PIL_AVAILABLE
+
+if PIL_AVAILABLE:
+    from PIL import Image
+
+
+class FakeResponse:
+    """Minimal streamed requests.Response"""
+
+    def __init__(self, status_code=200, body=b'', content_type='image/jpeg'):
+        self.status_code = status_code
+        self.body = body
+        self.headers = {'content-type': content_type}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def iter_content(self, chunk_size=8192):
+        yield self.body
+
+
+def jpeg_bytes(width=1600, height=1200):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 30, 30)).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+@unittest.skipUnless(PIL_AVAILABLE, "PIL/Pillow not installed")
+class TestImageCache(unittest.TestCase):
+    """Each image is downloaded once for all sizes, indexed in SQLite and evicted by size"""
+
+    def setUp(self):
+        """Set up a cache in a temporary directory"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "test.db")
+        self.cache = ImageCache(Path(self.temp_dir.name) / "build", max_cache_size_mb=1, db_path=self.db_path)
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.temp_dir.cleanup()
+
+    def test_pipeline_makes_every_size_from_one_download(self):
+        """Test that queued images get all sizes from a single fetch and the index survives restarts"""
+        url = 'https://www.heraldnews.com/photo.jpg'
+        self.assertTrue(self.cache.request(url))
+        self.assertFalse(self.cache.request(url))  # Already queued
+        with patch('utils.image_processor.requests.get', return_value=FakeResponse(body=jpeg_bytes())) as get:
+            self.assertTrue(self.cache.process_pending(workers=1, wait=True))
+            self.assertEqual(get.call_count, 1)
+
+        thumbnails = self.cache.get_all_thumbnails(url)
+        self.assertTrue(all(thumbnails.values()))
+        with Image.open(self.cache.base_dir / thumbnails['small']) as small:
+            self.assertLessEqual(small.size, (200, 150))
+        self.assertFalse(self.cache.request(url))  # Already cached
+
+        reopened = ImageCache(self.cache.base_dir, db_path=self.db_path)
+        self.assertEqual(reopened.get_all_thumbnails(url), thumbnails)
+        self.assertEqual(reopened.get_cache_stats()['total_files'], 3)
+
+    def test_failures_and_size_eviction(self):
+        """Test that failed images are not retried at once and the byte budget evicts LRU thumbnails"""
+        with patch('utils.image_processor.requests.get', return_value=FakeResponse(body=b'<html>', content_type='text/html')):
+            self.assertIsNone(self.cache.get_or_create_thumbnail('https://www.heraldnews.com/page', 'small'))
+        self.assertFalse(self.cache.request('https://www.heraldnews.com/page'))
+
+        with patch('utils.image_processor.requests.get', return_value=FakeResponse(body=jpeg_bytes())):
+            self.cache.get_or_create_thumbnail('https://www.heraldnews.com/9.jpg', 'small')
+            per_image = self.cache.get_cache_stats()['total_size_mb']
+            self.cache.max_cache_size_mb = per_image * 2.5
+            for n in range(1, 4):
+                self.cache.request(f'https://www.heraldnews.com/{n}.jpg')
+            self.cache.process_pending(workers=1, wait=True)
+        stats = self.cache.get_cache_stats()
+        self.assertLessEqual(stats['total_size_mb'], self.cache.max_cache_size_mb)
+        self.assertEqual(stats['total_files'], 6)
+        self.assertFalse(self.cache.has_thumbnails('https://www.heraldnews.com/9.jpg'))  # Least recently used, not first by name
+        self.assertTrue(self.cache.has_thumbnails('https://www.heraldnews.com/3.jpg'))
+        on_disk = sum(path.stat().st_size for path in self.cache.thumbnails_dir.rglob('*.webp'))
+        self.assertAlmostEqual(on_disk / (1024 * 1024), stats['total_size_mb'])
+
+    def test_queue_survives_the_process(self):
+        """Test that images queued by a process that exits before thumbnailing are made by the next one"""
+        urls = ['https://www.heraldnews.com/a.jpg', 'https://www.heraldnews.com/b.jpg']
+        for url in urls:
+            self.cache.request(url)
+        with patch.object(ImageCache, '_drain'):  # The process exits before the pipeline runs
+            self.cache.process_pending(workers=1, wait=True)
+
+        reopened = ImageCache(self.cache.base_dir, db_path=self.db_path)
+        self.assertEqual(reopened.get_cache_stats()['pending'], 2)
+        with patch('utils.image_processor.requests.get', return_value=FakeResponse(body=jpeg_bytes())):
+            reopened.process_pending(workers=1, wait=True)
+        self.assertTrue(all(reopened.has_thumbnails(url) for url in urls))
+        self.assertEqual(ImageCache(self.cache.base_dir, db_path=self.db_path).get_cache_stats()['pending'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
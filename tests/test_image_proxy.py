@@ -0,0 +1,87 @@
+"""Tests for the /cached-images disk cache"""
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from utils.image_proxy import ImageFetchError, ImageProxyCache
+
+
+class FakeResponse:
+    """Minimal streamed requests.Response"""
+
+    def __init__(self, status_code=200, body=b'', headers=None, delay=0):
+        self.status_code = status_code
+        self.body = body
+        self.headers = {'content-type': 'image/jpeg', 'etag': '"v1"'}
+        self.headers.update(headers or {})
+        self.url = 'https://www.heraldnews.com/photo.jpg'
+        self.delay = delay
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def iter_content(self, chunk_size=8192):
+        time.sleep(self.delay)
+        yield self.body
+
+
+class TestImageProxyCache(unittest.TestCase):
+    """Upstream images are fetched once, served from disk and evicted by size"""
+
+    def setUp(self):
+        """Set up a cache in a temporary directory"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ImageProxyCache(cache_dir=os.path.join(self.temp_dir.name, "images"), max_bytes=250,
+                                     max_age=3600, db_path=os.path.join(self.temp_dir.name, "test.db"))
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.temp_dir.cleanup()
+
+    def test_concurrent_misses_fetch_once(self):
+        """Test that simultaneous requests for one URL share a single upstream fetch"""
+        url = 'https://www.heraldnews.com/photo.jpg'
+        results = []
+        with patch('utils.image_proxy.requests.get', return_value=FakeResponse(body=b'x' * 100, delay=0.2)) as get:
+            threads = [threading.Thread(target=lambda: results.append(self.cache.get(url))) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(get.call_count, 1)
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(entry['path'].read_bytes() == b'x' * 100 for entry in results))
+
+    def test_revalidation_and_eviction(self):
+        """Test conditional revalidation of stale entries and LRU eviction by bytes"""
+        first, second = 'https://www.heraldnews.com/a.jpg', 'https://www.heraldnews.com/b.jpg'
+        with patch('utils.image_proxy.requests.get', return_value=FakeResponse(body=b'a' * 100)):
+            path_a = self.cache.get(first)['path']
+
+        self.cache.max_age = 0
+        with patch('utils.image_proxy.requests.get', return_value=FakeResponse(status_code=304)) as get:
+            self.assertEqual(self.cache.get(first)['path'], path_a)
+            self.assertEqual(get.call_args.kwargs['headers']['If-None-Match'], '"v1"')
+        with patch('utils.image_proxy.requests.get', return_value=FakeResponse(status_code=503)):
+            self.assertEqual(self.cache.get(first)['path'], path_a)  # Stale copy when upstream fails
+        self.cache.max_age = 3600
+
+        with patch('utils.image_proxy.requests.get', return_value=FakeResponse(body=b'b' * 200)):
+            self.cache.get(second)
+        self.assertIsNone(self.cache.lookup(first))  # Least recently used, over the 250 byte budget
+        self.assertFalse(path_a.exists())
+        self.assertEqual(self.cache.get_stats()['entries'], 1)
+
+        with patch('utils.image_proxy.requests.get', return_value=FakeResponse(headers={'content-type': 'text/html'})):
+            with self.assertRaises(ImageFetchError) as error:
+                self.cache.get(first)
+            self.assertEqual(error.exception.status, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""Tests for the persistent background job queue"""
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+from utils.job_queue import JobQueue
+
+
+class TestJobQueue(unittest.TestCase):
+    """Jobs coalesce per (type, zip), record results and honour cancellation"""
+
+    def setUp(self):
+        """Set up a queue on a temporary database"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        self.queue = JobQueue(db_path=self.temp_db.name, poll_interval=0.1)
+        self.calls = []
+
+        def count(ctx):
+            self.calls.append(ctx.zip_code)
+            for i in range(1, 4):
+                ctx.progress(i, 3)
+            return {'processed_count': 3}
+
+        def fail(ctx):
+            raise RuntimeError("boom")
+
+        self.queue.register('count', count)
+        self.queue.register('fail', fail)
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.queue.stop()
+        if os.path.exists(self.temp_db.name):
+            os.unlink(self.temp_db.name)
+
+    def test_duplicate_submissions_coalesce(self):
+        """Test that a queued job absorbs identical submissions but not other zips"""
+        self.queue.start = lambda: None  # Keep jobs queued
+        first, created = self.queue.submit('count', '02720')
+        second, created_again = self.queue.submit('count', '02720')
+        other, _ = self.queue.submit('count', '02721')
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(first['id'], second['id'])
+        self.assertNotEqual(first['id'], other['id'])
+
+        self.assertEqual(self.queue.run_pending(), 2)
+        job = self.queue.get_job(first['id'])
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual((job['processed'], job['total']), (3, 3))
+        self.assertEqual(job['result'], {'processed_count': 3})
+        self.assertIsNotNone(job['duration'])
+
+    def test_debounced_burst_runs_once(self):
+        """Test that repeated debounced submissions push the start back, up to max_delay"""
+        self.queue.start = lambda: None
+        first, _ = self.queue.submit('count', '02720', delay=30, max_delay=40)
+        self.assertEqual(self.queue.run_pending(), 0)  # Not due yet
+        again, created = self.queue.submit('count', '02720', delay=30, max_delay=40)
+        self.assertFalse(created)
+        self.assertGreater(again['run_after'], first['run_after'])
+        self.assertLessEqual(again['run_after'], first['created_at'] + 40)
+
+        conn = sqlite3.connect(self.temp_db.name)
+        conn.execute('UPDATE jobs SET run_after = 0')
+        conn.commit()
+        conn.close()
+        self.assertEqual(self.queue.run_pending(), 1)
+        self.assertEqual(self.calls, ['02720'])
+
+    def test_failure_and_cancel_recorded(self):
+        """Test that errors and cancelled queued jobs end up in the job record"""
+        self.queue.start = lambda: None
+        failed, _ = self.queue.submit('fail')
+        queued, _ = self.queue.submit('count', '02720')
+        self.assertEqual(self.queue.cancel(queued['id'])['status'], 'cancelled')
+        self.queue.run_pending()
+        self.assertEqual(self.queue.get_job(failed['id'])['error'], 'boom')
+        self.assertEqual(self.calls, [])
+        self.assertEqual([job['id'] for job in self.queue.list_jobs(status='cancelled')], [queued['id']])
+
+    def test_cancel_running_job(self):
+        """Test that a running job stops at its next progress checkpoint, and a command is killed"""
+        started = threading.Event()
+
+        def wait_for_cancel(ctx):
+            started.set()
+            ctx.run_command([sys.executable, '-c', 'import time; time.sleep(30)'], timeout=60)
+
+        self.queue.register('slow', wait_for_cancel)
+        job, _ = self.queue.submit('slow', '02720')
+        self.assertTrue(started.wait(10))
+        self.queue.cancel(job['id'])
+        self.queue.stop()
+        job = self.queue.get_job(job['id'])
+        self.assertEqual(job['status'], 'cancelled')
+        self.assertLess(job['duration'], 10)
+
+    def test_interrupted_jobs_marked_failed(self):
+        """Test that running jobs left by a dead process are failed on startup"""
+        conn = sqlite3.connect(self.temp_db.name)
+        conn.execute("INSERT INTO jobs (job_type, status, worker_pid, created_at, started_at) VALUES ('count', 'running', 0, 1, 1)")
+        conn.commit()
+        conn.close()
+        self.queue.start()
+        self.assertEqual(self.queue.list_jobs()[0]['status'], 'failed')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""Tests for the multi-core article job runner"""
+import os
+import sqlite3
+import tempfile
+import unittest
+from utils.batch_relevance import rescore_articles
+from utils.job_runner import article_id_shards, run_article_job
+
+
+class TestJobRunner(unittest.TestCase):
+    """Sharded worker runs must write the same results as an in-process run"""
+
+    def setUp(self):
+        """Set up a temporary database with a few dozen articles"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        conn = sqlite3.connect(self.temp_db.name)
+        conn.execute('''
+            CREATE TABLE articles (id INTEGER PRIMARY KEY, title TEXT, summary TEXT, content TEXT, source TEXT,
+                                   published TEXT, zip_code TEXT, category TEXT, primary_category TEXT,
+                                   category_confidence REAL, category_override INTEGER DEFAULT 0, relevance_score REAL)
+        ''')
+        conn.execute('CREATE TABLE article_management (id INTEGER PRIMARY KEY, article_id INTEGER, enabled INTEGER, is_auto_filtered INTEGER, auto_reject_reason TEXT, zip_code TEXT)')
+        conn.execute('CREATE TABLE admin_settings (key TEXT PRIMARY KEY, value TEXT)')
+        conn.execute('CREATE TABLE category_keywords (zip_code TEXT, category TEXT, keyword TEXT)')
+        # The config must come from this database, not the default one
+        conn.execute('CREATE TABLE relevance_config (category TEXT, item TEXT, points REAL, zip_code TEXT, city_state TEXT)')
+        conn.executemany('INSERT INTO relevance_config (category, item, points, zip_code) VALUES (?, ?, ?, ?)', [
+            ('high_relevance', 'fall river', None, '02720'),
+            ('high_relevance', 'police', None, '02720'),
+            ('high_relevance', 'basketball', None, '02720'),
+            ('source_credibility', 'herald news', 5.0, '02720'),
+        ])
+        texts = [
+            ("Fall River police arrest suspect downtown", "Police in Fall River arrested a man after a chase."),
+            ("Durfee basketball wins opener", "The Hilltoppers basketball team won in Fall River."),
+            ("National markets slide", "Stocks fell across the country on Tuesday."),
+        ]
+        conn.executemany('INSERT INTO articles (title, content, source, published, zip_code, category_override) VALUES (?, ?, ?, ?, ?, ?)', [
+            (title, content, "Herald News", "2024-01-01T10:00:00", "02720", 1 if i == 0 else 0)
+            for i in range(30) for title, content in [texts[i % 3]]
+        ])
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.temp_db.name):
+            os.unlink(self.temp_db.name)
+
+    def _snapshot(self):
+        conn = sqlite3.connect(self.temp_db.name)
+        rows = conn.execute('SELECT id, relevance_score, category, primary_category, category_confidence FROM articles ORDER BY id').fetchall()
+        filtered = conn.execute('SELECT article_id, auto_reject_reason FROM article_management ORDER BY article_id').fetchall()
+        conn.execute('UPDATE articles SET relevance_score = NULL, category = NULL, primary_category = NULL, category_confidence = NULL')
+        conn.execute('DELETE FROM article_management')
+        conn.commit()
+        conn.close()
+        return rows, filtered
+
+    def test_shards_cover_all_ids(self):
+        """Test that ID ranges partition the article set"""
+        conn = sqlite3.connect(self.temp_db.name)
+        shards, total = article_id_shards(conn.cursor(), "02720", shard_size=7)
+        conn.close()
+        self.assertEqual(total, 30)
+        self.assertEqual(shards[0], (1, 7))
+        self.assertEqual(shards[-1], (29, 30))
+
+    def test_parallel_matches_in_process(self):
+        """Test that two worker processes produce the same writes as one in-process run"""
+        snapshots = []
+        for workers in (1, 2):
+            progress = []
+            rescore_articles(zip_code="02720", relevance_threshold=10.5, bayesian_filter=False,
+                             db_path=self.temp_db.name, workers=workers)
+            result = run_article_job('categorize', zip_code="02720", db_path=self.temp_db.name,
+                                     workers=workers, shard_size=7, progress=lambda done, total: progress.append((done, total)))
+            self.assertEqual(result['processed_count'], 29)  # The overridden article is skipped
+            self.assertEqual(progress[-1], (29, 30))
+            snapshots.append(self._snapshot())
+
+        in_process, parallel = snapshots
+        self.assertEqual(in_process, parallel)
+        rows, filtered = in_process
+        self.assertIsNone(rows[0][2])  # Category override respected
+        self.assertIsNotNone(rows[1][2])
+        self.assertTrue(all(score is not None for _, score, *_ in rows))
+        self.assertEqual([article_id for article_id, _ in filtered], list(range(3, 31, 3)))  # Only the national story
+
+    def test_cancelled_rescore_keeps_filters(self):
+        """Test that a rescore stopped part-way leaves the existing auto-filters and scores alone"""
+        conn = sqlite3.connect(self.temp_db.name)
+        conn.execute("INSERT INTO article_management (article_id, enabled, is_auto_filtered, auto_reject_reason, zip_code) VALUES (2, 0, 1, 'manual test', '02720')")
+        conn.commit()
+        conn.close()
+
+        def cancel(done, total):
+            raise KeyboardInterrupt
+        with self.assertRaises(KeyboardInterrupt):
+            rescore_articles(zip_code="02720", relevance_threshold=10.5, bayesian_filter=False,
+                             db_path=self.temp_db.name, workers=1, progress=cancel)
+        rows, filtered = self._snapshot()
+        self.assertEqual(filtered, [(2, 'manual test')])
+        self.assertTrue(all(score is None for _, score, *_ in rows))
+
+    def test_rescore_every_zip_with_one_config(self):
+        """Test that config_zip scores all articles with that zip's config, not just its own articles"""
+        conn = sqlite3.connect(self.temp_db.name)
+        conn.execute("UPDATE articles SET zip_code = '02721' WHERE id > 15")
+        conn.commit()
+        conn.close()
+
+        result = rescore_articles(config_zip="02720", relevance_threshold=10.5, bayesian_filter=False,
+                                  db_path=self.temp_db.name, workers=1)
+        self.assertEqual(result['processed_count'], 30)
+        rows, filtered = self._snapshot()
+        self.assertEqual([article_id for article_id, _ in filtered], list(range(3, 31, 3)))
+        self.assertEqual(rows[15][1], rows[0][1])  # 02721's police story scored with the 02720 config
+
+
+if __name__ == "__main__":
+    unittest.main()
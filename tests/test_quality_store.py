@@ -0,0 +1,90 @@
+"""Tests for the content-hash keyed quality store"""
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from utils import quality_store
+from utils.content_quality import ContentQualityAnalyzer
+from utils.quality_store import get_quality, quality_content_hash, recompute_quality
+
+
+class TestQualityStore(unittest.TestCase):
+    """Quality is analyzed once per distinct content"""
+
+    def setUp(self):
+        """Set up a temporary database with one article"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        self.article = {
+            "title": "City council approves new budget",
+            "content": "The Fall River city council approved the budget on Tuesday. Members debated for hours. "
+                       "The mayor praised the vote. Residents spoke during public comment.",
+            "image_url": None,
+        }
+        conn = sqlite3.connect(self.temp_db.name)
+        conn.execute('CREATE TABLE articles (id INTEGER PRIMARY KEY, title TEXT, content TEXT, summary TEXT, image_url TEXT, content_hash TEXT)')
+        conn.execute('INSERT INTO articles (title, content) VALUES (?, ?)', (self.article["title"], self.article["content"]))
+        conn.commit()
+        conn.close()
+        quality_store._memo.clear()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        quality_store._memo.clear()
+        if os.path.exists(self.temp_db.name):
+            os.unlink(self.temp_db.name)
+
+    def test_result_matches_analyzer_and_is_reused(self):
+        """Test that the stored result equals a fresh analysis and is not recomputed"""
+        expected = ContentQualityAnalyzer().calculate_quality_score(self.article)
+        conn = sqlite3.connect(self.temp_db.name)
+        quality_store.init_quality_table(conn.cursor())
+        result = get_quality(self.article, conn.cursor())
+        self.assertEqual(result['quality_score'], expected['quality_score'])
+        self.assertEqual(result['issues'], expected['issues'])
+
+        quality_store._memo.clear()
+        with patch.object(quality_store, '_analyze') as analyze:
+            self.assertEqual(get_quality(self.article, conn.cursor())['quality_score'], expected['quality_score'])
+            analyze.assert_not_called()
+        conn.close()
+
+    def test_recompute_only_on_version_change(self):
+        """Test that recompute is a no-op until the analyzer version changes"""
+        self.assertEqual(recompute_quality(db_path=self.temp_db.name), 1)
+        self.assertEqual(recompute_quality(db_path=self.temp_db.name), 0)
+
+        conn = sqlite3.connect(self.temp_db.name)
+        stored_hash = conn.execute('SELECT content_hash FROM articles').fetchone()[0]
+        conn.close()
+        self.assertEqual(stored_hash, quality_content_hash(self.article))
+
+        with patch.object(quality_store, 'ANALYZER_VERSION', 2):
+            self.assertEqual(recompute_quality(db_path=self.temp_db.name), 1)
+
+    def test_relevance_score_has_no_quality_term(self):
+        """Test that relevance scores stay as before: they have no content quality term"""
+        from utils.relevance_calculator import calculate_relevance_score, get_default_relevance_config
+        with patch.object(quality_store, 'get_quality') as get:
+            calculate_relevance_score(dict(self.article, id=1), config=get_default_relevance_config())
+            get.assert_not_called()
+
+    def test_source_performance_in_save_transaction(self):
+        """Test that a stored quality score feeds source performance without waiting on the save's lock"""
+        from utils.dynamic_source_credibility import DynamicSourceCredibility
+        credibility = DynamicSourceCredibility(self.temp_db.name)
+        conn = sqlite3.connect(self.temp_db.name, timeout=0.1)
+        cursor = conn.cursor()
+        quality_store.init_quality_table(cursor)
+        quality_score = get_quality(self.article, cursor)['quality_score']  # Opens the write transaction
+        with patch.object(sqlite3, 'connect', side_effect=AssertionError("second connection")):
+            credibility.update_source_performance("Herald News", 20.0, quality_score, True, "02720", cursor=cursor)
+        conn.commit()
+        row = conn.execute('SELECT total_articles, avg_quality_score FROM source_performance').fetchone()
+        conn.close()
+        self.assertEqual(row, (1, quality_score))
+
+
+if __name__ == "__main__":
+    unittest.main()
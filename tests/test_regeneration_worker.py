@@ -0,0 +1,29 @@
+"""Tests for the warm regeneration worker"""
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, create_autospec, patch
+from utils.regeneration_worker import WarmRegenerator
+from website_generator import WebsiteGenerator
+
+
+class TestWarmRegenerator(unittest.TestCase):
+    """Regeneration calls must match WebsiteGenerator.generate() at every revision"""
+
+    def test_quick_regenerate_calls_generate_with_its_signature(self):
+        """Test that quick_regenerate's arguments bind to the real generate() signature"""
+        generator = create_autospec(WebsiteGenerator, instance=True)
+        regenerator = WarmRegenerator()
+        regenerator._app = SimpleNamespace(
+            database=Mock(get_all_articles=Mock(return_value=[{'id': 1}])),
+            aggregator=Mock(enrich_articles=lambda articles: articles),
+            website_generator=generator)
+        regenerator._city_states['02720'] = 'Fall River, MA'
+
+        with patch('utils.regeneration_worker._record_regeneration_time'):
+            result = regenerator.quick_regenerate('02720', full=True)
+        generator.generate.assert_called_once_with([{'id': 1}], zip_code='02720', city_state='Fall River, MA', full=True)
+        self.assertEqual(result['article_count'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
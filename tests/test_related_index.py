@@ -0,0 +1,60 @@
+"""Tests for the TF-IDF related-articles index"""
+import os
+import sqlite3
+import tempfile
+import unittest
+from utils.related_index import RelatedArticlesIndex, build_related_index, load_related
+
+
+class TestRelatedIndex(unittest.TestCase):
+    """Related articles come from the precomputed index"""
+
+    def setUp(self):
+        """Set up fixture articles"""
+        self.articles = [
+            {"id": 1, "title": "Council approves harbor dredging budget", "content": "The city council approved dredging funds for the harbor.",
+             "category": "news", "source": "Herald News", "url": "a"},
+            {"id": 2, "title": "Harbor dredging starts next spring", "content": "Dredging of the harbor channel begins in spring after council approval.",
+             "category": "news", "source": "WPRI", "url": "b"},
+            {"id": 3, "title": "Durfee wins basketball opener", "content": "Hilltoppers basketball opened with a win.",
+             "category": "sports", "source": "Herald News", "url": "c"},
+            {"id": 4, "title": "Restaurant opening downtown", "content": "A new restaurant is opening downtown this month.",
+             "category": "food", "source": "ABC6", "url": "d"},
+        ]
+
+    def test_related_ranks_shared_terms_first(self):
+        """Test that the article sharing the most terms is ranked first and self is excluded"""
+        index = RelatedArticlesIndex(self.articles, k=3)
+        related = index.related(1)
+
+        self.assertEqual(related[0][0]["id"], 2)
+        self.assertNotIn(1, [article["id"] for article, _ in related])
+        self.assertEqual(index.related(4), [])  # Nothing shares a term, topic, category or source
+        self.assertEqual([(article["id"], score) for article, score in index.related(3)], [(1, 5.0)])  # Source only
+        self.assertEqual(index.related_to({"title": "Harbor dredging update", "content": ""})[0][0]["id"], 1)
+
+    def test_build_stores_results(self):
+        """Test that build_related_index stores top-k rows readable by load_related"""
+        temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        temp_db.close()
+        try:
+            conn = sqlite3.connect(temp_db.name)
+            conn.execute('CREATE TABLE articles (id INTEGER PRIMARY KEY, title TEXT, url TEXT, source TEXT, published TEXT)')
+            conn.executemany('INSERT INTO articles (id, title, url, source) VALUES (?, ?, ?, ?)',
+                             [(a["id"], a["title"], a["url"], a["source"]) for a in self.articles])
+            conn.commit()
+
+            build_related_index(self.articles, zip_code="02720", k=2, db_path=temp_db.name)
+            build_related_index(self.articles[1:], zip_code="02721", k=2, db_path=temp_db.name)
+            related = load_related(conn.cursor(), 2, zip_code="02720")
+            self.assertEqual(related[0]["id"], 1)
+            self.assertLessEqual(len(related), 2)
+            self.assertNotIn(1, [row["id"] for row in load_related(conn.cursor(), 2, zip_code="02721")])
+            self.assertEqual(load_related(conn.cursor(), 2), related)  # Only 02720 stored rows for it
+            conn.close()
+        finally:
+            os.unlink(temp_db.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+"""Tests for the relevance term index and targeted rescoring"""
+import unittest
+import os
+import tempfile
+import sqlite3
+from unittest.mock import patch
+from config import DATABASE_CONFIG
+from utils import relevance_calculator
+from utils.relevance_calculator import load_relevance_config
+from utils.relevance_index import apply_relevance_item_change, build_relevance_index, index_articles
+
+
+class TestRelevanceIndex(unittest.TestCase):
+    """Test that config changes only rescore articles containing the term"""
+
+    def setUp(self):
+        """Set up a temporary database with a small relevance config"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        self.db_patch = patch.dict(DATABASE_CONFIG, {"path": self.temp_db.name})
+        self.db_patch.start()
+
+        conn = sqlite3.connect(self.temp_db.name)
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE articles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, summary TEXT, content TEXT,
+                source TEXT, published TEXT, category TEXT, zip_code TEXT, relevance_score REAL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE article_management (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, article_id INTEGER, enabled INTEGER DEFAULT 1,
+                is_auto_filtered INTEGER DEFAULT 0, auto_reject_reason TEXT, zip_code TEXT
+            )
+        ''')
+        cursor.execute('CREATE TABLE admin_settings (key TEXT UNIQUE, value TEXT)')
+        cursor.execute('''
+            CREATE TABLE relevance_config (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, category TEXT NOT NULL, item TEXT NOT NULL,
+                points REAL, zip_code TEXT, city_state TEXT
+            )
+        ''')
+        cursor.execute("INSERT INTO relevance_config (category, item, points) VALUES ('high_relevance', 'fall river', 10.0)")
+        cursor.execute("INSERT INTO admin_settings (key, value) VALUES ('relevance_threshold', '0')")
+        articles = [
+            ("Fall River harbor cleanup", "Volunteers cleaned the harbor."),
+            ("Fall River budget", "The council passed a budget."),
+            ("Harbor festival", "A festival at the harbor."),
+        ]
+        cursor.executemany('INSERT INTO articles (title, content, source) VALUES (?, ?, ?)',
+                           [(title, content, "Test Source") for title, content in articles])
+        conn.commit()
+        conn.close()
+
+        load_relevance_config(force_reload=True)
+        build_relevance_index()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.db_patch.stop()
+        relevance_calculator._relevance_config_cache.clear()
+        if os.path.exists(self.temp_db.name):
+            os.unlink(self.temp_db.name)
+
+    def _scores(self):
+        conn = sqlite3.connect(self.temp_db.name)
+        scores = dict(conn.execute('SELECT id, relevance_score FROM articles').fetchall())
+        conn.close()
+        return scores
+
+    def test_add_item_rescores_only_matching_articles(self):
+        """Test that adding a keyword rescores just the articles containing it"""
+        result = apply_relevance_item_change('topic_keywords', 'harbor', added=True)
+
+        self.assertEqual(result['affected_count'], 2)
+        self.assertEqual(result['changed_count'], 2)
+        scores = self._scores()
+        self.assertIsNone(scores[2])  # No "harbor" - never touched
+        self.assertEqual(scores[1], 20.0)  # fall river (15) + harbor (5)
+        self.assertEqual(scores[3], 5.0)
+
+    def test_remove_item_uses_index(self):
+        """Test that removing a keyword rescores the indexed articles"""
+        apply_relevance_item_change('topic_keywords', 'harbor', added=True)
+        result = apply_relevance_item_change('topic_keywords', 'harbor', added=False)
+
+        self.assertEqual(result['affected_count'], 2)
+        scores = self._scores()
+        self.assertEqual(scores[1], 15.0)
+        self.assertEqual(scores[3], 10.0)  # Minimum score when nothing matches
+
+    def test_new_articles_are_indexed_on_insert(self):
+        """Test that articles inserted after indexing get postings"""
+        conn = sqlite3.connect(self.temp_db.name)
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO articles (title, content, source) VALUES ('Fall River news', '', 'Test Source')")
+        article_id = cursor.lastrowid
+        index_articles(cursor, [(article_id, 'Fall River news', '', 'Test Source')])
+        conn.commit()
+        postings = cursor.execute('SELECT term FROM relevance_term_index WHERE article_id = ?', (article_id,)).fetchall()
+        conn.close()
+
+        self.assertIn(('fall river',), postings)
+
+    def test_edited_articles_are_reindexed(self):
+        """Test that articles written outside save_articles are picked up by the next item change"""
+        apply_relevance_item_change('topic_keywords', 'harbor', added=True)
+        conn = sqlite3.connect(self.temp_db.name)
+        conn.execute("UPDATE articles SET content = 'Harbor dredging is on the budget.' WHERE id = 2")
+        conn.execute("UPDATE articles SET title = 'Fall River cleanup', content = 'Volunteers turned out.' WHERE id = 1")
+        conn.execute("DELETE FROM articles WHERE id = 3")
+        conn.execute("INSERT INTO articles (title, content, source) VALUES ('Harbor lights', '', 'Test Source')")
+        conn.commit()
+        conn.close()
+
+        result = apply_relevance_item_change('topic_keywords', 'harbor', added=False)
+        self.assertEqual(result['affected_count'], 2)  # Edited article 2 and the new article 4
+        scores = self._scores()
+        self.assertEqual(scores[2], 15.0)
+        self.assertEqual(scores[4], 10.0)
+        self.assertEqual(scores[1], 20.0)  # No longer mentions harbor, so not rescored
+
+
+if __name__ == "__main__":
+    unittest.main()
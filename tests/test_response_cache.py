@@ -0,0 +1,84 @@
+"""Tests for the rendered-response cache and its data-version invalidation"""
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from flask import Flask
+from admin.services import send_cached_page
+from utils import response_cache
+from utils.data_version import DataVersion, init_data_version_table
+from utils.response_cache import ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+    """Pages are rendered once per data version and revalidated with ETag/Last-Modified"""
+
+    def setUp(self):
+        """Set up a database with the versioned tables and a cache over it"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "test.db")
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('CREATE TABLE articles (id INTEGER PRIMARY KEY, title TEXT)')
+            conn.execute('CREATE TABLE admin_settings (id INTEGER PRIMARY KEY, key TEXT UNIQUE, value TEXT)')
+            init_data_version_table(conn.cursor())
+        self.cache = ResponseCache(max_age=300, disk_dir=os.path.join(self.temp_dir.name, "pages"),
+                                   data_version=DataVersion(self.db_path, check_interval=0))
+        self.renders = 0
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.temp_dir.cleanup()
+
+    def render(self):
+        self.renders += 1
+        return f"<html>render {self.renders}</html>"
+
+    def execute(self, sql, params=()):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(sql, params)
+
+    def test_invalidated_by_data_changes(self):
+        """Test that article and display-setting writes invalidate, other settings don't"""
+        key = self.cache.key('02720', 'sports')
+        first = self.cache.get_or_render(key, self.render)
+        self.assertIs(self.cache.get_or_render(key, self.render), first)
+
+        self.execute("INSERT INTO admin_settings (key, value) VALUES ('last_regeneration_time', 'now')")
+        self.assertIs(self.cache.get_or_render(key, self.render), first)
+
+        self.execute("INSERT INTO articles (title) VALUES ('Council meets')")
+        self.assertEqual(self.cache.get_or_render(key, self.render).body, b"<html>render 2</html>")
+        self.execute("INSERT INTO admin_settings (key, value) VALUES ('show_images', '0')")
+        self.assertEqual(self.cache.get_or_render(key, self.render).body, b"<html>render 3</html>")
+
+        self.cache.clear()  # As in a new process: the disk copy is reused
+        self.assertEqual(self.cache.get_or_render(key, self.render).body, b"<html>render 3</html>")
+        self.assertEqual(self.renders, 3)
+
+        self.assertEqual(self.cache.get_or_render(self.cache.key('02720', None), lambda: ("Error", 500)),
+                         ("Error", 500))
+
+    def test_conditional_requests(self):
+        """Test ETag and Last-Modified revalidation"""
+        app = Flask(__name__)
+        app.add_url_rule('/', 'index', lambda: send_cached_page('02720', None, self.render))
+        client = app.test_client()
+        with patch.object(response_cache, '_response_cache', self.cache):
+            response = client.get('/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data, b"<html>render 1</html>")
+            etag, last_modified = response.headers['ETag'], response.headers['Last-Modified']
+
+            self.assertEqual(client.get('/', headers={'If-None-Match': etag}).status_code, 304)
+            self.assertEqual(client.get('/', headers={'If-Modified-Since': last_modified}).status_code, 304)
+
+            self.execute("INSERT INTO articles (title) VALUES ('Council meets')")
+            response = client.get('/', headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual(self.renders, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
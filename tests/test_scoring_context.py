@@ -0,0 +1,60 @@
+"""Tests for prefetched management flags used during scoring"""
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from utils.relevance_calculator import calculate_relevance_score, get_default_relevance_config
+from utils.scoring_context import ScoringContext
+
+
+class TestScoringContext(unittest.TestCase):
+    """Flags come from one batch query and feed the stellar boost"""
+
+    def setUp(self):
+        """Set up a temporary database with management rows"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        conn = sqlite3.connect(self.temp_db.name)
+        conn.execute('''
+            CREATE TABLE article_management (id INTEGER PRIMARY KEY AUTOINCREMENT, article_id INTEGER, zip_code TEXT,
+                                             is_stellar INTEGER DEFAULT 0, is_top_story INTEGER DEFAULT 0, is_rejected INTEGER DEFAULT 0)
+        ''')
+        conn.executemany('INSERT INTO article_management (article_id, zip_code, is_stellar, is_top_story) VALUES (?, ?, ?, ?)', [
+            (1, "02720", 0, 0),
+            (1, "02720", 1, 0),  # Latest row wins
+            (2, "02720", 0, 1),
+            (3, "02721", 1, 0),
+        ])
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.temp_db.name):
+            os.unlink(self.temp_db.name)
+
+    def test_prefetch_single_query(self):
+        """Test that one prefetch serves every article in the batch"""
+        context = ScoringContext("02720", self.temp_db.name)
+        with patch.object(context, '_query', wraps=context._query) as query:
+            context.prefetch([1, 2, 3, None])
+            self.assertTrue(context.is_stellar({"id": 1}))
+            self.assertFalse(context.is_stellar({"id": 2}))
+            self.assertFalse(context.is_stellar({"id": 3}))  # Stellar for another zip only
+            self.assertEqual(context.flags(2)['is_top_story'], 1)
+            self.assertEqual(query.call_count, 1)
+
+    def test_calculator_uses_context(self):
+        """Test that the stellar boost is applied from the context"""
+        context = ScoringContext("02720", self.temp_db.name).prefetch([1, 2])
+        config = get_default_relevance_config()
+        article = {"title": "Fall River council meeting", "content": "Fall River city council met downtown.", "source": ""}
+        with patch('utils.relevance_calculator.check_hard_zip_filter', return_value=True):
+            stellar = calculate_relevance_score(dict(article, id=1), config=config, zip_code="02720", context=context)
+            plain = calculate_relevance_score(dict(article, id=2), config=config, zip_code="02720", context=context)
+        self.assertGreater(stellar, plain)
+
+
+if __name__ == "__main__":
+    unittest.main()
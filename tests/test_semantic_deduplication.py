@@ -0,0 +1,163 @@
+"""Tests for semantic deduplication with the MinHash/LSH candidate index"""
+import unittest
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+from utils.duplicate_history import (find_history_duplicate, indexed_candidate_pairs, init_signature_tables,
+                                     prune_signatures, store_signatures)
+from utils.near_duplicate_index import MinHashLSHIndex, choose_band_rows
+from utils.semantic_deduplication import SemanticDeduplicator
+from utils.timestamps import to_epoch
+
+# Labeled fixture: (title, content, label) - articles sharing a label are the same story
+LABELED_ARTICLES = [
+    ("Fall River police arrest suspect in Pleasant Street robbery",
+     "Police arrested a suspect Tuesday after a robbery at a Pleasant Street convenience store.", "robbery"),
+    ("Police arrest suspect in Pleasant Street robbery in Fall River",
+     "A suspect was arrested Tuesday after a convenience store robbery on Pleasant Street.", "robbery"),
+    ("City Council approves Fall River budget for next year",
+     "The City Council voted to approve the budget after a long meeting at Government Center.", "budget"),
+    ("Fall River City Council approves budget for next year",
+     "Councilors approved the budget at Government Center following a long meeting.", "budget"),
+    ("Durfee basketball wins season opener",
+     "The Hilltoppers opened the season with a win over New Bedford.", "durfee"),
+    ("Snow storm expected to hit South Coast overnight",
+     "Forecasters expect several inches of snow across the South Coast overnight.", "storm"),
+    ("Snow storm expected to hit the South Coast overnight",
+     "Several inches of snow are expected across the South Coast overnight, forecasters said.", "storm"),
+    ("Battleship Cove hosts summer festival",
+     "Families gathered at Battleship Cove for the annual summer festival.", "festival"),
+    ("Route 24 crash closes northbound lanes",
+     "A crash on Route 24 closed the northbound lanes for two hours Monday morning.", "crash"),
+    ("Route 24 crash closes northbound lanes Monday",
+     "Northbound lanes on Route 24 were closed for two hours after a crash Monday morning.", "crash"),
+    ("Library announces new hours",
+     "The public library will extend its weekday hours starting next month.", "library"),
+    ("", "Untitled item with no headline.", "untitled"),
+]
+
+
+class TestSemanticDeduplication(unittest.TestCase):
+    """LSH-backed deduplication must make the same decisions as the exhaustive scan"""
+
+    def setUp(self):
+        """Set up the deduplicator and fixture articles"""
+        self.deduplicator = SemanticDeduplicator()
+        self.articles = [
+            {"id": i, "title": title, "content": content, "label": label}
+            for i, (title, content, label) in enumerate(LABELED_ARTICLES)
+        ]
+
+    def _decisions(self, unique, duplicates):
+        return ([a["id"] for a in unique],
+                [(d["article"]["id"], d["similar_to"]["id"], d["similarity"], d["reason"]) for d in duplicates])
+
+    def test_labeled_fixture_decisions(self):
+        """Test that every labeled duplicate is removed and distinct stories are kept"""
+        unique, duplicates = self.deduplicator.deduplicate_batch(self.articles, threshold=0.75)
+
+        self.assertEqual(len({a["label"] for a in unique}), len(unique))
+        self.assertEqual({a["label"] for a in unique}, {a["label"] for a in self.articles})
+        for dup in duplicates:
+            self.assertEqual(dup["article"]["label"], dup["similar_to"]["label"])
+
+    def test_matches_exhaustive_scan(self):
+        """Test that LSH and exhaustive deduplication agree at the thresholds used in the app"""
+        for threshold in (0.7, 0.75, 0.85, 0.3):
+            lsh = self._decisions(*self.deduplicator.deduplicate_batch(self.articles, threshold=threshold))
+            exhaustive = self._decisions(*self.deduplicator.deduplicate_batch_exhaustive(self.articles, threshold=threshold))
+            self.assertEqual(lsh, exhaustive, msg=f"threshold={threshold}")
+
+    def test_index_finds_similar_token_sets(self):
+        """Test that the LSH index returns near-identical sets and skips unrelated ones"""
+        index = MinHashLSHIndex(min_similarity=0.5)
+        index.add("a", {"fall", "river", "police", "arrest", "suspect"})
+        index.add("b", {"library", "hours", "weekday", "extend"})
+
+        self.assertIn("a", index.query({"fall", "river", "police", "arrest", "robbery"}))
+        self.assertNotIn("b", index.query({"fall", "river", "police", "arrest", "robbery"}))
+        self.assertEqual(index.query(set()), set())
+        self.assertGreaterEqual(choose_band_rows(0.5), 1)
+
+
+class TestDuplicateHistory(unittest.TestCase):
+    """Near-duplicates of articles saved in earlier cycles are found through the stored index"""
+
+    def setUp(self):
+        """Set up a temporary database with indexed history"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        self.conn = sqlite3.connect(self.temp_db.name)
+        self.cursor = self.conn.cursor()
+        self.cursor.execute('''
+            CREATE TABLE articles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, content TEXT, summary TEXT,
+                zip_code TEXT, ingested_at TEXT, created_at TEXT, ingested_ts INTEGER
+            )
+        ''')
+        init_signature_tables(self.cursor)
+        recent = datetime.now().isoformat()
+        old = (datetime.now() - timedelta(days=30)).isoformat()
+        history = [
+            (LABELED_ARTICLES[0][0], LABELED_ARTICLES[0][1], "02720", recent),
+            (LABELED_ARTICLES[5][0], LABELED_ARTICLES[5][1], "02720", old),
+            (LABELED_ARTICLES[10][0], LABELED_ARTICLES[10][1], "02720", recent),
+        ]
+        rows = []
+        for title, content, zip_code, ingested_at in history:
+            self.cursor.execute('INSERT INTO articles (title, content, zip_code, ingested_at, ingested_ts) VALUES (?, ?, ?, ?, ?)',
+                                (title, content, zip_code, ingested_at, to_epoch(ingested_at)))
+            rows.append((self.cursor.lastrowid, title, content, None))
+        store_signatures(self.cursor, rows)
+        self.conn.commit()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.conn.close()
+        if os.path.exists(self.temp_db.name):
+            os.unlink(self.temp_db.name)
+
+    def test_finds_recent_near_duplicate(self):
+        """Test that a reworded copy of a recent story matches it"""
+        article = {"title": LABELED_ARTICLES[1][0], "content": LABELED_ARTICLES[1][1]}
+        match = find_history_duplicate(self.cursor, article, zip_code="02720", days=7)
+        self.assertIsNotNone(match)
+        self.assertEqual(match[0], 1)
+
+    def test_respects_window_and_zip(self):
+        """Test that stories outside the window or for another zip are not matches"""
+        storm = {"title": LABELED_ARTICLES[6][0], "content": LABELED_ARTICLES[6][1]}
+        self.assertIsNone(find_history_duplicate(self.cursor, storm, zip_code="02720", days=7))
+        self.assertIsNotNone(find_history_duplicate(self.cursor, storm, zip_code="02720", days=60))
+
+        robbery = {"title": LABELED_ARTICLES[1][0], "content": LABELED_ARTICLES[1][1]}
+        self.assertIsNone(find_history_duplicate(self.cursor, robbery, zip_code="02721", days=7))
+
+    def test_window_uses_created_at_when_not_ingested(self):
+        """Test that a row with only created_at (space-separated) inside the window is a match"""
+        created_at = (datetime.now() - timedelta(days=7, hours=-1)).strftime('%Y-%m-%d %H:%M:%S')
+        self.cursor.execute('UPDATE articles SET ingested_at = NULL, created_at = ?, ingested_ts = ? WHERE id = 2',
+                            (created_at, to_epoch(created_at)))
+        storm = {"title": LABELED_ARTICLES[6][0], "content": LABELED_ARTICLES[6][1]}
+        match = find_history_duplicate(self.cursor, storm, zip_code="02720", days=7)
+        self.assertIsNotNone(match)
+        self.assertEqual(match[0], 2)
+
+    def test_distinct_story_not_matched(self):
+        """Test that an unrelated story has no history match"""
+        article = {"title": LABELED_ARTICLES[4][0], "content": LABELED_ARTICLES[4][1]}
+        self.assertIsNone(find_history_duplicate(self.cursor, article, zip_code="02720", days=7))
+        self.assertEqual(indexed_candidate_pairs(self.cursor), set())
+
+    def test_prune_keeps_only_the_window(self):
+        """Test that signatures for old or deleted articles are pruned and recent ones kept"""
+        self.cursor.execute('DELETE FROM articles WHERE id = 3')
+        self.assertEqual(prune_signatures(self.cursor, days=7), 2)
+        self.assertEqual(self.cursor.execute('SELECT DISTINCT article_id FROM article_signatures').fetchall(), [(1,)])
+        self.assertEqual(self.cursor.execute('SELECT DISTINCT article_id FROM signature_buckets').fetchall(), [(1,)])
+        self.assertEqual(prune_signatures(self.cursor, days=7), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
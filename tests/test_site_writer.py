@@ -0,0 +1,61 @@
+"""Tests for content-addressed, atomic static site writes"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from utils.site_writer import SiteWriter, write_text_atomic
+
+
+class TestSiteWriter(unittest.TestCase):
+    """Pages are replaced in one step and failed writes leave the old page in place"""
+
+    def setUp(self):
+        """Set up a temporary output directory and hash database"""
+        self.out_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.out_dir.name, "index.html")
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.out_dir.cleanup()
+        if os.path.exists(self.temp_db.name):
+            os.unlink(self.temp_db.name)
+
+    def test_write_replaces_file(self):
+        """Test that a write replaces the page and leaves no temporary files"""
+        write_text_atomic(self.path, "<p>old</p>")
+        write_text_atomic(self.path, "<p>new — page</p>")
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<p>new — page</p>")
+        self.assertEqual(os.listdir(self.out_dir.name), ["index.html"])
+
+    def test_failed_write_keeps_previous_page(self):
+        """Test that an error before the rename keeps the old content and cleans up"""
+        write_text_atomic(self.path, "<p>old</p>")
+        with patch("utils.site_writer.os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                write_text_atomic(self.path, "<p>new</p>")
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<p>old</p>")
+        self.assertEqual(os.listdir(self.out_dir.name), ["index.html"])
+
+    def test_unchanged_content_not_rewritten(self):
+        """Test that identical bytes leave the file alone and changes are listed until deployed"""
+        writer = SiteWriter(db_path=self.temp_db.name)
+        self.assertTrue(writer.write_text(self.path, "<p>v1</p>"))
+        os.utime(self.path, (1, 1))
+        self.assertFalse(SiteWriter(db_path=self.temp_db.name).write_text(self.path, "<p>v1</p>"))
+        self.assertEqual(os.path.getmtime(self.path), 1)
+        self.assertEqual(writer.changed_files(self.out_dir.name), [os.path.abspath(self.path)])
+
+        writer.mark_deployed(writer.changed_files())
+        self.assertEqual(writer.changed_files(), [])
+        self.assertTrue(writer.write_text(self.path, "<p>v2</p>"))
+        self.assertEqual(writer.changed_files(self.out_dir.name), [os.path.abspath(self.path)])
+        self.assertEqual(writer.changed_files(self.out_dir.name + "-other"), [])
+        self.assertIsNotNone(writer.content_hash(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
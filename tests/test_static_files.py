@@ -0,0 +1,58 @@
+"""Tests for precompressed site artifacts and conditional static serving"""
+import gzip
+import os
+import tempfile
+import unittest
+from flask import Flask
+from admin.services import send_static
+from utils.site_writer import SiteWriter
+from utils.static_files import accepted_encodings, select_representation
+
+
+class TestStaticFiles(unittest.TestCase):
+    """Text artifacts get .gz siblings that are served to clients accepting gzip, with 304s"""
+
+    def setUp(self):
+        """Set up a written page and a minimal Flask app serving it"""
+        self.out_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.out_dir.name, "index.html")
+        self.html = "<html>" + "Fall River council meets tonight. " * 50 + "</html>"
+        SiteWriter(db_path=os.path.join(self.out_dir.name, "site.db")).write_text(self.path, self.html)
+
+        app = Flask(__name__)
+        app.add_url_rule('/index.html', 'index', lambda: send_static(self.path))
+        self.client = app.test_client()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.out_dir.cleanup()
+
+    def test_negotiation(self):
+        """Test Accept-Encoding parsing and sibling selection"""
+        self.assertEqual(accepted_encodings("gzip;q=0.5, br;q=0, identity"), {"gzip", "identity"})
+        self.assertEqual(select_representation(self.path, "br, gzip"), (self.path + ".gz", "gzip"))
+        self.assertEqual(select_representation(self.path, None), (self.path, None))
+
+        os.utime(self.path + ".gz", (1, 1))  # Older than the page: stale
+        self.assertEqual(select_representation(self.path, "gzip"), (self.path, None))
+
+    def test_send_static_compressed_and_not_modified(self):
+        """Test that gzip clients get the precompressed body and a matching ETag yields 304"""
+        response = self.client.get('/index.html', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(response.data).decode(), self.html)
+        etag = response.headers['ETag']
+
+        plain = self.client.get('/index.html')
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertNotEqual(plain.headers['ETag'], etag)
+
+        cached = self.client.get('/index.html', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.data, b'')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""Tests for the shared, bytecode-cached template environment"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from utils import templates
+
+
+class TestTemplates(unittest.TestCase):
+    """Templates compile once per process and their bytecode is reused by new environments"""
+
+    def setUp(self):
+        """Point the bytecode cache at a temporary directory with a fresh environment"""
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.config = patch.dict(templates.WEBSITE_CONFIG, {"template_cache_dir": self.cache_dir.name,
+                                                            "template_auto_reload": False})
+        self.config.start()
+        self.saved_env = templates._env, templates._digest
+        templates._env = None
+
+    def tearDown(self):
+        """Restore the process environment"""
+        templates._env, templates._digest = self.saved_env
+        self.config.stop()
+        self.cache_dir.cleanup()
+
+    def test_compiled_once_and_cached_on_disk(self):
+        """Test that repeated lookups share one template and bytecode lands on disk"""
+        template = templates.get_template("category.html.j2")
+        self.assertIs(templates.get_template("category.html.j2"), template)
+        self.assertFalse(templates.get_template_env().auto_reload)
+        self.assertEqual(len(os.listdir(self.cache_dir.name)), 1)
+
+        templates._env = None  # As in a new process
+        with patch.object(templates.Environment, "compile", side_effect=AssertionError("recompiled")):
+            templates.get_template("category.html.j2")
+
+    def test_inline_templates_compiled_once(self):
+        """Test that the same inline source is compiled once"""
+        source = "<h1>{{ title }}</h1>"
+        self.assertIs(templates.template_from_string(source), templates.template_from_string(source))
+        self.assertEqual(templates.template_from_string(source).render(title="News"), "<h1>News</h1>")
+
+    def test_changed_templates_are_recompiled(self):
+        """Test that a template edit on disk drops the compiled templates without dev mode"""
+        template = templates.get_template("category.html.j2")
+        inline = templates.template_from_string("<h1>{{ title }}</h1>")
+        digest = templates.sync_templates(force=True)
+        self.assertIs(templates.get_template("category.html.j2"), template)  # Unchanged on disk
+
+        with patch.object(templates, "templates_digest", return_value="edited"):
+            self.assertEqual(templates.sync_templates(force=True), "edited")
+        self.assertNotEqual(digest, "edited")
+        self.assertIsNot(templates.get_template("category.html.j2"), template)
+        self.assertIsNot(templates.template_from_string("<h1>{{ title }}</h1>"), inline)
+
+
+if __name__ == "__main__":
+    unittest.main()
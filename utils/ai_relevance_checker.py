@@ -1,62 +1,53 @@
 """
 AI-based relevance checker for articles
 Uses AI to determine if articles are truly relevant to Fall River, MA
+
+Articles are classified in batches (several per request, a bounded number of requests in
+flight) through a pluggable backend. Verdicts are cached by a hash of exactly the text sent
+and PROMPT_VERSION, so re-ingested articles never pay for a second call.
 """
+import asyncio
+import concurrent.futures
+import hashlib
+import json
 import logging
 import os
-from typing import Dict, Tuple, Optional
-from config import LOCALE
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from config import DATABASE_CONFIG, LOCALE
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None  # Optional feature
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Try to import OpenAI (optional)
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-    logger.info("OpenAI not available - will use heuristic-based AI filtering")
+# Bump whenever the prompt or response format changes - cached verdicts are keyed by it
+PROMPT_VERSION = 2
 
+# Articles per request and requests in flight
+AI_BATCH_SIZE = 10
+AI_MAX_CONCURRENCY = 4
 
-class AIRelevanceChecker:
-    """AI-based relevance checker for Fall River articles"""
-    
-    def __init__(self):
-        self.api_key = os.getenv('OPENAI_API_KEY')
-        self.enabled = bool(self.api_key) and OPENAI_AVAILABLE
-        self.use_ai = self.enabled
-        
-        if not self.enabled:
-            logger.info("AI relevance checking disabled (no OpenAI API key). Using enhanced heuristic method.")
-    
-    def check_relevance(self, article: Dict) -> Tuple[bool, str, float]:
-        """
-        Check if article is relevant to Fall River using AI or enhanced heuristics
-        Returns: (is_relevant, reason, confidence)
-        """
-        if self.use_ai and self.api_key:
-            return self._check_with_ai(article)
-        else:
-            return self._check_with_heuristics(article)
-    
-    def _check_with_ai(self, article: Dict) -> Tuple[bool, str, float]:
-        """Use OpenAI API to check relevance"""
-        try:
-            title = article.get("title", "")
-            content = article.get("content", article.get("summary", ""))
-            source = article.get("source", "")
-            
-            # Truncate content for API (keep first 1000 chars)
-            content_preview = content[:1000] if len(content) > 1000 else content
-            
-            prompt = f"""You are a content filter for a local news aggregator in Fall River, Massachusetts.
-
-Article Title: {title}
-Article Source: {source}
-Article Content (preview): {content_preview}
-
-Determine if this article is TRULY relevant to Fall River, Massachusetts. Consider:
+# Characters of article content sent to the model
+CONTENT_PREVIEW_CHARS = 1000
+
+DEFAULT_MODEL = "gpt-4o-mini"  # Fast and cheap model
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+# (is_relevant, reason, confidence)
+Verdict = Tuple[bool, str, float]
+
+SYSTEM_PROMPT = ("You are a strict content filter for Fall River, Massachusetts local news. "
+                 "Be conservative - only approve articles with clear local relevance.")
+
+BATCH_PROMPT = """You are a content filter for a local news aggregator in Fall River, Massachusetts.
+
+For EACH article below, determine if it is TRULY relevant to Fall River, Massachusetts. Consider:
 1. Does it mention Fall River, MA specifically?
 2. Does it discuss local landmarks, neighborhoods, or people in Fall River?
 3. Does it cover events, news, or topics happening IN Fall River?
@@ -68,115 +59,363 @@ EXCLUDE articles that are:
 - Generic topics (weather, sports, entertainment) not tied to Fall River
 - About Cape Cod, Boston, or other areas far from Fall River
 
-Respond with ONLY a JSON object:
-{{"relevant": true/false, "reason": "brief explanation", "confidence": 0.0-1.0}}
+{articles}
+
+Respond with ONLY a JSON array containing one object per article, in any order:
+[{{"index": <article number>, "relevant": true/false, "reason": "brief explanation", "confidence": 0.0-1.0}}]
 
 Be strict - only mark as relevant if there's a clear Fall River connection."""
 
-            client = openai.OpenAI(api_key=self.api_key)
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",  # Fast and cheap model
-                messages=[
-                    {"role": "system", "content": "You are a strict content filter for Fall River, Massachusetts local news. Be conservative - only approve articles with clear local relevance."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=150,
-                temperature=0.1  # Low temperature for consistent results
-            )
-            
-            import json
-            result_text = response.choices[0].message.content.strip()
-            
-            # Try to parse JSON response
+ARTICLE_BLOCK = """### Article {index}
+Title: {title}
+Source: {source}
+Content (preview): {content}"""
+
+
+def _prompt_fields(article: Dict) -> Tuple[str, str, str]:
+    content = article.get("content", article.get("summary", "")) or ""
+    return (article.get("title", "") or "", article.get("source", "") or "", content[:CONTENT_PREVIEW_CHARS])
+
+
+def verdict_key(article: Dict) -> str:
+    """Hash of exactly the article text sent to the model"""
+    return hashlib.sha1("\x1f".join(_prompt_fields(article)).encode("utf-8")).hexdigest()
+
+
+def build_batch_prompt(articles: Sequence[Dict]) -> str:
+    """User prompt classifying articles numbered 0..n-1"""
+    blocks = []
+    for index, article in enumerate(articles):
+        title, source, content = _prompt_fields(article)
+        blocks.append(ARTICLE_BLOCK.format(index=index, title=title, source=source, content=content))
+    return BATCH_PROMPT.format(articles="\n\n".join(blocks))
+
+
+def parse_batch_response(text: str, count: int) -> List[Optional[Verdict]]:
+    """Verdicts aligned with the prompt's articles (None where the model gave no usable answer)"""
+    text = text.strip()
+    if text.startswith("```"):
+        # Remove markdown code blocks if present
+        text = text.split("```")[1]
+        if text.startswith("json"):
+            text = text[4:]
+    try:
+        items = json.loads(text)
+    except json.JSONDecodeError:
+        logger.warning(f"AI returned non-JSON response: {text[:100]}")
+        return [None] * count
+    if isinstance(items, dict):
+        items = items.get("results", [items])
+
+    verdicts: List[Optional[Verdict]] = [None] * count
+    for position, item in enumerate(items if isinstance(items, list) else []):
+        if not isinstance(item, dict):
+            continue
+        try:
+            index = int(item.get("index", position))
+            confidence = float(item.get("confidence", 0.5))
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < count:
+            verdicts[index] = (bool(item.get("relevant", False)), str(item.get("reason", "AI analysis")), confidence)
+    return verdicts
+
+
+def heuristic_verdict(article: Dict) -> Verdict:
+    """Enhanced heuristic-based relevance checking"""
+    title = (article.get("title", "") or "").lower()
+    content = (article.get("content", article.get("summary", "")) or "").lower()
+    combined = f"{title} {content}"
+
+    # Strong indicators of Fall River relevance
+    strong_indicators = [
+        "fall river", "fallriver", "fall-river",
+        "battleship cove", "durfee high", "b.m.c. durfee",
+        "saint anne's hospital", "st. anne's hospital",
+        "charlton memorial", "mayor coogan", "mayor paul coogan",
+        "fall river city council", "fall river school",
+        "government center", "kennedy park", "lafayette park"
+    ]
+
+    # Nearby towns that might be relevant (but need Fall River connection)
+    nearby_towns = [
+        "somerset", "swansea", "tiverton", "westport", "freetown",
+        "taunton", "new bedford", "dartmouth"
+    ]
+
+    # Strong negative indicators (definitely not Fall River)
+    negative_indicators = [
+        "cape cod", "boston", "worcester", "springfield",
+        "lowell", "cambridge", "somerville", "quincy",
+        "new york", "rhode island"  # Too generic
+    ]
+
+    # Check for strong negative indicators first
+    for neg in negative_indicators:
+        if neg in combined:
+            # But allow if Fall River is also mentioned
+            if "fall river" not in combined and "fallriver" not in combined:
+                return (False, f"Article mentions {neg} without Fall River connection", 0.9)
+
+    # Check for strong positive indicators
+    strong_count = sum(1 for indicator in strong_indicators if indicator in combined)
+    if strong_count >= 2:
+        return (True, f"Multiple Fall River indicators found ({strong_count})", 0.95)
+    elif strong_count == 1:
+        # Single strong indicator is enough
+        return (True, "Fall River indicator found", 0.85)
+    elif "fall river" in combined or "fallriver" in combined:
+        # Explicit Fall River mention is always relevant
+        return (True, "Explicit Fall River mention", 0.9)
+
+    # Check for nearby towns
+    nearby_count = sum(1 for town in nearby_towns if town in combined)
+    if nearby_count > 0:
+        # Nearby town mentioned - need Fall River connection or high relevance
+        if "fall river" in combined or "fallriver" in combined:
+            return (True, f"Nearby town ({nearby_towns[0] if nearby_count > 0 else ''}) with Fall River mention", 0.7)
+        else:
+            # Nearby town without Fall River - likely not relevant
+            return (False, f"Nearby town mentioned ({nearby_towns[0] if nearby_count > 0 else ''}) without Fall River connection", 0.6)
+
+    # No clear indicators - likely not relevant
+    return (False, "No clear Fall River indicators found", 0.5)
+
+
+class RelevanceBackend:
+    """Classifies a batch of articles; called concurrently from one event loop"""
+
+    # Part of the verdict cache key, so switching models doesn't reuse another model's answers
+    name = "base"
+
+    async def classify(self, session, articles: Sequence[Dict]) -> List[Optional[Verdict]]:
+        """Verdicts aligned with articles (None where no usable answer came back)"""
+        raise NotImplementedError
+
+
+class ChatCompletionsBackend(RelevanceBackend):
+    """OpenAI-compatible /chat/completions endpoint (OpenAI itself, or the local stub server)"""
+
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None,
+                 base_url: Optional[str] = None, timeout: float = 60.0):
+        self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        self.model = model or os.getenv('AI_RELEVANCE_MODEL', DEFAULT_MODEL)
+        self.base_url = (base_url or os.getenv('OPENAI_BASE_URL') or DEFAULT_BASE_URL).rstrip('/')
+        self.timeout = timeout
+        self.name = self.model
+
+    async def classify(self, session, articles):
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": build_batch_prompt(articles)}
+            ],
+            "max_tokens": 60 + 80 * len(articles),
+            "temperature": 0.1  # Low temperature for consistent results
+        }
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        async with session.post(f"{self.base_url}/chat/completions", json=payload, headers=headers,
+                                timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+            response.raise_for_status()
+            data = await response.json()
+        return parse_batch_response(data["choices"][0]["message"]["content"], len(articles))
+
+
+def init_verdict_table(cursor):
+    """Create the ai_relevance_verdicts table if it doesn't exist"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ai_relevance_verdicts (
+            content_hash TEXT NOT NULL,
+            prompt_version INTEGER NOT NULL,
+            model TEXT NOT NULL,
+            relevant INTEGER NOT NULL,
+            reason TEXT,
+            confidence REAL,
+            checked_at TEXT,
+            PRIMARY KEY (content_hash, prompt_version, model)
+        )
+    ''')
+
+
+class VerdictCache:
+    """Verdicts by (content hash, PROMPT_VERSION, model) in memory and in SQLite"""
+
+    def __init__(self, model: str, db_path: Optional[str] = None):
+        self.model = model
+        self.db_path = db_path or DATABASE_CONFIG.get("path", "fallriver_news.db")
+        self._memo: Dict[str, Verdict] = {}
+        self._lock = threading.Lock()
+        self._table_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._table_ready:
+            init_verdict_table(conn.cursor())
+            conn.commit()
+            self._table_ready = True
+        return conn
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Verdict]:
+        """Cached verdicts for whichever keys have one"""
+        keys = set(keys)
+        found = {key: self._memo[key] for key in keys if key in self._memo}
+        missing = sorted(keys - found.keys())
+        if not missing:
+            return found
+        try:
+            conn = self._connect()
+            try:
+                for start in range(0, len(missing), 500):
+                    chunk = missing[start:start + 500]
+                    rows = conn.execute(f'''
+                        SELECT content_hash, relevant, reason, confidence FROM ai_relevance_verdicts
+                        WHERE prompt_version = ? AND model = ? AND content_hash IN ({','.join('?' * len(chunk))})
+                    ''', [PROMPT_VERSION, self.model] + chunk).fetchall()
+                    for key, relevant, reason, confidence in rows:
+                        found[key] = (bool(relevant), reason or "", confidence or 0.0)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read AI verdict cache: {e}")
+        with self._lock:
+            self._memo.update(found)
+        return found
+
+    def put_many(self, verdicts: Dict[str, Verdict]):
+        """Store fresh verdicts"""
+        if not verdicts:
+            return
+        with self._lock:
+            self._memo.update(verdicts)
+        checked_at = datetime.now().isoformat()
+        try:
+            conn = self._connect()
             try:
-                # Remove markdown code blocks if present
-                if result_text.startswith("```"):
-                    result_text = result_text.split("```")[1]
-                    if result_text.startswith("json"):
-                        result_text = result_text[4:]
-                result = json.loads(result_text)
-                
-                is_relevant = result.get("relevant", False)
-                reason = result.get("reason", "AI analysis")
-                confidence = float(result.get("confidence", 0.5))
-                
-                return (is_relevant, reason, confidence)
-            except json.JSONDecodeError:
-                # Fallback if JSON parsing fails
-                logger.warning(f"AI returned non-JSON response: {result_text[:100]}")
-                return self._check_with_heuristics(article)
-                
-        except Exception as e:
-            logger.warning(f"AI relevance check failed: {e}. Falling back to heuristics.")
-            return self._check_with_heuristics(article)
-    
+                conn.executemany('''
+                    INSERT OR REPLACE INTO ai_relevance_verdicts
+                    (content_hash, prompt_version, model, relevant, reason, confidence, checked_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', [(key, PROMPT_VERSION, self.model, 1 if relevant else 0, reason, confidence, checked_at)
+                      for key, (relevant, reason, confidence) in verdicts.items()])
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not store AI verdicts: {e}")
+
+
+def _run_sync(coro):
+    """Run a coroutine from sync code, even when called inside a running event loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # e.g. filter_relevant_articles called from aggregate_async
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+class AIRelevanceChecker:
+    """AI-based relevance checker for Fall River articles"""
+
+    def __init__(self, backend: Optional[RelevanceBackend] = None, db_path: Optional[str] = None,
+                 batch_size: int = AI_BATCH_SIZE, max_concurrency: int = AI_MAX_CONCURRENCY):
+        """
+        Args:
+            backend: Classification backend (default: chat completions when OPENAI_API_KEY is set)
+            db_path: Optional database path for the verdict cache (defaults to DATABASE_CONFIG)
+            batch_size: Articles per request
+            max_concurrency: Requests in flight at once
+        """
+        if backend is None and os.getenv('OPENAI_API_KEY'):
+            backend = ChatCompletionsBackend()
+        self.backend = backend if aiohttp is not None else None
+        self.enabled = self.backend is not None
+        self.use_ai = self.enabled
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.cache = VerdictCache(self.backend.name, db_path) if self.enabled else None
+
+        if not self.enabled:
+            logger.info("AI relevance checking disabled (no OpenAI API key). Using enhanced heuristic method.")
+
+    def check_relevance(self, article: Dict) -> Tuple[bool, str, float]:
+        """
+        Check if article is relevant to Fall River using AI or enhanced heuristics
+        Returns: (is_relevant, reason, confidence)
+        """
+        return self.check_batch([article])[0]
+
+    def check_batch(self, articles: Sequence[Dict]) -> List[Verdict]:
+        """Verdicts for many articles, aligned with the input (see check_batch_async)"""
+        if not self.use_ai or not articles:
+            return [self._check_with_heuristics(article) for article in articles]
+        return _run_sync(self.check_batch_async(articles))
+
+    async def check_batch_async(self, articles: Sequence[Dict]) -> List[Verdict]:
+        """Classify articles, sending only content that has no cached verdict
+
+        Identical content is sent once. Articles whose request fails fall back to heuristics
+        and are not cached, so they are retried next cycle.
+        """
+        keys = [verdict_key(article) for article in articles]
+        verdicts = self.cache.get_many(keys)
+
+        pending: Dict[str, Dict] = {}
+        for key, article in zip(keys, articles):
+            if key not in verdicts and key not in pending:
+                pending[key] = article
+
+        if pending:
+            fresh = await self._classify_pending(pending)
+            self.cache.put_many(fresh)
+            verdicts.update(fresh)
+            logger.info(f"AI relevance: {len(articles)} articles, {len(articles) - len(pending)} cached, "
+                        f"{len(fresh)}/{len(pending)} classified")
+
+        return [verdicts.get(key) or self._check_with_heuristics(article) for key, article in zip(keys, articles)]
+
+    async def _classify_pending(self, pending: Dict[str, Dict]) -> Dict[str, Verdict]:
+        items = list(pending.items())
+        batches = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        fresh: Dict[str, Verdict] = {}
+
+        async def run(session, batch):
+            async with semaphore:
+                try:
+                    results = await self.backend.classify(session, [article for _, article in batch])
+                except Exception as e:
+                    logger.warning(f"AI relevance check failed for {len(batch)} articles: {e}. Falling back to heuristics.")
+                    return
+            for (key, _), verdict in zip(batch, results):
+                if verdict is not None:
+                    fresh[key] = verdict
+
+        async with aiohttp.ClientSession() as session:
+            await asyncio.gather(*(run(session, batch) for batch in batches))
+        return fresh
+
     def _check_with_heuristics(self, article: Dict) -> Tuple[bool, str, float]:
         """Enhanced heuristic-based relevance checking"""
-        title = article.get("title", "").lower()
-        content = article.get("content", article.get("summary", "")).lower()
-        combined = f"{title} {content}"
-        
-        # Strong indicators of Fall River relevance
-        strong_indicators = [
-            "fall river", "fallriver", "fall-river",
-            "battleship cove", "durfee high", "b.m.c. durfee",
-            "saint anne's hospital", "st. anne's hospital",
-            "charlton memorial", "mayor coogan", "mayor paul coogan",
-            "fall river city council", "fall river school",
-            "government center", "kennedy park", "lafayette park"
-        ]
-        
-        # Nearby towns that might be relevant (but need Fall River connection)
-        nearby_towns = [
-            "somerset", "swansea", "tiverton", "westport", "freetown",
-            "taunton", "new bedford", "dartmouth"
-        ]
-        
-        # Strong negative indicators (definitely not Fall River)
-        negative_indicators = [
-            "cape cod", "boston", "worcester", "springfield",
-            "lowell", "cambridge", "somerville", "quincy",
-            "new york", "rhode island"  # Too generic
-        ]
-        
-        # Check for strong negative indicators first
-        for neg in negative_indicators:
-            if neg in combined:
-                # But allow if Fall River is also mentioned
-                if "fall river" not in combined and "fallriver" not in combined:
-                    return (False, f"Article mentions {neg} without Fall River connection", 0.9)
-        
-        # Check for strong positive indicators
-        strong_count = sum(1 for indicator in strong_indicators if indicator in combined)
-        if strong_count >= 2:
-            return (True, f"Multiple Fall River indicators found ({strong_count})", 0.95)
-        elif strong_count == 1:
-            # Single strong indicator is enough
-            return (True, "Fall River indicator found", 0.85)
-        elif "fall river" in combined or "fallriver" in combined:
-            # Explicit Fall River mention is always relevant
-            return (True, "Explicit Fall River mention", 0.9)
-        
-        # Check for nearby towns
-        nearby_count = sum(1 for town in nearby_towns if town in combined)
-        if nearby_count > 0:
-            # Nearby town mentioned - need Fall River connection or high relevance
-            if "fall river" in combined or "fallriver" in combined:
-                return (True, f"Nearby town ({nearby_towns[0] if nearby_count > 0 else ''}) with Fall River mention", 0.7)
-            else:
-                # Nearby town without Fall River - likely not relevant
-                return (False, f"Nearby town mentioned ({nearby_towns[0] if nearby_count > 0 else ''}) without Fall River connection", 0.6)
-        
-        # No clear indicators - likely not relevant
-        return (False, "No clear Fall River indicators found", 0.5)
-    
+        return heuristic_verdict(article)
+
     def should_include(self, article: Dict, threshold: float = 0.6) -> Tuple[bool, str]:
         """
         Determine if article should be included based on AI/heuristic check
         Returns: (should_include, reason)
         """
-        is_relevant, reason, confidence = self.check_relevance(article)
-        
+        return self._decision(self.check_relevance(article), threshold)
+
+    def should_include_batch(self, articles: Sequence[Dict], threshold: float = 0.6) -> List[Tuple[bool, str]]:
+        """should_include for many articles with one batched, cached check"""
+        return [self._decision(verdict, threshold) for verdict in self.check_batch(articles)]
+
+    @staticmethod
+    def _decision(verdict: Verdict, threshold: float) -> Tuple[bool, str]:
+        is_relevant, reason, confidence = verdict
+
         if is_relevant and confidence >= threshold:
             return (True, f"AI: {reason} (confidence: {confidence:.1%})")
         elif not is_relevant:
@@ -185,3 +424,15 @@ Be strict - only mark as relevant if there's a clear Fall River connection."""
             # Low confidence - be conservative
             return (False, f"AI: Low confidence ({confidence:.1%}) - {reason}")
 
+
+_shared_checker: Optional[AIRelevanceChecker] = None
+_shared_lock = threading.Lock()
+
+
+def get_ai_relevance_checker() -> AIRelevanceChecker:
+    """Process-wide checker, so the verdict memo survives across aggregation cycles"""
+    global _shared_checker
+    with _shared_lock:
+        if _shared_checker is None:
+            _shared_checker = AIRelevanceChecker()
+        return _shared_checker
@@ -0,0 +1,128 @@
+"""
+Local deterministic stand-in for the chat completions API (tests and benchmarks)
+Parses the articles out of a relevance batch prompt and answers with heuristic_verdict(), so
+results are reproducible and free. Point a checker at it with ChatCompletionsBackend(base_url=...)
+or OPENAI_BASE_URL=http://127.0.0.1:<port>/v1.
+
+Usage: python -m utils.ai_stub_server [port] [latency_seconds]
+"""
+import asyncio
+import json
+import logging
+import re
+import sys
+import threading
+from typing import List, Optional
+
+from aiohttp import web
+
+from utils.ai_relevance_checker import heuristic_verdict
+
+logger = logging.getLogger(__name__)
+
+_ARTICLE_PATTERN = re.compile(
+    r"^### Article (\d+)\nTitle: (.*?)\nSource: (.*?)\nContent \(preview\): (.*?)(?=\n\n### Article \d+\n|\n\nRespond with ONLY)",
+    re.MULTILINE | re.DOTALL)
+
+# Number of articles in each request received, for tests and benchmarks
+REQUESTS_KEY = web.AppKey('requests', list)
+
+
+def answer_prompt(prompt: str) -> str:
+    """JSON array of heuristic verdicts for every article in a batch prompt"""
+    results = []
+    for index, title, source, content in _ARTICLE_PATTERN.findall(prompt):
+        relevant, reason, confidence = heuristic_verdict({'title': title, 'source': source, 'content': content})
+        results.append({'index': int(index), 'relevant': relevant, 'reason': reason, 'confidence': confidence})
+    return json.dumps(results)
+
+
+def create_app(latency: float = 0.0) -> web.Application:
+    """aiohttp app serving POST /v1/chat/completions
+
+    Args:
+        latency: Seconds to sleep per request (simulates a remote model for benchmarks)
+    """
+    app = web.Application()
+    app[REQUESTS_KEY] = []
+
+    async def chat_completions(request: web.Request) -> web.Response:
+        payload = await request.json()
+        prompt = payload['messages'][-1]['content']
+        content = answer_prompt(prompt)
+        request.app[REQUESTS_KEY].append(len(json.loads(content)))
+        if latency:
+            await asyncio.sleep(latency)
+        return web.json_response({
+            'id': f"stub-{len(request.app[REQUESTS_KEY])}",
+            'object': 'chat.completion',
+            'model': payload.get('model', 'stub'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+        })
+
+    app.router.add_post('/v1/chat/completions', chat_completions)
+    return app
+
+
+class StubServer:
+    """Runs the stub on a background thread (port 0 picks a free port)
+
+    with StubServer() as server:
+        backend = ChatCompletionsBackend(base_url=server.base_url, model='stub')
+    """
+
+    def __init__(self, port: int = 0, latency: float = 0.0):
+        self.port = port
+        self.app = create_app(latency)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    @property
+    def requests(self) -> List[int]:
+        """Articles per request received so far"""
+        return self.app[REQUESTS_KEY]
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._serve, name="ai-stub-server", daemon=True)
+        self._thread.start()
+        self._ready.wait(10)
+        return self
+
+    def _serve(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._runner = web.AppRunner(self.app)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, '127.0.0.1', self.port)
+        self._loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(self._runner.cleanup())
+        self._loop.close()
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    print(f"AI relevance stub listening on http://127.0.0.1:{port}/v1 (latency {latency}s)")
+    web.run_app(create_app(latency), host='127.0.0.1', port=port, print=None)
@@ -0,0 +1,409 @@
+"""
+Batch relevance rescoring engine
+Scores a whole set of articles with sparse matrix operations instead of one
+calculate_relevance_score_with_tags() call (plus DB round-trips) per article
+"""
+import bisect
+import logging
+import sqlite3
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+
+from config import DATABASE_CONFIG
+from utils.relevance_calculator import load_relevance_config, load_hard_filter_keywords
+from utils.timestamps import article_epoch
+
+logger = logging.getLogger(__name__)
+
+# Joins article texts into one corpus; never appears in keywords so matches can't span articles
+_SEPARATOR = "\x00"
+
+# Clickbait penalty per matched pattern. calculate_relevance_score_with_tags() applies its
+# -5 clickbait block twice, so the effective penalty is -10 - kept for score parity.
+CLICKBAIT_PENALTY = 10.0
+
+
+def build_term_matrix(texts: Sequence[str], terms: Sequence[str]) -> sparse.csr_matrix:
+    """Build a binary article x term matrix with the same semantics as `term in text`
+
+    Every text is joined into one corpus and each term is located with str.find(),
+    jumping to the next article after a hit, so the cost is one C-level scan per term
+    rather than len(texts) * len(terms) Python-level substring tests.
+
+    Args:
+        texts: Lowercased article texts
+        terms: Lowercased keywords/phrases (duplicates keep their own column)
+
+    Returns:
+        CSR matrix of shape (len(texts), len(terms)) with 1.0 where the term occurs
+    """
+    n_docs = len(texts)
+    if n_docs == 0 or not terms:
+        return sparse.csr_matrix((n_docs, len(terms)), dtype=np.float64)
+
+    texts = [text.replace(_SEPARATOR, " ") for text in texts]
+    corpus = _SEPARATOR.join(texts)
+
+    # starts[i] = offset of article i in the corpus; starts[n_docs] is past the end
+    starts = [0] * (n_docs + 1)
+    offset = 0
+    for i, text in enumerate(texts):
+        starts[i] = offset
+        offset += len(text) + 1
+    starts[n_docs] = offset
+
+    rows = []
+    cols = []
+    for col, term in enumerate(terms):
+        if not term:
+            # '' in text is always True
+            rows.extend(range(n_docs))
+            cols.extend([col] * n_docs)
+            continue
+        pos = corpus.find(term)
+        while pos != -1:
+            doc = bisect.bisect_right(starts, pos) - 1
+            rows.append(doc)
+            cols.append(col)
+            pos = corpus.find(term, starts[doc + 1])
+
+    data = np.ones(len(rows), dtype=np.float64)
+    return sparse.csr_matrix((data, (rows, cols)), shape=(n_docs, len(terms)))
+
+
+def recency_multipliers(published_epochs: Sequence[Optional[int]], now: Optional[datetime] = None) -> np.ndarray:
+    """Vectorized recency multiplier (x2.0 <6h, x1.5 <24h, x1.0 <72h, x0.5 older, x1.0 if unknown)"""
+    now_ts = (now or datetime.now()).timestamp()
+    epochs = np.array([np.nan if epoch is None else epoch for epoch in published_epochs], dtype=np.float64)
+    hours_old = (now_ts - epochs) / 3600
+
+    with np.errstate(invalid='ignore'):
+        multipliers = np.select([hours_old < 6, hours_old < 24, hours_old < 72], [2.0, 1.5, 1.0], 0.5)
+    multipliers[np.isnan(hours_old)] = 1.0
+    return multipliers
+
+
+class BatchRelevanceScorer:
+    """Scores many articles at once against one city's relevance config
+
+    Produces the same scores as calculate_relevance_score_with_tags() for each article.
+    """
+
+    def __init__(self, zip_code: Optional[str] = None, config: Optional[Dict] = None,
+                 use_bayesian: bool = True, now: Optional[datetime] = None, db_path: Optional[str] = None):
+        """
+        Args:
+            zip_code: Zip code whose relevance config and hard filter apply
+            config: Optional pre-loaded relevance config. If None, loads from database.
+            use_bayesian: Include the BayesianRelevanceLearner adjustment
+            now: Reference time for recency (defaults to now)
+            db_path: Optional database path for the config, hard filter and learner (defaults to DATABASE_CONFIG)
+        """
+        self.zip_code = zip_code
+        self.db_path = db_path
+        self.config = config if config is not None else load_relevance_config(zip_code=zip_code, db_path=db_path)
+        self.use_bayesian = use_bayesian
+        self.now = now
+
+        high_relevance = list(self.config.get('high_relevance', []))
+        local_places = list(self.config.get('local_places', []))
+        topic_keywords = self.config.get('topic_keywords', {})
+        clickbait_patterns = list(self.config.get('clickbait_patterns', []))
+
+        # One column per configured item; clickbait columns are weighted separately
+        # because the penalty is applied after the recency multiplier
+        self.terms = high_relevance + local_places + list(topic_keywords.keys()) + clickbait_patterns
+        n_positive = len(self.terms) - len(clickbait_patterns)
+        self.keyword_weights = np.array(
+            [float(self.config.get('high_relevance_points', 15.0))] * len(high_relevance) +
+            [float(self.config.get('local_places_points', 3.0))] * len(local_places) +
+            [float(points) for points in topic_keywords.values()] +
+            [0.0] * len(clickbait_patterns),
+            dtype=np.float64
+        )
+        self.clickbait_weights = np.zeros(len(self.terms), dtype=np.float64)
+        self.clickbait_weights[n_positive:] = -CLICKBAIT_PENALTY
+
+        self.term_matrix = None
+
+    def _source_boosts(self, sources: Sequence[str]) -> np.ndarray:
+        """Source credibility per article - first configured source name contained in the source wins"""
+        source_credibility = self.config.get('source_credibility', {})
+        boost_by_source = {}
+        boosts = np.zeros(len(sources), dtype=np.float64)
+        for i, source in enumerate(sources):
+            if source not in boost_by_source:
+                boost = 0.0
+                for source_name, points in source_credibility.items():
+                    if source_name in source:
+                        boost = points
+                        break
+                boost_by_source[source] = boost
+            boosts[i] = boost_by_source[source]
+        return boosts
+
+    def _hard_filter_mask(self, articles: List[Dict]) -> np.ndarray:
+        """True where the article passes the zip hard filter (see check_hard_zip_filter)"""
+        passed = np.ones(len(articles), dtype=bool)
+        if not self.zip_code:
+            return passed
+        keywords = load_hard_filter_keywords(self.zip_code, db_path=self.db_path)
+        if not keywords:
+            return passed
+        texts = [
+            f"{(a.get('title') or '').lower()} {(a.get('summary') or '').lower()} {(a.get('content') or '').lower()}"
+            for a in articles
+        ]
+        matrix = build_term_matrix(texts, keywords)
+        return np.diff(matrix.indptr) > 0
+
+    def score(self, articles: List[Dict]) -> np.ndarray:
+        """Score a batch of articles
+
+        Args:
+            articles: Article dicts with title, content/summary, source, published and optional is_stellar
+
+        Returns:
+            Array of relevance scores (0-100), aligned with articles
+        """
+        if not articles:
+            self.term_matrix = sparse.csr_matrix((0, len(self.terms)), dtype=np.float64)
+            return np.zeros(0, dtype=np.float64)
+
+        combined = []
+        for article in articles:
+            content = article.get("content", article.get("summary", "")) or ""
+            title = article.get("title") or ""
+            combined.append(f"{title.lower()} {content.lower()}")
+
+        self.term_matrix = build_term_matrix(combined, self.terms)
+
+        stellar = np.array([50.0 if a.get('is_stellar', 0) else 0.0 for a in articles])
+        sources = [(a.get("source") or "").lower() for a in articles]
+
+        scores = stellar + self.term_matrix @ self.keyword_weights + self._source_boosts(sources)
+        scores *= recency_multipliers([article_epoch(a) for a in articles], self.now)
+
+        if self.use_bayesian and self.zip_code:
+            try:
+                from utils.bayesian_relevance import BayesianRelevanceLearner
+                scores += np.array(BayesianRelevanceLearner(self.db_path).batch_relevance_adjustments(articles, self.zip_code))
+            except ImportError:
+                pass
+            except Exception as e:
+                logger.debug(f"Error calculating Bayesian adjustments: {e}")
+
+        scores += self.term_matrix @ self.clickbait_weights
+
+        # Minimum score if passed hard filter but no other matches
+        scores[scores == 0] = 10.0
+        scores = np.clip(scores, 0.0, 100.0)
+        scores[~self._hard_filter_mask(articles)] = 0.0
+        return scores
+
+
+def _chunked(items: Sequence, size: int = 500):
+    """Yield successive slices of items (keeps IN (...) lists under SQLite's variable limit)"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# Columns rescoring reads per article
+RESCORE_COLUMNS = 'id, title, summary, content, source, published, category, relevance_score'
+
+
+def _row_to_article(row) -> Dict:
+    article = dict(row)
+    article['title'] = article['title'] or ''
+    article['content'] = article['content'] or ''
+    article['source'] = article['source'] or ''
+    return article
+
+
+def evaluate_scores(articles: List[Dict], scores: np.ndarray, relevance_threshold: float,
+                    zip_code: Optional[str] = None, learner=None, patterns=None):
+    """Turn batch scores into write rows
+
+    Args:
+        articles: Scored articles (with their stored relevance_score)
+        scores: BatchRelevanceScorer scores aligned with articles
+        relevance_threshold: Auto-filter threshold (obituaries are exempt)
+        zip_code: Zip code recorded on auto-filter rows (defaults to 02720)
+        learner: Optional BayesianLearner rejection filter, with its preloaded patterns
+
+    Returns:
+        (score_updates, filter_rows) - (score, id) for changed scores and
+        (article_id, reason, zip_code) for auto-filtered articles
+    """
+    score_updates = []
+    filter_rows = []
+    for article, score in zip(articles, scores.tolist()):
+        old_score = article.get('relevance_score')
+        if old_score is None or abs(old_score - score) > 1e-9:
+            score_updates.append((score, article['id']))
+
+        # Check relevance threshold (exclude obituaries)
+        is_obituary = 'obituar' in (article.get('category') or '').lower()
+        reason = None
+        if score < relevance_threshold and not is_obituary:
+            reason = f"Relevance score {score:.1f} below threshold {relevance_threshold}"
+        elif learner is not None:
+            try:
+                should_filter, _, reasons = learner.should_filter(article, threshold=0.7, patterns=patterns)
+                if should_filter:
+                    reason_str = "; ".join(reasons[:3]) if reasons else "High similarity to previously rejected articles"
+                    reason = f"Bayesian filter: {reason_str}"
+            except Exception as e:
+                logger.warning(f"Error in Bayesian filtering for article {article['id']}: {e}")
+
+        if reason:
+            filter_rows.append((article['id'], reason, zip_code or "02720"))
+
+    return score_updates, filter_rows
+
+
+def _load_threshold(cursor) -> float:
+    """Auto-filter threshold from admin_settings (default 10.0)"""
+    cursor.execute('SELECT value FROM admin_settings WHERE key = ?', ('relevance_threshold',))
+    threshold_row = cursor.fetchone()
+    return float(threshold_row[0]) if threshold_row and threshold_row[0] else 10.0
+
+
+def _rescore_all_parallel(zip_code: Optional[str], relevance_threshold: Optional[float], bayesian_filter: bool,
+                          db_path: str, workers: Optional[int], progress, config_zip: Optional[str] = None) -> Dict:
+    """Full rescoring via the multi-core job runner (workers score, this process writes)"""
+    from utils.job_runner import run_article_job
+
+    if relevance_threshold is None:
+        conn = sqlite3.connect(db_path)
+        try:
+            relevance_threshold = _load_threshold(conn.cursor())
+        finally:
+            conn.close()
+
+    # The Bayesian filter's training data is loaded once here and shipped to every worker
+    learner = None
+    patterns = None
+    if bayesian_filter:
+        try:
+            from utils.bayesian_learner import BayesianLearner
+            learner = BayesianLearner(db_path)
+            patterns = learner.load_patterns()
+        except Exception as e:
+            logger.warning(f"Bayesian filter unavailable for batch rescoring: {e}")
+            learner = None
+
+    # Existing auto-filters are cleared by RescoreJob in the same transaction as the new results
+    logger.info(f"Batch rescoring with threshold {relevance_threshold}")
+    result = run_article_job('rescore', zip_code=zip_code, db_path=db_path, workers=workers, progress=progress,
+                             options={'relevance_threshold': relevance_threshold, 'learner': learner,
+                                      'patterns': patterns, 'now': datetime.now(), 'db_path': db_path,
+                                      'config_zip': config_zip})
+    processed_count = result['processed_count']
+    auto_rejected_count = result['written'].get('filter', 0)
+    return {
+        'processed_count': processed_count,
+        'changed_count': result['written'].get('score', 0),
+        'auto_rejected_count': auto_rejected_count,
+        'kept_count': processed_count - auto_rejected_count,
+        'duration': result['duration']
+    }
+
+
+def rescore_articles(zip_code: Optional[str] = None, relevance_threshold: Optional[float] = None,
+                     bayesian_filter: bool = True, db_path: Optional[str] = None,
+                     article_ids: Optional[Sequence[int]] = None, workers: Optional[int] = None,
+                     progress: Optional[Callable[[int, int], None]] = None,
+                     config_zip: Optional[str] = None) -> Dict:
+    """Rescore every article (optionally for one zip) and write results back in bulk
+
+    Scores are computed with BatchRelevanceScorer, articles below the threshold (or
+    flagged by the Bayesian rejection filter) are auto-filtered, and all writes go
+    out as executemany() batches. Only rows whose score actually changed are updated.
+    Full rescoring is sharded across worker processes (utils.job_runner); targeted
+    rescoring runs in a single transaction in-process.
+
+    Args:
+        zip_code: Optional zip code to limit rescoring to
+        relevance_threshold: Auto-filter threshold. If None, read from admin_settings (default 10.0)
+        bayesian_filter: Also apply the BayesianLearner rejection filter
+        db_path: Optional database path (defaults to DATABASE_CONFIG)
+        article_ids: Optional subset of article IDs to rescore (targeted rescoring)
+        workers: Worker processes for full rescoring (default: CPU count, 1 = in-process)
+        progress: Optional callback(processed, total) for full rescoring
+        config_zip: Zip code whose relevance config scores the articles (defaults to zip_code),
+            e.g. to rescore every zip's articles with one config
+
+    Returns:
+        Dict with processed_count, changed_count, auto_rejected_count, kept_count and duration (seconds)
+    """
+    start_time = time.time()
+    db_path = db_path or DATABASE_CONFIG.get("path", "fallriver_news.db")
+
+    if article_ids is None:
+        return _rescore_all_parallel(zip_code, relevance_threshold, bayesian_filter, db_path, workers, progress,
+                                     config_zip)
+
+    # Load the Bayesian filter before opening the write transaction (its init writes to the DB)
+    learner = None
+    patterns = None
+    if bayesian_filter:
+        try:
+            from utils.bayesian_learner import BayesianLearner
+            learner = BayesianLearner(db_path)
+            patterns = learner.load_patterns()
+        except Exception as e:
+            logger.warning(f"Bayesian filter unavailable for batch rescoring: {e}")
+            learner = None
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+
+        if relevance_threshold is None:
+            relevance_threshold = _load_threshold(cursor)
+
+        # Targeted rescoring: only clear and reload the requested articles
+        rows = []
+        for chunk in _chunked(list(article_ids)):
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'UPDATE article_management SET is_auto_filtered = 0, auto_reject_reason = NULL WHERE article_id IN ({placeholders}) AND is_auto_filtered = 1', chunk)
+            if zip_code:
+                cursor.execute(f'SELECT {RESCORE_COLUMNS} FROM articles WHERE id IN ({placeholders}) AND zip_code = ?', list(chunk) + [zip_code])
+            else:
+                cursor.execute(f'SELECT {RESCORE_COLUMNS} FROM articles WHERE id IN ({placeholders})', chunk)
+            rows.extend(cursor.fetchall())
+
+        articles = [_row_to_article(row) for row in rows]
+
+        logger.info(f"Batch rescoring {len(articles)} articles with threshold {relevance_threshold}")
+        scores = BatchRelevanceScorer(zip_code=config_zip or zip_code, db_path=db_path).score(articles)
+
+        score_updates, filter_rows = evaluate_scores(articles, scores, relevance_threshold, config_zip or zip_code,
+                                                     learner, patterns)
+
+        cursor.executemany('UPDATE articles SET relevance_score = ? WHERE id = ?', score_updates)
+        cursor.executemany('''
+            INSERT OR REPLACE INTO article_management
+            (article_id, enabled, is_auto_filtered, auto_reject_reason, zip_code)
+            VALUES (?, 0, 1, ?, ?)
+        ''', filter_rows)
+        conn.commit()
+    finally:
+        conn.close()
+
+    duration = time.time() - start_time
+    processed_count = len(articles)
+    logger.info(f"Batch rescoring processed {processed_count} articles ({len(score_updates)} changed), auto-filtered {len(filter_rows)} in {duration:.2f}s")
+    return {
+        'processed_count': processed_count,
+        'changed_count': len(score_updates),
+        'auto_rejected_count': len(filter_rows),
+        'kept_count': processed_count - len(filter_rows),
+        'duration': round(duration, 2)
+    }
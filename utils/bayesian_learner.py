@@ -34,8 +34,8 @@ STOP_WORDS = {
 class BayesianLearner:
     """Naive Bayes classifier that learns from rejected articles"""
     
-    def __init__(self):
-        self.db_path = DATABASE_CONFIG.get("path", "fallriver_news.db")
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or DATABASE_CONFIG.get("path", "fallriver_news.db")
         self._init_database()
         self.reject_count = 0
         self.accept_count = 0
@@ -232,21 +232,57 @@ class BayesianLearner:
         except Exception as e:
             logger.error(f"Error training from rejection: {e}")
     
-    def calculate_rejection_probability(self, article: Dict) -> Tuple[float, List[str]]:
+    def load_patterns(self) -> Dict[Tuple[str, str], Tuple[int, int]]:
+        """Load all rejection patterns into memory for batch classification
+        Returns: dict of (feature, feature_type) -> (reject_count, accept_count)
+        """
+        patterns = {}
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute('SELECT feature, feature_type, reject_count, accept_count FROM rejection_patterns')
+            for feature, feature_type, reject_count, accept_count in cursor.fetchall():
+                patterns[(feature, feature_type)] = (reject_count or 0, accept_count or 0)
+            conn.close()
+        except Exception as e:
+            logger.warning(f"Error loading rejection patterns: {e}")
+        return patterns
+    
+    def calculate_rejection_probability(self, article: Dict,
+                                        patterns: Optional[Dict[Tuple[str, str], Tuple[int, int]]] = None) -> Tuple[float, List[str]]:
         """
         Calculate probability that article should be rejected
+        
+        Args:
+            article: Article dict
+            patterns: Optional preloaded patterns from load_patterns() - avoids one query per feature
+        
         Returns: (probability, reasons)
         """
         features = self.extract_features(article)
         reasons = []
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            conn = None
+            if patterns is None:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+            
+            def get_pattern(feature, feature_type):
+                if patterns is not None:
+                    return patterns.get((feature, feature_type))
+                cursor.execute('''
+                    SELECT reject_count, accept_count 
+                    FROM rejection_patterns 
+                    WHERE feature = ? AND feature_type = ?
+                ''', (feature, feature_type))
+                return cursor.fetchone()
             
             # Prior probability (base rate of rejections)
             total_articles = self.reject_count + self.accept_count
             if total_articles == 0:
+                if conn is not None:
+                    conn.close()
                 return (0.0, [])
             
             prior_reject = self.reject_count / total_articles if total_articles > 0 else 0.5
@@ -267,12 +303,7 @@ class BayesianLearner:
                         continue
                     
                     # Get feature statistics
-                    cursor.execute('''
-                        SELECT reject_count, accept_count 
-                        FROM rejection_patterns 
-                        WHERE feature = ? AND feature_type = ?
-                    ''', (feature, feature_type))
-                    row = cursor.fetchone()
+                    row = get_pattern(feature, feature_type)
                     
                     if row:
                         feat_reject, feat_accept = row[0], row[1]
@@ -302,12 +333,7 @@ class BayesianLearner:
             # Check nearby towns without Fall River connection (special case)
             if features["nearby_towns"] and not features["has_fall_river"]:
                 for town in features["nearby_towns"]:
-                    cursor.execute('''
-                        SELECT reject_count, accept_count 
-                        FROM rejection_patterns 
-                        WHERE feature = ? AND feature_type = ?
-                    ''', (f"{town}_no_fr", "nearby_town_no_fr"))
-                    row = cursor.fetchone()
+                    row = get_pattern(f"{town}_no_fr", "nearby_town_no_fr")
                     
                     if row:
                         feat_reject, feat_accept = row[0], row[1]
@@ -316,7 +342,8 @@ class BayesianLearner:
                             log_likelihood_reject += 3.0
                             reasons.append(f"Nearby town '{town}' mentioned without Fall River connection (rejected {feat_reject}x)")
             
-            conn.close()
+            if conn is not None:
+                conn.close()
             
             # Calculate posterior probability using Naive Bayes
             # P(reject | features) = P(features | reject) * P(reject) / P(features)
@@ -341,12 +368,13 @@ class BayesianLearner:
             logger.error(f"Error calculating rejection probability: {e}")
             return (0.0, [])
     
-    def should_filter(self, article: Dict, threshold: float = 0.7) -> Tuple[bool, float, List[str]]:
+    def should_filter(self, article: Dict, threshold: float = 0.7,
+                      patterns: Optional[Dict[Tuple[str, str], Tuple[int, int]]] = None) -> Tuple[bool, float, List[str]]:
         """
         Determine if article should be filtered based on Bayesian probability
         Returns: (should_filter, probability, reasons)
         """
-        probability, reasons = self.calculate_rejection_probability(article)
+        probability, reasons = self.calculate_rejection_probability(article, patterns=patterns)
         should_filter = probability >= threshold
         
         return (should_filter, probability, reasons)
@@ -26,8 +26,8 @@ STOP_WORDS = {
 class BayesianRelevanceLearner:
     """Bayesian learner for relevance scoring (separate from filtering)"""
     
-    def __init__(self):
-        self.db_path = DATABASE_CONFIG.get("path", "fallriver_news.db")
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or DATABASE_CONFIG.get("path", "fallriver_news.db")
     
     def extract_features(self, article: Dict) -> Dict[str, Set[str]]:
         """Extract features from an article for relevance learning"""
@@ -225,6 +225,89 @@ class BayesianRelevanceLearner:
             logger.debug(f"Error calculating Bayesian adjustment: {e}")
             return 0.0
     
+    def batch_relevance_adjustments(self, articles: List[Dict], zip_code: Optional[str] = None) -> List[float]:
+        """Calculate Bayesian adjustments for many articles with one pass over the training data
+        
+        Same result as calling calculate_relevance_adjustment() per article, but training
+        examples are loaded once and per-feature statistics are shared across the batch
+        instead of running one LIKE query per feature per article.
+        
+        Args:
+            articles: List of article dicts
+            zip_code: Zip code
+            
+        Returns:
+            List of adjustments (-20 to +20 points), one per article
+        """
+        adjustments = [0.0] * len(articles)
+        if not zip_code or not articles:
+            return adjustments
+        
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT COUNT(*), SUM(CASE WHEN good_fit = 1 THEN 1 ELSE 0 END),
+                       SUM(CASE WHEN good_fit = 0 THEN 1 ELSE 0 END)
+                FROM training_data WHERE zip_code = ?
+            ''', (zip_code,))
+            total_examples, positive_count, negative_count = cursor.fetchone()
+            total_examples = total_examples or 0
+            positive_count = positive_count or 0
+            negative_count = negative_count or 0
+            
+            if total_examples < 10 or positive_count + negative_count == 0:
+                conn.close()
+                return adjustments
+            
+            cursor.execute('''
+                SELECT td.good_fit, LOWER(a.title), LOWER(a.summary), LOWER(a.content)
+                FROM training_data td
+                JOIN articles a ON td.article_id = a.id
+                WHERE td.zip_code = ?
+                ORDER BY td.id
+            ''', (zip_code,))
+            examples = cursor.fetchall()
+            conn.close()
+        except Exception as e:
+            logger.debug(f"Error loading Bayesian training examples: {e}")
+            return adjustments
+        
+        base_prob = positive_count / (positive_count + negative_count)
+        feature_stats = {}  # feature -> (positive, total) over the first 50 matching examples
+        
+        for i, article in enumerate(articles):
+            total_adjustment = 0.0
+            feature_count = 0
+            for feature_set in self.extract_features(article).values():
+                for feature in feature_set:
+                    if not feature or len(feature) < 2:
+                        continue
+                    
+                    stats = feature_stats.get(feature)
+                    if stats is None:
+                        feature_positive = 0
+                        feature_total = 0
+                        for good_fit, title, summary, content in examples:
+                            if ((title and feature in title) or (summary and feature in summary)
+                                    or (content and feature in content)):
+                                feature_total += 1
+                                if good_fit == 1:
+                                    feature_positive += 1
+                                if feature_total >= 50:
+                                    break
+                        stats = feature_stats[feature] = (feature_positive, feature_total)
+                    
+                    if stats[1] > 0:
+                        total_adjustment += (stats[0] / stats[1] - base_prob) * 10.0
+                        feature_count += 1
+            
+            if feature_count > 0:
+                adjustments[i] = max(-20.0, min(20.0, total_adjustment / feature_count))
+        
+        return adjustments
+    
     def get_training_stats(self, zip_code: Optional[str] = None) -> Dict:
         """Get training statistics for a zip code"""
         if not zip_code:
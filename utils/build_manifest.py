@@ -0,0 +1,207 @@
+"""
+Dependency-tracked build manifest for incremental site generation
+Each output page (index, category pages, scanner) records the inputs it was rendered from: the
+article IDs and a digest of their rendered fields, the admin settings it could read, a weather
+snapshot and the templates/generator version. The manifest is stored per zip code in the
+website_generation table, and a page is only re-rendered when its fingerprint changes, its file
+is missing, or it is older than PAGE_MAX_AGE (trending and "last updated" text drift with time).
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from config import DATABASE_CONFIG
+from utils.site_writer import SiteWriter, get_site_writer
+
+logger = logging.getLogger(__name__)
+
+# Bump when page rendering changes in a way templates don't capture (forces a rebuild of every page)
+GENERATOR_VERSION = 1
+
+# Seconds before an unchanged page is rebuilt anyway (0 disables)
+PAGE_MAX_AGE = 60 * 60
+
+# Settings that change on every run without affecting page content
+VOLATILE_SETTING_PREFIXES = ('last_',)
+
+# Weather fields that describe conditions (fetch timestamps and cache metadata are ignored)
+WEATHER_CURRENT_FIELDS = ('temperature', 'unit', 'condition', 'description', 'icon', 'feels_like',
+                          'humidity', 'wind_speed', 'wind_direction')
+
+# Keys the renderers add to article dicts (ignored so an annotated article digests like a fresh one)
+RENDER_ANNOTATIONS = ('source_gradient', 'source_initials', 'thumbnail_small', 'thumbnail_medium',
+                      'thumbnail_large', 'related_article_ids')
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "website_generator" / "templates"
+
+
+def init_build_manifest_table(cursor):
+    """Create the website_generation table and add the per-zip manifest columns"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS website_generation (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            last_article_id INTEGER,
+            last_generation_time TEXT,
+            pages_generated TEXT
+        )
+    ''')
+    try:
+        cursor.execute('ALTER TABLE website_generation ADD COLUMN zip_code TEXT')
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_website_generation_zip ON website_generation(zip_code)')
+
+
+def _digest(value) -> str:
+    payload = json.dumps(value, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def article_fields(article: Dict) -> Dict:
+    """Article fields that come from the database rather than from a previous render"""
+    return {key: value for key, value in article.items()
+            if not key.startswith('_') and key not in RENDER_ANNOTATIONS}
+
+
+def stable_settings(settings: Dict) -> Dict:
+    """Settings without keys that change on every run (last_regeneration_time, ...)"""
+    return {key: value for key, value in (settings or {}).items()
+            if not str(key).startswith(VOLATILE_SETTING_PREFIXES)}
+
+
+def weather_snapshot(weather: Dict) -> Dict:
+    """The parts of a weather payload that end up on a page"""
+    weather = weather or {}
+    current = weather.get('current') or {}
+    return {
+        'location': weather.get('location'),
+        'current': {field: current.get(field) for field in WEATHER_CURRENT_FIELDS},
+        'forecast': weather.get('forecast') or [],
+        'station_url': weather.get('station_url'),
+    }
+
+
+def templates_digest(template_dir: Path = TEMPLATE_DIR) -> str:
+    """Generator version plus name, size and mtime of every template file"""
+    entries: List = [GENERATOR_VERSION]
+    if template_dir.is_dir():
+        for path in sorted(template_dir.rglob('*')):
+            if path.is_file():
+                stat = path.stat()
+                entries.append((str(path.relative_to(template_dir)), stat.st_size, int(stat.st_mtime)))
+    return _digest(entries)
+
+
+def page_inputs(articles: Iterable[Dict], settings: Dict, weather: Dict, templates: str, **extra) -> Dict:
+    """Describe what a page is rendered from
+
+    Args:
+        articles: Articles the page displays, in display order
+        settings: Admin settings passed to the renderer
+        weather: Weather payload passed to the renderer
+        templates: templates_digest() for this run
+        **extra: Any other page-specific inputs (zip code, last database update, ...)
+
+    Returns:
+        Dict of article IDs and digests; equal dicts mean the page would render the same
+    """
+    articles = list(articles)
+    settings = stable_settings(settings)
+    return {
+        'article_ids': [article.get('id') for article in articles],
+        'articles': _digest([article_fields(article) for article in articles]),
+        'settings_keys': sorted(settings),
+        'settings': _digest(settings),
+        'weather': _digest(weather_snapshot(weather)),
+        'templates': templates,
+        'extra': _digest(extra),
+    }
+
+
+class BuildManifest:
+    """Per-zip record of page inputs, loaded before and saved after a generation run"""
+
+    def __init__(self, zip_code: Optional[str] = None, db_path: Optional[str] = None, writer: Optional[SiteWriter] = None):
+        self.zip_code = zip_code
+        self.db_path = db_path or DATABASE_CONFIG.get("path", "fallriver_news.db")
+        self.writer = writer or get_site_writer()
+        self.pages: Dict[str, Dict] = {}
+        self.last_article_id = 0
+        self.rebuilt: List[str] = []
+        self.skipped: List[str] = []
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        init_build_manifest_table(conn.cursor())
+        return conn
+
+    def load(self) -> "BuildManifest":
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute('SELECT last_article_id, pages_generated FROM website_generation WHERE zip_code IS ?',
+                                   (self.zip_code,)).fetchone()
+            finally:
+                conn.close()
+            if row:
+                self.last_article_id = row[0] or 0
+                pages = json.loads(row[1]) if row[1] else {}
+                self.pages = pages if isinstance(pages, dict) else {}
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Could not load build manifest for zip {self.zip_code}: {e}")
+        return self
+
+    def needs_build(self, page: str, inputs: Dict, output_file: str) -> bool:
+        """True when the page's inputs changed, its file is missing or it has expired"""
+        record = self.pages.get(page)
+        if not record or not os.path.exists(output_file):
+            return True
+        if record.get('inputs') != inputs:
+            return True
+        return bool(PAGE_MAX_AGE) and time.time() - record.get('generated_at', 0) > PAGE_MAX_AGE
+
+    def build(self, page: str, inputs: Dict, output_file: str, render) -> bool:
+        """Call render() if the page is stale and record its inputs once it has output the file
+
+        render() must write output_file through the manifest's SiteWriter.
+
+        Returns:
+            True if the page was rendered
+        """
+        if not self.needs_build(page, inputs, output_file):
+            self.skipped.append(page)
+            return False
+        started = time.time()
+        render()
+        if os.path.exists(output_file) and self.writer.last_output(output_file) >= started:
+            self.pages[page] = {'inputs': inputs, 'generated_at': time.time()}
+        else:
+            self.pages.pop(page, None)  # Renderer logged and swallowed an error; retry next run
+        self.rebuilt.append(page)
+        return True
+
+    def save(self, last_article_id: Optional[int] = None):
+        if last_article_id is not None:
+            self.last_article_id = max(self.last_article_id, last_article_id)
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute('''
+                        INSERT INTO website_generation (zip_code, last_article_id, last_generation_time, pages_generated)
+                        VALUES (?, ?, ?, ?)
+                        ON CONFLICT(zip_code) DO UPDATE SET
+                            last_article_id = excluded.last_article_id,
+                            last_generation_time = excluded.last_generation_time,
+                            pages_generated = excluded.pages_generated
+                    ''', (self.zip_code, self.last_article_id, datetime.now().isoformat(), json.dumps(self.pages, sort_keys=True)))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not save build manifest for zip {self.zip_code}: {e}")
@@ -0,0 +1,228 @@
+"""
+Precomputed learned-category keyword model
+Per-category keyword sets are extracted from category_training once per zip whenever the
+training data changes, stored in category_model, and kept in memory so categorizing an
+article is a dictionary lookup plus a keyword match pass
+"""
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import DATABASE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Default zip when an article doesn't carry one (same default _detect_category used)
+DEFAULT_ZIP = "02720"
+
+# zip_code -> (training fingerprint, {category: [keywords]})
+_model_cache: Dict[str, Tuple[Tuple, Dict[str, List[str]]]] = {}
+_model_lock = threading.Lock()
+
+
+def init_category_tables(cursor):
+    """Create category_training and the stored model tables if they don't exist"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS category_training (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            article_id INTEGER,
+            title TEXT,
+            content TEXT,
+            summary TEXT,
+            source TEXT,
+            url TEXT,
+            original_category TEXT,
+            corrected_category TEXT,
+            zip_code TEXT,
+            trained_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (article_id) REFERENCES articles (id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS category_model (
+            zip_code TEXT NOT NULL,
+            category TEXT NOT NULL,
+            keywords TEXT NOT NULL,
+            PRIMARY KEY (zip_code, category)
+        )
+    ''')
+    # One row per zip recording which training data the stored model was built from
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS category_model_builds (
+            zip_code TEXT PRIMARY KEY,
+            fingerprint TEXT NOT NULL,
+            built_at TEXT
+        )
+    ''')
+
+
+def training_fingerprint(cursor, zip_code: str) -> Tuple:
+    """Cheap change marker for a zip's training data (row count, newest id, newest timestamp)"""
+    cursor.execute('''
+        SELECT COUNT(*), MAX(id), MAX(trained_at) FROM category_training
+        WHERE zip_code = ? OR zip_code IS NULL
+    ''', (zip_code,))
+    return tuple(cursor.fetchone())
+
+
+def extract_category_keywords(category_texts: List[str]) -> List[str]:
+    """Top keywords for one category's training texts
+
+    TF-IDF (1-3 grams) averaged across documents when sklearn is available,
+    otherwise words appearing in at least 40% of examples.
+    """
+    try:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        import numpy as np
+
+        # TF-IDF vectorization with proper preprocessing
+        vectorizer = TfidfVectorizer(
+            max_features=50,  # Top 50 terms per category
+            stop_words='english',
+            ngram_range=(1, 3),  # Unigrams, bigrams, trigrams
+            min_df=2,  # Term must appear in at least 2 documents
+            max_df=0.9  # Term can appear in at most 90% of documents
+        )
+
+        tfidf_matrix = vectorizer.fit_transform(category_texts)
+        feature_names = vectorizer.get_feature_names_out()
+
+        # Get average TF-IDF scores across all documents
+        avg_scores = np.asarray(tfidf_matrix.mean(axis=0)).ravel()
+
+        # Get top keywords by TF-IDF score
+        top_indices = np.argsort(avg_scores)[-20:][::-1]  # Top 20
+        top_keywords = [feature_names[i] for i in top_indices if avg_scores[i] > 0.1]
+        return top_keywords[:15]  # Limit to 15 best
+
+    except ImportError:
+        # Fallback to simple frequency-based extraction if sklearn not available
+        word_counts = {}
+        for text in category_texts:
+            words = [w for w in text.split() if len(w) > 3]  # Filter short words
+            for word in words:
+                word_counts[word] = word_counts.get(word, 0) + 1
+
+        # Get words that appear in at least 40% of examples
+        min_occurrences = max(2, len(category_texts) * 0.4)
+        return [word for word, count in word_counts.items() if count >= min_occurrences][:20]
+
+
+def build_category_model(zip_code: str, db_path: Optional[str] = None) -> Dict[str, List[str]]:
+    """Extract per-category keywords for a zip and store them in category_model
+
+    Args:
+        zip_code: Zip code to build for (training rows without a zip apply to every zip)
+        db_path: Optional database path (defaults to DATABASE_CONFIG)
+
+    Returns:
+        Dict of category -> learned keywords
+    """
+    conn = sqlite3.connect(db_path or DATABASE_CONFIG.get("path", "fallriver_news.db"))
+    try:
+        cursor = conn.cursor()
+        init_category_tables(cursor)
+        fingerprint = training_fingerprint(cursor, zip_code)
+
+        cursor.execute('''
+            SELECT DISTINCT corrected_category FROM category_training
+            WHERE zip_code = ? OR zip_code IS NULL
+        ''', (zip_code,))
+        categories = [row[0] for row in cursor.fetchall() if row[0]]
+
+        learned_keywords = {}
+        for category in categories:
+            cursor.execute('''
+                SELECT title, content, summary, source
+                FROM category_training
+                WHERE corrected_category = ? AND (zip_code = ? OR zip_code IS NULL)
+                LIMIT 100
+            ''', (category, zip_code))
+            category_texts = [
+                f"{title or ''} {content or ''} {summary or ''} {source or ''}".lower()
+                for title, content, summary, source in cursor.fetchall()
+            ]
+            if len(category_texts) >= 3:  # Need minimum examples
+                keywords = extract_category_keywords(category_texts)
+                if keywords:
+                    learned_keywords[category] = keywords
+
+        cursor.execute('DELETE FROM category_model WHERE zip_code = ?', (zip_code,))
+        cursor.executemany('INSERT INTO category_model (zip_code, category, keywords) VALUES (?, ?, ?)',
+                           [(zip_code, category, json.dumps(keywords)) for category, keywords in learned_keywords.items()])
+        cursor.execute('''
+            INSERT OR REPLACE INTO category_model_builds (zip_code, fingerprint, built_at)
+            VALUES (?, ?, ?)
+        ''', (zip_code, json.dumps(fingerprint), datetime.now().isoformat()))
+        conn.commit()
+    finally:
+        conn.close()
+
+    with _model_lock:
+        _model_cache[zip_code] = (fingerprint, learned_keywords)
+    logger.info(f"Built category model for {zip_code}: {len(learned_keywords)} learned categories")
+    return learned_keywords
+
+
+def refresh_category_models(zip_codes: Iterable[Optional[str]], db_path: Optional[str] = None):
+    """Load each zip's stored model, rebuilding it first if category_training changed since the last build
+
+    Costs one fingerprint query per zip when nothing changed - call once per enrichment
+    cycle rather than per article.
+    """
+    conn = sqlite3.connect(db_path or DATABASE_CONFIG.get("path", "fallriver_news.db"))
+    try:
+        cursor = conn.cursor()
+        init_category_tables(cursor)
+        for zip_code in {zip_code or DEFAULT_ZIP for zip_code in zip_codes}:
+            fingerprint = training_fingerprint(cursor, zip_code)
+            cached = _model_cache.get(zip_code)
+            if cached and cached[0] == fingerprint:
+                continue
+
+            cursor.execute('SELECT fingerprint FROM category_model_builds WHERE zip_code = ?', (zip_code,))
+            row = cursor.fetchone()
+            if row and tuple(json.loads(row[0])) == fingerprint:
+                cursor.execute('SELECT category, keywords FROM category_model WHERE zip_code = ?', (zip_code,))
+                with _model_lock:
+                    _model_cache[zip_code] = (fingerprint, {category: json.loads(keywords)
+                                                            for category, keywords in cursor.fetchall()})
+            else:
+                build_category_model(zip_code, db_path=db_path)
+    finally:
+        conn.close()
+
+
+def get_category_model(zip_code: Optional[str] = None, db_path: Optional[str] = None) -> Dict[str, List[str]]:
+    """In-memory learned keywords for a zip (loaded or built on first use)"""
+    zip_code = zip_code or DEFAULT_ZIP
+    cached = _model_cache.get(zip_code)
+    if cached is None:
+        refresh_category_models([zip_code], db_path=db_path)
+        cached = _model_cache.get(zip_code, ((), {}))
+    return cached[1]
+
+
+def match_learned_category(text: str, learned_keywords: Dict[str, List[str]]) -> Tuple[Optional[str], float, int]:
+    """Best learned category for lowercased article text
+
+    Returns:
+        (category, confidence, matches) - confidence is the share of the category's keywords found
+    """
+    best_match = None
+    best_confidence = 0.0
+    best_matches = 0
+    for category, keywords in learned_keywords.items():
+        if not keywords:
+            continue
+        matches = sum(1 for kw in keywords if kw in text)
+        if matches > 0:
+            confidence = matches / len(keywords)  # Confidence = match ratio
+            if confidence > best_confidence:
+                best_confidence = confidence
+                best_match = category
+                best_matches = matches
+    return best_match, best_confidence, best_matches
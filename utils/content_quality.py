@@ -4,11 +4,14 @@ Assesses article quality based on multiple signals
 """
 import re
 import math
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever scoring rules change so stored results are recomputed (see utils/quality_store)
+ANALYZER_VERSION = 1
+
 class ContentQualityAnalyzer:
     """Analyzes article content quality using multiple metrics"""
 
@@ -0,0 +1,122 @@
+"""
+Data-version counter for invalidating rendered pages
+A single counter in the data_version table is bumped by SQLite triggers whenever articles,
+article_management rows, zip-to-city mappings or display settings change. That covers every writer (ingestion, admin
+toggles, rescoring jobs) in every process. Readers cache the value for CHECK_INTERVAL seconds, so
+checking it on a page view is normally a clock comparison, not a query.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from config import DATABASE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Seconds a reader trusts its cached version before asking the database again
+CHECK_INTERVAL = 1.0
+
+# Tables whose changes alter rendered pages
+VERSIONED_TABLES = ('articles', 'article_management', 'city_zip_mapping')
+
+# admin_settings keys that change how pages render
+VERSIONED_SETTINGS = ('show_images',)
+
+
+def init_data_version_table(cursor):
+    """Create the data_version counter and the triggers that bump it"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS data_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)')
+    for table in VERSIONED_TABLES:
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            try:
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS trg_data_version_{table}_{event.lower()}
+                    AFTER {event} ON {table}
+                    BEGIN
+                        UPDATE data_version SET version = version + 1 WHERE id = 1;
+                    END
+                ''')
+            except sqlite3.OperationalError:
+                pass  # Table not created yet; the next init adds the trigger
+    settings = ', '.join(f"'{key}'" for key in VERSIONED_SETTINGS)
+    for event, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+        try:
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_data_version_admin_settings_{event.lower()}
+                AFTER {event} ON admin_settings
+                WHEN {row}.key IN ({settings})
+                BEGIN
+                    UPDATE data_version SET version = version + 1 WHERE id = 1;
+                END
+            ''')
+        except sqlite3.OperationalError:
+            pass  # Table not created yet
+
+
+def bump_data_version(cursor):
+    """Invalidate rendered pages for a change the triggers don't see"""
+    cursor.execute('UPDATE data_version SET version = version + 1 WHERE id = 1')
+
+
+class DataVersion:
+    """Cached reader of the data_version counter"""
+
+    def __init__(self, db_path: Optional[str] = None, check_interval: float = CHECK_INTERVAL):
+        self.db_path = db_path or DATABASE_CONFIG.get("path", "fallriver_news.db")
+        self.check_interval = check_interval
+        self._version = -1
+        self._checked_at = 0.0
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    def current(self) -> int:
+        """Current data version (at most check_interval seconds old)"""
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return self._version
+        with self._lock:
+            if time.monotonic() - self._checked_at >= self.check_interval:
+                self._version = self._read()
+                self._checked_at = time.monotonic()
+        return self._version
+
+    def refresh(self) -> int:
+        """Re-read the version now (after a change made by this process)"""
+        self._checked_at = 0.0
+        return self.current()
+
+    def _read(self) -> int:
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            try:
+                if not self._initialized:
+                    with conn:
+                        init_data_version_table(conn.cursor())
+                    self._initialized = True
+                row = conn.execute('SELECT version FROM data_version WHERE id = 1').fetchone()
+                return row[0] if row else 0
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read data version: {e}")
+            return -1  # Unknown: callers treat cached pages as stale
+
+
+_data_version: Optional[DataVersion] = None
+_data_version_lock = threading.Lock()
+
+
+def get_data_version() -> DataVersion:
+    """Process-wide data version reader"""
+    global _data_version
+    with _data_version_lock:
+        if _data_version is None:
+            _data_version = DataVersion()
+        return _data_version
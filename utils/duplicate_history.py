@@ -0,0 +1,238 @@
+"""
+Persistent near-duplicate signatures for cross-cycle deduplication
+Stores a MinHash signature per article plus its LSH band buckets, so a new article can be
+checked against the last N days of history with indexed lookups instead of pairwise scans
+"""
+import hashlib
+import logging
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from config import DATABASE_CONFIG
+from utils.near_duplicate_index import MinHashLSHIndex
+from utils.semantic_deduplication import SemanticDeduplicator
+
+logger = logging.getLogger(__name__)
+
+# Threshold save_articles uses for near-duplicates (same as the in-batch pass)
+HISTORY_THRESHOLD = 0.75
+
+# Signature kinds and the lowest Jaccard each must surface as a candidate. The band layout
+# is persisted with the buckets, so changing these requires rebuild_signature_index().
+SIGNATURE_KINDS = {
+    'title': SemanticDeduplicator.min_title_jaccard(HISTORY_THRESHOLD) - 0.02,
+    'content': 0.5,
+}
+
+_hashers: Dict[str, MinHashLSHIndex] = {}
+_deduplicator = SemanticDeduplicator()
+
+
+def _hasher(kind: str) -> MinHashLSHIndex:
+    """Signature/band layout for a kind (fixed seed so stored buckets stay comparable)"""
+    if kind not in _hashers:
+        _hashers[kind] = MinHashLSHIndex(min_similarity=SIGNATURE_KINDS[kind])
+    return _hashers[kind]
+
+
+def _bucket_ids(hasher: MinHashLSHIndex, signature) -> List[int]:
+    """One signed 64-bit bucket id per LSH band (band number folded into the hash)"""
+    ids = []
+    for band in range(hasher.bands):
+        band_bytes = signature[band * hasher.rows:(band + 1) * hasher.rows].tobytes()
+        digest = hashlib.blake2b(band.to_bytes(2, 'big') + band_bytes, digest_size=8).digest()
+        ids.append(int.from_bytes(digest, 'big', signed=True))
+    return ids
+
+
+def init_signature_tables(cursor):
+    """Create the signature and LSH bucket tables if they don't exist"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS article_signatures (
+            article_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            signature BLOB NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (article_id, kind)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS signature_buckets (
+            kind TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            article_id INTEGER NOT NULL,
+            PRIMARY KEY (kind, bucket, article_id)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_signature_buckets_article ON signature_buckets(article_id)')
+
+
+def _kind_tokens(kind: str, features: Dict) -> Set[str]:
+    return features['title_words'] if kind == 'title' else features['content_words']
+
+
+def store_signatures(cursor, articles: Sequence[Tuple[int, str, str, str]]):
+    """Store signatures and bucket rows for newly saved articles
+
+    Args:
+        cursor: Open cursor (runs inside the caller's transaction)
+        articles: Sequence of (article_id, title, content, summary)
+    """
+    if not articles:
+        return
+    init_signature_tables(cursor)
+    signature_rows = []
+    bucket_rows = []
+    for article_id, title, content, summary in articles:
+        features = _deduplicator.article_features({'title': title, 'content': content, 'summary': summary})
+        for kind in SIGNATURE_KINDS:
+            hasher = _hasher(kind)
+            signature = hasher.signature(_kind_tokens(kind, features))
+            if signature is None:
+                continue
+            signature_rows.append((article_id, kind, signature.tobytes()))
+            bucket_rows.extend((kind, bucket, article_id) for bucket in _bucket_ids(hasher, signature))
+
+    cursor.executemany('INSERT OR REPLACE INTO article_signatures (article_id, kind, signature) VALUES (?, ?, ?)',
+                       signature_rows)
+    cursor.executemany('INSERT OR IGNORE INTO signature_buckets (kind, bucket, article_id) VALUES (?, ?, ?)',
+                       bucket_rows)
+
+
+def candidate_ids(cursor, kind: str, tokens: Set[str]) -> List[int]:
+    """Article IDs sharing at least one LSH bucket with a token set"""
+    hasher = _hasher(kind)
+    signature = hasher.signature(tokens)
+    if signature is None:
+        return []
+    buckets = _bucket_ids(hasher, signature)
+    placeholders = ','.join('?' * len(buckets))
+    cursor.execute(f'''
+        SELECT DISTINCT article_id FROM signature_buckets
+        WHERE kind = ? AND bucket IN ({placeholders})
+        ORDER BY article_id
+    ''', [kind] + buckets)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def find_history_duplicate(cursor, article: Dict, zip_code: Optional[str] = None,
+                           days: Optional[int] = None,
+                           threshold: float = HISTORY_THRESHOLD) -> Optional[Tuple[int, float, str]]:
+    """Find a stored article from the last N days that the new article duplicates
+
+    Candidates come from the title LSH buckets and are verified with the same
+    similarity SemanticDeduplicator uses within a batch.
+
+    Args:
+        cursor: Open cursor
+        article: Incoming article dict
+        zip_code: Only compare against articles for this zip
+        days: History window (defaults to DATABASE_CONFIG duplicate_history_days)
+        threshold: Combined similarity threshold
+
+    Returns:
+        (article_id, similarity, reason) for the most similar stored article, or None
+    """
+    features = _deduplicator.article_features(article)
+    ids = candidate_ids(cursor, 'title', features['title_words'])
+    if not ids:
+        return None
+
+    days = days if days is not None else DATABASE_CONFIG.get("duplicate_history_days", 7)
+    # ingested_ts normalizes ingested_at / created_at, which are stored in different string formats
+    cutoff = int((datetime.now() - timedelta(days=days)).timestamp())
+    placeholders = ','.join('?' * len(ids))
+    cursor.execute(f'''
+        SELECT id, title, content, summary FROM articles
+        WHERE id IN ({placeholders}) AND ingested_ts >= ? AND zip_code IS ?
+        ORDER BY id
+    ''', ids + [cutoff, zip_code])
+
+    best = None
+    for article_id, title, content, summary in cursor.fetchall():
+        stored = _deduplicator.article_features({'title': title, 'content': content, 'summary': summary})
+        combined_sim, title_sim, content_sim = _deduplicator.feature_similarity(features, stored)
+        if combined_sim >= threshold and (best is None or combined_sim > best[1]):
+            _, reason = _deduplicator._duplicate_reason(combined_sim, title_sim, content_sim, threshold)
+            best = (article_id, combined_sim, reason)
+    return best
+
+
+def indexed_candidate_pairs(cursor, kind: str = 'title') -> Set[Tuple[int, int]]:
+    """Every (lower_id, higher_id) pair sharing a bucket - a self-join on the bucket index"""
+    cursor.execute('''
+        SELECT DISTINCT b1.article_id, b2.article_id
+        FROM signature_buckets b1
+        JOIN signature_buckets b2 ON b1.kind = b2.kind AND b1.bucket = b2.bucket AND b1.article_id < b2.article_id
+        WHERE b1.kind = ?
+    ''', (kind,))
+    return set(cursor.fetchall())
+
+
+def rebuild_signature_index(db_path: Optional[str] = None, only_missing: bool = True) -> int:
+    """Backfill signatures for stored articles
+
+    Args:
+        db_path: Optional database path (defaults to DATABASE_CONFIG)
+        only_missing: Skip articles that already have signatures; False rebuilds everything
+
+    Returns:
+        Number of articles indexed
+    """
+    conn = sqlite3.connect(db_path or DATABASE_CONFIG.get("path", "fallriver_news.db"))
+    try:
+        cursor = conn.cursor()
+        init_signature_tables(cursor)
+        if only_missing:
+            cursor.execute('''
+                SELECT id, title, content, summary FROM articles
+                WHERE id NOT IN (SELECT article_id FROM article_signatures)
+            ''')
+        else:
+            cursor.execute('DELETE FROM signature_buckets')
+            cursor.execute('DELETE FROM article_signatures')
+            cursor.execute('SELECT id, title, content, summary FROM articles')
+        rows = cursor.fetchall()
+        store_signatures(cursor, rows)
+        conn.commit()
+        logger.info(f"Indexed near-duplicate signatures for {len(rows)} articles")
+        return len(rows)
+    finally:
+        conn.close()
+
+
+def prune_signatures(cursor, days: Optional[int] = None) -> int:
+    """Drop index rows for articles outside the history window or no longer stored
+
+    find_history_duplicate never looks past the window, so save_articles prunes after storing
+    new signatures to keep the tables at one window's worth. rebuild_signature_index re-adds the
+    older articles for the whole-corpus scripts until the next prune.
+
+    Args:
+        cursor: Open cursor (runs inside the caller's transaction)
+        days: History window (defaults to DATABASE_CONFIG duplicate_history_days)
+
+    Returns:
+        Number of articles whose signatures were removed
+    """
+    days = days if days is not None else DATABASE_CONFIG.get("duplicate_history_days", 7)
+    cutoff = int((datetime.now() - timedelta(days=days)).timestamp())
+    cursor.execute('''
+        SELECT s.article_id FROM article_signatures s
+        LEFT JOIN articles a ON a.id = s.article_id
+        WHERE a.id IS NULL OR a.ingested_ts < ?
+        GROUP BY s.article_id
+    ''', (cutoff,))
+    stale_ids = [row[0] for row in cursor.fetchall()]
+    if stale_ids:
+        remove_signatures(cursor, stale_ids)
+        logger.info(f"Pruned near-duplicate signatures for {len(stale_ids)} articles outside the {days}-day window")
+    return len(stale_ids)
+
+
+def remove_signatures(cursor, article_ids: Sequence[int]):
+    """Drop index rows for deleted articles"""
+    init_signature_tables(cursor)
+    cursor.executemany('DELETE FROM signature_buckets WHERE article_id = ?', [(i,) for i in article_ids])
+    cursor.executemany('DELETE FROM article_signatures WHERE article_id = ?', [(i,) for i in article_ids])
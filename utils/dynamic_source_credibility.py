@@ -63,11 +63,18 @@ class DynamicSourceCredibility:
 
     def update_source_performance(self, source_name: str, relevance_score: float,
                                 quality_score: float, is_enabled: bool,
-                                zip_code: Optional[str] = None):
-        """Update performance metrics for a source"""
+                                zip_code: Optional[str] = None, cursor: Optional[sqlite3.Cursor] = None):
+        """Update performance metrics for a source
+
+        Args:
+            cursor: Optional open cursor; the update then runs in the caller's transaction
+                (a second connection would wait on the caller's write lock)
+        """
+        conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            if cursor is None:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
 
             # Get current performance data
             cursor.execute('''
@@ -108,11 +115,14 @@ class DynamicSourceCredibility:
                     VALUES (?, ?, 1, ?, ?, ?, CURRENT_TIMESTAMP)
                 ''', (source_name, zip_code, 1 if is_enabled else 0, relevance_score, quality_score))
 
-            conn.commit()
-            conn.close()
+            if conn is not None:
+                conn.commit()
 
         except Exception as e:
             logger.error(f"Error updating source performance for {source_name}: {e}")
+        finally:
+            if conn is not None:
+                conn.close()
 
     def calculate_dynamic_credibility(self, source_name: str, zip_code: Optional[str] = None) -> float:
         """Calculate dynamic credibility score for a source"""
@@ -0,0 +1,212 @@
+"""
+Cached RSS proxy shared by /api/proxy-rss (admin app) and serve_website.py
+Feeds are kept in memory for feed_proxy_ttl seconds and answered without going upstream. After
+that, a stale copy is still served (up to feed_proxy_stale_ttl) while one background fetch
+revalidates it with If-None-Match / If-Modified-Since. Concurrent misses for one feed wait on a
+single upstream fetch, and the cache holds at most feed_proxy_cache_mb, dropping the least recently
+used feeds first.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from config import WEBSITE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Largest feed accepted from upstream (bytes)
+MAX_FEED_SIZE = 5 * 1024 * 1024
+
+# Seconds a follower waits for the request already fetching its feed
+COALESCE_TIMEOUT = 15
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+class FeedFetchError(Exception):
+    """Feed could not be fetched and nothing usable is cached; status is the HTTP status to answer with"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class CachedFeed:
+    """A proxied feed body and the validators for revalidating it"""
+
+    __slots__ = ('body', 'content_type', 'etag', 'last_modified', 'fetched_at')
+
+    def __init__(self, body: bytes, content_type: str, etag: Optional[str], last_modified: Optional[str]):
+        self.body = body
+        self.content_type = content_type
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = time.monotonic()
+
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+class _Flight:
+    """An upstream fetch in progress that other requests for the same feed wait on"""
+
+    __slots__ = ('done', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.error: Optional[FeedFetchError] = None
+
+
+class FeedCache:
+    """TTL cache with stale-while-revalidate and single-flight fetches"""
+
+    def __init__(self, ttl: Optional[int] = None, stale_ttl: Optional[int] = None, max_bytes: Optional[int] = None):
+        """
+        Args:
+            ttl: Seconds a feed is served without revalidation (default: feed_proxy_ttl)
+            stale_ttl: Seconds a stale feed may be served while it is refreshed (default: feed_proxy_stale_ttl)
+            max_bytes: Cap on cached feed bytes (default: feed_proxy_cache_mb)
+        """
+        self.ttl = WEBSITE_CONFIG.get("feed_proxy_ttl", 300) if ttl is None else ttl
+        self.stale_ttl = WEBSITE_CONFIG.get("feed_proxy_stale_ttl", 3600) if stale_ttl is None else stale_ttl
+        self.max_bytes = (WEBSITE_CONFIG.get("feed_proxy_cache_mb", 16) * 1024 * 1024
+                          if max_bytes is None else max_bytes)
+        self._feeds: 'OrderedDict[str, CachedFeed]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, _Flight] = {}
+        self._refresher = ThreadPoolExecutor(max_workers=4, thread_name_prefix="feed-refresh")
+        self.fetches = 0
+
+    def get(self, url: str) -> CachedFeed:
+        """Cached feed for url, fetching it upstream only when nothing usable is cached
+
+        Args:
+            url: Feed URL (http or https)
+
+        Returns:
+            CachedFeed
+
+        Raises:
+            FeedFetchError: The URL is invalid, or the fetch failed with nothing cached
+        """
+        if urlparse(url).scheme not in ('http', 'https') or not urlparse(url).netloc:
+            raise FeedFetchError(400, "Invalid feed URL")
+
+        feed = self._feeds.get(url)
+        if feed is not None:
+            try:
+                self._feeds.move_to_end(url)
+            except KeyError:
+                pass  # Evicted meanwhile; this copy is still usable
+            age = feed.age()
+            if age < self.ttl:
+                return feed
+            if age < self.ttl + self.stale_ttl:
+                flight, leader = self._claim(url)
+                if leader:
+                    self._refresher.submit(self._refresh, url, feed, flight)
+                return feed
+
+        flight, leader = self._claim(url)
+        if leader:
+            return self._refresh(url, feed, flight)
+        flight.done.wait(timeout=COALESCE_TIMEOUT)  # Another request is fetching this feed
+        feed = self._feeds.get(url) or feed
+        if feed is not None:
+            return feed
+        raise flight.error or FeedFetchError(504, "Gateway Timeout")
+
+    def _claim(self, url: str):
+        """The fetch in progress for url, and whether the caller must perform it"""
+        with self._lock:
+            flight = self._inflight.get(url)
+            if flight is not None:
+                return flight, False
+            flight = self._inflight[url] = _Flight()
+            return flight, True
+
+    def _refresh(self, url: str, stale: Optional[CachedFeed], flight: _Flight) -> CachedFeed:
+        try:
+            return self._fetch(url, stale)
+        except FeedFetchError as e:
+            flight.error = e
+            if stale is not None:
+                logger.warning(f"Serving stale feed for {url}: {e.message}")
+                return stale
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(url, None)
+            flight.done.set()
+
+    def _fetch(self, url: str, stale: Optional[CachedFeed]) -> CachedFeed:
+        headers = {'User-Agent': USER_AGENT}
+        if stale is not None:
+            if stale.etag:
+                headers['If-None-Match'] = stale.etag
+            if stale.last_modified:
+                headers['If-Modified-Since'] = stale.last_modified
+
+        self.fetches += 1
+        try:
+            with requests.get(url, headers=headers, timeout=10, stream=True) as response:
+                if response.status_code == 304 and stale is not None:
+                    feed = stale
+                    feed.fetched_at = time.monotonic()
+                elif response.status_code != 200:
+                    logger.error(f"HTTP error fetching RSS {url}: {response.status_code}")
+                    raise FeedFetchError(response.status_code, f"Error fetching RSS: HTTP {response.status_code}")
+                else:
+                    body = bytearray()
+                    for chunk in response.iter_content(chunk_size=65536):
+                        body.extend(chunk)
+                        if len(body) > MAX_FEED_SIZE:
+                            raise FeedFetchError(502, "Feed too large")
+                    feed = CachedFeed(bytes(body), response.headers.get('content-type', 'application/xml'),
+                                      response.headers.get('etag'), response.headers.get('last-modified'))
+        except requests.exceptions.Timeout:
+            logger.error(f"Timeout fetching RSS: {url}")
+            raise FeedFetchError(504, "Gateway Timeout")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error fetching RSS {url}: {e}")
+            raise FeedFetchError(502, f"Error fetching RSS: {e}")
+
+        self._store(url, feed)
+        return feed
+
+    def _store(self, url: str, feed: CachedFeed):
+        with self._lock:
+            previous = self._feeds.pop(url, None)
+            if previous is not None:
+                self._bytes -= len(previous.body)
+            self._feeds[url] = feed
+            self._bytes += len(feed.body)
+            while self._bytes > self.max_bytes and len(self._feeds) > 1:
+                _, evicted = self._feeds.popitem(last=False)
+                self._bytes -= len(evicted.body)
+
+    def get_stats(self) -> Dict:
+        """Cached feed count, size and upstream fetches"""
+        return {'feeds': len(self._feeds), 'total_size_mb': self._bytes / (1024 * 1024),
+                'max_size_mb': self.max_bytes / (1024 * 1024), 'upstream_fetches': self.fetches}
+
+
+_feed_cache: Optional[FeedCache] = None
+_feed_cache_lock = threading.Lock()
+
+
+def get_feed_cache() -> FeedCache:
+    """Process-wide feed cache"""
+    global _feed_cache
+    with _feed_cache_lock:
+        if _feed_cache is None:
+            _feed_cache = FeedCache()
+        return _feed_cache
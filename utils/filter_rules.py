@@ -0,0 +1,153 @@
+"""
+Compiled filtering rules for filter_relevant_articles / enrich_articles
+Alert phrase lists, priority words and the source name -> source_key lookup are compiled once
+at import; admin settings are loaded once per cycle into a FilterRules instance
+"""
+import logging
+import re
+import sqlite3
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+from config import DATABASE_CONFIG, NEWS_SOURCES
+
+logger = logging.getLogger(__name__)
+
+# ONLY flag TRUE emergency situations with official terminology
+# Order matters: when an article matches several types the first one wins
+ALERT_KEYWORDS = {
+    'weather': [
+        # Only official National Weather Service warnings/advisories
+        'winter weather advisory', 'winter storm warning', 'winter storm watch',
+        'blizzard warning', 'blizzard watch', 'ice storm warning', 'ice storm watch',
+        'freezing rain warning', 'freezing rain advisory', 'heavy snow warning',
+        'heavy snow advisory', 'wind warning', 'wind advisory', 'high wind warning',
+        'severe thunderstorm warning', 'severe thunderstorm watch', 'tornado warning',
+        'tornado watch', 'flood warning', 'flood watch', 'flash flood warning',
+        'flash flood watch', 'coastal flood warning', 'coastal flood watch',
+        'hazardous weather outlook', 'special weather statement', 'severe weather statement',
+        # Emergency conditions (must include "emergency" or official terminology)
+        'snow emergency declared', 'state of emergency due to weather',
+        'emergency travel ban', 'weather emergency road closure',
+        'dangerous driving conditions due to weather', 'whiteout emergency conditions',
+        'life-threatening weather conditions', 'extreme cold warning', 'extreme heat warning'
+    ],
+    'parking': [
+        # Only emergency parking situations with "emergency" or "snow emergency"
+        'emergency parking ban', 'parking ban due to snow emergency',
+        'parking ban due to weather emergency', 'emergency alternate side parking',
+        'emergency street cleaning due to weather', 'emergency parking restriction due to snow'
+    ],
+    'trash': [
+        # Only emergency trash collection situations
+        'emergency trash collection delay', 'trash collection delayed due to snow emergency',
+        'trash collection delayed due to weather emergency', 'emergency waste collection delay',
+        'storm emergency trash collection', 'weather emergency collection delay due to storm'
+    ]
+}
+
+CRITICAL_WORDS = ['emergency', 'evacuation', 'critical', 'severe']
+WARNING_WORDS = ['warning', 'advisory', 'caution', 'alert']
+
+_ALERT_TYPE_ORDER = list(ALERT_KEYWORDS)
+# Phrase -> rank of the first alert type listing it
+_PHRASE_RANK = {}
+for _rank in reversed(range(len(_ALERT_TYPE_ORDER))):
+    for _phrase in ALERT_KEYWORDS[_ALERT_TYPE_ORDER[_rank]]:
+        _PHRASE_RANK[_phrase] = _rank
+
+
+def _alternation(phrases: Iterable[str]) -> str:
+    return '|'.join(re.escape(phrase) for phrase in phrases)
+
+
+# Zero-width lookahead reports a phrase at every position (overlapping matches included).
+# Alternatives are listed in type order, so at any position the earliest type that matches is reported.
+_ALERT_PATTERN = re.compile(
+    '(?=(' + _alternation(p for t in _ALERT_TYPE_ORDER for p in ALERT_KEYWORDS[t]) + '))'
+)
+_CRITICAL_PATTERN = re.compile(_alternation(CRITICAL_WORDS))
+_WARNING_PATTERN = re.compile(_alternation(WARNING_WORDS))
+
+
+def match_alert_type(text: str) -> Optional[str]:
+    """First alert type (in ALERT_KEYWORDS order) with a phrase in lowercased text, or None"""
+    best = None
+    for match in _ALERT_PATTERN.finditer(text):
+        rank = _PHRASE_RANK[match.group(1)]
+        if best is None or rank < best:
+            best = rank
+            if rank == 0:
+                break
+    return _ALERT_TYPE_ORDER[best] if best is not None else None
+
+
+def alert_priority(text: str) -> str:
+    """Alert priority for lowercased text: critical, warning or info"""
+    if _CRITICAL_PATTERN.search(text):
+        return 'critical'
+    if _WARNING_PATTERN.search(text):
+        return 'warning'
+    return 'info'
+
+
+def detect_alert(article: Dict) -> Dict:
+    """Alert fields for an article (is_alert, alert_type, alert_priority)"""
+    text = f"{article.get('title', '')} {article.get('content', '')} {article.get('summary', '')}".lower()
+    alert_type = match_alert_type(text)
+    if alert_type is None:
+        return {'is_alert': False, 'alert_type': None, 'alert_priority': 'info'}
+    return {'is_alert': True, 'alert_type': alert_type, 'alert_priority': alert_priority(text)}
+
+
+@lru_cache(maxsize=1024)
+def source_key_for(source: str) -> Optional[str]:
+    """NEWS_SOURCES key for a lowercased source name (first source whose name or key it contains)"""
+    for key, config in NEWS_SOURCES.items():
+        if config["name"].lower() in source or key in source:
+            return key
+    return None
+
+
+class FilterRules:
+    """Admin filter settings loaded once per aggregation cycle"""
+
+    def __init__(self, source_settings: Optional[Dict[str, Dict[str, bool]]] = None,
+                 ai_filtering_enabled: bool = False, relevance_threshold: float = 10.0):
+        self.source_settings = source_settings or {}
+        self.ai_filtering_enabled = ai_filtering_enabled
+        self.relevance_threshold = relevance_threshold
+
+    @classmethod
+    def load(cls, db_path: Optional[str] = None) -> "FilterRules":
+        """Read source_* settings, ai_filtering_enabled and relevance_threshold from admin_settings"""
+        source_settings = {}
+        ai_filtering_enabled = False
+        relevance_threshold = 10.0  # Default threshold
+        try:
+            conn = sqlite3.connect(db_path or DATABASE_CONFIG.get("path", "fallriver_news.db"))
+            try:
+                cursor = conn.cursor()
+                cursor.execute('SELECT key, value FROM admin_settings WHERE key LIKE "source_%" OR key = "ai_filtering_enabled" OR key = "relevance_threshold"')
+                for key, value in cursor.fetchall():
+                    if key == 'ai_filtering_enabled':
+                        ai_filtering_enabled = value == '1'
+                    elif key == 'relevance_threshold':
+                        try:
+                            relevance_threshold = float(value)
+                        except (TypeError, ValueError):
+                            relevance_threshold = 10.0
+                    else:
+                        parts = key.replace('source_', '').split('_', 1)
+                        if len(parts) == 2:
+                            source_settings.setdefault(parts[0], {})[parts[1]] = value == '1'
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.debug(f"Could not load filter settings: {e}")
+        return cls(source_settings, ai_filtering_enabled, relevance_threshold)
+
+    def require_fall_river(self, source_key: str) -> bool:
+        """Admin override for a source's require_fall_river flag, else the NEWS_SOURCES default"""
+        return self.source_settings.get(source_key, {}).get(
+            'require_fall_river', NEWS_SOURCES.get(source_key, {}).get('require_fall_river', False))
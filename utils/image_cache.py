@@ -1,20 +1,78 @@
 """
 Image thumbnail caching system
 Manages creation and retrieval of image thumbnails
+
+Thumbnails are indexed in the image_thumbnails table and loaded into memory once, so lookups while
+rendering are dict reads. Missing thumbnails are queued with request(); process_pending() saves the
+queue to image_thumbnail_queue and works through it in a background thread: each source image is
+downloaded and decoded once in a worker process, which writes every size. The thread is not a daemon,
+so a short-lived run finishes its queue before exiting, and anything left over (a crash, a kill) is
+picked up by the next process. The cache keeps a running byte total and, over its budget,
+evicts the least recently used images (all sizes) in SQL order, without walking the thumbnails directory.
 """
-import json
 import logging
+import multiprocessing
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Optional, List
-from datetime import datetime, timedelta
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
-import hashlib
+from typing import Dict, Optional, List, Tuple
 
-from .image_processor import create_thumbnail, THUMBNAIL_SIZES
+from config import DATABASE_CONFIG, WEBSITE_CONFIG
+from .image_processor import create_thumbnails, THUMBNAIL_SIZES
 
 logger = logging.getLogger(__name__)
 
+# Seconds before an image whose thumbnails could not be made is tried again
+FAILURE_RETRY = 6 * 3600
+
+# Seconds between access-time writes for one thumbnail (keeps lookups from writing on every render)
+TOUCH_INTERVAL = 3600
+
+# Least recently used images read per eviction query
+EVICTION_BATCH = 64
+
+
+def init_thumbnail_tables(cursor):
+    """Create the image_thumbnails, image_thumbnail_failures and image_thumbnail_queue tables if they don't exist"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS image_thumbnails (
+            base_dir TEXT NOT NULL,
+            image_url TEXT NOT NULL,
+            size_name TEXT NOT NULL,
+            path TEXT NOT NULL,
+            bytes INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL,
+            PRIMARY KEY (base_dir, image_url, size_name)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_image_thumbnails_accessed ON image_thumbnails(base_dir, accessed_at)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS image_thumbnail_failures (
+            base_dir TEXT NOT NULL,
+            image_url TEXT NOT NULL,
+            failed_at REAL NOT NULL,
+            PRIMARY KEY (base_dir, image_url)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS image_thumbnail_queue (
+            base_dir TEXT NOT NULL,
+            image_url TEXT NOT NULL,
+            queued_at REAL NOT NULL,
+            PRIMARY KEY (base_dir, image_url)
+        )
+    ''')
+
+
+def _init_worker(project_root: str):
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+
 
 class ImageCache:
     """
@@ -22,49 +80,66 @@ class ImageCache:
     Provides thread-safe access to cached thumbnails with automatic cleanup.
     """
 
-    def __init__(self, base_dir: Path, max_cache_size_mb: int = 500):
+    def __init__(self, base_dir: Path, max_cache_size_mb: Optional[int] = None, db_path: Optional[str] = None):
         """
         Initialize image cache.
 
         Args:
-            base_dir: Base directory for cache (e.g., build/zips/zip_02720/)
-            max_cache_size_mb: Maximum cache size before cleanup
+            base_dir: Base directory for cache (e.g., build/)
+            max_cache_size_mb: Maximum cache size; least recently used thumbnails are evicted beyond it
+                (default: thumbnail_cache_mb)
+            db_path: Database holding the index (default: the main database)
         """
         self.base_dir = Path(base_dir)
         self.images_dir = self.base_dir / 'images'
         self.thumbnails_dir = self.images_dir / 'thumbnails'
-        self.cache_file = self.images_dir / 'cache.json'
-        self.max_cache_size_mb = max_cache_size_mb
+        self.max_cache_size_mb = (WEBSITE_CONFIG.get("thumbnail_cache_mb", 500)
+                                  if max_cache_size_mb is None else max_cache_size_mb)
+        self.db_path = db_path or DATABASE_CONFIG.get("path", "fallriver_news.db")
+        self._key = str(self.base_dir)
 
         # Create directory structure
         for size_name in THUMBNAIL_SIZES.keys():
             (self.thumbnails_dir / size_name).mkdir(parents=True, exist_ok=True)
 
-        # Load existing cache
-        self.cache = self._load_cache()
+        self._lock = threading.Lock()
+        self._pending: Dict[str, None] = {}  # Insertion-ordered set of URLs waiting for thumbnails
+        self._touched: Dict[Tuple[str, str], float] = {}
+        self._worker: Optional[threading.Thread] = None
 
-        # Thread pool for async thumbnail creation
-        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="thumbnail")
+        # Load the index: (image_url, size_name) -> [path, bytes, accessed_at]
+        self.cache: Dict[Tuple[str, str], List] = {}
+        self._failed: Dict[str, float] = {}
+        self._total_bytes = 0
+        self._load_cache()
 
-    def _load_cache(self) -> Dict:
-        """Load cache metadata from disk"""
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.warning(f"Could not load image cache: {e}")
-                return {}
-        return {}
-
-    def _save_cache(self):
-        """Save cache metadata to disk"""
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        init_thumbnail_tables(conn.cursor())
+        return conn
+
+    def _load_cache(self):
+        """Load the thumbnail index from the database"""
         try:
-            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"Could not save image cache: {e}")
+            conn = self._connect()
+            try:
+                rows = conn.execute('SELECT image_url, size_name, path, bytes, accessed_at FROM image_thumbnails '
+                                    'WHERE base_dir = ?', (self._key,)).fetchall()
+                failures = conn.execute('SELECT image_url, failed_at FROM image_thumbnail_failures WHERE base_dir = ?',
+                                        (self._key,)).fetchall()
+                queued = conn.execute('SELECT image_url FROM image_thumbnail_queue WHERE base_dir = ? ORDER BY queued_at',
+                                      (self._key,)).fetchall()
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not load image cache: {e}")
+            return
+        self.cache = {(url, size): [path, size_bytes, accessed] for url, size, path, size_bytes, accessed in rows}
+        self._failed = dict(failures)
+        self._total_bytes = sum(entry[1] for entry in self.cache.values())
+        # Left over by a process that exited before its queue was done
+        self._pending = {url: None for url, in queued if not self.has_thumbnails(url)}
 
     def get_or_create_thumbnail(self, image_url: str, size_name: str) -> Optional[str]:
         """
@@ -75,43 +150,18 @@ class ImageCache:
             size_name: Thumbnail size ('small', 'medium', 'large')
 
         Returns:
-            Relative path to thumbnail, or None if failed
+            Path to thumbnail relative to base_dir, or None if failed
         """
         if not image_url or size_name not in THUMBNAIL_SIZES:
             return None
 
-        # Check cache first
-        cache_key = f"{image_url}_{size_name}"
-        if cache_key in self.cache:
-            cached_path = self.cache[cache_key].get('path')
-            if cached_path and (self.base_dir / cached_path).exists():
-                # Update access time
-                self.cache[cache_key]['accessed'] = datetime.now().isoformat()
-                return cached_path
-
-        # Create thumbnail
-        try:
-            thumb_path = create_thumbnail(image_url, size_name, self.thumbnails_dir / size_name)
-            if thumb_path:
-                # Cache the result
-                self.cache[cache_key] = {
-                    'path': thumb_path,
-                    'created': datetime.now().isoformat(),
-                    'accessed': datetime.now().isoformat(),
-                    'original_url': image_url,
-                    'size': size_name
-                }
-                self._save_cache()
-
-                # Check if we need cleanup
-                self._check_cache_size()
-
-                return thumb_path
-
-        except Exception as e:
-            logger.warning(f"Failed to create thumbnail for {image_url}: {e}")
+        cached_path = self.get_cached_thumbnail(image_url, size_name)
+        if cached_path:
+            return cached_path
 
-        return None
+        self.request(image_url)
+        self.process_pending(workers=1, wait=True)
+        return self.get_cached_thumbnail(image_url, size_name)
 
     def get_cached_thumbnail(self, image_url: str, size_name: str) -> Optional[str]:
         """
@@ -122,17 +172,17 @@ class ImageCache:
             size_name: Thumbnail size
 
         Returns:
-            Relative path to cached thumbnail, or None
+            Path to cached thumbnail relative to base_dir, or None
         """
-        cache_key = f"{image_url}_{size_name}"
-        if cache_key in self.cache:
-            cached_path = self.cache[cache_key].get('path')
-            if cached_path and (self.base_dir / cached_path).exists():
-                # Update access time
-                self.cache[cache_key]['accessed'] = datetime.now().isoformat()
-                return cached_path
-
-        return None
+        entry = self.cache.get((image_url, size_name))
+        if entry is None:
+            return None
+        now = time.time()
+        if now - entry[2] >= TOUCH_INTERVAL:
+            entry[2] = now
+            with self._lock:
+                self._touched[(image_url, size_name)] = now
+        return entry[0]
 
     def get_all_thumbnails(self, image_url: str) -> Dict[str, Optional[str]]:
         """
@@ -149,140 +199,308 @@ class ImageCache:
             thumbnails[size_name] = self.get_cached_thumbnail(image_url, size_name)
         return thumbnails
 
-    def _check_cache_size(self):
-        """Check if cache is too large and trigger cleanup if needed"""
-        try:
-            total_size = sum(
-                (self.base_dir / entry['path']).stat().st_size
-                for entry in self.cache.values()
-                if 'path' in entry and (self.base_dir / entry['path']).exists()
-            ) / (1024 * 1024)  # Convert to MB
+    def has_thumbnails(self, image_url: str) -> bool:
+        """Whether every size of image_url is cached"""
+        return all((image_url, size_name) in self.cache for size_name in THUMBNAIL_SIZES)
 
-            if total_size > self.max_cache_size_mb:
-                logger.info(f"Cache size {total_size:.1f}MB exceeds limit {self.max_cache_size_mb}MB, triggering cleanup")
-                self.cleanup_cache()
+    def request(self, image_url: str) -> bool:
+        """
+        Queue an image for thumbnailing by the next process_pending() run.
 
+        Args:
+            image_url: Original image URL
+
+        Returns:
+            True if the image was queued (not cached, not already queued, not recently failed)
+        """
+        if not image_url or self.has_thumbnails(image_url):
+            return False
+        failed_at = self._failed.get(image_url)
+        if failed_at is not None and time.time() - failed_at < FAILURE_RETRY:
+            return False
+        with self._lock:
+            if image_url in self._pending:
+                return False
+            self._pending[image_url] = None
+            return True
+
+    def process_pending(self, workers: Optional[int] = None, wait: bool = False) -> bool:
+        """
+        Save the queue and make thumbnails for every queued image in a background thread.
+
+        The thread is not a daemon: a process exiting right after generation waits for it.
+
+        Args:
+            workers: Worker processes (default: thumbnail_workers, else CPU count). 1, or a single
+                image, thumbnails in-process
+            wait: Block until the queue is drained
+
+        Returns:
+            True if a run was started (False if the queue was empty or a run is already going)
+        """
+        self._save_pending()
+        with self._lock:
+            running = self._worker is not None and self._worker.is_alive()
+            started = bool(self._pending) and not running
+            if started:
+                self._worker = threading.Thread(target=self._drain, args=(workers,), name="thumbnail-pipeline")
+                self._worker.start()
+            worker = self._worker
+        if wait and worker is not None:
+            worker.join()
+        return started
+
+    def _save_pending(self):
+        """Persist queued URLs so they survive the process (rows are removed as each image is recorded)"""
+        with self._lock:
+            urls = list(self._pending)
+        if not urls:
+            return
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                conn.executemany('INSERT OR IGNORE INTO image_thumbnail_queue (base_dir, image_url, queued_at) VALUES (?, ?, ?)',
+                                 [(self._key, url, now) for url in urls])
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not save the thumbnail queue: {e}")
+
+    def _take_pending(self) -> List[str]:
+        with self._lock:
+            urls = list(self._pending)
+            self._pending.clear()
+            return urls
+
+    def _drain(self, workers: Optional[int]):
+        """Thumbnail queued images until the queue stays empty"""
+        try:
+            while True:
+                urls = self._take_pending()
+                if not urls:
+                    break
+                start = time.time()
+                made = self._run_batch(urls, workers)
+                logger.info(f"Thumbnailed {made}/{len(urls)} images in {time.time() - start:.2f}s")
         except Exception as e:
-            logger.warning(f"Could not check cache size: {e}")
+            logger.error(f"Thumbnail pipeline failed: {e}", exc_info=True)
+        finally:
+            self._flush_touches()
+
+    def _run_batch(self, urls: List[str], workers: Optional[int]) -> int:
+        workers = workers or WEBSITE_CONFIG.get("thumbnail_workers") or os.cpu_count() or 1
+        workers = max(1, min(workers, len(urls)))
+        made = 0
+        in_process = urls if workers == 1 else []
+        if workers > 1:
+            # spawn: the admin app is multi-threaded, so don't fork it
+            project_root = str(Path(__file__).resolve().parent.parent)
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_init_worker, initargs=(project_root,)) as executor:
+                futures = {}
+                for n, url in enumerate(urls):
+                    try:
+                        futures[executor.submit(create_thumbnails, url, self.thumbnails_dir)] = url
+                    except RuntimeError:
+                        # The interpreter is exiting (process pools take no new work then): finish in-process
+                        in_process = urls[n:]
+                        break
+                for future in as_completed(futures):
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.warning(f"Could not create thumbnails for {futures[future]}: {e}")
+                        result = None
+                    made += self._record(futures[future], result)
+
+        for url in in_process:
+            made += self._record(url, create_thumbnails(url, self.thumbnails_dir))
+        return made
+
+    def _record(self, image_url: str, result: Optional[Dict[str, Tuple[str, int]]]) -> int:
+        """Index the thumbnails made for image_url (or its failure); returns 1 if it succeeded"""
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                conn.execute('DELETE FROM image_thumbnail_queue WHERE base_dir = ? AND image_url = ?', (self._key, image_url))
+                if not result:
+                    conn.execute('INSERT OR REPLACE INTO image_thumbnail_failures (base_dir, image_url, failed_at) '
+                                 'VALUES (?, ?, ?)', (self._key, image_url, now))
+                    conn.commit()
+                    self._failed[image_url] = now
+                    return 0
+
+                rows = []
+                for size_name, (filename, size_bytes) in result.items():
+                    path = f"images/thumbnails/{size_name}/{filename}"
+                    rows.append((self._key, image_url, size_name, path, size_bytes, now, now))
+                conn.executemany('INSERT OR REPLACE INTO image_thumbnails '
+                                 '(base_dir, image_url, size_name, path, bytes, created_at, accessed_at) '
+                                 'VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+                conn.execute('DELETE FROM image_thumbnail_failures WHERE base_dir = ? AND image_url = ?',
+                             (self._key, image_url))
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.error(f"Could not index thumbnails for {image_url}: {e}")
+            return 0
+
+        with self._lock:
+            for _, _, size_name, path, size_bytes, _, _ in rows:
+                previous = self.cache.get((image_url, size_name))
+                if previous is not None:
+                    self._total_bytes -= previous[1]
+                self.cache[(image_url, size_name)] = [path, size_bytes, now]
+                self._total_bytes += size_bytes
+            self._failed.pop(image_url, None)
+        self._check_cache_size()
+        return 1
+
+    def _flush_touches(self):
+        """Write batched access times to the index"""
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        if not touched:
+            return
+        try:
+            conn = self._connect()
+            try:
+                conn.executemany('UPDATE image_thumbnails SET accessed_at = ? '
+                                 'WHERE base_dir = ? AND image_url = ? AND size_name = ?',
+                                 [(accessed, self._key, url, size) for (url, size), accessed in touched.items()])
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not update thumbnail access times: {e}")
+
+    def _check_cache_size(self):
+        """Evict least recently used thumbnails while the running total exceeds the budget"""
+        max_bytes = self.max_cache_size_mb * 1024 * 1024
+        if self._total_bytes <= max_bytes:
+            return
+        logger.info(f"Cache size {self._total_bytes / (1024 * 1024):.1f}MB exceeds limit {self.max_cache_size_mb}MB, evicting")
+        self._flush_touches()
+        try:
+            conn = self._connect()
+            try:
+                while self._total_bytes > max_bytes:
+                    # Whole images (every size) go together, least recently used first
+                    victims = conn.execute('SELECT t.image_url, t.size_name, t.path, t.bytes FROM image_thumbnails t JOIN ('
+                                           '  SELECT image_url, MAX(accessed_at) AS last_used FROM image_thumbnails '
+                                           '  WHERE base_dir = ? GROUP BY image_url ORDER BY last_used LIMIT ?) lru '
+                                           'ON t.image_url = lru.image_url '
+                                           'WHERE t.base_dir = ? ORDER BY lru.last_used, t.image_url',
+                                           (self._key, EVICTION_BATCH, self._key)).fetchall()
+                    if not victims:
+                        break
+                    self._remove(conn, victims, max_bytes)
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not evict thumbnails: {e}")
+
+    def _remove(self, conn, victims: List[Tuple], stop_below: Optional[int] = None):
+        """Delete index rows and files for (image_url, size_name, path, bytes) rows, grouped by image_url
+
+        Args:
+            conn: Open index connection (caller commits)
+            victims: Rows to remove
+            stop_below: Stop at the first new image once the running total is at most this many bytes
+        """
+        removed = []
+        for image_url, size_name, path, size_bytes in victims:
+            if stop_below is not None and self._total_bytes <= stop_below and (not removed or image_url != removed[-1][1]):
+                break  # Under budget, and the last image is removed with all its sizes
+            try:
+                (self.base_dir / path).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Could not remove cached thumbnail {path}: {e}")
+            with self._lock:
+                if self.cache.pop((image_url, size_name), None) is not None:
+                    self._total_bytes -= size_bytes
+            removed.append((self._key, image_url, size_name))
+        conn.executemany('DELETE FROM image_thumbnails WHERE base_dir = ? AND image_url = ? AND size_name = ?', removed)
 
     def cleanup_cache(self, max_age_days: int = 30, keep_recent: int = 1000):
         """
         Clean up old cache entries.
 
         Args:
-            max_age_days: Remove thumbnails older than this many days
+            max_age_days: Remove thumbnails not used for this many days
             keep_recent: Keep at least this many recently accessed thumbnails
         """
+        self._flush_touches()
+        cutoff = time.time() - max_age_days * 86400
         try:
-            now = datetime.now()
-            cutoff_date = now - timedelta(days=max_age_days)
-
-            # Sort by access time (most recent first)
-            sorted_entries = sorted(
-                self.cache.items(),
-                key=lambda x: x[1].get('accessed', x[1].get('created', '2000-01-01')),
-                reverse=True
-            )
-
-            # Keep most recent entries
-            to_keep = sorted_entries[:keep_recent]
-
-            # Also keep entries newer than cutoff
-            recent_cutoff = []
-            for cache_key, entry in sorted_entries[keep_recent:]:
-                created = entry.get('created', '2000-01-01')
-                try:
-                    created_date = datetime.fromisoformat(created)
-                    if created_date > cutoff_date:
-                        recent_cutoff.append((cache_key, entry))
-                except:
-                    pass
-
-            # Combine kept entries
-            kept_entries = dict(to_keep + recent_cutoff)
-            removed_count = len(self.cache) - len(kept_entries)
-
-            if removed_count > 0:
-                logger.info(f"Cache cleanup: removed {removed_count} old thumbnails")
-
-                # Remove files that are no longer in cache
-                for cache_key, entry in self.cache.items():
-                    if cache_key not in kept_entries and 'path' in entry:
-                        try:
-                            thumb_file = self.base_dir / entry['path']
-                            if thumb_file.exists():
-                                thumb_file.unlink()
-                        except Exception as e:
-                            logger.warning(f"Could not remove cached thumbnail {entry['path']}: {e}")
-
-                # Update cache
-                self.cache = kept_entries
-                self._save_cache()
-
-        except Exception as e:
+            conn = self._connect()
+            try:
+                victims = conn.execute('SELECT image_url, size_name, path, bytes FROM image_thumbnails '
+                                       'WHERE base_dir = ? AND accessed_at < ? ORDER BY accessed_at DESC LIMIT -1 OFFSET ?',
+                                       (self._key, cutoff, keep_recent)).fetchall()
+                self._remove(conn, victims)
+                conn.execute('DELETE FROM image_thumbnail_failures WHERE base_dir = ? AND failed_at < ?',
+                             (self._key, cutoff))
+                conn.commit()
+            finally:
+                conn.close()
+            if victims:
+                logger.info(f"Cache cleanup: removed {len(victims)} old thumbnails")
+        except sqlite3.Error as e:
             logger.error(f"Cache cleanup failed: {e}")
 
     def get_cache_stats(self) -> Dict:
         """Get cache statistics"""
-        try:
-            total_files = len(self.cache)
-            total_size = 0
-            size_counts = {size: 0 for size in THUMBNAIL_SIZES.keys()}
-
-            for entry in self.cache.values():
-                if 'path' in entry:
-                    try:
-                        file_path = self.base_dir / entry['path']
-                        if file_path.exists():
-                            total_size += file_path.stat().st_size
-                            # Extract size from path
-                            if 'small' in entry['path']:
-                                size_counts['small'] += 1
-                            elif 'medium' in entry['path']:
-                                size_counts['medium'] += 1
-                            elif 'large' in entry['path']:
-                                size_counts['large'] += 1
-                    except:
-                        pass
-
-            return {
-                'total_files': total_files,
-                'total_size_mb': total_size / (1024 * 1024),
-                'size_breakdown': size_counts,
-                'max_cache_size_mb': self.max_cache_size_mb
-            }
-
-        except Exception as e:
-            logger.error(f"Could not get cache stats: {e}")
-            return {}
+        size_counts = {size: 0 for size in THUMBNAIL_SIZES.keys()}
+        for _, size_name in list(self.cache):
+            size_counts[size_name] = size_counts.get(size_name, 0) + 1
+        return {
+            'total_files': len(self.cache),
+            'total_size_mb': self._total_bytes / (1024 * 1024),
+            'size_breakdown': size_counts,
+            'max_cache_size_mb': self.max_cache_size_mb,
+            'pending': len(self._pending),
+            'failed': len(self._failed)
+        }
 
     def clear_cache(self):
         """Clear all cached thumbnails"""
         try:
-            for entry in self.cache.values():
-                if 'path' in entry:
-                    try:
-                        thumb_file = self.base_dir / entry['path']
-                        if thumb_file.exists():
-                            thumb_file.unlink()
-                    except Exception as e:
-                        logger.warning(f"Could not remove {entry['path']}: {e}")
-
-            self.cache = {}
-            self._save_cache()
+            conn = self._connect()
+            try:
+                victims = conn.execute('SELECT image_url, size_name, path, bytes FROM image_thumbnails WHERE base_dir = ?',
+                                       (self._key,)).fetchall()
+                self._remove(conn, victims)
+                conn.execute('DELETE FROM image_thumbnail_failures WHERE base_dir = ?', (self._key,))
+                conn.execute('DELETE FROM image_thumbnail_queue WHERE base_dir = ?', (self._key,))
+                conn.commit()
+            finally:
+                conn.close()
+            with self._lock:
+                self.cache = {}
+                self._pending = {}
+                self._failed = {}
+                self._touched = {}
+                self._total_bytes = 0
             logger.info("Image cache cleared")
-
-        except Exception as e:
+        except sqlite3.Error as e:
             logger.error(f"Could not clear cache: {e}")
 
 
 # Global cache instance
 _cache_instance = None
+_cache_lock = threading.Lock()
 
 
 def get_image_cache(base_dir: Path) -> ImageCache:
     """Get or create global image cache instance"""
     global _cache_instance
-    if _cache_instance is None or _cache_instance.base_dir != base_dir:
-        _cache_instance = ImageCache(base_dir)
-    return _cache_instance
\ No newline at end of file
+    with _cache_lock:
+        if _cache_instance is None or _cache_instance.base_dir != Path(base_dir):
+            _cache_instance = ImageCache(base_dir)
+        return _cache_instance
@@ -4,7 +4,8 @@ Resize images and convert to WebP format
 """
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
+import hashlib
 import logging
 import io
 import requests
@@ -24,6 +25,9 @@ MAX_IMAGE_WIDTH = 1200
 MAX_IMAGE_HEIGHT = 800
 WEBP_QUALITY = 85
 
+# Largest source image downloaded for thumbnailing (bytes)
+MAX_SOURCE_IMAGE_SIZE = 20 * 1024 * 1024
+
 # Thumbnail sizes for different use cases
 THUMBNAIL_SIZES = {
     'small': (200, 150),    # For trending sidebar, compact views
@@ -170,6 +174,82 @@ def create_thumbnail(image_url: str, size_name: str, output_dir: Optional[Path]
         return None
 
 
+def thumbnail_filename(image_url: str, size_name: str) -> str:
+    """File name of the thumbnail of image_url at size_name (stable across runs)"""
+    return f"{hashlib.md5(f'{image_url}_{size_name}'.encode()).hexdigest()[:12]}.webp"
+
+
+def create_thumbnails(image_url: str, thumbnails_dir: Path) -> Optional[Dict[str, Tuple[str, int]]]:
+    """
+    Download an image once and write every THUMBNAIL_SIZES thumbnail from a single decode.
+
+    JPEGs are decoded at reduced scale (draft mode) when even the largest thumbnail is much smaller
+    than the source. Runs in worker processes, so it only touches files under thumbnails_dir.
+
+    Args:
+        image_url: URL of the image to thumbnail
+        thumbnails_dir: Directory holding one subdirectory per size name
+
+    Returns:
+        Dict mapping size name to (file name, bytes written), or None if the image could not be used
+    """
+    if not PIL_AVAILABLE:
+        logger.debug(f"PIL not available, skipping thumbnail creation for {image_url}")
+        return None
+
+    try:
+        with requests.get(image_url, timeout=15, stream=True, headers={
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        }) as response:
+            if response.status_code != 200:
+                logger.debug(f"Failed to download image {image_url}: HTTP {response.status_code}")
+                return None
+
+            content_type = response.headers.get('content-type', '').lower()
+            if not content_type.startswith('image/'):
+                logger.debug(f"URL does not contain an image: {image_url} (content-type: {content_type})")
+                return None
+
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=65536):
+                body.extend(chunk)
+                if len(body) > MAX_SOURCE_IMAGE_SIZE:
+                    logger.debug(f"Image too large to thumbnail: {image_url}")
+                    return None
+
+        img = Image.open(io.BytesIO(body))
+        largest = max(THUMBNAIL_SIZES.values())
+        img.draft('RGB', largest)  # JPEG only: decode at the smallest scale still covering the largest size
+
+        # Convert to RGB once (for WebP without alpha), then resize copies from the same pixels
+        if img.mode in ('RGBA', 'LA', 'P'):
+            if img.mode != 'RGBA':
+                img = img.convert('RGBA')
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.split()[-1])
+            img = background
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        written = {}
+        # Largest first, each resized from the previous one, so every step works on fewer pixels
+        for size_name, target_size in sorted(THUMBNAIL_SIZES.items(), key=lambda item: item[1], reverse=True):
+            img = img.copy()
+            img.thumbnail(target_size, Image.Resampling.LANCZOS)
+            output_dir = thumbnails_dir / size_name
+            output_dir.mkdir(parents=True, exist_ok=True)
+            filename = thumbnail_filename(image_url, size_name)
+            temp_path = output_dir / f".{filename}.{os.getpid()}.tmp"
+            img.save(temp_path, 'WEBP', quality=80, optimize=True)
+            os.replace(temp_path, output_dir / filename)
+            written[size_name] = (filename, (output_dir / filename).stat().st_size)
+        return written
+
+    except Exception as e:
+        logger.warning(f"Could not create thumbnails for {image_url}: {e}")
+        return None
+
+
 def get_thumbnail_path(image_url: str, size_name: str, base_dir: Path) -> Optional[str]:
     """
     Get the cached thumbnail path for an image URL and size.
@@ -0,0 +1,341 @@
+"""
+Disk cache for the /cached-images proxy
+Upstream images are stored once by content hash (blobs/ab/<sha256>) and indexed by URL in the
+image_proxy_cache table, so the proxy serves them from disk (sendfile) instead of re-fetching from
+the publisher for every visitor. The cache has a byte budget: the least recently used URLs are
+evicted when a new image would exceed it. Concurrent misses for one URL share a single upstream
+fetch. Entries older than max_age are revalidated with If-None-Match / If-Modified-Since, and the
+stale copy is served if the publisher can't be reached.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+
+from config import DATABASE_CONFIG, WEBSITE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Largest upstream image accepted (bytes)
+MAX_IMAGE_SIZE = 20 * 1024 * 1024
+
+# Seconds between access-time updates for a cached URL (keeps hits from writing on every request)
+TOUCH_INTERVAL = 60
+
+UPSTREAM_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Referer': 'https://fallriver.live/',
+    'Sec-Fetch-Dest': 'image',
+    'Sec-Fetch-Mode': 'no-cors',
+    'Sec-Fetch-Site': 'cross-site'
+}
+
+
+class ImageFetchError(Exception):
+    """Upstream image could not be fetched; status is the HTTP status to answer with"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def init_image_proxy_table(cursor):
+    """Create the image_proxy_cache table if it doesn't exist"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS image_proxy_cache (
+            url TEXT PRIMARY KEY,
+            sha256 TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            content_type TEXT NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_image_proxy_cache_accessed ON image_proxy_cache(accessed_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_image_proxy_cache_sha256 ON image_proxy_cache(sha256)')
+
+
+class ImageProxyCache:
+    """Content-addressed, size-bounded disk cache of upstream images"""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None,
+                 max_age: Optional[int] = None, db_path: Optional[str] = None):
+        """
+        Args:
+            cache_dir: Blob directory (default: image_proxy_cache_dir)
+            max_bytes: Byte budget (default: image_proxy_cache_mb)
+            max_age: Seconds before an entry is revalidated upstream (default: image_proxy_max_age)
+            db_path: Database holding the index (default: the main database)
+        """
+        cache_dir = Path(cache_dir or WEBSITE_CONFIG.get("image_proxy_cache_dir") or os.path.join("cache", "images"))
+        self.cache_dir = cache_dir if cache_dir.is_absolute() else PROJECT_ROOT / cache_dir
+        self.max_bytes = max_bytes if max_bytes is not None else WEBSITE_CONFIG.get("image_proxy_cache_mb", 512) * 1024 * 1024
+        self.max_age = max_age if max_age is not None else WEBSITE_CONFIG.get("image_proxy_max_age", 86400)
+        self.db_path = db_path or DATABASE_CONFIG.get("path", "fallriver_news.db")
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, threading.Event] = {}
+        self._total: Optional[int] = None
+        self._initialized = False
+        self.fetches = 0
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._initialized:
+            with conn:
+                init_image_proxy_table(conn.cursor())
+            self._initialized = True
+        return conn
+
+    def blob_path(self, sha256: str) -> Path:
+        """Where the content with this hash is stored"""
+        return self.cache_dir / 'blobs' / sha256[:2] / sha256
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """Index entry for url whose blob is on disk, or None"""
+        conn = self._connect()
+        try:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute('SELECT * FROM image_proxy_cache WHERE url = ?', (url,)).fetchone()
+            if row is None:
+                return None
+            entry = dict(row)
+            entry['path'] = self.blob_path(entry['sha256'])
+            if not entry['path'].is_file():
+                conn.execute('DELETE FROM image_proxy_cache WHERE url = ?', (url,))
+                conn.commit()
+                return None
+            now = time.time()
+            if now - entry['accessed_at'] >= TOUCH_INTERVAL:
+                conn.execute('UPDATE image_proxy_cache SET accessed_at = ? WHERE url = ?', (now, url))
+                conn.commit()
+            return entry
+        finally:
+            conn.close()
+
+    def get(self, url: str) -> Dict:
+        """Cached entry for url, fetching or revalidating upstream when needed
+
+        Args:
+            url: Full upstream image URL (already validated against trusted domains)
+
+        Returns:
+            Dict with path (blob on disk), sha256, size and content_type
+
+        Raises:
+            ImageFetchError: Nothing cached and the upstream fetch failed
+        """
+        entry = self.lookup(url)
+        if entry is not None and time.time() - entry['fetched_at'] < self.max_age:
+            return entry
+
+        with self._lock:
+            event = self._inflight.get(url)
+            leader = event is None
+            if leader:
+                event = self._inflight[url] = threading.Event()
+        if not leader:
+            event.wait(timeout=30)  # Another request is fetching this URL
+            fresh = self.lookup(url)
+            if fresh is not None:
+                return fresh
+            if entry is not None:
+                return entry
+            raise ImageFetchError(502, "Bad Gateway")
+
+        try:
+            return self._fetch(url, entry)
+        except ImageFetchError:
+            if entry is not None:
+                logger.warning(f"Serving stale cached image for {url}")
+                return entry
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(url, None)
+            event.set()
+
+    def _fetch(self, url: str, stale: Optional[Dict]) -> Dict:
+        headers = dict(UPSTREAM_HEADERS)
+        if stale is not None:
+            if stale.get('etag'):
+                headers['If-None-Match'] = stale['etag']
+            if stale.get('last_modified'):
+                headers['If-Modified-Since'] = stale['last_modified']
+
+        self.fetches += 1
+        try:
+            response = requests.get(url, headers=headers, stream=True, timeout=15, allow_redirects=True)
+        except requests.exceptions.Timeout:
+            logger.warning(f"Timeout fetching image: {url}")
+            raise ImageFetchError(504, "Gateway Timeout")
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Request error fetching image {url}: {e}")
+            raise ImageFetchError(502, "Bad Gateway")
+
+        with response:
+            if response.status_code == 304 and stale is not None:
+                self._touch_fetched(url)
+                return stale
+            if response.status_code != 200:
+                logger.warning(f"Failed to fetch image {url}: HTTP {response.status_code}")
+                raise ImageFetchError(404, f"Not Found: HTTP {response.status_code}")
+
+            content_type = response.headers.get('content-type', '').lower()
+            if not content_type.startswith('image/'):
+                logger.warning(f"URL does not return image content: {url} (content-type: {content_type})")
+                raise ImageFetchError(404, f"Not an image: {content_type}")
+
+            sha256, size, temp_path = self._download(response)
+
+        path = self.blob_path(sha256)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(temp_path, path)  # Same content is the same file
+        except OSError:
+            os.unlink(temp_path)
+            raise
+
+        now = time.time()
+        entry = {'url': url, 'sha256': sha256, 'size': size, 'content_type': content_type,
+                 'etag': response.headers.get('etag'), 'last_modified': response.headers.get('last-modified'),
+                 'fetched_at': now, 'accessed_at': now}
+        self._store(entry, replaced=stale)
+        entry['path'] = path
+        return entry
+
+    def _download(self, response):
+        """Stream the body to a temporary file while hashing it"""
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.download.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=65536):
+                    size += len(chunk)
+                    if size > MAX_IMAGE_SIZE:
+                        raise ImageFetchError(404, "Image too large")
+                    digest.update(chunk)
+                    f.write(chunk)
+        except requests.exceptions.RequestException as e:
+            os.unlink(temp_path)
+            logger.warning(f"Error downloading image {response.url}: {e}")
+            raise ImageFetchError(502, "Bad Gateway")
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        os.chmod(temp_path, 0o644)
+        return digest.hexdigest(), size, temp_path
+
+    def _store(self, entry: Dict, replaced: Optional[Dict] = None):
+        conn = self._connect()
+        try:
+            with conn:
+                new_blob = not self._referenced(conn, entry['sha256'])
+                conn.execute('''
+                    INSERT OR REPLACE INTO image_proxy_cache
+                        (url, sha256, size, content_type, etag, last_modified, fetched_at, accessed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (entry['url'], entry['sha256'], entry['size'], entry['content_type'], entry['etag'],
+                      entry['last_modified'], entry['fetched_at'], entry['accessed_at']))
+            with self._lock:
+                total = self._total_bytes(conn)
+                if new_blob:
+                    total += entry['size']
+                if replaced is not None and replaced['sha256'] != entry['sha256']:
+                    total -= self._remove_unreferenced(conn, replaced['sha256'], replaced['size'])
+                self._total = total
+                if total > self.max_bytes:
+                    self._evict(conn, keep=entry['url'])
+        finally:
+            conn.close()
+
+    def _touch_fetched(self, url: str):
+        conn = self._connect()
+        try:
+            with conn:
+                now = time.time()
+                conn.execute('UPDATE image_proxy_cache SET fetched_at = ?, accessed_at = ? WHERE url = ?',
+                             (now, now, url))
+        finally:
+            conn.close()
+
+    def _total_bytes(self, conn, refresh: bool = False) -> int:
+        """Running total of stored bytes (URLs sharing content share a blob)"""
+        if self._total is None or refresh:
+            row = conn.execute('SELECT COALESCE(SUM(size), 0) FROM '
+                               '(SELECT MAX(size) AS size FROM image_proxy_cache GROUP BY sha256)').fetchone()
+            self._total = row[0]
+        return self._total
+
+    def _evict(self, conn, keep: Optional[str] = None):
+        """Drop least recently used URLs until the stored blobs fit the byte budget"""
+        total = self._total_bytes(conn, refresh=True)  # Other server processes may have stored images
+        evicted = 0
+        while total > self.max_bytes:
+            rows = conn.execute('SELECT url, sha256, size FROM image_proxy_cache WHERE url != ? '
+                                'ORDER BY accessed_at LIMIT 64', (keep or '',)).fetchall()
+            if not rows:
+                break
+            for url, sha256, size in rows:
+                with conn:
+                    conn.execute('DELETE FROM image_proxy_cache WHERE url = ?', (url,))
+                evicted += 1
+                total -= self._remove_unreferenced(conn, sha256, size)
+                if total <= self.max_bytes:
+                    break
+        self._total = total
+        logger.info(f"Image proxy cache evicted {evicted} URL(s); {total / (1024 * 1024):.1f}MB stored")
+
+    def _referenced(self, conn, sha256: str) -> bool:
+        return conn.execute('SELECT 1 FROM image_proxy_cache WHERE sha256 = ? LIMIT 1', (sha256,)).fetchone() is not None
+
+    def _remove_unreferenced(self, conn, sha256: str, size: int) -> int:
+        """Delete a blob no URL refers to any more; returns the bytes freed"""
+        if self._referenced(conn, sha256):
+            return 0
+        try:
+            self.blob_path(sha256).unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove cached image {sha256}: {e}")
+        return size
+
+    def get_stats(self) -> Dict:
+        """Entry count and stored size"""
+        conn = self._connect()
+        try:
+            count = conn.execute('SELECT COUNT(*) FROM image_proxy_cache').fetchone()[0]
+            return {'entries': count, 'total_size_mb': self._total_bytes(conn) / (1024 * 1024),
+                    'max_size_mb': self.max_bytes / (1024 * 1024), 'upstream_fetches': self.fetches}
+        finally:
+            conn.close()
+
+
+_image_proxy_cache: Optional[ImageProxyCache] = None
+_image_proxy_cache_lock = threading.Lock()
+
+
+def get_image_proxy_cache() -> ImageProxyCache:
+    """Process-wide image proxy cache"""
+    global _image_proxy_cache
+    with _image_proxy_cache_lock:
+        if _image_proxy_cache is None:
+            _image_proxy_cache = ImageProxyCache()
+        return _image_proxy_cache
@@ -0,0 +1,434 @@
+"""
+Persistent background job queue for admin operations
+Jobs live in the jobs table so their progress, timings and results survive the request that
+started them. A small pool of daemon threads claims queued jobs; duplicate submissions for the
+same (job type, zip code) coalesce into the job that is already waiting (optionally debounced,
+so a burst of triggers becomes one run), and two jobs with the same key never run at once.
+Running jobs are cancelled cooperatively through JobContext.
+"""
+import json
+import logging
+import os
+import sqlite3
+import subprocess
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from config import DATABASE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ('queued', 'running', 'succeeded', 'failed', 'cancelled')
+FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+# Seconds between progress row updates (the final update is always written)
+PROGRESS_INTERVAL = 0.5
+
+# Seconds between cancel_requested checks while a job is running
+CANCEL_CHECK_INTERVAL = 1.0
+
+JOB_COLUMNS = ('id', 'job_type', 'zip_code', 'status', 'params', 'processed', 'total', 'message',
+               'result', 'error', 'cancel_requested', 'worker_pid', 'created_at', 'run_after', 'started_at', 'finished_at')
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job has been cancelled"""
+
+
+def init_jobs_table(cursor):
+    """Create the jobs table if it doesn't exist"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_type TEXT NOT NULL,
+            zip_code TEXT,
+            status TEXT NOT NULL DEFAULT 'queued',
+            params TEXT,
+            processed INTEGER DEFAULT 0,
+            total INTEGER,
+            message TEXT,
+            result TEXT,
+            error TEXT,
+            cancel_requested INTEGER DEFAULT 0,
+            worker_pid INTEGER,
+            created_at REAL NOT NULL,
+            run_after REAL,
+            started_at REAL,
+            finished_at REAL
+        )
+    ''')
+    try:
+        cursor.execute('ALTER TABLE jobs ADD COLUMN run_after REAL')
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, job_type, zip_code)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at DESC)')
+
+
+def _row_to_job(row) -> Dict:
+    job = dict(zip(JOB_COLUMNS, row))
+    job['params'] = json.loads(job['params']) if job['params'] else {}
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    job['cancel_requested'] = bool(job['cancel_requested'])
+    end = job['finished_at'] or (time.time() if job['started_at'] else None)
+    job['duration'] = round(end - job['started_at'], 2) if job['started_at'] and end else None
+    job['percent'] = round(100.0 * job['processed'] / job['total'], 1) if job['total'] else None
+    return job
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobContext:
+    """Handle passed to a job handler for reporting progress and honouring cancellation"""
+
+    def __init__(self, queue: "JobQueue", job: Dict):
+        self.queue = queue
+        self.job_id = job['id']
+        self.zip_code = job['zip_code']
+        self.params = job['params']
+        self._last_progress = 0.0
+        self._last_cancel_check = 0.0
+        self._cancelled = False
+
+    @property
+    def cancelled(self) -> bool:
+        """True once cancellation was requested (re-read at most every CANCEL_CHECK_INTERVAL)"""
+        now = time.time()
+        if not self._cancelled and now - self._last_cancel_check >= CANCEL_CHECK_INTERVAL:
+            self._last_cancel_check = now
+            self._cancelled = self.queue._cancel_requested(self.job_id)
+        return self._cancelled
+
+    def check_cancelled(self):
+        """Raise JobCancelled if the job should stop"""
+        if self.cancelled:
+            raise JobCancelled()
+
+    def progress(self, processed: int, total: Optional[int] = None, message: Optional[str] = None):
+        """Record progress (throttled) and stop the job here if it was cancelled
+
+        Matches the progress(processed, total) callbacks of rescore_articles and run_article_job.
+        """
+        now = time.time()
+        if now - self._last_progress >= PROGRESS_INTERVAL or (total is not None and processed >= total):
+            self._last_progress = now
+            self.queue._update(self.job_id, processed=processed, total=total, message=message)
+        self.check_cancelled()
+
+    def message(self, message: str):
+        """Record a status message without touching the counters"""
+        self.queue._update(self.job_id, message=message)
+        self.check_cancelled()
+
+    def run_command(self, cmd: Sequence[str], timeout: float, cwd: Optional[str] = None) -> str:
+        """Run a subprocess, killing it if the job is cancelled or the timeout passes
+
+        Returns:
+            Combined stdout/stderr
+
+        Raises:
+            JobCancelled, TimeoutError, or RuntimeError on a non-zero exit
+        """
+        logger.info(f"[JOB {self.job_id}] Running: {' '.join(cmd)}")
+        start = time.time()
+        proc = subprocess.Popen(list(cmd), stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, cwd=cwd)
+        while True:
+            try:
+                output, _ = proc.communicate(timeout=CANCEL_CHECK_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                if self.cancelled or time.time() - start > timeout:
+                    proc.kill()
+                    proc.communicate()
+                    if self._cancelled:
+                        raise JobCancelled()
+                    raise TimeoutError(f"Command timed out after {timeout}s: {' '.join(cmd)}")
+        if proc.returncode != 0:
+            raise RuntimeError(f"Command exited with {proc.returncode}: {(output or '')[-2000:]}")
+        return output or ''
+
+
+Handler = Callable[[JobContext], Optional[Dict]]
+
+
+class JobQueue:
+    """SQLite-backed job queue with an in-process worker pool"""
+
+    def __init__(self, db_path: Optional[str] = None, workers: int = 2, poll_interval: float = 2.0):
+        self.db_path = db_path or DATABASE_CONFIG.get("path", "fallriver_news.db")
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.handlers: Dict[str, Handler] = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._start_lock = threading.Lock()
+        conn = self._connect()
+        try:
+            init_jobs_table(conn.cursor())
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def register(self, job_type: str, handler: Handler):
+        """Register the function that runs jobs of job_type"""
+        self.handlers[job_type] = handler
+
+    def submit(self, job_type: str, zip_code: Optional[str] = None, params: Optional[Dict] = None,
+               delay: float = 0.0, max_delay: Optional[float] = None) -> Tuple[Dict, bool]:
+        """Queue a job unless an identical one is already waiting
+
+        A job that is already running doesn't absorb the submission - the data may have changed
+        since it started - so at most one follow-up is queued behind it.
+
+        Args:
+            job_type: Registered job type
+            zip_code: Optional zip code (part of the coalescing key)
+            params: Optional JSON-serializable parameters for a newly created job
+            delay: Debounce - the job starts no earlier than delay seconds after the latest submission
+            max_delay: Cap on how far repeated submissions can push back a waiting job's start
+
+        Returns:
+            (job, created) - created is False when the submission coalesced into a queued job
+        """
+        if job_type not in self.handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        conn = self._connect()
+        try:
+            conn.isolation_level = None
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute(f'''
+                SELECT {', '.join(JOB_COLUMNS)} FROM jobs
+                WHERE job_type = ? AND zip_code IS ? AND status = 'queued'
+                ORDER BY id LIMIT 1
+            ''', (job_type, zip_code))
+            row = cursor.fetchone()
+            now = time.time()
+            if row:
+                job = _row_to_job(row)
+                if delay:
+                    run_after = max(job['run_after'] or now, now + delay)
+                    if max_delay is not None:
+                        run_after = min(run_after, job['created_at'] + max_delay)
+                    cursor.execute('UPDATE jobs SET run_after = ? WHERE id = ?', (run_after, job['id']))
+                    job['run_after'] = run_after
+                cursor.execute('COMMIT')
+                return job, False
+            cursor.execute('''
+                INSERT INTO jobs (job_type, zip_code, status, params, created_at, run_after)
+                VALUES (?, ?, 'queued', ?, ?, ?)
+            ''', (job_type, zip_code, json.dumps(params or {}), now, now + delay))
+            job_id = cursor.lastrowid
+            cursor.execute('COMMIT')
+        finally:
+            conn.close()
+        logger.info(f"[JOB {job_id}] Queued {job_type} for zip {zip_code or 'all'}")
+        self.start()
+        self._wake.set()
+        return self.get_job(job_id), True
+
+    def get_job(self, job_id: int) -> Optional[Dict]:
+        """One job by ID"""
+        conn = self._connect()
+        try:
+            row = conn.execute(f'SELECT {", ".join(JOB_COLUMNS)} FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return _row_to_job(row) if row else None
+
+    def list_jobs(self, status: Optional[str] = None, job_type: Optional[str] = None,
+                  zip_code: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """Most recent jobs first, optionally filtered"""
+        query = f'SELECT {", ".join(JOB_COLUMNS)} FROM jobs WHERE 1=1'
+        params: List = []
+        if status:
+            query += ' AND status = ?'
+            params.append(status)
+        if job_type:
+            query += ' AND job_type = ?'
+            params.append(job_type)
+        if zip_code:
+            query += ' AND zip_code = ?'
+            params.append(zip_code)
+        query += ' ORDER BY id DESC LIMIT ?'
+        params.append(limit)
+        conn = self._connect()
+        try:
+            rows = conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+        return [_row_to_job(row) for row in rows]
+
+    def cancel(self, job_id: int) -> Optional[Dict]:
+        """Cancel a queued job now, or ask a running one to stop at its next checkpoint"""
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE jobs SET status = 'cancelled', finished_at = ?, message = 'Cancelled before start'
+                WHERE id = ? AND status = 'queued'
+            ''', (time.time(), job_id))
+            cursor.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,))
+            conn.commit()
+        finally:
+            conn.close()
+        return self.get_job(job_id)
+
+    def start(self):
+        """Start the worker threads (once per queue)"""
+        with self._start_lock:
+            if self._threads:
+                return
+            self._recover_interrupted()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self):
+        """Stop the worker threads after their current job"""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._stop.clear()
+
+    def run_pending(self) -> int:
+        """Run queued jobs in the calling thread until none can be claimed (scripts and tests)
+
+        Returns:
+            Number of jobs run
+        """
+        count = 0
+        job = self._claim()
+        while job:
+            self._run(job)
+            count += 1
+            job = self._claim()
+        return count
+
+    def _recover_interrupted(self):
+        """Fail 'running' jobs whose worker process has gone away (e.g. a server restart)"""
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, worker_pid FROM jobs WHERE status = 'running'")
+            stale = [job_id for job_id, pid in cursor.fetchall() if pid == os.getpid() or not _pid_alive(pid)]
+            cursor.executemany('''
+                UPDATE jobs SET status = 'failed', error = 'Interrupted (worker process stopped)', finished_at = ?
+                WHERE id = ?
+            ''', [(time.time(), job_id) for job_id in stale])
+            conn.commit()
+        finally:
+            conn.close()
+        if stale:
+            logger.warning(f"Marked {len(stale)} interrupted job(s) as failed: {stale}")
+
+    def _claim(self) -> Optional[Dict]:
+        """Atomically move the oldest runnable queued job to running"""
+        conn = self._connect()
+        try:
+            conn.isolation_level = None
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute(f'''
+                SELECT {', '.join(JOB_COLUMNS)} FROM jobs AS queued
+                WHERE status = 'queued' AND COALESCE(run_after, 0) <= ? AND NOT EXISTS (
+                    SELECT 1 FROM jobs AS running
+                    WHERE running.status = 'running' AND running.job_type = queued.job_type
+                    AND running.zip_code IS queued.zip_code
+                )
+                ORDER BY id LIMIT 1
+            ''', (time.time(),))
+            row = cursor.fetchone()
+            if row is None:
+                cursor.execute('COMMIT')
+                return None
+            cursor.execute('''
+                UPDATE jobs SET status = 'running', started_at = ?, worker_pid = ? WHERE id = ?
+            ''', (time.time(), os.getpid(), row[0]))
+            cursor.execute('COMMIT')
+        finally:
+            conn.close()
+        return self.get_job(row[0])
+
+    def _seconds_until_due(self) -> float:
+        """Time until the next debounced job may start (capped at poll_interval)"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT MIN(COALESCE(run_after, 0)) FROM jobs WHERE status = 'queued'").fetchone()
+        finally:
+            conn.close()
+        if row is None or row[0] is None:
+            return self.poll_interval
+        return min(self.poll_interval, max(0.05, row[0] - time.time()))
+
+    def _cancel_requested(self, job_id: int) -> bool:
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT cancel_requested FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return bool(row and row[0])
+
+    def _update(self, job_id: int, **fields):
+        fields = {key: value for key, value in fields.items() if value is not None}
+        if not fields:
+            return
+        conn = self._connect()
+        try:
+            assignments = ', '.join(f'{key} = ?' for key in fields)
+            conn.execute(f'UPDATE jobs SET {assignments} WHERE id = ?', list(fields.values()) + [job_id])
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _run(self, job: Dict):
+        context = JobContext(self, job)
+        label = f"[JOB {job['id']}] {job['job_type']} (zip {job['zip_code'] or 'all'})"
+        logger.info(f"{label} started")
+        try:
+            result = self.handlers[job['job_type']](context)
+            status, fields = 'succeeded', {'result': json.dumps(result) if result is not None else None}
+        except JobCancelled:
+            status, fields = 'cancelled', {'message': 'Cancelled'}
+        except Exception as e:
+            logger.error(f"{label} failed: {e}", exc_info=True)
+            status, fields = 'failed', {'error': str(e)}
+        self._update(job['id'], status=status, finished_at=time.time(), **fields)
+        logger.info(f"{label} {status}")
+
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            try:
+                job = self._claim()
+            except sqlite3.Error as e:
+                logger.warning(f"Job queue claim failed: {e}")
+                job = None
+            if job is None:
+                try:
+                    timeout = self._seconds_until_due()
+                except sqlite3.Error:
+                    timeout = self.poll_interval
+                self._wake.wait(timeout)
+                self._wake.clear()
+                continue
+            self._run(job)
+            # A finished job may unblock a follow-up with the same key
+            self._wake.set()
@@ -0,0 +1,316 @@
+"""
+Multi-core article jobs (rescoring, recategorization)
+Article IDs are split into contiguous ranges and processed by a ProcessPoolExecutor. Each worker
+keeps its own read-only connection and per-zip models (relevance scorer, categorizer) for its
+lifetime; write rows stream back to the parent, which is the only writer and commits in batches.
+"""
+import logging
+import multiprocessing
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import DATABASE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# (kind, params) - kind selects the job's write statement
+WriteRow = Tuple[str, tuple]
+
+
+class ArticleJob:
+    """One shardable pass over articles"""
+
+    # kind -> SQL executed with executemany() by the writer
+    writes: Dict[str, str] = {}
+
+    # Buffer every write row and commit them, after begin_writes(), in one transaction at the end,
+    # so a failed or cancelled run changes nothing
+    atomic = False
+
+    def begin_writes(self, cursor: sqlite3.Cursor, zip_code: Optional[str], options: Dict):
+        """Writes made by the writer ahead of the shard results (committed with the first batch)"""
+
+    def load_model(self, conn: sqlite3.Connection, zip_code: Optional[str], options: Dict):
+        """Build whatever the job needs per worker and zip (called once, then reused)"""
+        return None
+
+    def process(self, conn: sqlite3.Connection, model, lo: int, hi: int,
+                zip_code: Optional[str], options: Dict) -> Tuple[int, List[WriteRow]]:
+        """Process articles with lo <= id <= hi
+
+        Returns:
+            (articles processed, write rows)
+        """
+        raise NotImplementedError
+
+
+def _select_range(conn, columns: str, lo: int, hi: int, zip_code: Optional[str], extra_where: str = ''):
+    query = f'SELECT {columns} FROM articles WHERE id BETWEEN ? AND ?{extra_where}'
+    params = [lo, hi]
+    if zip_code:
+        query += ' AND zip_code = ?'
+        params.append(zip_code)
+    return conn.execute(query, params).fetchall()
+
+
+class RescoreJob(ArticleJob):
+    """BatchRelevanceScorer rescoring with threshold / Bayesian auto-filtering (see rescore_articles)"""
+
+    writes = {
+        'score': 'UPDATE articles SET relevance_score = ? WHERE id = ?',
+        'filter': '''
+            INSERT OR REPLACE INTO article_management
+            (article_id, enabled, is_auto_filtered, auto_reject_reason, zip_code)
+            VALUES (?, 0, 1, ?, ?)
+        ''',
+    }
+
+    atomic = True
+
+    def begin_writes(self, cursor, zip_code, options):
+        # Clear existing auto-filtered status for re-evaluation
+        if zip_code:
+            cursor.execute('UPDATE article_management SET is_auto_filtered = 0, auto_reject_reason = NULL WHERE zip_code = ? AND is_auto_filtered = 1', (zip_code,))
+        else:
+            cursor.execute('UPDATE article_management SET is_auto_filtered = 0, auto_reject_reason = NULL WHERE is_auto_filtered = 1')
+
+    def load_model(self, conn, zip_code, options):
+        from utils.batch_relevance import BatchRelevanceScorer
+        # The Bayesian learner and its patterns are loaded once by the parent (see _rescore_all_parallel)
+        return (BatchRelevanceScorer(zip_code=options.get('config_zip') or zip_code, now=options.get('now'), db_path=options.get('db_path')),
+                options.get('learner'), options.get('patterns'))
+
+    def process(self, conn, model, lo, hi, zip_code, options):
+        from utils.batch_relevance import RESCORE_COLUMNS, _row_to_article, evaluate_scores
+        scorer, learner, patterns = model
+        articles = [_row_to_article(row) for row in _select_range(conn, RESCORE_COLUMNS, lo, hi, zip_code)]
+        if not articles:
+            return 0, []
+        score_updates, filter_rows = evaluate_scores(articles, scorer.score(articles), options['relevance_threshold'],
+                                                     options.get('config_zip') or zip_code, learner, patterns)
+        return len(articles), [('score', row) for row in score_updates] + [('filter', row) for row in filter_rows]
+
+
+class RelevanceV2Job(ArticleJob):
+    """Per-article relevance_calculator_v2 scores (uses each article's own zip code)"""
+
+    writes = {'score': 'UPDATE articles SET relevance_score = ? WHERE id = ?'}
+
+    def process(self, conn, model, lo, hi, zip_code, options):
+        from utils.relevance_calculator_v2 import calculate_relevance_score
+        rows = _select_range(conn, 'id, title, content, summary, source, published, zip_code, relevance_score', lo, hi, zip_code)
+        updates = []
+        for row in rows:
+            article = {
+                'id': row['id'],
+                'title': row['title'] or '',
+                'content': row['content'] or '',
+                'summary': row['summary'] or '',
+                'source': row['source'] or '',
+                'published': row['published'] or '',
+                'zip_code': row['zip_code'] or '02720'
+            }
+            try:
+                new_score = calculate_relevance_score(article, zip_code=row['zip_code'])
+            except Exception as e:
+                logger.warning(f"Error calculating score for article {row['id']}: {e}")
+                continue
+            if row['relevance_score'] is None or abs(row['relevance_score'] - new_score) > 1e-9:
+                updates.append(('score', (new_score, row['id'])))
+        return len(rows), updates
+
+
+class CategorizeJob(ArticleJob):
+    """SmartCategorizer recategorization, skipping manually overridden categories"""
+
+    writes = {
+        'category': '''
+            UPDATE articles SET category = ?, primary_category = ?, category_confidence = ?
+            WHERE id = ? AND COALESCE(category_override, 0) = 0
+        ''',
+    }
+
+    def load_model(self, conn, zip_code, options):
+        # Categorizers per article zip, each with its keywords loaded once
+        return {}
+
+    def process(self, conn, model, lo, hi, zip_code, options):
+        from utils.smart_categorizer import SmartCategorizer
+        rows = _select_range(conn, 'id, title, content, summary, zip_code, category, primary_category, category_confidence',
+                             lo, hi, zip_code, ' AND COALESCE(category_override, 0) = 0')
+        updates = []
+        for row in rows:
+            article_zip = zip_code or row['zip_code']
+            if article_zip not in model:
+                model[article_zip] = SmartCategorizer(article_zip).preload_keywords(conn)
+            primary_category, confidence, _ = model[article_zip].categorize_article(
+                {'title': row['title'] or '', 'content': row['content'] or '', 'summary': row['summary'] or ''})
+
+            # Same database format recalculate_articles.py writes
+            category = primary_category.replace(' ', '-').lower()
+            primary_category_db = primary_category.replace('-', ' ').title()
+            new_values = (category, primary_category_db, confidence / 100.0)
+            if new_values != (row['category'], row['primary_category'], row['category_confidence']):
+                updates.append(('category', new_values + (row['id'],)))
+        return len(rows), updates
+
+
+JOBS: Dict[str, ArticleJob] = {
+    'rescore': RescoreJob(),
+    'relevance_v2': RelevanceV2Job(),
+    'categorize': CategorizeJob(),
+}
+
+
+class _WorkerState:
+    """Per-process read-only connection and models"""
+
+    def __init__(self, db_path: str, options: Dict):
+        self.db_path = db_path
+        self.options = options
+        self.models = {}
+        self._conn = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(Path(self.db_path).resolve().as_uri() + '?mode=ro', uri=True)
+            self._conn.row_factory = sqlite3.Row
+        return self._conn
+
+    def run(self, job_name: str, zip_code: Optional[str], lo: int, hi: int) -> Tuple[int, List[WriteRow]]:
+        job = JOBS[job_name]
+        key = (job_name, zip_code)
+        if key not in self.models:
+            self.models[key] = job.load_model(self.conn, zip_code, self.options)
+        return job.process(self.conn, self.models[key], lo, hi, zip_code, self.options)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+_worker_state: Optional[_WorkerState] = None
+
+
+def _init_worker(db_path: str, options: Dict):
+    global _worker_state
+    _worker_state = _WorkerState(db_path, options)
+
+
+def _run_shard(job_name: str, zip_code: Optional[str], lo: int, hi: int) -> Tuple[int, List[WriteRow]]:
+    return _worker_state.run(job_name, zip_code, lo, hi)
+
+
+def article_id_shards(cursor, zip_code: Optional[str] = None, shard_size: int = 500) -> Tuple[List[Tuple[int, int]], int]:
+    """Contiguous (lo, hi) ID ranges of about shard_size articles each
+
+    Returns:
+        (shards, total article count)
+    """
+    if zip_code:
+        cursor.execute('SELECT id FROM articles WHERE zip_code = ? ORDER BY id', (zip_code,))
+    else:
+        cursor.execute('SELECT id FROM articles ORDER BY id')
+    ids = [row[0] for row in cursor.fetchall()]
+    shards = [(ids[i], ids[min(i + shard_size, len(ids)) - 1]) for i in range(0, len(ids), shard_size)]
+    return shards, len(ids)
+
+
+def _flush(cursor, job: ArticleJob, pending: List[WriteRow], written: Dict[str, int]):
+    by_kind: Dict[str, List[tuple]] = {}
+    for kind, params in pending:
+        by_kind.setdefault(kind, []).append(params)
+    for kind, rows in by_kind.items():
+        cursor.executemany(job.writes[kind], rows)
+        written[kind] = written.get(kind, 0) + len(rows)
+    pending.clear()
+
+
+def run_article_job(job_name: str, zip_code: Optional[str] = None, db_path: Optional[str] = None,
+                    workers: Optional[int] = None, shard_size: int = 500, commit_every: int = 2000,
+                    options: Optional[Dict] = None,
+                    progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """Run a registered job over all articles (optionally one zip) across worker processes
+
+    Args:
+        job_name: Key in JOBS ('rescore', 'relevance_v2', 'categorize')
+        zip_code: Optional zip code to limit the job to
+        db_path: Optional database path (defaults to DATABASE_CONFIG)
+        workers: Worker processes (default: CPU count). 1, or a single shard, runs in-process
+        shard_size: Articles per ID range handed to a worker
+        commit_every: Write rows buffered before the writer commits (atomic jobs commit once, at the end)
+        options: Job options passed to every worker (must be picklable)
+        progress: Optional callback(processed, total) called after each shard
+
+    Returns:
+        Dict with processed_count, total, written (rows per write kind), workers and duration (seconds)
+    """
+    start_time = time.time()
+    db_path = db_path or DATABASE_CONFIG.get("path", "fallriver_news.db")
+    options = options or {}
+    job = JOBS[job_name]
+
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        shards, total = article_id_shards(cursor, zip_code, shard_size)
+        workers = max(1, min(workers or os.cpu_count() or 1, len(shards) or 1))
+
+        processed = 0
+        written: Dict[str, int] = {}
+        pending: List[WriteRow] = []
+        if not job.atomic:
+            job.begin_writes(cursor, zip_code, options)
+
+        def collect(count: int, rows: List[WriteRow]):
+            nonlocal processed
+            processed += count
+            pending.extend(rows)
+            if len(pending) >= commit_every and not job.atomic:
+                _flush(cursor, job, pending, written)
+                conn.commit()
+            if progress:
+                progress(processed, total)
+
+        if workers == 1:
+            state = _WorkerState(db_path, options)
+            try:
+                for lo, hi in shards:
+                    collect(*state.run(job_name, zip_code, lo, hi))
+            finally:
+                state.close()
+        else:
+            # spawn: the admin app is multi-threaded, so don't fork it
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_init_worker, initargs=(db_path, options)) as executor:
+                futures = [executor.submit(_run_shard, job_name, zip_code, lo, hi) for lo, hi in shards]
+                try:
+                    for future in as_completed(futures):
+                        collect(*future.result())
+                except BaseException:
+                    # e.g. a cancelled background job raising from progress(): drop unstarted shards
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    raise
+
+        if job.atomic:
+            job.begin_writes(cursor, zip_code, options)
+        _flush(cursor, job, pending, written)
+        conn.commit()
+    finally:
+        conn.close()
+
+    duration = time.time() - start_time
+    logger.info(f"Job {job_name}: processed {processed}/{total} articles with {workers} worker(s), wrote {written} in {duration:.2f}s")
+    return {
+        'processed_count': processed,
+        'total': total,
+        'written': written,
+        'workers': workers,
+        'duration': round(duration, 2)
+    }
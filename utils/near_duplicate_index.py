@@ -0,0 +1,120 @@
+"""
+MinHash signatures and an LSH banding index for near-duplicate candidate search
+Finds likely-similar token sets in near-linear time so the exact similarity check
+only runs on candidate pairs instead of every pair in a batch
+"""
+import logging
+import zlib
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Mersenne prime for the universal hash family (a * x + b) % p
+_MERSENNE_PRIME = (1 << 31) - 1
+
+# Default signature length and the acceptable chance of missing a pair at the similarity floor
+DEFAULT_NUM_PERM = 128
+DEFAULT_MISS_PROBABILITY = 1e-4
+
+
+def token_hashes(tokens: Iterable[str]) -> np.ndarray:
+    """Stable 31-bit hashes for a token set (crc32, so signatures are reproducible across processes)"""
+    return np.fromiter((zlib.crc32(token.encode('utf-8')) & _MERSENNE_PRIME for token in tokens),
+                       dtype=np.int64)
+
+
+def choose_band_rows(min_similarity: float, num_perm: int = DEFAULT_NUM_PERM,
+                     miss_probability: float = DEFAULT_MISS_PROBABILITY) -> int:
+    """Pick rows per band so a pair at min_similarity is missed with at most miss_probability
+
+    More rows per band means fewer false candidates, so take the largest value that still
+    meets the recall target. Pairs above min_similarity are caught with even higher probability.
+
+    Args:
+        min_similarity: Lowest Jaccard similarity that must become a candidate pair
+        num_perm: Signature length
+        miss_probability: Allowed chance of missing a pair at exactly min_similarity
+
+    Returns:
+        Rows per band (bands = num_perm // rows)
+    """
+    best = 1
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        miss = (1.0 - min_similarity ** rows) ** bands
+        if miss <= miss_probability:
+            best = rows
+    return best
+
+
+class MinHashLSHIndex:
+    """MinHash + LSH banding index over token sets
+
+    add() stores a key's signature in one bucket per band; query() returns every key
+    that shares at least one band bucket with the given tokens.
+    """
+
+    def __init__(self, min_similarity: float = 0.5, num_perm: int = DEFAULT_NUM_PERM,
+                 rows: Optional[int] = None, seed: int = 1):
+        self.num_perm = num_perm
+        self.rows = rows or choose_band_rows(min_similarity, num_perm)
+        self.bands = num_perm // self.rows
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+        self._b = rng.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [{} for _ in range(self.bands)]
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, tokens: Iterable[str]) -> Optional[np.ndarray]:
+        """MinHash signature for a token set (None for an empty set)"""
+        hashes = token_hashes(tokens)
+        if hashes.size == 0:
+            return None
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, key: Hashable, tokens: Iterable[str] = (), signature: Optional[np.ndarray] = None):
+        """Index a key by its token set (or a precomputed signature)"""
+        if signature is None:
+            signature = self.signature(tokens)
+        if signature is None:
+            return
+        self._signatures[key] = signature
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(band_key, []).append(key)
+
+    def query(self, tokens: Iterable[str] = (), signature: Optional[np.ndarray] = None) -> Set[Hashable]:
+        """Keys sharing at least one LSH band with the token set"""
+        if signature is None:
+            signature = self.signature(tokens)
+        if signature is None:
+            return set()
+        candidates = set()
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(band_key, ()))
+        return candidates
+
+    def estimated_similarity(self, key1: Hashable, key2: Hashable) -> float:
+        """Jaccard estimate from two stored signatures"""
+        return float(np.mean(self._signatures[key1] == self._signatures[key2]))
+
+    def candidate_pairs(self) -> Set[Tuple[Hashable, Hashable]]:
+        """All key pairs that share a bucket (each pair once, in insertion order)"""
+        order = {key: i for i, key in enumerate(self._signatures)}
+        pairs = set()
+        for bucket in self._buckets:
+            for keys in bucket.values():
+                if len(keys) < 2:
+                    continue
+                for i, key1 in enumerate(keys):
+                    for key2 in keys[i + 1:]:
+                        pairs.add((key1, key2) if order[key1] < order[key2] else (key2, key1))
+        return pairs
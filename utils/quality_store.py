@@ -0,0 +1,180 @@
+"""
+Content-hash keyed store for ContentQualityAnalyzer results
+Article text rarely changes after ingest, so quality is computed once per distinct content
+(title, body, image presence), stored in article_quality and reused by relevance rescoring and
+source credibility tracking. Rows from an older ANALYZER_VERSION are recomputed by recompute_quality().
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from config import DATABASE_CONFIG
+from utils.content_quality import ANALYZER_VERSION, ContentQualityAnalyzer
+
+logger = logging.getLogger(__name__)
+
+# content_hash -> {'quality_score', 'grade', 'issues'} for the current analyzer version
+_memo: Dict[str, Dict] = {}
+_memo_lock = threading.Lock()
+_preloaded = False
+_analyzer = ContentQualityAnalyzer()
+
+
+def quality_content_hash(article: Dict) -> str:
+    """Hash of exactly the fields the analyzer reads (title, content or summary, image presence)"""
+    content = article.get('content', '') or article.get('summary', '')
+    key = f"{article.get('title', '') or ''}\x1f{content or ''}\x1f{1 if article.get('image_url') else 0}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def init_quality_table(cursor):
+    """Create the article_quality table if it doesn't exist"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS article_quality (
+            content_hash TEXT PRIMARY KEY,
+            analyzer_version INTEGER NOT NULL,
+            quality_score REAL NOT NULL,
+            grade TEXT,
+            issues TEXT,
+            computed_at TEXT
+        )
+    ''')
+
+
+def _analyze(article: Dict) -> Dict:
+    analysis = _analyzer.calculate_quality_score(article)
+    return {'quality_score': analysis['quality_score'], 'grade': analysis['grade'], 'issues': analysis['issues']}
+
+
+def _store(cursor, content_hash: str, result: Dict):
+    cursor.execute('''
+        INSERT OR REPLACE INTO article_quality (content_hash, analyzer_version, quality_score, grade, issues, computed_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (content_hash, ANALYZER_VERSION, result['quality_score'], result['grade'],
+          json.dumps(result['issues']), datetime.now().isoformat()))
+
+
+def preload_quality(cursor):
+    """Load every current-version stored result into the in-process memo"""
+    init_quality_table(cursor)
+    cursor.execute('SELECT content_hash, quality_score, grade, issues FROM article_quality WHERE analyzer_version = ?',
+                   (ANALYZER_VERSION,))
+    rows = {content_hash: {'quality_score': score, 'grade': grade, 'issues': json.loads(issues or '[]')}
+            for content_hash, score, grade, issues in cursor.fetchall()}
+    with _memo_lock:
+        _memo.update(rows)
+
+
+def _preload_default():
+    """Warm the memo from the configured database once per process (skipped if it doesn't exist yet)"""
+    global _preloaded
+    _preloaded = True
+    db_path = DATABASE_CONFIG.get("path", "fallriver_news.db")
+    if not os.path.exists(db_path):
+        return
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            preload_quality(conn.cursor())
+            conn.commit()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.debug(f"Could not preload quality results: {e}")
+
+
+def get_quality(article: Dict, cursor=None) -> Dict:
+    """Quality result for an article, computed only if its content hasn't been analyzed before
+
+    Args:
+        article: Article dict (title, content/summary, image_url)
+        cursor: Optional cursor; when given, misses are looked up in and written to article_quality
+
+    Returns:
+        Dict with quality_score, grade and issues
+    """
+    content_hash = quality_content_hash(article)
+    result = _memo.get(content_hash)
+    if result is not None:
+        return result
+
+    if cursor is None and not _preloaded:
+        _preload_default()
+        result = _memo.get(content_hash)
+        if result is not None:
+            return result
+
+    if cursor is not None:
+        cursor.execute('SELECT quality_score, grade, issues FROM article_quality WHERE content_hash = ? AND analyzer_version = ?',
+                       (content_hash, ANALYZER_VERSION))
+        row = cursor.fetchone()
+        if row:
+            result = {'quality_score': row[0], 'grade': row[1], 'issues': json.loads(row[2] or '[]')}
+
+    if result is None:
+        result = _analyze(article)
+        if cursor is not None:
+            _store(cursor, content_hash, result)
+
+    with _memo_lock:
+        _memo[content_hash] = result
+    return result
+
+
+def recompute_quality(db_path: Optional[str] = None, force: bool = False, batch_size: int = 500) -> int:
+    """Analyze articles whose content has no current-version quality row
+
+    Rows from older analyzer versions are dropped first, so this only does work after
+    ANALYZER_VERSION changes (or for articles ingested before the store existed).
+
+    Args:
+        db_path: Optional database path (defaults to DATABASE_CONFIG)
+        force: Recompute every article regardless of version
+        batch_size: Rows written per transaction
+
+    Returns:
+        Number of articles analyzed
+    """
+    conn = sqlite3.connect(db_path or DATABASE_CONFIG.get("path", "fallriver_news.db"))
+    try:
+        cursor = conn.cursor()
+        init_quality_table(cursor)
+        if force:
+            cursor.execute('DELETE FROM article_quality')
+        else:
+            cursor.execute('DELETE FROM article_quality WHERE analyzer_version != ?', (ANALYZER_VERSION,))
+        conn.commit()
+
+        cursor.execute('''
+            SELECT a.id, a.title, a.content, a.summary, a.image_url FROM articles a
+            LEFT JOIN article_quality q ON q.content_hash = a.content_hash
+            WHERE a.content_hash IS NULL OR q.content_hash IS NULL
+        ''')
+        rows = cursor.fetchall()
+        with _memo_lock:
+            _memo.clear()
+
+        analyzed = 0
+        for start in range(0, len(rows), batch_size):
+            hash_updates = []
+            for article_id, title, content, summary, image_url in rows[start:start + batch_size]:
+                article = {'title': title or '', 'content': content or '', 'summary': summary or '', 'image_url': image_url}
+                content_hash = quality_content_hash(article)
+                if content_hash not in _memo:
+                    result = _analyze(article)
+                    _store(cursor, content_hash, result)
+                    _memo[content_hash] = result
+                hash_updates.append((content_hash, article_id))
+                analyzed += 1
+            cursor.executemany('UPDATE articles SET content_hash = ? WHERE id = ?', hash_updates)
+            conn.commit()
+    finally:
+        conn.close()
+
+    logger.info(f"Recomputed content quality for {analyzed} articles (analyzer v{ANALYZER_VERSION})")
+    return analyzed
@@ -0,0 +1,140 @@
+"""
+Warm in-process website regeneration
+One NewsAggregatorApp (aggregator, website generator with its compiled templates, database with
+its schema already initialized) is built on first use and reused by every regeneration in the
+process, instead of starting a fresh interpreter per trigger. Builds run one at a time because
+WebsiteGenerator.generate() points its output_dir at the zip being built. Triggers arrive through
+the admin job queue, which debounces bursts into one build per zip.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+
+from config import DATABASE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Seconds a regeneration trigger waits for further triggers for the same zip before building
+REGENERATION_DEBOUNCE = 2.0
+
+# Longest a burst of triggers can keep pushing a build back
+REGENERATION_MAX_DELAY = 10.0
+
+Reporter = Callable[[str], None]
+
+
+def _report(report: Optional[Reporter], message: str):
+    logger.info(f"[REGENERATION] {message}")
+    if report:
+        report(message)
+
+
+class WarmRegenerator:
+    """Long-lived aggregator / generator / database shared by regeneration jobs"""
+
+    def __init__(self):
+        self._app = None
+        self._build_lock = threading.Lock()
+        self._init_lock = threading.Lock()
+        self._city_states: Dict[str, Optional[str]] = {}
+
+    @property
+    def app(self):
+        """NewsAggregatorApp, constructed once (imports and schema init happen here)"""
+        if self._app is None:
+            with self._init_lock:
+                if self._app is None:
+                    start = time.time()
+                    from main import NewsAggregatorApp
+                    self._app = NewsAggregatorApp()
+                    logger.info(f"[REGENERATION] Warm regenerator ready in {time.time() - start:.2f}s")
+        return self._app
+
+    def _city_state(self, zip_code: Optional[str]) -> Optional[str]:
+        if not zip_code:
+            return None
+        if zip_code not in self._city_states:
+            try:
+                from zip_resolver import get_city_state_for_zip
+                self._city_states[zip_code] = get_city_state_for_zip(zip_code)
+            except Exception as e:
+                logger.warning(f"Could not resolve city_state for zip {zip_code}: {e}")
+                return None
+        return self._city_states[zip_code]
+
+    def quick_regenerate(self, zip_code: Optional[str] = None, report: Optional[Reporter] = None,
+                         full: bool = False) -> Dict:
+        """Regenerate the website from articles already in the database (quick_regenerate.py)
+
+        Args:
+            zip_code: Optional zip code for zip-specific generation
+            report: Optional callback for stage messages (may raise to stop between stages)
+            full: Re-render every page, not just pages whose inputs changed
+
+        Returns:
+            Dict with article_count and duration (seconds)
+        """
+        app = self.app
+        city_state = self._city_state(zip_code)
+        with self._build_lock:
+            start = time.time()
+            articles = app.database.get_all_articles(limit=500, zip_code=zip_code, city_state=city_state)
+            _report(report, f"Enriching {len(articles)} articles")
+            enriched = app.aggregator.enrich_articles(articles)
+            _report(report, f"Generating website for {zip_code or 'default zip'}")
+            app.website_generator.generate(enriched, zip_code=zip_code, city_state=city_state, full=full)
+            _record_regeneration_time('last_regeneration_time')
+            duration = time.time() - start
+        logger.info(f"[REGENERATION] Quick regeneration for {zip_code or 'default zip'} finished in {duration:.2f}s")
+        return {'article_count': len(enriched), 'duration': round(duration, 2)}
+
+    def aggregation_cycle(self, zip_code: Optional[str] = None, force_refresh: bool = False,
+                          report: Optional[Reporter] = None) -> Dict:
+        """Fetch, save, enrich and generate (main.py --once)
+
+        Returns:
+            Dict with duration (seconds)
+        """
+        app = self.app
+        with self._build_lock:
+            start = time.time()
+            _report(report, f"Fetching {'fresh ' if force_refresh else ''}articles for {zip_code or 'all sources'}")
+            app.force_refresh = force_refresh
+            try:
+                app.run_aggregation_cycle(zip_code=zip_code)
+            finally:
+                app.force_refresh = False
+            if zip_code:
+                _record_regeneration_time(f'last_static_regen_{zip_code}', datetime.now().isoformat())
+            duration = time.time() - start
+        return {'duration': round(duration, 2)}
+
+
+def _record_regeneration_time(key: str, value: Optional[str] = None):
+    """Store a regeneration timestamp in admin_settings"""
+    try:
+        conn = sqlite3.connect(DATABASE_CONFIG.get("path", "fallriver_news.db"))
+        try:
+            conn.execute('INSERT OR REPLACE INTO admin_settings (key, value) VALUES (?, ?)',
+                         (key, value or datetime.now(timezone.utc).isoformat()))
+            conn.commit()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Could not update {key}: {e}")
+
+
+_regenerator: Optional[WarmRegenerator] = None
+_regenerator_lock = threading.Lock()
+
+
+def get_regenerator() -> WarmRegenerator:
+    """Process-wide warm regenerator"""
+    global _regenerator
+    with _regenerator_lock:
+        if _regenerator is None:
+            _regenerator = WarmRegenerator()
+        return _regenerator
@@ -0,0 +1,299 @@
+"""
+TF-IDF related-articles index
+Built once per generation over the article listing; related(article_id, k) reads the
+precomputed top-k instead of scoring every other article per article. As with the old pairwise
+scorer, articles sharing only the category and/or source are related too (with just those
+bonuses). Results are stored per zip in the related_articles table for website generation and
+the admin view.
+"""
+import logging
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from config import DATABASE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Words ignored when extracting key terms (same list NewsAggregator used)
+COMMON_WORDS = {
+    "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "by", "is", "are",
+    "was", "were", "be", "been", "have", "has", "had", "do", "does", "did", "will", "would", "could",
+    "should", "may", "might", "must", "can", "this", "that", "these", "those", "i", "you", "he", "she",
+    "it", "we", "they", "what", "which", "who", "when", "where", "why", "how"
+}
+
+# Topics that count as shared when both articles mention them
+TOPIC_KEYWORDS = ["police", "arrest", "city council", "mayor", "school", "student", "business",
+                  "restaurant", "event", "festival"]
+
+# Score weights (category/source/topic weights match the old pairwise scorer)
+TEXT_WEIGHT = 20.0
+CATEGORY_WEIGHT = 10.0
+SOURCE_WEIGHT = 5.0
+TOPIC_WEIGHT = 3.0
+
+
+def extract_key_terms(article: Dict) -> List[str]:
+    """Key terms of an article: title words > 3 chars and content words > 4 chars, minus common words"""
+    title = (article.get("title") or "").lower()
+    content = (article.get("content") or article.get("summary") or "").lower()
+    terms = [word.strip('.,!?;:"()[]') for word in title.split() if len(word) > 3 and word not in COMMON_WORDS]
+    terms += [word.strip('.,!?;:"()[]') for word in content.split() if len(word) > 4 and word not in COMMON_WORDS]
+    return [term for term in terms if term]
+
+
+def _topic_row(article: Dict) -> List[int]:
+    content = (article.get("content") or article.get("summary") or "").lower()
+    return [j for j, topic in enumerate(TOPIC_KEYWORDS) if topic in content]
+
+
+class RelatedArticlesIndex:
+    """TF-IDF inverted index with precomputed top-k related articles per article"""
+
+    def __init__(self, articles: Sequence[Dict], k: int = 5):
+        self.articles = list(articles)
+        self.k = k
+        self._positions = {}
+        for i, article in enumerate(self.articles):
+            if article.get("id") is not None:
+                self._positions.setdefault(article["id"], i)
+        self.vocabulary: Dict[str, int] = {}
+        self.idf = np.zeros(0)
+        self._matrix = sparse.csr_matrix((len(self.articles), 0))
+        self._topics = sparse.csr_matrix((len(self.articles), len(TOPIC_KEYWORDS)))
+        self._top_k: List[List[Tuple[int, float]]] = []
+        # Positions by category / source, for articles related only through those fields
+        self._by_category: Dict[str, List[int]] = {}
+        self._by_source: Dict[str, List[int]] = {}
+        for i, article in enumerate(self.articles):
+            if article.get("category"):
+                self._by_category.setdefault(article["category"], []).append(i)
+            if article.get("source"):
+                self._by_source.setdefault(article["source"], []).append(i)
+        self._build()
+
+    def _vectorize(self, term_lists: List[List[str]], grow: bool) -> sparse.csr_matrix:
+        """Raw term-frequency matrix (new terms are added to the vocabulary only when grow=True)"""
+        rows, cols, values = [], [], []
+        for i, terms in enumerate(term_lists):
+            counts = {}
+            for term in terms:
+                col = self.vocabulary.get(term)
+                if col is None:
+                    if not grow:
+                        continue
+                    col = self.vocabulary[term] = len(self.vocabulary)
+                counts[col] = counts.get(col, 0) + 1
+            rows.extend([i] * len(counts))
+            cols.extend(counts.keys())
+            values.extend(counts.values())
+        return sparse.csr_matrix((values, (rows, cols)), shape=(len(term_lists), len(self.vocabulary)), dtype=np.float64)
+
+    def _weight(self, tf: sparse.csr_matrix) -> sparse.csr_matrix:
+        """Sublinear TF x IDF, L2-normalized per row"""
+        weighted = tf.copy()
+        weighted.data = 1.0 + np.log(weighted.data)
+        weighted = weighted.multiply(self.idf).tocsr()
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.diags(1.0 / norms) @ weighted
+
+    def _build(self):
+        n = len(self.articles)
+        if n == 0:
+            return
+        tf = self._vectorize([extract_key_terms(article) for article in self.articles], grow=True)
+        document_frequency = np.bincount(tf.indices, minlength=len(self.vocabulary))
+        self.idf = np.log((1.0 + n) / (1.0 + document_frequency)) + 1.0
+        self._matrix = self._weight(tf).tocsr()
+
+        topic_rows = [_topic_row(article) for article in self.articles]
+        self._topics = sparse.csr_matrix(
+            (np.ones(sum(len(row) for row in topic_rows)),
+             ([i for i, row in enumerate(topic_rows) for _ in row], [j for row in topic_rows for j in row])),
+            shape=(n, len(TOPIC_KEYWORDS)))
+
+        # Pairs sharing a term or a topic come from sparse products; _rank adds category/source-only matches
+        scores = (TEXT_WEIGHT * (self._matrix @ self._matrix.T) + TOPIC_WEIGHT * (self._topics @ self._topics.T)).tocsr()
+        self._top_k = [self._rank(i, scores.indices[scores.indptr[i]:scores.indptr[i + 1]],
+                                  scores.data[scores.indptr[i]:scores.indptr[i + 1]], self.articles[i], self.k)
+                       for i in range(n)]
+
+    def _is_self(self, col: int, row: Optional[int], article: Dict) -> bool:
+        other = self.articles[col]
+        return (col == row or (article.get("id") is not None and other.get("id") == article.get("id"))
+                or bool(article.get("url") and other.get("url") == article.get("url")))
+
+    def _rank(self, row: Optional[int], cols: np.ndarray, values: np.ndarray, article: Dict,
+              k: int) -> List[Tuple[int, float]]:
+        """Add category/source bonuses to candidate scores and keep the top k positions"""
+        category, source = article.get("category"), article.get("source")
+        ranked = []
+        for col, value in zip(cols.tolist(), values.tolist()):
+            if self._is_self(col, row, article):
+                continue
+            other = self.articles[col]
+            score = value
+            if category and other.get("category") == category:
+                score += CATEGORY_WEIGHT
+            if source and other.get("source") == source:
+                score += SOURCE_WEIGHT
+            ranked.append((col, score))
+        ranked.sort(key=lambda item: (-item[1], item[0]))
+        if len(ranked) < k or ranked[k - 1][1] < CATEGORY_WEIGHT + SOURCE_WEIGHT:
+            ranked += self._metadata_matches(row, article, {col for col, _ in ranked}, k)
+            ranked.sort(key=lambda item: (-item[1], item[0]))
+        return ranked[:k]
+
+    def _metadata_matches(self, row: Optional[int], article: Dict, exclude: set,
+                          k: int) -> List[Tuple[int, float]]:
+        """Up to k articles per bonus level that share only the category and/or source"""
+        category, source = article.get("category"), article.get("source")
+        same_source = set(self._by_source.get(source, [])) if source else set()
+        both, category_only, source_only = [], [], []
+        for col in self._by_category.get(category, []) if category else []:
+            if len(both) >= k and len(category_only) >= k:
+                break
+            if col in exclude or self._is_self(col, row, article):
+                continue
+            (both if col in same_source else category_only).append(col)
+        for col in self._by_source.get(source, []) if source else []:
+            if len(source_only) >= k:
+                break
+            if col in exclude or self._is_self(col, row, article) \
+                    or (category and self.articles[col].get("category") == category):
+                continue
+            source_only.append(col)
+        return ([(col, CATEGORY_WEIGHT + SOURCE_WEIGHT) for col in both[:k]]
+                + [(col, CATEGORY_WEIGHT) for col in category_only[:k]]
+                + [(col, SOURCE_WEIGHT) for col in source_only])
+
+    def related(self, article_id, k: Optional[int] = None) -> List[Tuple[Dict, float]]:
+        """Top-k related (article, score) pairs for an indexed article ID"""
+        position = self._positions.get(article_id)
+        if position is None:
+            return []
+        return [(self.articles[col], score) for col, score in self._top_k[position][:k or self.k]]
+
+    def related_to(self, article: Dict, k: Optional[int] = None) -> List[Tuple[Dict, float]]:
+        """Top-k related articles for any article, indexed or not"""
+        position = self._positions.get(article.get("id")) if article.get("id") is not None else None
+        if position is not None and (k or self.k) <= self.k:
+            return self.related(article["id"], k)
+        if not self.articles:
+            return []
+        query = self._weight(self._vectorize([extract_key_terms(article)], grow=False))
+        topic_cols = _topic_row(article)
+        topics = sparse.csr_matrix((np.ones(len(topic_cols)), ([0] * len(topic_cols), topic_cols)),
+                                   shape=(1, len(TOPIC_KEYWORDS)))
+        scores = (TEXT_WEIGHT * (query @ self._matrix.T) + TOPIC_WEIGHT * (topics @ self._topics.T)).tocsr()
+        ranked = self._rank(position, scores.indices, scores.data, article, k or self.k)
+        return [(self.articles[col], score) for col, score in ranked]
+
+    def all_related(self) -> Dict[int, List[Tuple[int, float]]]:
+        """article_id -> [(related_id, score), ...] for every indexed article with an ID"""
+        results = {}
+        for article_id, position in self._positions.items():
+            results[article_id] = [(self.articles[col].get("id"), score) for col, score in self._top_k[position]
+                                   if self.articles[col].get("id") is not None]
+        return results
+
+
+def init_related_table(cursor):
+    """Create the related_articles table if it doesn't exist
+
+    Rows are keyed by zip: the same article can appear in several zips' listings, with
+    different related articles in each ('' is stored for a listing without a zip).
+    """
+    cursor.execute('PRAGMA table_info(related_articles)')
+    primary_key = {row[1] for row in cursor.fetchall() if row[5]}
+    if primary_key and 'zip_code' not in primary_key:
+        # Derived data from an older layout keyed only by article; the next generation rebuilds it
+        cursor.execute('DROP TABLE related_articles')
+        logger.info("Dropped related_articles stored without a zip key (rebuilt on the next generation)")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS related_articles (
+            zip_code TEXT NOT NULL DEFAULT '',
+            article_id INTEGER NOT NULL,
+            rank INTEGER NOT NULL,
+            related_id INTEGER NOT NULL,
+            score REAL,
+            generated_at TEXT,
+            PRIMARY KEY (zip_code, article_id, rank)
+        )
+    ''')
+
+
+def build_related_index(articles: Sequence[Dict], zip_code: Optional[str] = None, k: int = 5,
+                        db_path: Optional[str] = None) -> RelatedArticlesIndex:
+    """Build the index for a listing and store each article's top-k related IDs
+
+    Args:
+        articles: Article dicts (need 'id' to be stored)
+        zip_code: Zip code the listing belongs to
+        k: Related articles kept per article
+        db_path: Optional database path (defaults to DATABASE_CONFIG)
+
+    Returns:
+        The built RelatedArticlesIndex
+    """
+    index = RelatedArticlesIndex(articles, k=k)
+    results = index.all_related()
+    if not results:
+        return index
+
+    generated_at = datetime.now().isoformat()
+    zip_key = zip_code or ''
+    conn = sqlite3.connect(db_path or DATABASE_CONFIG.get("path", "fallriver_news.db"))
+    try:
+        cursor = conn.cursor()
+        init_related_table(cursor)
+        ids = list(results)
+        cursor.executemany('DELETE FROM related_articles WHERE zip_code = ? AND article_id = ?',
+                           [(zip_key, article_id) for article_id in ids])
+        cursor.executemany('''
+            INSERT INTO related_articles (zip_code, article_id, rank, related_id, score, generated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [(zip_key, article_id, rank, related_id, score, generated_at)
+              for article_id, related in results.items()
+              for rank, (related_id, score) in enumerate(related)])
+        conn.commit()
+    finally:
+        conn.close()
+    logger.info(f"Stored related articles for {len(results)} articles")
+    return index
+
+
+def load_related(cursor, article_id: int, k: int = 5, zip_code: Optional[str] = None) -> List[Dict]:
+    """Stored related articles for an article (empty if the index hasn't been built)
+
+    Args:
+        cursor: Open cursor
+        article_id: Article to look up
+        k: Maximum related articles returned
+        zip_code: Listing the results come from (default: the most recently generated one)
+    """
+    init_related_table(cursor)
+    if zip_code is None:
+        cursor.execute('SELECT zip_code FROM related_articles WHERE article_id = ? ORDER BY generated_at DESC LIMIT 1',
+                       (article_id,))
+        row = cursor.fetchone()
+        if not row:
+            return []
+        zip_code = row[0]
+    cursor.execute('''
+        SELECT r.related_id, r.score, a.title, a.url, a.source, a.published
+        FROM related_articles r
+        JOIN articles a ON a.id = r.related_id
+        WHERE r.zip_code = ? AND r.article_id = ?
+        ORDER BY r.rank
+        LIMIT ?
+    ''', (zip_code, article_id, k))
+    return [
+        {'id': row[0], 'score': row[1], 'title': row[2], 'url': row[3], 'source': row[4], 'published': row[5]}
+        for row in cursor.fetchall()
+    ]
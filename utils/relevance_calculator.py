@@ -6,6 +6,8 @@ from typing import Dict, List, Optional, Tuple
 import sqlite3
 import logging
 from config import DATABASE_CONFIG
+from utils.timestamps import article_epoch, hours_since
+from utils.scoring_context import ScoringContext, get_scoring_context
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +19,7 @@ _cache_timestamp = {}  # Dict[zip_code or None, timestamp]
 _hard_filter_cache = {}  # Dict[zip_code, List[str]]
 
 
-def load_relevance_config(force_reload=False, zip_code=None, city_state=None):
+def load_relevance_config(force_reload=False, zip_code=None, city_state=None, db_path=None):
     """Load relevance configuration from database with caching (zip-specific or city-specific)
     Phase 5: Now supports city_state for city-based relevance
     
@@ -25,6 +27,7 @@ def load_relevance_config(force_reload=False, zip_code=None, city_state=None):
         force_reload: If True, clear cache and reload
         zip_code: Optional zip code to load zip-specific config. If None, loads global config.
         city_state: Optional city_state (e.g., "Fall River, MA") to load city-specific config.
+        db_path: Optional database path (defaults to DATABASE_CONFIG)
     
     Returns:
         Dict with relevance configuration
@@ -33,6 +36,10 @@ def load_relevance_config(force_reload=False, zip_code=None, city_state=None):
     
     # Phase 5: Use city_state as primary key, fallback to zip_code
     cache_key = city_state if city_state else (zip_code if zip_code else None)
+    default_db_path = DATABASE_CONFIG.get("path", "fallriver_news.db")
+    if db_path and db_path != default_db_path:
+        cache_key = (db_path, cache_key)
+    db_path = db_path or default_db_path
     
     # Clear cache if forcing reload
     if force_reload:
@@ -45,7 +52,6 @@ def load_relevance_config(force_reload=False, zip_code=None, city_state=None):
     if not force_reload and cache_key in _relevance_config_cache:
         return _relevance_config_cache[cache_key]
     
-    db_path = DATABASE_CONFIG.get("path", "fallriver_news.db")
     config = {
         'high_relevance': [],
         'local_places': [],
@@ -150,40 +156,53 @@ def load_relevance_config(force_reload=False, zip_code=None, city_state=None):
         return get_default_relevance_config()
 
 
-def check_hard_zip_filter(article: Dict, zip_code: Optional[str] = None) -> bool:
-    """Check if article passes hard zip-specific filter (instant kill if fails)
+def load_hard_filter_keywords(zip_code: str, db_path: Optional[str] = None) -> Optional[List[str]]:
+    """Load hard filter keywords for a zip code (cached)
     
     Args:
-        article: Article dict with title, content, summary
-        zip_code: Zip code to check filter for
+        zip_code: Zip code to load keywords for
+        db_path: Optional database path (defaults to DATABASE_CONFIG)
         
     Returns:
-        True if article passes (has at least one required keyword), False if should be rejected
+        List of lowercase keywords, or None if they could not be loaded
     """
-    if not zip_code:
-        # If no zip code, allow through (backward compatibility)
-        return True
-    
     global _hard_filter_cache
     
-    # Load keywords from cache or database
-    if zip_code not in _hard_filter_cache:
-        db_path = DATABASE_CONFIG.get("path", "fallriver_news.db")
-        keywords = []
+    default_db_path = DATABASE_CONFIG.get("path", "fallriver_news.db")
+    cache_key = (db_path, zip_code) if db_path and db_path != default_db_path else zip_code
+    if cache_key not in _hard_filter_cache:
         try:
-            conn = sqlite3.connect(db_path)
+            conn = sqlite3.connect(db_path or default_db_path)
             cursor = conn.cursor()
             cursor.execute('SELECT keyword FROM zip_hard_filters WHERE zip_code = ?', (zip_code,))
             rows = cursor.fetchall()
-            keywords = [row[0].lower() for row in rows]
             conn.close()
-            _hard_filter_cache[zip_code] = keywords
+            _hard_filter_cache[cache_key] = [row[0].lower() for row in rows]
         except Exception as e:
             logger.warning(f"Error loading hard filter keywords for zip {zip_code}: {e}")
-            # If error, allow through (fail open)
-            return True
+            return None
+    
+    return _hard_filter_cache.get(cache_key, [])
+
+
+def check_hard_zip_filter(article: Dict, zip_code: Optional[str] = None) -> bool:
+    """Check if article passes hard zip-specific filter (instant kill if fails)
+    
+    Args:
+        article: Article dict with title, content, summary
+        zip_code: Zip code to check filter for
+        
+    Returns:
+        True if article passes (has at least one required keyword), False if should be rejected
+    """
+    if not zip_code:
+        # If no zip code, allow through (backward compatibility)
+        return True
     
-    keywords = _hard_filter_cache.get(zip_code, [])
+    keywords = load_hard_filter_keywords(zip_code)
+    if keywords is None:
+        # If error, allow through (fail open)
+        return True
     
     # If no keywords configured for this zip, allow through
     if not keywords:
@@ -310,7 +329,8 @@ def get_default_relevance_config():
     }
 
 
-def calculate_relevance_score(article: Dict, config: Optional[Dict] = None, zip_code: Optional[str] = None, city_state: Optional[str] = None) -> float:
+def calculate_relevance_score(article: Dict, config: Optional[Dict] = None, zip_code: Optional[str] = None, city_state: Optional[str] = None,
+                              context: Optional[ScoringContext] = None) -> float:
     """Calculate relevance score (0-100) with enhanced local knowledge
     Phase 5: Now supports city_state for city-based relevance
     
@@ -319,6 +339,8 @@ def calculate_relevance_score(article: Dict, config: Optional[Dict] = None, zip_
         config: Optional pre-loaded relevance config. If None, loads from database.
         zip_code: Optional zip code to use zip-specific relevance config.
         city_state: Optional city_state (e.g., "Fall River, MA") for city-based config.
+        context: Optional ScoringContext with management flags prefetched for the batch.
+            If None, a shared cached context for zip_code is used.
     
     Returns:
         Relevance score between 0 and 100
@@ -337,27 +359,11 @@ def calculate_relevance_score(article: Dict, config: Optional[Dict] = None, zip_
     
     score = 0.0
     
-    # Stellar article boost (+50 points)
-    if article.get('is_stellar', 0) or article.get('id'):
-        # Check database if is_stellar not in article dict
-        is_stellar = article.get('is_stellar', 0)
-        if not is_stellar and article.get('id') and zip_code:
-            try:
-                conn = sqlite3.connect(DATABASE_CONFIG.get("path", "fallriver_news.db"))
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT is_stellar FROM article_management 
-                    WHERE article_id = ? AND zip_code = ?
-                    ORDER BY id DESC LIMIT 1
-                ''', (article.get('id'), zip_code))
-                row = cursor.fetchone()
-                if row:
-                    is_stellar = row[0] or 0
-                conn.close()
-            except Exception as e:
-                logger.warning(f"Error checking stellar status: {e}")
-        
-        if is_stellar:
+    # Stellar article boost (+50 points) - flag from the article dict or its management row
+    if article.get('is_stellar', 0) or (article.get('id') and zip_code):
+        if context is None or context.zip_code != zip_code:
+            context = get_scoring_context(zip_code)
+        if context.is_stellar(article):
             score += 50.0
     
     # High relevance keywords (15 points each, configurable)
@@ -395,25 +401,19 @@ def calculate_relevance_score(article: Dict, config: Optional[Dict] = None, zip_
     
     # Recency multiplier (applied AFTER source boost, BEFORE Bayesian adjustment)
     recency_multiplier = 1.0
-    published = article.get("published")
-    if published:
-        try:
-            pub_date = datetime.fromisoformat(published.replace('Z', '+00:00').split('+')[0])
-            hours_old = (datetime.now() - pub_date.replace(tzinfo=None)).total_seconds() / 3600
-            
-            if hours_old < 6:
-                recency_multiplier = 2.0  # <6h: ×2.0
-            elif hours_old < 24:
-                recency_multiplier = 1.5  # <24h: ×1.5
-            elif hours_old < 72:
-                recency_multiplier = 1.0  # <72h: ×1.0
-            else:
-                recency_multiplier = 0.5  # older: ×0.5
-            
-            # Apply multiplier to current score
-            score = score * recency_multiplier
-        except:
-            pass
+    hours_old = hours_since(article_epoch(article))
+    if hours_old is not None:
+        if hours_old < 6:
+            recency_multiplier = 2.0  # <6h: ×2.0
+        elif hours_old < 24:
+            recency_multiplier = 1.5  # <24h: ×1.5
+        elif hours_old < 72:
+            recency_multiplier = 1.0  # <72h: ×1.0
+        else:
+            recency_multiplier = 0.5  # older: ×0.5
+        
+        # Apply multiplier to current score
+        score = score * recency_multiplier
     
     # Bayesian relevance adjustment (will be added after creating bayesian_relevance module)
     # For now, placeholder - will integrate after creating the module
@@ -434,27 +434,6 @@ def calculate_relevance_score(article: Dict, config: Optional[Dict] = None, zip_
         if pattern in combined:
             score -= 5.0
 
-    # Content quality analysis
-    try:
-        from utils.content_quality import ContentQualityAnalyzer
-        quality_analyzer = ContentQualityAnalyzer()
-        quality_analysis = quality_analyzer.calculate_quality_score(article)
-
-        # Add quality score (scaled down to avoid overpowering other factors)
-        quality_bonus = (quality_analysis['quality_score'] - 50) * 0.5  # Center around 0, scale by 0.5
-        score += quality_bonus
-
-        # Major quality penalties
-        if quality_analysis['quality_score'] < 30:
-            score -= 10  # Major quality issues
-        elif quality_analysis['quality_score'] < 50:
-            score -= 5   # Minor quality issues
-
-    except ImportError:
-        logger.debug("Content quality analyzer not available")
-    except Exception as e:
-        logger.debug(f"Error in content quality analysis: {e}")
-
     # Penalize if no local connection (but only if we got past hard filter)
     if score == 0:
         score = 10.0  # Minimum score if passed hard filter but no other matches
@@ -551,29 +530,23 @@ def calculate_relevance_score_with_tags(article: Dict, config: Optional[Dict] =
     
     # Recency multiplier (applied AFTER source boost, BEFORE Bayesian adjustment)
     recency_multiplier = 1.0
-    published = article.get("published")
-    if published:
-        try:
-            pub_date = datetime.fromisoformat(published.replace('Z', '+00:00').split('+')[0])
-            hours_old = (datetime.now() - pub_date.replace(tzinfo=None)).total_seconds() / 3600
-            
-            if hours_old < 6:
-                recency_multiplier = 2.0  # <6h: ×2.0
-                matched_tags.append("🕐 Published <6h ago (×2.0)")
-            elif hours_old < 24:
-                recency_multiplier = 1.5  # <24h: ×1.5
-                matched_tags.append("🕐 Published <24h ago (×1.5)")
-            elif hours_old < 72:
-                recency_multiplier = 1.0  # <72h: ×1.0
-                matched_tags.append("🕐 Published <72h ago (×1.0)")
-            else:
-                recency_multiplier = 0.5  # older: ×0.5
-                matched_tags.append("🕐 Published >72h ago (×0.5)")
-            
-            # Apply multiplier to current score
-            score = score * recency_multiplier
-        except:
-            pass
+    hours_old = hours_since(article_epoch(article))
+    if hours_old is not None:
+        if hours_old < 6:
+            recency_multiplier = 2.0  # <6h: ×2.0
+            matched_tags.append("🕐 Published <6h ago (×2.0)")
+        elif hours_old < 24:
+            recency_multiplier = 1.5  # <24h: ×1.5
+            matched_tags.append("🕐 Published <24h ago (×1.5)")
+        elif hours_old < 72:
+            recency_multiplier = 1.0  # <72h: ×1.0
+            matched_tags.append("🕐 Published <72h ago (×1.0)")
+        else:
+            recency_multiplier = 0.5  # older: ×0.5
+            matched_tags.append("🕐 Published >72h ago (×0.5)")
+        
+        # Apply multiplier to current score
+        score = score * recency_multiplier
     
     # Bayesian relevance adjustment
     bayesian_adjustment = 0.0
@@ -1,10 +1,10 @@
 """
 Optimized relevance calculator for Fall River articles - simplified and effective
 """
-from datetime import datetime
 from typing import Dict, List, Optional
 import logging
 from config import DATABASE_CONFIG
+from utils.timestamps import article_epoch, hours_since
 
 logger = logging.getLogger(__name__)
 
@@ -149,39 +149,32 @@ def calculate_relevance_score(article: Dict, zip_code: Optional[str] = None) ->
     # === RECENCY BONUS (multiplier 0.7-2.5) ===
     # Local articles get stronger recency weighting - recent local news matters more
     # Local articles get stronger recency weighting - recent local news matters more
-    published = article.get("published")
     recency_multiplier = 1.0
-    if published:
-        try:
-            pub_date = datetime.fromisoformat(published.replace('Z', '+00:00').split('+')[0])
-            hours_old = (datetime.now() - pub_date.replace(tzinfo=None)).total_seconds() / 3600
+    hours_old = hours_since(article_epoch(article))
+    if hours_old is not None:
+        # Base recency multipliers (for non-local content)
+        if hours_old < 6:
+            base_multiplier = 2.0  # Breaking news boost
+        elif hours_old < 24:
+            base_multiplier = 1.5  # Recent news boost
+        elif hours_old < 72:
+            base_multiplier = 1.0  # Normal recency
+        else:
+            base_multiplier = 0.7  # Older news penalty
 
-            # Base recency multipliers (for non-local content)
+        # Local articles get enhanced recency weighting
+        if fall_river_boost > 0 or local_politics_override:
             if hours_old < 6:
-                base_multiplier = 2.0  # Breaking news boost
+                recency_multiplier = 2.5  # Breaking LOCAL news gets maximum boost
             elif hours_old < 24:
-                base_multiplier = 1.5  # Recent news boost
+                recency_multiplier = 2.0  # Recent LOCAL news very important
             elif hours_old < 72:
-                base_multiplier = 1.0  # Normal recency
-            else:
-                base_multiplier = 0.7  # Older news penalty
-
-            # Local articles get enhanced recency weighting
-            if fall_river_boost > 0 or local_politics_override:
-                if hours_old < 6:
-                    recency_multiplier = 2.5  # Breaking LOCAL news gets maximum boost
-                elif hours_old < 24:
-                    recency_multiplier = 2.0  # Recent LOCAL news very important
-                elif hours_old < 72:
-                    recency_multiplier = 1.3  # LOCAL news still gets slight boost
-                else:
-                    recency_multiplier = 0.8  # LOCAL news ages more gracefully
+                recency_multiplier = 1.3  # LOCAL news still gets slight boost
             else:
-                # Non-local content gets standard recency weighting
-                recency_multiplier = base_multiplier
-
-        except:
-            pass
+                recency_multiplier = 0.8  # LOCAL news ages more gracefully
+        else:
+            # Non-local content gets standard recency weighting
+            recency_multiplier = base_multiplier
 
     # === JUNK CONTENT PENALTIES (-50 to 0 points) ===
     junk_penalties = 0
@@ -0,0 +1,238 @@
+"""
+Inverted index from relevance keywords/phrases to article IDs
+Lets a relevance config change rescore only the articles that contain the affected term
+instead of running a full rerun-relevance-scoring over every article. Triggers on articles keep
+it current for every write path: edits and deletes drop an article's postings, and inserted or
+edited articles are queued in relevance_index_pending and indexed before the next lookup.
+"""
+import logging
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config import DATABASE_CONFIG
+from utils.batch_relevance import build_term_matrix, rescore_articles
+from utils.relevance_calculator import load_relevance_config
+
+logger = logging.getLogger(__name__)
+
+# relevance_config categories that affect scoring, and which article field they match against
+SCORED_CATEGORIES = {
+    'high_relevance': 'text',
+    'local_places': 'text',
+    'topic_keywords': 'text',
+    'clickbait_patterns': 'text',
+    'source_credibility': 'source',
+}
+
+# Points stored for items added through the admin panel
+DEFAULT_ITEM_POINTS = {
+    'high_relevance': 10.0,
+    'local_places': 3.0,
+    'topic_keywords': 5.0,
+    'source_credibility': 5.0,
+}
+
+
+def init_index_tables(cursor):
+    """Create the term index tables if they don't exist"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS relevance_term_index (
+            field TEXT NOT NULL,
+            term TEXT NOT NULL,
+            article_id INTEGER NOT NULL,
+            PRIMARY KEY (field, term, article_id)
+        )
+    ''')
+    # Terms whose postings are complete (a term can legitimately have zero postings)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS relevance_indexed_terms (
+            field TEXT NOT NULL,
+            term TEXT NOT NULL,
+            indexed_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (field, term)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_relevance_term_index_article ON relevance_term_index(article_id)')
+    # Articles written since they were last indexed (filled by the triggers below)
+    cursor.execute('CREATE TABLE IF NOT EXISTS relevance_index_pending (article_id INTEGER PRIMARY KEY)')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_relevance_index_insert
+        AFTER INSERT ON articles
+        BEGIN
+            INSERT OR IGNORE INTO relevance_index_pending (article_id) VALUES (NEW.id);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_relevance_index_update
+        AFTER UPDATE OF title, content, source ON articles
+        WHEN NEW.title IS NOT OLD.title OR NEW.content IS NOT OLD.content OR NEW.source IS NOT OLD.source
+        BEGIN
+            DELETE FROM relevance_term_index WHERE article_id = OLD.id;
+            INSERT OR IGNORE INTO relevance_index_pending (article_id) VALUES (NEW.id);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_relevance_index_delete
+        AFTER DELETE ON articles
+        BEGIN
+            DELETE FROM relevance_term_index WHERE article_id = OLD.id;
+            DELETE FROM relevance_index_pending WHERE article_id = OLD.id;
+        END
+    ''')
+
+
+def _article_field_text(field: str, title: Optional[str], content: Optional[str], source: Optional[str]) -> str:
+    """Text a term is matched against - same strings BatchRelevanceScorer uses"""
+    if field == 'source':
+        return (source or '').lower()
+    return f"{(title or '').lower()} {(content or '').lower()}"
+
+
+def index_articles(cursor, articles: Sequence[Tuple[int, str, str, str]]):
+    """(Re)build postings for inserted or edited articles against every already-indexed term
+
+    Args:
+        cursor: Open cursor (runs inside the caller's transaction)
+        articles: Sequence of (article_id, title, content, source)
+    """
+    if not articles:
+        return
+    init_index_tables(cursor)
+    cursor.execute('SELECT field, term FROM relevance_indexed_terms')
+    terms_by_field = {}
+    for field, term in cursor.fetchall():
+        terms_by_field.setdefault(field, []).append(term)
+
+    # Drop leftovers for reused IDs (INSERT OR REPLACE deletes rows without firing the delete trigger)
+    cursor.executemany('DELETE FROM relevance_term_index WHERE article_id = ?', [(article[0],) for article in articles])
+    postings = []
+    for field, terms in terms_by_field.items():
+        texts = [_article_field_text(field, title, content, source) for _, title, content, source in articles]
+        matrix = build_term_matrix(texts, terms).tocoo()
+        for row, col in zip(matrix.row.tolist(), matrix.col.tolist()):
+            postings.append((field, terms[col], articles[row][0]))
+
+    cursor.executemany('INSERT OR IGNORE INTO relevance_term_index (field, term, article_id) VALUES (?, ?, ?)', postings)
+    cursor.executemany('DELETE FROM relevance_index_pending WHERE article_id = ?', [(article[0],) for article in articles])
+
+
+def _index_pending(cursor):
+    """Index articles the triggers queued (written by paths that don't call index_articles)"""
+    cursor.execute('''
+        SELECT a.id, a.title, a.content, a.source FROM relevance_index_pending p
+        JOIN articles a ON a.id = p.article_id
+    ''')
+    rows = cursor.fetchall()
+    index_articles(cursor, rows)
+    cursor.execute('DELETE FROM relevance_index_pending')
+    if rows:
+        logger.info(f"Indexed {len(rows)} articles written since the last relevance index update")
+
+
+def _index_terms(cursor, field: str, terms: Iterable[str]):
+    """Build postings for terms that are not indexed yet (one scan over all articles)"""
+    cursor.execute('SELECT term FROM relevance_indexed_terms WHERE field = ?', (field,))
+    indexed = {row[0] for row in cursor.fetchall()}
+    missing = sorted({term.lower() for term in terms if term} - indexed)
+    if not missing:
+        return
+
+    cursor.execute('SELECT id, title, content, source FROM articles')
+    rows = cursor.fetchall()
+    texts = [_article_field_text(field, title, content, source) for _, title, content, source in rows]
+    matrix = build_term_matrix(texts, missing).tocoo()
+    postings = [(field, missing[col], rows[row][0]) for row, col in zip(matrix.row.tolist(), matrix.col.tolist())]
+
+    cursor.executemany('INSERT OR IGNORE INTO relevance_term_index (field, term, article_id) VALUES (?, ?, ?)', postings)
+    cursor.executemany('INSERT OR IGNORE INTO relevance_indexed_terms (field, term) VALUES (?, ?)',
+                       [(field, term) for term in missing])
+    logger.info(f"Indexed {len(missing)} relevance terms ({field}): {len(postings)} postings")
+
+
+def build_relevance_index(zip_code: Optional[str] = None, db_path: Optional[str] = None):
+    """Index every scored term in a zip's relevance config (terms already indexed are skipped)"""
+    config = load_relevance_config(zip_code=zip_code)
+    conn = sqlite3.connect(db_path or DATABASE_CONFIG.get("path", "fallriver_news.db"))
+    try:
+        cursor = conn.cursor()
+        init_index_tables(cursor)
+        for category, field in SCORED_CATEGORIES.items():
+            _index_terms(cursor, field, config.get(category, []))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def find_articles_with_term(cursor, category: str, term: str, zip_code: Optional[str] = None) -> List[int]:
+    """Article IDs containing a relevance term, indexing the term first if needed"""
+    field = SCORED_CATEGORIES[category]
+    term = term.lower()
+    init_index_tables(cursor)
+    _index_pending(cursor)
+    _index_terms(cursor, field, [term])
+    if zip_code:
+        cursor.execute('''
+            SELECT ti.article_id FROM relevance_term_index ti
+            JOIN articles a ON a.id = ti.article_id
+            WHERE ti.field = ? AND ti.term = ? AND a.zip_code = ?
+        ''', (field, term, zip_code))
+    else:
+        cursor.execute('SELECT article_id FROM relevance_term_index WHERE field = ? AND term = ?', (field, term))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def apply_relevance_item_change(category: str, item: str, zip_code: Optional[str] = None,
+                                added: bool = True, db_path: Optional[str] = None) -> Dict:
+    """Persist an added/removed relevance item and rescore only the articles containing it
+
+    Args:
+        category: relevance_config category (e.g. 'topic_keywords')
+        item: Keyword, phrase or source name
+        zip_code: Zip code whose config is changing
+        added: True when the item was added, False when removed
+        db_path: Optional database path (defaults to DATABASE_CONFIG)
+
+    Returns:
+        Dict with affected_count (articles containing the term), changed_count
+        (articles whose score moved) and duration (seconds)
+    """
+    db_path = db_path or DATABASE_CONFIG.get("path", "fallriver_news.db")
+    item = item.strip().lower()
+
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        if added:
+            # UNIQUE(category, item, zip_code, city_state) doesn't catch NULL columns, so check first
+            cursor.execute('SELECT 1 FROM relevance_config WHERE category = ? AND LOWER(item) = ? AND zip_code IS ?',
+                           (category, item, zip_code))
+            if not cursor.fetchone():
+                cursor.execute('''
+                    INSERT INTO relevance_config (category, item, points, zip_code)
+                    VALUES (?, ?, ?, ?)
+                ''', (category, item, DEFAULT_ITEM_POINTS.get(category), zip_code))
+        else:
+            cursor.execute('DELETE FROM relevance_config WHERE category = ? AND LOWER(item) = ? AND zip_code IS ?',
+                           (category, item, zip_code))
+
+        affected_ids = []
+        if category in SCORED_CATEGORIES:
+            affected_ids = find_articles_with_term(cursor, category, item, zip_code)
+        conn.commit()
+    finally:
+        conn.close()
+
+    # Drop the cached config so the rescore sees the change
+    load_relevance_config(force_reload=True, zip_code=zip_code)
+
+    if not affected_ids:
+        return {'affected_count': 0, 'changed_count': 0, 'duration': 0.0}
+
+    result = rescore_articles(zip_code=zip_code, db_path=db_path, article_ids=affected_ids)
+    logger.info(f"Relevance item {'added' if added else 'removed'} ({category}: '{item}'): "
+                f"{len(affected_ids)} articles affected, {result['changed_count']} scores changed")
+    return {
+        'affected_count': len(affected_ids),
+        'changed_count': result['changed_count'],
+        'duration': result['duration']
+    }
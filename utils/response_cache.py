@@ -0,0 +1,179 @@
+"""
+Rendered-response cache for the dynamic index and category pages
+Pages are keyed by (zip, category, template version) and tagged with the data version they were
+rendered from (see utils/data_version.py). An entry is reused until the data version moves or it
+reaches max_age (pages show the current time and a 48-hour window, so they can't live forever).
+Entries live in memory; with response_cache_dir set they are also written to disk, so server
+processes share renders and a restart starts warm.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Hashable, Optional
+
+from config import WEBSITE_CONFIG
+from utils.data_version import DataVersion, get_data_version
+from utils.site_writer import write_text_atomic
+from utils.templates import sync_templates
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Entries kept in memory (zips x categories); the oldest is dropped first
+MAX_ENTRIES = 512
+
+
+class CachedResponse:
+    """A rendered page and its validators"""
+
+    __slots__ = ('body', 'etag', 'last_modified', 'data_version')
+
+    def __init__(self, body: bytes, etag: str, last_modified: float, data_version: int):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.data_version = data_version
+
+    @classmethod
+    def from_html(cls, html: str, data_version: int) -> 'CachedResponse':
+        body = html.encode('utf-8')
+        return cls(body, f'"{hashlib.sha256(body).hexdigest()[:32]}"', time.time(), data_version)
+
+
+class ResponseCache:
+    """In-process (optionally disk-backed) cache of rendered pages"""
+
+    def __init__(self, max_age: Optional[int] = None, disk_dir: Optional[str] = None,
+                 data_version: Optional[DataVersion] = None, max_entries: int = MAX_ENTRIES):
+        """
+        Args:
+            max_age: Seconds an entry may be reused (default: response_cache_max_age, 0 disables)
+            disk_dir: Directory for the disk copy (default: response_cache_dir, empty disables)
+            data_version: Data version reader (default: the process-wide one)
+            max_entries: Entries kept in memory
+        """
+        self.max_age = WEBSITE_CONFIG.get("response_cache_max_age", 300) if max_age is None else max_age
+        disk_dir = WEBSITE_CONFIG.get("response_cache_dir") if disk_dir is None else disk_dir
+        self.disk_dir = None
+        if disk_dir:
+            self.disk_dir = Path(disk_dir) if Path(disk_dir).is_absolute() else PROJECT_ROOT / disk_dir
+            try:
+                self.disk_dir.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"Response cache disk copy disabled ({self.disk_dir}): {e}")
+                self.disk_dir = None
+        self.data_version = data_version or get_data_version()
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, CachedResponse]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def template_version(self) -> str:
+        """Digest of the templates (re-checked at most every TEMPLATE_CHECK_INTERVAL seconds)"""
+        return sync_templates()
+
+    def key(self, zip_code: str, category: Optional[str]) -> tuple:
+        """Cache key for a page (category None is the zip's index)"""
+        return (zip_code, category, self.template_version())
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """Reusable entry for key, or None"""
+        if self.max_age <= 0:
+            return None
+        version = self.data_version.current()
+        entry = self._entries.get(key)
+        if self._fresh(entry, version):
+            return entry
+        if self.disk_dir is not None:
+            entry = self._load(key)  # Possibly rendered by another server process
+            if self._fresh(entry, version):
+                self._remember(key, entry)
+                return entry
+        return None
+
+    def put(self, key: Hashable, html: str, data_version: int) -> CachedResponse:
+        """Store a page rendered from data_version (read before rendering)"""
+        entry = CachedResponse.from_html(html, data_version)
+        if self.max_age > 0 and data_version >= 0:
+            self._remember(key, entry)
+            if self.disk_dir is not None:
+                self._store(key, entry)
+        return entry
+
+    def get_or_render(self, key: Hashable, render: Callable[[], object]):
+        """Cached entry for key, rendering and storing it on a miss
+
+        Args:
+            key: Cache key (see key())
+            render: Returns the page HTML, or a (body, status) tuple on error
+
+        Returns:
+            CachedResponse, or render()'s error tuple (which is not cached)
+        """
+        entry = self.get(key)
+        if entry is not None:
+            return entry
+        version = self.data_version.current()
+        html = render()
+        if isinstance(html, tuple):  # Error case
+            return html
+        return self.put(key, html, version)
+
+    def clear(self):
+        """Drop every in-memory entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def _fresh(self, entry: Optional[CachedResponse], version: int) -> bool:
+        return (entry is not None and version >= 0 and entry.data_version == version
+                and time.time() - entry.last_modified < self.max_age)
+
+    def _remember(self, key: Hashable, entry: CachedResponse):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_path(self, key: Hashable) -> Path:
+        return self.disk_dir / f"{hashlib.sha1(repr(key).encode('utf-8')).hexdigest()}.json"
+
+    def _load(self, key: Hashable) -> Optional[CachedResponse]:
+        try:
+            with open(self._disk_path(key), encoding='utf-8') as f:
+                data = json.load(f)
+            return CachedResponse(data['html'].encode('utf-8'), data['etag'], data['last_modified'],
+                                  data['data_version'])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable response cache entry for {key}: {e}")
+            return None
+
+    def _store(self, key: Hashable, entry: CachedResponse):
+        try:
+            write_text_atomic(str(self._disk_path(key)), json.dumps({
+                'html': entry.body.decode('utf-8'),
+                'etag': entry.etag,
+                'last_modified': entry.last_modified,
+                'data_version': entry.data_version,
+            }))
+        except OSError as e:
+            logger.warning(f"Could not write response cache entry for {key}: {e}")
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide response cache"""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
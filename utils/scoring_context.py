@@ -0,0 +1,105 @@
+"""
+Prefetched article_management flags for relevance scoring
+A ScoringContext loads stellar / top story / rejected flags for a whole batch of articles in
+one query, so scoring a batch doesn't open a connection per article. Single-article scoring
+goes through a shared per-zip context that caches lookups for a short TTL.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from config import DATABASE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+MANAGEMENT_FLAGS = ('is_stellar', 'is_top_story', 'is_rejected')
+NO_FLAGS = {flag: 0 for flag in MANAGEMENT_FLAGS}
+
+# Seconds a shared context's cached flags stay valid (admin edits show up after at most this)
+SHARED_CONTEXT_TTL = 60
+
+_shared_contexts: Dict[str, "ScoringContext"] = {}
+_shared_lock = threading.Lock()
+
+
+class ScoringContext:
+    """Management flags for the articles of one zip code"""
+
+    def __init__(self, zip_code: Optional[str], db_path: Optional[str] = None):
+        self.zip_code = zip_code
+        self.db_path = db_path or DATABASE_CONFIG.get("path", "fallriver_news.db")
+        self.created_at = time.time()
+        self._flags: Dict[int, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _query(self, article_ids) -> Dict[int, Dict[str, int]]:
+        """Latest management row per article (same row the per-article lookup picked)"""
+        found = {}
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.cursor()
+            for start in range(0, len(article_ids), 500):
+                chunk = article_ids[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(f'''
+                    SELECT article_id, {', '.join(MANAGEMENT_FLAGS)} FROM article_management
+                    WHERE zip_code = ? AND article_id IN ({placeholders})
+                    ORDER BY id
+                ''', [self.zip_code] + chunk)
+                for row in cursor.fetchall():
+                    # Later rows win, matching ORDER BY id DESC LIMIT 1
+                    found[row[0]] = {flag: value or 0 for flag, value in zip(MANAGEMENT_FLAGS, row[1:])}
+        finally:
+            conn.close()
+        return found
+
+    def prefetch(self, article_ids: Iterable[Optional[int]]) -> "ScoringContext":
+        """Load flags for every article not already cached in one query
+
+        Args:
+            article_ids: Article IDs in the batch (None entries are skipped)
+
+        Returns:
+            self, so callers can write ScoringContext(zip).prefetch(ids)
+        """
+        missing = sorted({article_id for article_id in article_ids
+                          if article_id is not None and article_id not in self._flags})
+        if not missing or not self.zip_code:
+            return self
+        try:
+            found = self._query(missing)
+        except sqlite3.Error as e:
+            logger.warning(f"Error prefetching management flags: {e}")
+            found = {}
+        with self._lock:
+            for article_id in missing:
+                self._flags[article_id] = found.get(article_id, NO_FLAGS)
+        return self
+
+    def flags(self, article_id: Optional[int]) -> Dict[str, int]:
+        """Flags for one article (fetched on a cache miss)"""
+        if article_id is None or not self.zip_code:
+            return NO_FLAGS
+        if article_id not in self._flags:
+            self.prefetch([article_id])
+        return self._flags.get(article_id, NO_FLAGS)
+
+    def is_stellar(self, article: Dict) -> bool:
+        """True if the article dict or its management row marks it stellar"""
+        if article.get('is_stellar', 0):
+            return True
+        return bool(self.flags(article.get('id'))['is_stellar'])
+
+
+def get_scoring_context(zip_code: Optional[str]) -> ScoringContext:
+    """Shared context for single-article scoring (replaced after SHARED_CONTEXT_TTL seconds)"""
+    key = zip_code or ''
+    with _shared_lock:
+        context = _shared_contexts.get(key)
+        if context is None or time.time() - context.created_at > SHARED_CONTEXT_TTL:
+            context = ScoringContext(zip_code)
+            _shared_contexts[key] = context
+        return context
+
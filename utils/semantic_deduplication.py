@@ -116,35 +116,55 @@ class SemanticDeduplicator:
         # Use cosine similarity for content
         return self.cosine_similarity(content1, content2)
 
-    def is_duplicate(self, article1: Dict, article2: Dict, threshold: float = 0.7) -> Tuple[bool, float, str]:
-        """
-        Check if two articles are duplicates
-
-        Args:
-            article1, article2: Article dictionaries
-            threshold: Similarity threshold (0-1)
+    def article_features(self, article: Dict) -> Dict:
+        """Tokenize an article once for repeated similarity checks
 
         Returns:
-            (is_duplicate, similarity_score, reason)
+            Dict with the raw title/content plus their preprocessed word sets
         """
-        title1 = article1.get('title', '')
-        title2 = article2.get('title', '')
-        content1 = article1.get('content', '') or article1.get('summary', '')
-        content2 = article2.get('content', '') or article2.get('summary', '')
+        title = article.get('title', '') or ''
+        content = article.get('content', '') or article.get('summary', '') or ''
+        return {
+            'title': title,
+            'title_words': self.preprocess_text(title),
+            'content': content,
+            'content_words': self.preprocess_text(content)
+        }
+
+    def feature_similarity(self, features1: Dict, features2: Dict) -> Tuple[float, float, float]:
+        """Similarity between two pre-tokenized articles
 
-        # Title similarity (most important)
-        title_sim = self.title_similarity(title1, title2)
+        Same arithmetic as title_similarity/content_similarity, without re-tokenizing.
 
-        # Content similarity
-        content_sim = self.content_similarity(content1, content2)
+        Returns:
+            (combined_similarity, title_similarity, content_similarity)
+        """
+        title1, title2 = features1['title'], features2['title']
+        words1, words2 = features1['title_words'], features2['title_words']
+        title_sim = 0.0
+        if title1 and title2 and words1 and words2:
+            title_sim = self.jaccard_similarity(words1, words2)
+            len_diff = abs(len(title1) - len(title2)) / max(len(title1), len(title2))
+            if len_diff < 0.3:  # Length difference < 30%
+                title_sim *= 1.2
+            title_sim = min(title_sim, 1.0)
+
+        content_sim = 0.0
+        if features1['content'] and features2['content']:
+            content1, content2 = features1['content_words'], features2['content_words']
+            if not content1 and not content2:
+                content_sim = 1.0
+            elif content1 and content2:
+                # Word sets, so every term frequency is 1
+                content_sim = len(content1 & content2) / (math.sqrt(len(content1)) * math.sqrt(len(content2)))
 
-        # Combined similarity (weighted average)
         combined_sim = (title_sim * 0.7) + (content_sim * 0.3)
+        return combined_sim, title_sim, content_sim
 
-        # Determine if duplicate
+    def _duplicate_reason(self, combined_sim: float, title_sim: float, content_sim: float,
+                          threshold: float) -> Tuple[bool, str]:
+        """Duplicate decision and human-readable reason for a similarity triple"""
         is_duplicate = combined_sim >= threshold
-
-        # Determine reason
         if is_duplicate:
             if title_sim >= 0.8:
                 reason = f"Very similar titles ({title_sim:.2f})"
@@ -154,7 +174,23 @@ class SemanticDeduplicator:
                 reason = f"Overall similarity ({combined_sim:.2f})"
         else:
             reason = f"Below threshold ({combined_sim:.2f} < {threshold})"
+        return is_duplicate, reason
 
+    def is_duplicate(self, article1: Dict, article2: Dict, threshold: float = 0.7) -> Tuple[bool, float, str]:
+        """
+        Check if two articles are duplicates
+
+        Args:
+            article1, article2: Article dictionaries
+            threshold: Similarity threshold (0-1)
+
+        Returns:
+            (is_duplicate, similarity_score, reason)
+        """
+        # Title similarity is weighted 0.7, content similarity 0.3
+        combined_sim, title_sim, content_sim = self.feature_similarity(
+            self.article_features(article1), self.article_features(article2))
+        is_duplicate, reason = self._duplicate_reason(combined_sim, title_sim, content_sim, threshold)
         return is_duplicate, combined_sim, reason
 
     def find_similar_articles(self, new_article: Dict, existing_articles: List[Dict],
@@ -171,21 +207,36 @@ class SemanticDeduplicator:
             List of (article, similarity_score, reason) tuples for similar articles
         """
         similar_articles = []
+        new_features = self.article_features(new_article)
 
         for existing in existing_articles:
-            is_dup, similarity, reason = self.is_duplicate(new_article, existing, threshold)
+            combined_sim, title_sim, content_sim = self.feature_similarity(new_features, self.article_features(existing))
+            is_dup, reason = self._duplicate_reason(combined_sim, title_sim, content_sim, threshold)
             if is_dup:
-                similar_articles.append((existing, similarity, reason))
+                similar_articles.append((existing, combined_sim, reason))
 
         # Sort by similarity (highest first)
         similar_articles.sort(key=lambda x: x[1], reverse=True)
 
         return similar_articles
 
+    @staticmethod
+    def min_title_jaccard(threshold: float) -> float:
+        """Lowest title word-set Jaccard that can still reach the combined threshold
+
+        combined = 0.7 * title_sim + 0.3 * content_sim with content_sim <= 1 and
+        title_sim <= 1.2 * jaccard, so any duplicate has jaccard >= (threshold - 0.3) / 0.84.
+        """
+        return (threshold - 0.3) / (0.7 * 1.2)
+
     def deduplicate_batch(self, articles: List[Dict], threshold: float = 0.7) -> Tuple[List[Dict], List[Dict]]:
         """
         Remove duplicates from a batch of articles
 
+        Each article is tokenized once and indexed by a MinHash signature of its title words.
+        Only accepted articles sharing an LSH band are verified with the exact similarity,
+        so a batch costs near-linear time instead of comparing every pair.
+
         Args:
             articles: List of article dictionaries
             threshold: Similarity threshold
@@ -196,24 +247,90 @@ class SemanticDeduplicator:
         if not articles:
             return [], []
 
+        min_jaccard = self.min_title_jaccard(threshold)
+        if min_jaccard <= 0.05:
+            # Content alone can reach such a low threshold - title candidates would miss pairs
+            return self.deduplicate_batch_exhaustive(articles, threshold)
+
+        from utils.near_duplicate_index import MinHashLSHIndex
+
+        # Small margin below the bound so float rounding at the boundary can't drop a pair
+        index = MinHashLSHIndex(min_similarity=max(min_jaccard - 0.02, 0.05))
         unique_articles = []
+        unique_features = []
         duplicates = []
 
         for article in articles:
-            # Check against already accepted articles
-            similar = self.find_similar_articles(article, unique_articles, threshold)
+            features = self.article_features(article)
+            signature = index.signature(features['title_words'])
+
+            best = None
+            if signature is not None:
+                # Candidates in acceptance order so ties resolve like the exhaustive scan
+                for candidate in sorted(index.query(signature=signature)):
+                    combined_sim, title_sim, content_sim = self.feature_similarity(features, unique_features[candidate])
+                    if combined_sim >= threshold and (best is None or combined_sim > best[1]):
+                        _, reason = self._duplicate_reason(combined_sim, title_sim, content_sim, threshold)
+                        best = (candidate, combined_sim, reason)
+
+            if best:
+                duplicates.append({
+                    'article': article,
+                    'similar_to': unique_articles[best[0]],
+                    'similarity': best[1],
+                    'reason': best[2]
+                })
+            else:
+                # Articles without title words can never reach the threshold, so aren't indexed
+                index.add(len(unique_articles), signature=signature)
+                unique_articles.append(article)
+                unique_features.append(features)
+
+        return unique_articles, duplicates
+
+    def deduplicate_batch_exhaustive(self, articles: List[Dict], threshold: float = 0.7) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Remove duplicates by comparing every article with every accepted one (O(n^2))
+
+        Reference implementation for deduplicate_batch, also used for thresholds the
+        title index can't serve.
+
+        Args:
+            articles: List of article dictionaries
+            threshold: Similarity threshold
+
+        Returns:
+            (unique_articles, duplicates_with_reasons)
+        """
+        if not articles:
+            return [], []
+
+        unique_articles = []
+        unique_features = []
+        duplicates = []
 
-            if similar:
+        for article in articles:
+            features = self.article_features(article)
+
+            # Check against already accepted articles
+            best = None
+            for i, existing_features in enumerate(unique_features):
+                combined_sim, title_sim, content_sim = self.feature_similarity(features, existing_features)
+                if combined_sim >= threshold and (best is None or combined_sim > best[1]):
+                    _, reason = self._duplicate_reason(combined_sim, title_sim, content_sim, threshold)
+                    best = (i, combined_sim, reason)
+
+            if best:
                 # Found similar article, mark as duplicate
-                most_similar = similar[0]
                 duplicates.append({
                     'article': article,
-                    'similar_to': most_similar[0],
-                    'similarity': most_similar[1],
-                    'reason': most_similar[2]
+                    'similar_to': unique_articles[best[0]],
+                    'similarity': best[1],
+                    'reason': best[2]
                 })
             else:
                 # No similar articles found, add to unique
                 unique_articles.append(article)
+                unique_features.append(features)
 
         return unique_articles, duplicates
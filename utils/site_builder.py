@@ -0,0 +1,88 @@
+"""
+Multi-zip site builds on all cores
+Each zip's site is independent, so zips are spread over a ProcessPoolExecutor. Every worker process
+keeps one warm regenerator (see utils/regeneration_worker.py) for its lifetime and builds one zip at a
+time; within a zip, WebsiteGenerator renders its pages concurrently from one article snapshot and
+writes them atomically.
+
+Usage: python -m utils.site_builder [--full] [--workers N] ZIP [ZIP ...]
+"""
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker(project_root: str):
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+    from utils.templates import preload_templates
+    preload_templates()  # Loads bytecode compiled by earlier processes
+
+
+def _build_zip(zip_code: str, full: bool) -> Dict:
+    from utils.regeneration_worker import get_regenerator
+    return get_regenerator().quick_regenerate(zip_code, full=full)
+
+
+def build_sites(zip_codes: List[str], workers: Optional[int] = None, full: bool = False) -> Dict:
+    """Regenerate the sites for several zips in parallel
+
+    Args:
+        zip_codes: Zip codes to build
+        workers: Worker processes (default: CPU count). 1, or a single zip, builds in-process
+        full: Re-render every page, not just pages whose inputs changed
+
+    Returns:
+        Dict with per-zip results, failed zips (zip -> error), workers and duration (seconds)
+    """
+    start = time.time()
+    zip_codes = list(dict.fromkeys(zip_codes))
+    workers = max(1, min(workers or os.cpu_count() or 1, len(zip_codes) or 1))
+    results: Dict[str, Dict] = {}
+    failed: Dict[str, str] = {}
+
+    if workers == 1:
+        for zip_code in zip_codes:
+            try:
+                results[zip_code] = _build_zip(zip_code, full)
+            except Exception as e:
+                logger.error(f"Site build for zip {zip_code} failed: {e}", exc_info=True)
+                failed[zip_code] = str(e)
+    else:
+        project_root = str(Path(__file__).resolve().parent.parent)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_worker, initargs=(project_root,)) as executor:
+            futures = {executor.submit(_build_zip, zip_code, full): zip_code for zip_code in zip_codes}
+            for future in as_completed(futures):
+                zip_code = futures[future]
+                try:
+                    results[zip_code] = future.result()
+                except Exception as e:
+                    logger.error(f"Site build for zip {zip_code} failed: {e}")
+                    failed[zip_code] = str(e)
+
+    duration = time.time() - start
+    logger.info(f"Built {len(results)}/{len(zip_codes)} zip sites with {workers} worker(s) in {duration:.2f}s")
+    return {'results': results, 'failed': failed, 'workers': workers, 'duration': round(duration, 2)}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Build the static sites for several zip codes in parallel")
+    parser.add_argument("zip_codes", nargs="+", help="Zip codes to build")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--full", action="store_true", help="Re-render every page")
+    args = parser.parse_args()
+    summary = build_sites(args.zip_codes, workers=args.workers, full=args.full)
+    print(f"{len(summary['results'])} built, {len(summary['failed'])} failed in {summary['duration']}s "
+          f"({summary['workers']} workers)")
+    sys.exit(1 if summary['failed'] else 0)
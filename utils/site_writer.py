@@ -0,0 +1,257 @@
+"""
+Content-addressed output writes for the static site
+Every generated file goes through SiteWriter, which hashes the rendered bytes and compares them with
+the hash stored for that path in the site_files table. Unchanged output is not rewritten, so mtimes,
+browser/CDN caches and deploys only move when content does. Changed files are written to a temporary
+file in the destination directory and moved into place with os.replace(), so a server (or a concurrent
+render of another page) never sees a half-written file.
+
+site_files also remembers the hash last deployed for each path: changed_files() is the list of files
+the deployer still has to push, and content_hash() gives a stable validator for cache headers.
+
+Text artifacts (HTML, CSS, JS, ...) also get precompressed .gz and, when the brotli package is
+installed, .br siblings, so servers can send them without compressing per request.
+"""
+import gzip
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from config import DATABASE_CONFIG
+
+try:
+    import brotli
+except ImportError:
+    brotli = None  # Optional feature
+
+logger = logging.getLogger(__name__)
+
+# Extensions that get precompressed siblings
+PRECOMPRESS_EXTENSIONS = ('.html', '.css', '.js', '.json', '.xml', '.svg', '.txt')
+
+# Smaller files are not worth a compressed copy (headers outweigh the savings)
+PRECOMPRESS_MIN_SIZE = 256
+
+# Content-Encoding -> sibling suffix, in server preference order
+PRECOMPRESSED_SUFFIXES = (('br', '.br'), ('gzip', '.gz'))
+
+
+def init_site_files_table(cursor):
+    """Create the site_files table if it doesn't exist"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS site_files (
+            path TEXT PRIMARY KEY,
+            sha256 TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            updated_at REAL NOT NULL,
+            deployed_sha256 TEXT
+        )
+    ''')
+
+
+def write_bytes_atomic(path: str, data: bytes):
+    """Write data to path, replacing any existing file in one step
+
+    Args:
+        path: Destination file (its directory must exist)
+        data: Content to write
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_text_atomic(path: str, text: str, encoding: str = "utf-8"):
+    """write_bytes_atomic() for text (unencodable characters are replaced)"""
+    write_bytes_atomic(path, text.encode(encoding, errors="replace"))
+
+
+def write_compressed_siblings(path: str, data: bytes):
+    """Write path.gz and path.br for a text artifact (or remove them if it no longer qualifies)
+
+    Args:
+        path: The uncompressed file's path
+        data: Its content
+    """
+    compress = path.lower().endswith(PRECOMPRESS_EXTENSIONS) and len(data) >= PRECOMPRESS_MIN_SIZE
+    for encoding, suffix in PRECOMPRESSED_SUFFIXES:
+        sibling = path + suffix
+        if compress and encoding == 'gzip':
+            write_bytes_atomic(sibling, gzip.compress(data, compresslevel=9, mtime=0))
+        elif compress and encoding == 'br' and brotli is not None:
+            write_bytes_atomic(sibling, brotli.compress(data, quality=11))
+        elif os.path.exists(sibling):
+            os.unlink(sibling)  # Stale copy of older content
+
+
+def _siblings_current(path: str) -> bool:
+    if not path.lower().endswith(PRECOMPRESS_EXTENSIONS):
+        return True
+    mtime = os.path.getmtime(path)
+    return all(os.path.exists(path + suffix) and os.path.getmtime(path + suffix) >= mtime
+               for encoding, suffix in PRECOMPRESSED_SUFFIXES if encoding == 'gzip' or brotli is not None)
+
+
+class SiteWriter:
+    """Writes output files only when their content hash changes"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or DATABASE_CONFIG.get("path", "fallriver_news.db")
+        self._hashes: Optional[Dict[str, Tuple[str, int]]] = None
+        self._outputs: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.written = 0
+        self.unchanged = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        init_site_files_table(conn.cursor())
+        return conn
+
+    def _known_hashes(self) -> Dict[str, Tuple[str, int]]:
+        if self._hashes is None:
+            hashes = {}
+            try:
+                conn = self._connect()
+                try:
+                    for path, sha256, size in conn.execute('SELECT path, sha256, size FROM site_files'):
+                        hashes[path] = (sha256, size)
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not load site file hashes: {e}")
+            self._hashes = hashes
+        return self._hashes
+
+    def write_bytes(self, path: str, data: bytes) -> bool:
+        """Write data unless the file already holds exactly these bytes
+
+        Returns:
+            True if the file was written
+        """
+        path = os.path.abspath(path)
+        sha256 = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            known = self._known_hashes().get(path)
+            self._outputs[path] = time.time()
+        if known == (sha256, len(data)) and os.path.isfile(path) and os.path.getsize(path) == len(data):
+            with self._lock:
+                self.unchanged += 1
+            if len(data) >= PRECOMPRESS_MIN_SIZE and not _siblings_current(path):
+                write_compressed_siblings(path, data)
+            return False
+
+        write_bytes_atomic(path, data)
+        write_compressed_siblings(path, data)
+        with self._lock:
+            self._hashes[path] = (sha256, len(data))
+            self.written += 1
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute('''
+                        INSERT INTO site_files (path, sha256, size, updated_at) VALUES (?, ?, ?, ?)
+                        ON CONFLICT(path) DO UPDATE SET sha256 = excluded.sha256, size = excluded.size,
+                                                        updated_at = excluded.updated_at
+                    ''', (path, sha256, len(data), time.time()))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not record hash for {path}: {e}")
+        return True
+
+    def write_text(self, path: str, text: str, encoding: str = "utf-8") -> bool:
+        """write_bytes() for text (unencodable characters are replaced)"""
+        return self.write_bytes(path, text.encode(encoding, errors="replace"))
+
+    def copy_file(self, src: str, dst: str) -> bool:
+        """Copy src to dst if dst's content differs"""
+        with open(src, "rb") as f:
+            return self.write_bytes(dst, f.read())
+
+    def last_output(self, path: str) -> float:
+        """When this writer last produced path (written or found unchanged), 0 if never"""
+        return self._outputs.get(os.path.abspath(path), 0.0)
+
+    def content_hash(self, path: str) -> Optional[str]:
+        """sha256 of the content last written to path, if it is still current on disk"""
+        path = os.path.abspath(path)
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute('SELECT sha256, size FROM site_files WHERE path = ?', (path,)).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None
+        if row and os.path.isfile(path) and os.path.getsize(path) == row[1]:
+            return row[0]
+        return None
+
+    def changed_files(self, root: Optional[str] = None) -> List[str]:
+        """Files whose content differs from what was last deployed
+
+        Args:
+            root: Only files under this directory
+
+        Returns:
+            Absolute paths of existing files, sorted
+        """
+        query = 'SELECT path FROM site_files WHERE sha256 IS NOT deployed_sha256'
+        params: list = []
+        if root:
+            prefix = os.path.join(os.path.abspath(root), '')
+            query += ' AND substr(path, 1, ?) = ?'
+            params.extend([len(prefix), prefix])
+        try:
+            conn = self._connect()
+            try:
+                paths = [row[0] for row in conn.execute(query + ' ORDER BY path', params)]
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not list changed site files: {e}")
+            return []
+        return [path for path in paths if os.path.isfile(path)]
+
+    def mark_deployed(self, paths: List[str]):
+        """Record that the current content of paths has been deployed"""
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany('UPDATE site_files SET deployed_sha256 = sha256 WHERE path = ?',
+                                     [(os.path.abspath(path),) for path in paths])
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not mark site files deployed: {e}")
+
+
+_site_writer: Optional[SiteWriter] = None
+_site_writer_lock = threading.Lock()
+
+
+def get_site_writer() -> SiteWriter:
+    """Process-wide site writer"""
+    global _site_writer
+    with _site_writer_lock:
+        if _site_writer is None:
+            _site_writer = SiteWriter()
+        return _site_writer
@@ -14,14 +14,43 @@ logger = logging.getLogger(__name__)
 class SmartCategorizer:
     """Intelligent article categorizer with learning capabilities"""
 
-    def __init__(self, zip_code: Optional[str] = None):
+    def __init__(self, zip_code: Optional[str] = None, db_path: Optional[str] = None):
         self.zip_code = zip_code
-        self.db_path = DATABASE_CONFIG.get("path", "fallriver_news.db")
+        self.db_path = db_path or DATABASE_CONFIG.get("path", "fallriver_news.db")
         self.categories = ['business', 'crime', 'events', 'food', 'local-news',
                           'obituaries', 'schools', 'sports', 'weather']
+        self._keywords: Optional[Dict[str, Set[str]]] = None  # Set by preload_keywords()
+
+    def preload_keywords(self, conn: Optional[sqlite3.Connection] = None) -> "SmartCategorizer":
+        """Load every category's keywords in one query so categorizing doesn't hit the database
+
+        Args:
+            conn: Optional open connection (e.g. a read-only worker connection)
+        """
+        keywords = {category: set() for category in self.categories}
+        own_conn = conn is None
+        try:
+            conn = conn or sqlite3.connect(self.db_path)
+            try:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT category, keyword FROM category_keywords
+                    WHERE zip_code = ? OR zip_code IS NULL
+                ''', (self.zip_code,))
+                for category, keyword in cursor.fetchall():
+                    keywords.setdefault(category, set()).add(keyword.lower())
+            finally:
+                if own_conn:
+                    conn.close()
+        except Exception as e:
+            logger.error(f"Error preloading category keywords: {e}")
+        self._keywords = keywords
+        return self
 
     def get_category_keywords(self, category: str) -> Set[str]:
         """Get keywords for a specific category"""
+        if self._keywords is not None:
+            return self._keywords.get(category, set())
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
@@ -294,6 +323,9 @@ class SmartCategorizer:
             conn.commit()
             conn.close()
 
+            if self._keywords is not None:
+                self._keywords.setdefault(category, set()).update(keyword.lower() for keyword in keywords)
+
         except Exception as e:
             logger.error(f"Error adding keywords to category {category}: {e}")
 
@@ -0,0 +1,109 @@
+"""
+Content negotiation and validators for serving the generated site
+Picks the precompressed sibling (.br / .gz, see utils/site_writer.py) a client accepts, and derives
+strong ETags from the file's content hash, one per encoding, so repeat views are answered with 304.
+Used by the Flask static routes (admin/services.send_static) and serve_website.py.
+"""
+import hashlib
+import mimetypes
+import os
+import threading
+from typing import Dict, Optional, Set, Tuple
+
+from utils.site_writer import PRECOMPRESSED_SUFFIXES
+
+# path -> ((mtime_ns, size, inode), sha256)
+_hash_cache: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
+_hash_cache_lock = threading.Lock()
+
+ETAG_SUFFIXES = {'gzip': '-gz', 'br': '-br'}
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> Set[str]:
+    """Content codings a client accepts (q=0 entries excluded)
+
+    Args:
+        accept_encoding: The Accept-Encoding request header
+    """
+    accepted = set()
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(coding)
+    if '*' in accepted:
+        accepted.update(encoding for encoding, _ in PRECOMPRESSED_SUFFIXES)
+    return accepted
+
+
+def select_representation(path: str, accept_encoding: Optional[str]) -> Tuple[str, Optional[str]]:
+    """Best file to send for path
+
+    A sibling is only used if it is at least as new as the file itself (files written outside
+    SiteWriter have no fresh siblings).
+
+    Returns:
+        (file path to send, Content-Encoding or None for the file itself)
+    """
+    accepted = accepted_encodings(accept_encoding)
+    if accepted:
+        try:
+            mtime = os.path.getmtime(path)
+            for encoding, suffix in PRECOMPRESSED_SUFFIXES:
+                sibling = path + suffix
+                if encoding in accepted and os.path.isfile(sibling) and os.path.getmtime(sibling) >= mtime:
+                    return sibling, encoding
+        except OSError:
+            pass
+    return path, None
+
+
+def content_sha256(path: str) -> str:
+    """sha256 of a file, cached until its mtime, size or inode changes"""
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    with _hash_cache_lock:
+        cached = _hash_cache.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    sha256 = digest.hexdigest()
+    with _hash_cache_lock:
+        _hash_cache[path] = (key, sha256)
+    return sha256
+
+
+def strong_etag(path: str, encoding: Optional[str] = None) -> str:
+    """Quoted strong ETag for path's content in the given encoding"""
+    return f'"{content_sha256(path)[:32]}{ETAG_SUFFIXES.get(encoding, "")}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches etag (weak comparison, as RFC 9110 requires)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return any((tag[2:] if tag.startswith('W/') else tag) == etag for tag in tags)
+
+
+def guess_mimetype(path: str) -> str:
+    """Content-Type for a site file (UTF-8 for text)"""
+    mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    if mimetype.startswith('text/') or mimetype in ('application/javascript', 'application/json'):
+        mimetype += '; charset=utf-8'
+    return mimetype
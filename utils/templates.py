@@ -0,0 +1,115 @@
+"""
+Shared Jinja2 environment for site and dynamic page templates
+One Environment per process, reused by every WebsiteGenerator, zip and request, so each template is
+compiled once and kept in memory. Compiled bytecode is also stored on disk (FileSystemBytecodeCache),
+so a fresh process (regeneration worker, job runner, server restart) loads templates without
+recompiling them. Outside dev mode (template_auto_reload) Jinja does not re-check each template on
+disk; instead sync_templates() compares templates_digest() with the files the compiled templates came
+from and drops them when anything changed, so long-lived processes pick up template edits.
+"""
+import hashlib
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+
+from config import WEBSITE_CONFIG
+from utils.build_manifest import templates_digest
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+TEMPLATE_DIR = PROJECT_ROOT / "website_generator" / "templates"
+
+_env: Optional[Environment] = None
+_env_lock = threading.Lock()
+_string_templates: Dict[str, Template] = {}
+
+# Seconds between template directory checks made by sync_templates() without force
+TEMPLATE_CHECK_INTERVAL = 1.0
+
+_digest: Optional[str] = None  # templates_digest() the compiled templates belong to
+_checked_at = 0.0
+
+
+def _bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    cache_dir = Path(WEBSITE_CONFIG.get("template_cache_dir") or "")
+    if not str(cache_dir):
+        return None
+    if not cache_dir.is_absolute():
+        cache_dir = PROJECT_ROOT / cache_dir
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        return FileSystemBytecodeCache(str(cache_dir))
+    except OSError as e:
+        logger.warning(f"Template bytecode cache disabled ({cache_dir}): {e}")
+        return None
+
+
+def get_template_env() -> Environment:
+    """Process-wide Environment over website_generator/templates"""
+    global _env, _digest, _checked_at
+    if _env is None:
+        with _env_lock:
+            if _env is None:
+                _digest = templates_digest(TEMPLATE_DIR)
+                _checked_at = time.monotonic()
+                auto_reload = bool(WEBSITE_CONFIG.get("template_auto_reload", False))
+                _env = Environment(loader=FileSystemLoader(str(TEMPLATE_DIR)),
+                                   bytecode_cache=_bytecode_cache(),
+                                   auto_reload=auto_reload,
+                                   cache_size=-1)  # Never evict compiled templates
+                logger.info(f"Template environment ready (auto_reload={auto_reload})")
+    return _env
+
+
+def sync_templates(force: bool = False) -> str:
+    """Current templates_digest(), dropping compiled templates if the files changed since they were loaded
+
+    Args:
+        force: Check the template directory now (otherwise at most every TEMPLATE_CHECK_INTERVAL seconds)
+
+    Returns:
+        Digest of the templates that renders will now use
+    """
+    global _digest, _checked_at
+    if _digest is not None and not force and time.monotonic() - _checked_at < TEMPLATE_CHECK_INTERVAL:
+        return _digest
+    digest = templates_digest(TEMPLATE_DIR)
+    with _env_lock:
+        if _digest is not None and digest != _digest:
+            if _env is not None:
+                _env.cache.clear()
+            _string_templates.clear()
+            logger.info("Templates changed on disk; compiled templates dropped")
+        _digest = digest
+        _checked_at = time.monotonic()
+    return digest
+
+
+def get_template(name: str) -> Template:
+    """Compiled template by name (compiled on first use, then served from memory)"""
+    return get_template_env().get_template(name)
+
+
+def template_from_string(source: str) -> Template:
+    """Compile an inline template once per distinct source"""
+    key = hashlib.sha1(source.encode("utf-8")).hexdigest()
+    template = _string_templates.get(key)
+    if template is None:
+        template = get_template_env().from_string(source)
+        _string_templates[key] = template
+    return template
+
+
+def preload_templates():
+    """Compile every template up front (workers call this before their first build)"""
+    env = get_template_env()
+    for name in env.list_templates(filter_func=lambda name: name.endswith(".j2")):
+        try:
+            env.get_template(name)
+        except Exception as e:
+            logger.warning(f"Could not preload template {name}: {e}")
@@ -0,0 +1,86 @@
+"""
+Shared timestamp parsing and epoch helpers
+Articles carry integer published_ts / ingested_ts columns normalized at ingest; these helpers
+parse whatever string inputs are left (feeds, admin edits, legacy rows) through one cached parser
+"""
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Dict, Optional, Union
+
+TimestampInput = Union[str, int, float, datetime, None]
+
+
+@lru_cache(maxsize=65536)
+def _parse_string(value: str) -> Optional[datetime]:
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        # Same normalization the scorers always used: drop 'Z'/'+hh:mm' and keep the wall-clock time
+        return datetime.fromisoformat(value.replace('Z', '+00:00').split('+')[0]).replace(tzinfo=None)
+    except ValueError:
+        pass
+    try:
+        # Just the date part
+        return datetime.fromisoformat(value.split('T')[0])
+    except ValueError:
+        pass
+    try:
+        # RFC 2822 dates straight from RSS feeds
+        return parsedate_to_datetime(value).replace(tzinfo=None)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def parse_datetime(value: TimestampInput) -> Optional[datetime]:
+    """Parse a timestamp into a naive (wall-clock) datetime
+
+    Args:
+        value: ISO 8601 / RFC 2822 string, epoch seconds, or datetime
+
+    Returns:
+        Naive datetime, or None if the value is empty or unparseable
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value) if value > 0 else None
+    if isinstance(value, str):
+        return _parse_string(value)
+    return None
+
+
+def to_epoch(value: TimestampInput) -> Optional[int]:
+    """Epoch seconds for a timestamp (naive times are local), or None if unparseable"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value) if value > 0 else None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        return None
+    try:
+        return int(parsed.timestamp())
+    except (OverflowError, OSError, ValueError):
+        return None
+
+
+def article_epoch(article: Dict, field: str = 'published') -> Optional[int]:
+    """Epoch seconds for an article date, preferring the normalized <field>_ts column
+
+    A stored 0 means the string was missing or unparseable at ingest.
+    """
+    column = 'ingested_ts' if field == 'ingested_at' else f'{field}_ts'
+    stored = article.get(column)
+    if isinstance(stored, int) and stored >= 0:
+        return stored or None
+    return to_epoch(article.get(field))
+
+
+def hours_since(epoch: Optional[int], now: Optional[float] = None) -> Optional[float]:
+    """Hours elapsed since an epoch timestamp (None stays None)"""
+    if epoch is None:
+        return None
+    return ((now if now is not None else time.time()) - epoch) / 3600
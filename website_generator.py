@@ -9,18 +9,22 @@ import shutil
 import json
 import time
 from collections import OrderedDict
-from jinja2 import Template, Environment, FileSystemLoader
+from jinja2 import Template
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 import logging
 import contextlib
+from concurrent.futures import ThreadPoolExecutor
 from config import WEBSITE_CONFIG, LOCALE, DATABASE_CONFIG, CATEGORY_SLUGS, CATEGORY_MAPPING, CATEGORY_COLORS, WEATHER_CONFIG, SCANNER_CONFIG
 from ingestors.weather_ingestor import WeatherIngestor
 from website_generator.static.css.styles import get_css_content
 from website_generator.static.js.scripts import get_js_content
 from utils.image_processor import should_optimize_image, optimize_image
-from utils.image_cache import get_image_cache
+from utils.timestamps import article_epoch, to_epoch
+from utils.build_manifest import BuildManifest, page_inputs
+from utils.site_writer import get_site_writer
+from utils.templates import get_template_env, sync_templates, template_from_string
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -28,6 +32,12 @@ logger = logging.getLogger(__name__)
 
 class WebsiteGenerator:
     """Generate static website from aggregated news with MSN-style layout"""
+
+    # Category pages built for every zip (category/scanner.html is then replaced by the scanner page)
+    CATEGORY_PAGES = ['business', 'crime', 'events', 'food', 'local-news', 'meetings', 'obituaries', 'scanner', 'schools', 'sports', 'weather']
+
+    # Threads rendering the pages of one zip concurrently
+    RENDER_WORKERS = min(8, os.cpu_count() or 1)
     
     def __init__(self):
         self.output_dir = WEBSITE_CONFIG.get("output_dir", "build")
@@ -49,7 +59,7 @@ class WebsiteGenerator:
         self.use_file_templates = template_dir.exists() and template_dir.is_dir()
         if self.use_file_templates:
             try:
-                self.jinja_env = Environment(loader=FileSystemLoader(str(template_dir)))
+                self.jinja_env = get_template_env()
             except Exception as e:
                 logger.warning(f"Could not initialize Jinja2 FileSystemLoader: {e}")
                 self.use_file_templates = False
@@ -78,7 +88,7 @@ class WebsiteGenerator:
             logger.info(f"Template dir: {template_dir}, exists: {template_dir.exists()}, is_dir: {template_dir.is_dir()}, use_file_templates: {self.use_file_templates}")
             if self.use_file_templates:
                 try:
-                    self.jinja_env = Environment(loader=FileSystemLoader(str(template_dir)))
+                    self.jinja_env = get_template_env()
                     logger.info(f"Using file-based templates from {template_dir}")
                 except Exception as e:
                     logger.warning(f"Could not initialize Jinja2 FileSystemLoader: {e}")
@@ -104,6 +114,13 @@ class WebsiteGenerator:
                 self.output_dir = "build"
             self._ensure_directories()
 
+    def _ready_thumbnails(self, articles: List[Dict]) -> List[str]:
+        """Image URLs among articles whose thumbnails are cached (a page input: pages switch to them once made)"""
+        if not self.image_cache:
+            return []
+        return sorted({a['image_url'] for a in articles
+                       if isinstance(a.get('image_url'), str) and self.image_cache.has_thumbnails(a['image_url'])})
+
     def enrich_article_with_thumbnails(self, article: Dict) -> Dict:
         """
         Enrich an article with thumbnail URLs for different sizes.
@@ -147,8 +164,11 @@ class WebsiteGenerator:
             return article
 
         try:
-            # Try to get/create thumbnails
+            # Use cached thumbnails; missing ones are queued for the background pipeline
             thumbnails = self.image_cache.get_all_thumbnails(original_url)
+            if not all(thumbnails.values()):
+                self.image_cache.request(original_url)
+            thumbnails = {size: f"/{path}" for size, path in thumbnails.items() if path}
 
             # Set thumbnail URLs with fallbacks to original image
             article['thumbnail_small'] = thumbnails.get('small') or original_url
@@ -173,7 +193,7 @@ class WebsiteGenerator:
         self.use_file_templates = template_dir.exists() and template_dir.is_dir()
         if self.use_file_templates:
             try:
-                self.jinja_env = Environment(loader=FileSystemLoader(str(template_dir)))
+                self.jinja_env = get_template_env()
             except Exception as e:
                 logger.warning(f"Could not initialize Jinja2 FileSystemLoader: {e}")
                 self.use_file_templates = False
@@ -191,11 +211,15 @@ class WebsiteGenerator:
         os.makedirs(os.path.join(self.output_dir, "category"), exist_ok=True)
         self.images_dir.mkdir(parents=True, exist_ok=True)
     
-    def generate(self, articles: List[Dict], zip_code: Optional[str] = None, city_state: Optional[str] = None):
+    def generate(self, articles: List[Dict], zip_code: Optional[str] = None, city_state: Optional[str] = None, full: bool = False):
         """Generate complete website with incremental updates
         Phase 6: Now supports city_state for city-based generation
 
         Args:
+            articles: Enriched articles for the zip
+            zip_code: Zip code to generate (defaults to 02720)
+            city_state: Optional "City, ST" for city-based generation
+            full: Re-render every page even if its inputs are unchanged
         """
         try:
             # Phase 6: Default to Fall River (02720) if no zip_code or city_state provided
@@ -238,7 +262,10 @@ class WebsiteGenerator:
                 logger.info(f"Generating website for default zip {zip_code} in {self.output_dir} with {len(articles)} articles...")
 
             # Check if we can do incremental update
-            last_article_id = self._get_last_generated_article_id()
+            manifest = BuildManifest(zip_code).load()
+            last_article_id = manifest.last_article_id
+            if full:
+                manifest.pages = {}
             new_articles = self._get_new_articles(articles, last_article_id)
 
             # Auto-expire old flags before generation
@@ -253,14 +280,16 @@ class WebsiteGenerator:
 
             # Use incremental generation which includes index.html generation
             logger.info("Incremental regeneration: generating index and category pages")
-            self._generate_incremental(articles, new_articles, last_article_id, zip_code)
+            self._generate_incremental(articles, new_articles, last_article_id, zip_code, manifest)
 
-            # Update last article ID
-            if articles:
-                article_ids = [a.get('id', 0) for a in articles if a.get('id')]
-                if article_ids:
-                    max_id = max(article_ids)
-                    self._update_last_generated_article_id(max_id)
+            # Update last article ID and the per-page inputs
+            article_ids = [a.get('id', 0) for a in articles if a.get('id')]
+            manifest.save(max(article_ids) if article_ids else None)
+
+            # Thumbnails queued while rendering are made in the background; pages showing them
+            # are rebuilt by the next generation, since thumbnail readiness is part of their inputs
+            if self.image_cache:
+                self.image_cache.process_pending()
 
             # Restore original output directory
             self.output_dir = original_output_dir
@@ -287,45 +316,33 @@ class WebsiteGenerator:
         logger.info(f"Processing {len(articles)} articles")
         logger.info("=" * 60)
         
-        logger.info("Step 1/6: Loading admin settings...")
+        logger.info("Step 1/5: Loading admin settings...")
         admin_settings = self._get_admin_settings()
         logger.info("✓ Admin settings loaded")
         
-        logger.info("Step 2/6: Filtering enabled articles...")
+        logger.info("Step 2/5: Filtering enabled articles...")
         enabled_articles = self._get_enabled_articles(articles, admin_settings, zip_code=zip_code, city_state=city_state)
         logger.info(f"✓ Filtered to {len(enabled_articles)} enabled articles (from {len(articles)} total)")
         
-        logger.info("Step 3/6: Fetching weather data...")
+        logger.info("Step 3/5: Fetching weather data...")
         # CACHING DISABLED - Always fetch fresh weather data
         logger.info("[CACHE] ⚠️ Weather caching DISABLED - fetching fresh data")
         weather = self.weather_ingestor.fetch_weather()
         logger.info("✓ Weather data fetched (fresh)")
 
-        logger.info("Step 4/6: Generating index page...")
-        self._generate_index(enabled_articles, weather, admin_settings, zip_code)
-        logger.info("  ✓ Index page generated")
-
-        logger.info("Step 5/6: Generating category pages...")
-        # Generate category pages for all categories
-        categories_to_generate = ['business', 'crime', 'events', 'food', 'local-news', 'meetings', 'obituaries', 'scanner', 'schools', 'sports', 'weather']
-        for category_slug in categories_to_generate:
-            try:
-                self._generate_category_page(category_slug, enabled_articles, weather, admin_settings, zip_code)
-                logger.info(f"  ✓ Generated {category_slug} category page")
-            except Exception as e:
-                logger.error(f"Failed to generate {category_slug} category page: {e}")
-
-        # Generate scanner page separately
-        logger.info("About to generate scanner page...")
-        try:
-            self._generate_scanner_page(weather, admin_settings, zip_code, city_state)
-            logger.info("  ✓ Generated scanner page")
-        except Exception as e:
-            logger.error(f"Failed to generate scanner page: {e}")
-            import traceback
-            logger.error(f"Scanner generation traceback: {traceback.format_exc()}")
-
-        logger.info("Step 6/6: Generating CSS and JS files...")
+        logger.info("Step 4/5: Rendering index, category and scanner pages...")
+        # Pages are independent; each renders from its own copy of the enabled articles.
+        # The scanner page owns category/scanner.html, so it replaces the scanner category page.
+        pages = [('index', lambda: self._generate_index(self._article_snapshot(enabled_articles), weather, admin_settings, zip_code))]
+        for category_slug in self.CATEGORY_PAGES:
+            if category_slug == 'scanner':
+                continue
+            pages.append((f"category/{category_slug}",
+                          lambda slug=category_slug: self._generate_category_page(slug, self._article_snapshot(enabled_articles), weather, admin_settings, zip_code)))
+        pages.append(('scanner', lambda: self._generate_scanner_page(weather, admin_settings, zip_code, city_state)))
+        self._render_pages(pages)
+
+        logger.info("Step 5/5: Generating CSS and JS files...")
         self._generate_css()
         logger.info("  ✓ CSS generated")
         self._generate_js()
@@ -337,26 +354,53 @@ class WebsiteGenerator:
         logger.info(f"✓ Website fully regenerated in {self.output_dir}")
         logger.info("=" * 60)
     
-    def _generate_incremental(self, all_articles: List[Dict], new_articles: List[Dict], last_article_id: int, zip_code: Optional[str] = None):
+    def _generate_incremental(self, all_articles: List[Dict], new_articles: List[Dict], last_article_id: int, zip_code: Optional[str] = None,
+                              manifest: Optional[BuildManifest] = None):
         """Generate website incrementally - only update changed pages
-        
+
+        Every page's inputs (article IDs and content, settings, weather snapshot, templates) are
+        compared with the build manifest; pages whose inputs are unchanged are not rewritten.
+
         Args:
+            all_articles: All articles for this zip
+            new_articles: Articles added since the last generation
+            last_article_id: Highest article ID included in the last generation
+            zip_code: Zip code being generated
+            manifest: Loaded build manifest for the zip (loaded here if omitted; caller saves it)
         """
+        if manifest is None:
+            manifest = BuildManifest(zip_code).load()
         admin_settings = self._get_admin_settings()
         enabled_articles = self._get_enabled_articles(all_articles, admin_settings, zip_code=zip_code)
         weather = self.weather_ingestor.fetch_weather()
-        
-        # Always regenerate index (it shows all articles)
-        logger.info("About to call _generate_index")
-        try:
-            result = self._generate_index(enabled_articles, weather, admin_settings, zip_code)
-            logger.info(f"_generate_index returned: {result}")
-            logger.info("  ✓ Index page generated")
-        except Exception as e:
-            logger.error(f"Failed to generate index page: {e}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
-        
+        templates = sync_templates(force=True)  # Also drops compiled templates whose files changed
+        logger.info(f"Incremental update: {len(new_articles)} new articles since ID {last_article_id}")
+
+        # Fingerprint every page before rendering (rendering annotates the article dicts).
+        # Index shows all enabled articles, plus trending and last-update text read from the database
+        index_inputs = page_inputs(enabled_articles, admin_settings, weather, templates,
+                                   zip_code=zip_code, database=self._get_articles_watermark(),
+                                   thumbnails=self._ready_thumbnails(enabled_articles))
+        category_inputs = {}
+        for category_slug in self.CATEGORY_PAGES:
+            if category_slug == 'scanner':
+                continue  # category/scanner.html belongs to the scanner page
+            category_articles = [a for a in enabled_articles if a.get('category') == category_slug][:50]
+            category_inputs[category_slug] = page_inputs(category_articles, admin_settings, weather, templates, zip_code=zip_code,
+                                                         thumbnails=self._ready_thumbnails(category_articles))
+        scanner_inputs = page_inputs([], admin_settings, weather, templates, zip_code=zip_code)
+
+        pages = [('index', lambda: manifest.build('index', index_inputs, os.path.join(self.output_dir, "index.html"),
+                                                  lambda: self._generate_index(self._article_snapshot(enabled_articles), weather, admin_settings, zip_code)))]
+        for category_slug, inputs in category_inputs.items():
+            output_file = os.path.join(self.output_dir, "category", f"{category_slug}.html")
+            pages.append((f"category/{category_slug}", lambda slug=category_slug, inputs=inputs, output_file=output_file: manifest.build(
+                f"category/{slug}", inputs, output_file,
+                lambda: self._generate_category_page(slug, self._article_snapshot(enabled_articles), weather, admin_settings, zip_code))))
+        pages.append(('scanner', lambda: manifest.build('scanner', scanner_inputs, os.path.join(self.output_dir, "category", "scanner.html"),
+                                                        lambda: self._generate_scanner_page(weather, admin_settings, zip_code))))
+        self._render_pages(pages)
+
         # CSS and JS only if they don't exist or are old
         css_path = Path(self.output_dir) / "css" / "style.css"
         js_path = Path(self.output_dir) / "js" / "main.js"
@@ -369,42 +413,64 @@ class WebsiteGenerator:
             self._generate_js()
             logger.info("  ✓ JS generated")
         
-        # Always copy static JS files in incremental updates to ensure weather.js is current
+        # Copy static JS files whose content changed so weather.js stays current
         self._copy_static_js_files()
 
-        # Generate scanner page
-        logger.info("About to generate scanner page...")
+        logger.info(f"Incremental update complete in {self.output_dir}: rebuilt {len(manifest.rebuilt)} pages "
+                    f"({', '.join(manifest.rebuilt) or 'none'}), {len(manifest.skipped)} unchanged")
+
+    def _render_pages(self, pages: List[tuple]):
+        """Render independent pages concurrently on a thread pool
+
+        Templates are loaded before the pool starts so workers share the compiled templates.
+        A failing page is logged and does not stop the others.
+
+        Args:
+            pages: (name, render) pairs; each render() writes its own output file
+        """
+        self._warm_templates()
+        start = time.time()
+        workers = max(1, min(self.RENDER_WORKERS, len(pages)))
+        if workers == 1:
+            for name, render in pages:
+                self._render_page(name, render)
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="render") as executor:
+                list(executor.map(lambda page: self._render_page(*page), pages))
+        logger.info(f"Rendered {len(pages)} pages with {workers} worker(s) in {time.time() - start:.2f}s")
+
+    def _render_page(self, name: str, render):
         try:
-            self._generate_scanner_page(weather, admin_settings, zip_code)
-            logger.info("  ✓ Generated scanner page")
+            render()
         except Exception as e:
-            logger.error(f"Failed to generate scanner page: {e}")
-            import traceback
-            logger.error(f"Scanner generation traceback: {traceback.format_exc()}")
+            logger.error(f"Failed to generate {name} page: {e}", exc_info=True)
 
-        logger.info(f"Incremental update complete in {self.output_dir}")
-    
-    def _get_last_generated_article_id(self) -> int:
-        """Get the last article ID that was included in website generation"""
+    def _warm_templates(self):
+        """Compile the page templates once, before concurrent renders ask for them"""
+        if not (self.use_file_templates and self.jinja_env):
+            return
+        sync_templates(force=True)
+        for name in ("index.html.j2", "category.html.j2"):
+            try:
+                self.jinja_env.get_template(name)
+            except Exception as e:
+                logger.warning(f"Could not preload template {name}: {e}")
+
+    @staticmethod
+    def _article_snapshot(articles: List[Dict]) -> List[Dict]:
+        """Per-page copies of the article dicts (renderers annotate the articles they are given)"""
+        return [dict(article) for article in articles]
+
+    def _get_articles_watermark(self) -> Dict:
+        """Newest article ID and creation time in the database (inputs to trending and last-update text)"""
         try:
             with self.get_db_cursor() as cursor:
-                cursor.execute('SELECT last_article_id FROM website_generation ORDER BY id DESC LIMIT 1')
+                cursor.execute('SELECT MAX(id), MAX(created_at) FROM articles')
                 row = cursor.fetchone()
-                return row[0] if row and row[0] else 0
+                return {'max_id': row[0], 'max_created_at': row[1]} if row else {}
         except Exception as e:
-            logger.warning(f"Could not get last generated article ID: {e}")
-            return 0
-    
-    def _update_last_generated_article_id(self, article_id: int):
-        """Update the last article ID that was included in website generation"""
-        try:
-            with self.get_db_cursor() as cursor:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO website_generation (id, last_article_id, last_generation_time)
-                    VALUES (1, ?, ?)
-                ''', (article_id, datetime.now().isoformat()))
-        except Exception as e:
-            logger.warning(f"Could not update last article ID: {e}")
+            logger.warning(f"Could not read article watermark: {e}")
+            return {}
     
     def _get_new_articles(self, articles: List[Dict], last_article_id: int) -> List[Dict]:
         """Get articles that are newer than last generated article ID"""
@@ -743,20 +809,8 @@ class WebsiteGenerator:
         # Sort by updated_at DESC (newest top hat clicks first), then by display_order
         # This ensures articles marked most recently by admin appear first
         def parse_timestamp(ts_str):
-            if ts_str is None:
-                return 0  # Default to oldest if None
-            try:
-                if not isinstance(ts_str, str) or not ts_str.strip():
-                    return 0  # Default to oldest if not a string or empty
-                from datetime import datetime
-                # Clean the timestamp string and parse it
-                cleaned_ts = ts_str.strip()
-                return datetime.fromisoformat(cleaned_ts.replace('Z', '+00:00').split('+')[0]).timestamp()
-            except Exception as e:
-                # Only log warnings for actual timestamp strings, not None values
-                if ts_str and isinstance(ts_str, str):
-                    logger.warning(f"Could not parse timestamp '{ts_str}': {e}")
-                return 0  # Default to oldest if parsing fails
+            # Unset or unparseable timestamps sort as oldest
+            return to_epoch(ts_str) or 0
 
         top_stories.sort(key=lambda x: (
             -parse_timestamp(x.get('_top_story_updated_at')),  # Newest clicked first (negative for descending)
@@ -799,15 +853,16 @@ class WebsiteGenerator:
         newest_articles.sort(key=lambda x: parse_timestamp(x.get('published') or x.get('created_at')), reverse=True)
         newest_articles = newest_articles[:10]  # Take top 10 newest articles
         
-        # Add related articles to each article
+        # Add related articles to each article (index built once per generation and stored for the admin view)
         try:
-            from aggregator import NewsAggregator
-            aggregator = NewsAggregator()
+            from utils.related_index import build_related_index
+            related_index = build_related_index(all_articles, zip_code=zip_code)
             for article in all_articles:
-                # Add related articles logic here
-                pass
+                article['related_article_ids'] = [related.get('id') for related, _ in related_index.related(article.get('id'))]
         except ImportError:
-            pass  # Skip if aggregator not available
+            pass  # Optional feature
+        except Exception as e:
+            logger.warning(f"Error building related articles index: {e}")
 
         # Enrich articles with source initials, combined gradients, and glow colors
         for article in all_articles:
@@ -1120,8 +1175,7 @@ class WebsiteGenerator:
             # Fallback to simple HTML
             html = f"<html><body><h1>{title}</h1><p>Template error: {e}</p><p>Generated at {datetime.now()}</p></body></html>"
 
-        with open(os.path.join(self.output_dir, "index.html"), "w", encoding="utf-8", errors='replace') as f:
-            f.write(html)
+        get_site_writer().write_text(os.path.join(self.output_dir, "index.html"), html)
 
 
     def _get_nav_tabs(self, active_page: str = "home", zip_code: Optional[str] = None, is_category_page: bool = False) -> str:
@@ -1293,7 +1347,6 @@ class WebsiteGenerator:
 
         # Only fall back if Jinja2 environment is not available
         logger.warning("Using fallback template - Jinja2 environment not available")
-        from jinja2 import Template
         template_content = '''
 <!DOCTYPE html>
 <html lang="en" class="dark">
@@ -1336,7 +1389,7 @@ class WebsiteGenerator:
 </body>
 </html>
                 '''
-        return Template(template_content)
+        return template_from_string(template_content)
         
         # Determine paths
         # Note: self.output_dir is already set to zip-specific directory if zip_code is provided
@@ -1593,8 +1646,7 @@ class WebsiteGenerator:
             # Fallback to simple HTML
             html = f"<html><body><h1>{title}</h1><p>Template error: {e}</p><p>Generated at {datetime.now()}</p></body></html>"
 
-        with open(os.path.join(self.output_dir, "index.html"), "w", encoding="utf-8", errors='replace') as f:
-            f.write(html)
+        get_site_writer().write_text(os.path.join(self.output_dir, "index.html"), html)
 
         # Prepare template variables
         template_vars = {
@@ -1607,8 +1659,7 @@ class WebsiteGenerator:
         html = template.render(**template_vars)
         
         output_file = os.path.join(output_path, f"{category_slug}.html")
-        with open(output_file, "w", encoding="utf-8", errors='replace') as f:
-            f.write(html)
+        get_site_writer().write_text(output_file, html)
 
         logger.info(f"Generated category page: {output_file} ({len(formatted_articles)} articles)")
     
@@ -1692,8 +1743,7 @@ class WebsiteGenerator:
             logger.info(f"Rendering category template for {category_slug} with context keys: {list(template_context.keys())}")
             html = template.render(**template_context)
             output_file = os.path.join(output_path, f"{category_slug}.html")
-            with open(output_file, "w", encoding="utf-8", errors='replace') as f:
-                f.write(html)
+            get_site_writer().write_text(output_file, html)
             logger.info(f"Generated category page: {output_file}")
         except Exception as e:
             logger.error(f"Failed to render category template for {category_slug}: {e}")
@@ -1840,8 +1890,7 @@ class WebsiteGenerator:
         output_file = os.path.join(output_path, "scanner.html")
         logger.info(f"About to write scanner page to: {output_file}")
         logger.info(f"HTML length: {len(scanner_html)}")
-        with open(output_file, "w", encoding="utf-8", errors='replace') as f:
-            f.write(scanner_html)
+        get_site_writer().write_text(output_file, scanner_html)
         logger.info(f"Successfully wrote scanner page: {output_file}")
 
     def _get_source_gradient(self, source: str) -> str:
@@ -2101,8 +2150,7 @@ class WebsiteGenerator:
     def _generate_css(self):
         """Generate CSS file"""
         css = self._get_css_content()
-        with open(os.path.join(self.output_dir, "css", "style.css"), "w", encoding="utf-8", errors='replace') as f:
-            f.write(css)
+        get_site_writer().write_text(os.path.join(self.output_dir, "css", "style.css"), css)
 
     def _get_css_content(self) -> str:
         """Get CSS content"""
@@ -2111,8 +2159,7 @@ class WebsiteGenerator:
     def _generate_js(self):
         """Generate JavaScript file"""
         js = self._get_js_content()
-        with open(os.path.join(self.output_dir, "js", "main.js"), "w", encoding="utf-8", errors='replace') as f:
-            f.write(js)
+        get_site_writer().write_text(os.path.join(self.output_dir, "js", "main.js"), js)
 
     def _get_js_content(self) -> str:
         """Get JavaScript content with progressive loading"""
@@ -2139,9 +2186,7 @@ class WebsiteGenerator:
         for filename in static_files:
             src_file = public_js_dir / filename
             dst_file = output_js_dir / filename
-            if src_file.exists():
-                import shutil
-                shutil.copy2(src_file, dst_file)
+            if src_file.exists() and get_site_writer().copy_file(str(src_file), str(dst_file)):
                 logger.info(f"Copied static JS file: {filename}")
 
     def _get_trending_articles(self, articles: List[Dict], limit: int = 10) -> List[Dict]:
@@ -2155,7 +2200,7 @@ class WebsiteGenerator:
                     FROM articles a
                     LEFT JOIN article_management am ON a.id = am.article_id AND am.zip_code = '02720'
                     WHERE a.zip_code = '02720' AND a.relevance_score IS NOT NULL AND a.relevance_score > 0
-                    ORDER BY a.relevance_score DESC, a.published DESC
+                    ORDER BY a.relevance_score DESC, a.published_ts DESC
                     LIMIT 200  -- Get top 200 candidates to find the best trending articles
                 ''')
 
@@ -2238,25 +2283,9 @@ class WebsiteGenerator:
         def sort_key(article):
             # Use boosted score if available, otherwise regular relevance score
             relevance_score = article.get('_boosted_score', article.get('relevance_score', 0))
-            published = article.get('published')
-            if published:
-                # Convert to sortable format (newer dates sort first)
-                try:
-                    from datetime import datetime
-                    pub_dt = datetime.fromisoformat(published.replace('Z', '+00:00'))
-                    pub_timestamp = -pub_dt.timestamp()  # Negative for descending (newest first)
-                except:
-                    pub_timestamp = 0
-                return (-relevance_score, pub_timestamp)
-            # Fallback to other date fields
-            created_at = article.get('created_at', article.get('date_sort', '1970-01-01'))
-            try:
-                from datetime import datetime
-                created_dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                created_timestamp = -created_dt.timestamp()
-            except:
-                created_timestamp = 0
-            return (-relevance_score, created_timestamp)
+            # Newest first: prefer the normalized published_ts, then fall back to other date fields
+            timestamp = article_epoch(article) or to_epoch(article.get('created_at', article.get('date_sort'))) or 0
+            return (-relevance_score, -timestamp)
 
         sorted_articles = sorted(filtered_trending, key=sort_key)
         return sorted_articles[:limit]
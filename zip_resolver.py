@@ -8,15 +8,14 @@ import logging
 import sqlite3
 from typing import Dict, Optional
 from functools import lru_cache
-import time
 from config import DATABASE_CONFIG
+from cache import get_cache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# In-memory cache with TTL (24 hours)
-_cache = {}
-_cache_ttl = 24 * 60 * 60  # 24 hours in seconds
+# Seconds a zip that neither API could resolve is not retried
+UNRESOLVED_TTL = 10 * 60
 
 
 def resolve_zip(zip_code: str) -> Optional[Dict[str, str]]:
@@ -57,13 +56,15 @@ def resolve_zip(zip_code: str) -> Optional[Dict[str, str]]:
     except Exception as e:
         logger.warning(f"Error checking database cache for zip {zip_code}: {e}")
     
-    # Check in-memory cache
-    cache_key = zip_code
-    if cache_key in _cache:
-        cached_data, cached_time = _cache[cache_key]
-        if time.time() - cached_time < _cache_ttl:
-            logger.debug(f"Using in-memory cache for zip {zip_code}")
-            return cached_data
+    # Check the shared cache (resolutions and recent failures)
+    cache = get_cache()
+    cached_data = cache.get("zip", zip_code)
+    if cached_data is not None:
+        if cached_data.get("unresolved"):
+            logger.debug(f"Zip {zip_code} failed to resolve recently, not retrying yet")
+            return None
+        logger.debug(f"Using cached resolution for zip {zip_code}")
+        return cached_data
     
     # Try primary API: zippopotam.us
     try:
@@ -82,8 +83,7 @@ def resolve_zip(zip_code: str) -> Optional[Dict[str, str]]:
                 }
                 # Save to database cache
                 _save_to_db_cache(zip_code, result)
-                # Cache in memory
-                _cache[cache_key] = (result, time.time())
+                cache.set("zip", zip_code, result)
                 logger.info(f"Resolved {zip_code} to {result['city_state']}")
                 return result
     except Exception as e:
@@ -105,14 +105,14 @@ def resolve_zip(zip_code: str) -> Optional[Dict[str, str]]:
                 }
                 # Save to database cache
                 _save_to_db_cache(zip_code, result)
-                # Cache in memory
-                _cache[cache_key] = (result, time.time())
+                cache.set("zip", zip_code, result)
                 logger.info(f"Resolved {zip_code} to {result['city_state']} (fallback API)")
                 return result
     except Exception as e:
         logger.warning(f"Ziptastic API failed for {zip_code}: {e}")
     
     logger.error(f"Failed to resolve zip code {zip_code} from both APIs")
+    cache.set("zip", zip_code, {"unresolved": True}, ttl=UNRESOLVED_TTL)
     return None
 
 